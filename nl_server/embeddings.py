@@ -20,6 +20,8 @@ from typing import Dict, List
 
 import torch
 
+from shared.lib import metrics
+
 
 # A single match from Embeddings result.
 @dataclass
@@ -71,6 +73,13 @@ class EmbeddingsStore(ABC):
 # Search result keyed by query.
 SearchVarsResult = Dict[str, EmbeddingsResult]
 
+ENCODE_SECONDS = metrics.histogram('nl_embedding_duration_seconds',
+                                   'Time to embed a batch of queries.',
+                                   ['model'])
+_VECTOR_SEARCH_SECONDS = metrics.histogram(
+    'nl_vector_search_duration_seconds',
+    'Time to search an embeddings store for a batch of queries.', ['store'])
+
 
 # A simple wrapper around EmbeddingsModel + EmbeddingsStore.
 class Embeddings:
@@ -81,7 +90,8 @@ class Embeddings:
 
   # Given a list of queries, returns
   def vector_search(self, queries: List[str], top_k: int) -> SearchVarsResult:
-    query_embeddings = self.model.encode(queries)
+    with ENCODE_SECONDS.time(model=type(self.model).__name__):
+      query_embeddings = self.model.encode(queries)
 
     if self.model.returns_tensor and not self.store.needs_tensor:
       # Convert to List[List[float]]
@@ -91,7 +101,8 @@ class Embeddings:
       query_embeddings = torch.tensor(query_embeddings, dtype=torch.float)
 
     # Call the store.
-    results = self.store.vector_search(query_embeddings, top_k)
+    with _VECTOR_SEARCH_SECONDS.time(store=type(self.store).__name__):
+      results = self.store.vector_search(query_embeddings, top_k)
 
     # Turn this into a map:
     return {k: v for k, v in zip(queries, results)}
@@ -20,10 +20,13 @@ from flask import Flask
 import google.cloud.logging
 import torch
 
+from nl_server import loader
 from nl_server import registry
 from nl_server import routes
 from nl_server import search
 from shared.lib import gcp as lib_gcp
+from shared.lib import metrics
+from shared.lib import profiling
 from shared.lib import utils as lib_utils
 
 
@@ -74,7 +77,10 @@ def create_app():
 
     app = Flask(__name__)
     app.register_blueprint(routes.bp)
+    profiling.init(app)
+    metrics.init(app, 'nl_server')
     app.config[registry.REGISTRY_KEY] = reg
+    app.config[loader.LOADER_KEY] = loader.RegistryLoader(app)
 
     logging.info('NL Server Flask app initialized')
     return app
@@ -0,0 +1,110 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Background reloading of the NL server registry."""
+
+from enum import Enum
+import logging
+import threading
+import time
+
+from flask import Flask
+
+from nl_server import registry
+from nl_server.registry import REGISTRY_KEY
+
+LOADER_KEY: str = 'REGISTRY_LOADER'
+
+
+class LoadState(str, Enum):
+  IDLE = 'IDLE'
+  LOADING = 'LOADING'
+  DONE = 'DONE'
+  FAILED = 'FAILED'
+
+
+class RegistryLoader:
+  """
+  Rebuilds the registry on a background thread and swaps it into the app
+  config once it is fully loaded.
+
+  Requests keep being served by the current registry while a load is in
+  progress. Only indexes whose config or embeddings file changed are rebuilt,
+  everything else is shared with the current registry.
+  """
+
+  def __init__(self, app: Flask):
+    self._app = app
+    self._lock = threading.Lock()
+    self._thread: threading.Thread = None
+    self._status = {'state': LoadState.IDLE}
+
+  def start(self, additional_catalog_path: str = None) -> bool:
+    """
+    Starts a background load. Returns False if a load is already in progress.
+    """
+    with self._lock:
+      if self._thread and self._thread.is_alive():
+        return False
+      self._status = {
+          'state': LoadState.LOADING,
+          'additional_catalog_path': additional_catalog_path,
+          'start_time': time.time(),
+      }
+      self._thread = threading.Thread(target=self._load,
+                                      args=(additional_catalog_path,),
+                                      name='nl-registry-loader',
+                                      daemon=True)
+      self._thread.start()
+      return True
+
+  def wait(self, timeout: float = None):
+    thread = self._thread
+    if thread:
+      thread.join(timeout)
+
+  def status(self) -> dict:
+    with self._lock:
+      return dict(self._status)
+
+  def _update_status(self, **kwargs):
+    with self._lock:
+      self._status.update(kwargs)
+
+  def _load(self, additional_catalog_path: str):
+    start = time.time()
+    try:
+      current: registry.Registry = self._app.config.get(REGISTRY_KEY)
+      new_reg = registry.build(additional_catalog_path=additional_catalog_path,
+                               previous=current)
+      # A single assignment, so concurrent requests see either the old or the
+      # new registry and never a partially loaded one.
+      self._app.config[REGISTRY_KEY] = new_reg
+      rebuilt_indexes = [
+          idx for idx in new_reg.name_to_emb
+          if idx not in new_reg.reused_indexes
+      ]
+      self._update_status(state=LoadState.DONE,
+                          version=new_reg.server_config().version,
+                          reused_models=new_reg.reused_models,
+                          reused_indexes=new_reg.reused_indexes,
+                          rebuilt_indexes=rebuilt_indexes,
+                          end_time=time.time(),
+                          duration_sec=round(time.time() - start, 3))
+      logging.info(f'Registry reloaded, rebuilt indexes: {rebuilt_indexes}')
+    except Exception as e:
+      logging.error(f'Server registry not built due to error: {str(e)}')
+      self._update_status(state=LoadState.FAILED,
+                          error=str(e),
+                          end_time=time.time(),
+                          duration_sec=round(time.time() - start, 3))
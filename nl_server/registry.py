@@ -12,8 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from dataclasses import asdict
+import hashlib
+import json
 import logging
-from typing import Dict
+import os
+import time
+from typing import Dict, List
 
 from nl_server import config_reader
 from nl_server.config import IndexConfig
@@ -29,21 +34,43 @@ from nl_server.model.create import create_embeddings_model
 from nl_server.ranking import RerankingModel
 from nl_server.store.memory import MemoryEmbeddingsStore
 from nl_server.store.vertexai import VertexAIStore
+from shared.lib import metrics
 from shared.lib.custom_dc_util import is_custom_dc
 
 REGISTRY_KEY: str = 'REGISTRY'
 
+_CHECKSUM_CHUNK_BYTES = 1 << 20
+
+_MODEL_LOAD_SECONDS = metrics.gauge('nl_model_load_seconds',
+                                    'Time taken to load each model.', ['model'],
+                                    mode='max')
+_INDEX_LOAD_SECONDS = metrics.gauge('nl_index_load_seconds',
+                                    'Time taken to load each index.', ['index'],
+                                    mode='max')
+
 
 class Registry:
   """
   A class to hold runtime model handle/client objects and embeddings stores.
+
+  When a previous registry is given, models whose config is unchanged and
+  indexes whose config and embeddings file are unchanged are shared with it
+  instead of being rebuilt.
   """
 
-  def __init__(self, server_config: ServerConfig):
+  def __init__(self, server_config: ServerConfig, previous: 'Registry' = None):
     self.name_to_emb: dict[str, Embeddings] = {}
     self.name_to_model: Dict[str, EmbeddingsModel | RerankingModel] = {}
-    self._attribute_model = AttributeModel()
-    self.load(server_config)
+    # Index name -> fingerprint of the index config and embeddings file.
+    self.name_to_fingerprint: Dict[str, str] = {}
+    # Names of the models and indexes that were shared with `previous`.
+    self.reused_models: List[str] = []
+    self.reused_indexes: List[str] = []
+    if previous:
+      self._attribute_model = previous.get_attribute_model()
+    else:
+      self._attribute_model = AttributeModel()
+    self.load(server_config, previous)
 
   # Note: The caller takes care of exceptions.
   # TODO: consider consistent naming among index and embedding.
@@ -69,30 +96,58 @@ class Registry:
     return self._server_config
 
   # Load the registry from the server config
-  def load(self, server_config: ServerConfig):
+  def load(self, server_config: ServerConfig, previous: 'Registry' = None):
     self._server_config = server_config
-    self._load_models(server_config.models)
+    self._load_models(server_config.models, previous)
     for idx_name, idx_info in server_config.indexes.items():
-      self._set_embeddings(idx_name, idx_info)
+      self._set_embeddings(idx_name, idx_info, previous)
 
   # Loads a dict of model name -> model info
-  def _load_models(self, models: dict[str, ModelConfig]):
+  def _load_models(self,
+                   models: dict[str, ModelConfig],
+                   previous: 'Registry' = None):
     for model_name, model_config in models.items():
       # if model has already been loaded, continue
       if model_name in self.name_to_model:
         continue
 
+      # if the previous registry loaded the same model, share it
+      if (previous and model_name in previous.name_to_model and
+          previous.server_config().models.get(model_name) == model_config):
+        self.name_to_model[model_name] = previous.name_to_model[model_name]
+        self.reused_models.append(model_name)
+        continue
+
       # try creating a model object from the model info
       try:
+        start = time.perf_counter()
         self.name_to_model[model_name] = create_embeddings_model(model_config)
+        _MODEL_LOAD_SECONDS.set(time.perf_counter() - start, model=model_name)
       except Exception as e:
         logging.error(f'error loading model {model_name}: {str(e)} ')
         raise e
 
   # Sets an index to the name_to_emb
-  def _set_embeddings(self, idx_name: str, idx_info: IndexConfig):
+  def _set_embeddings(self,
+                      idx_name: str,
+                      idx_info: IndexConfig,
+                      previous: 'Registry' = None):
+    fingerprint = _index_fingerprint(idx_info)
+    self.name_to_fingerprint[idx_name] = fingerprint
+
+    # if the previous registry has the same index on the same model, share
+    # its store
+    if previous and previous.name_to_fingerprint.get(idx_name) == fingerprint:
+      prev_emb = previous.get_index(idx_name)
+      model = self.name_to_model.get(idx_info.model)
+      if prev_emb and prev_emb.model is model:
+        self.name_to_emb[idx_name] = prev_emb
+        self.reused_indexes.append(idx_name)
+        return
+
     # try creating a store object from the index info
     store = None
+    start = time.perf_counter()
     try:
       if idx_info.store_type == StoreType.MEMORY:
         store = MemoryEmbeddingsStore(idx_info)
@@ -113,12 +168,36 @@ class Registry:
 
     # if store successfully created, set it in name_to_emb
     if store and idx_info.model in self.name_to_model:
+      _INDEX_LOAD_SECONDS.set(time.perf_counter() - start, index=idx_name)
       self.name_to_emb[idx_name] = Embeddings(
           model=self.name_to_model[idx_info.model], store=store)
 
 
+def _file_checksum(path: str) -> str:
+  md5 = hashlib.md5()
+  with open(path, 'rb') as f:
+    for chunk in iter(lambda: f.read(_CHECKSUM_CHUNK_BYTES), b''):
+      md5.update(chunk)
+  return md5.hexdigest()
+
+
+def _index_fingerprint(idx_info: IndexConfig) -> str:
+  """
+  Returns a fingerprint of an index config. For indexes backed by a local
+  embeddings file, the checksum of the file is included so that rewriting the
+  file in place is detected.
+  """
+  parts = [json.dumps(asdict(idx_info), sort_keys=True, default=str)]
+  embeddings_path = getattr(idx_info, 'embeddings_path', None)
+  if (embeddings_path and embeddings_path.startswith('/') and
+      os.path.isfile(embeddings_path)):
+    parts.append(_file_checksum(embeddings_path))
+  return '|'.join(parts)
+
+
 def build(additional_catalog: dict = None,
-          additional_catalog_path: str = None) -> Registry:
+          additional_catalog_path: str = None,
+          previous: Registry = None) -> Registry:
   """
   Build the registry based on available catalog and environment config files.
   This also get all the model/index resources downloaded and ready to use.
@@ -126,10 +205,11 @@ def build(additional_catalog: dict = None,
   Args:
     additional_catalog: additional catalog config to be merged with the default
     catalog.
+    previous: an existing registry to share unchanged models and indexes with.
   """
   catalog = config_reader.read_catalog(
       catalog_dict=additional_catalog,
       additional_catalog_path=additional_catalog_path)
   env = config_reader.read_env()
   server_config = config_reader.get_server_config(catalog, env)
-  return Registry(server_config)
+  return Registry(server_config, previous=previous)
@@ -22,9 +22,11 @@ from flask import current_app
 from flask import request
 from markupsafe import escape
 
-from nl_server import registry
 from nl_server import search
 from nl_server.embeddings import Embeddings
+from nl_server.embeddings import ENCODE_SECONDS
+from nl_server.loader import LOADER_KEY
+from nl_server.loader import RegistryLoader
 from nl_server.registry import Registry
 from nl_server.registry import REGISTRY_KEY
 from shared.lib import constants
@@ -57,7 +59,8 @@ def encode():
   queries = [str(escape(q)) for q in queries]
   reg: Registry = current_app.config[REGISTRY_KEY]
   model = reg.get_embedding_model(model_name)
-  query_embeddings = model.encode(queries)
+  with ENCODE_SECONDS.time(model=type(model).__name__):
+    query_embeddings = model.encode(queries)
   if model.returns_tensor:
     query_embeddings = query_embeddings.tolist()
   return json.dumps({q: e for q, e in zip(queries, query_embeddings)})
@@ -130,15 +133,34 @@ def embeddings_version_map():
 
 @bp.route('/api/load/', methods=['POST'])
 def load():
+  """Starts reloading the registry in the background.
+
+  The current registry keeps serving until the new one is fully loaded. Use
+  /api/load/status to follow the progress.
+
+  With ?wait=true, waits for the load to finish and returns the server config
+  of the registry, as the synchronous load did.
+  """
   additional_catalog_path = request.json.get('additional_catalog_path', None)
-  try:
-    current_app.config[REGISTRY_KEY] = registry.build(
-        additional_catalog_path=additional_catalog_path)
-  except Exception as e:
-    logging.error(f'Server registry not built due to error: {str(e)}')
-  reg: Registry = current_app.config[REGISTRY_KEY]
-  server_config = reg.server_config()
-  return json.dumps(asdict(server_config))
+  loader: RegistryLoader = current_app.config[LOADER_KEY]
+  if request.args.get('wait') == 'true':
+    # Let a load in progress finish first, so that this one reads the
+    # requested catalog.
+    while not loader.start(additional_catalog_path=additional_catalog_path):
+      loader.wait()
+    loader.wait()
+    reg: Registry = current_app.config[REGISTRY_KEY]
+    return json.dumps(asdict(reg.server_config()))
+  started = loader.start(additional_catalog_path=additional_catalog_path)
+  status = loader.status()
+  status['started'] = started
+  return json.dumps(status), 202 if started else 409
+
+
+@bp.route('/api/load/status', methods=['GET'])
+def load_status():
+  loader: RegistryLoader = current_app.config[LOADER_KEY]
+  return json.dumps(loader.status())
 
 
 def _get_indexes(reg: Registry, idx_types: List[str]) -> List[Embeddings]:
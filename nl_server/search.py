@@ -21,6 +21,7 @@ from nl_server import rerank
 from nl_server.embeddings import Embeddings
 from nl_server.embeddings import EmbeddingsResult
 from nl_server.merge import merge_search_results
+from shared.lib import metrics
 import shared.lib.detected_variables as dvars
 
 # Topic DCIDs contain this string.
@@ -33,6 +34,10 @@ _NUM_SV_INDEX_MATCHES = 40
 # try to retrieve more from vector DB.
 _NUM_SV_INDEX_MATCHES_WITHOUT_TOPICS = 60
 
+_RERANK_SECONDS = metrics.histogram(
+    'nl_rerank_duration_seconds', 'Time to rerank the candidates of a search.',
+    ['model'])
+
 
 #
 # Given a list of query embeddings, searches the embeddings index
@@ -65,6 +70,8 @@ def search_vars(embeddings_list: List[Embeddings],
     start = time.time()
     results = rerank.rerank(rerank_model, results, debug_logs)
     debug_logs['time_var_reranking'] = time.time() - start
+    _RERANK_SECONDS.observe(debug_logs['time_var_reranking'],
+                            model=type(rerank_model).__name__)
 
   return results
 
@@ -0,0 +1,132 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for incremental registry reloads."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from flask import Flask
+
+from nl_server import loader
+from nl_server import registry
+from nl_server import routes
+from nl_server.config import LocalModelConfig
+from nl_server.config import MemoryIndexConfig
+from nl_server.config import ServerConfig
+from nl_server.registry import Registry
+from nl_server.registry import REGISTRY_KEY
+
+
+def _server_config(indexes: dict) -> ServerConfig:
+  return ServerConfig(version='1',
+                      default_indexes=list(indexes.keys()),
+                      indexes=indexes,
+                      models={
+                          'm1':
+                              LocalModelConfig(type='LOCAL',
+                                               usage='EMBEDDINGS',
+                                               score_threshold=0.5,
+                                               gcs_folder='gs://bucket/m1')
+                      },
+                      enable_reranking=False)
+
+
+def _index(path: str) -> MemoryIndexConfig:
+  return MemoryIndexConfig(store_type='MEMORY',
+                           model='m1',
+                           embeddings_path=path)
+
+
+@mock.patch('nl_server.registry.AttributeModel', mock.MagicMock)
+@mock.patch('nl_server.registry.MemoryEmbeddingsStore')
+@mock.patch('nl_server.registry.create_embeddings_model')
+class TestRegistryReload(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp_dir = tempfile.TemporaryDirectory()
+    self.path_a = os.path.join(self.tmp_dir.name, 'a.csv')
+    self.path_b = os.path.join(self.tmp_dir.name, 'b.csv')
+    for path in [self.path_a, self.path_b]:
+      with open(path, 'w') as f:
+        f.write(f'dcid,sentence\nsv,{path}\n')
+
+  def tearDown(self):
+    self.tmp_dir.cleanup()
+
+  def test_reuses_unchanged(self, mock_model, mock_store):
+    mock_model.side_effect = lambda _: mock.MagicMock()
+    mock_store.side_effect = lambda _: mock.MagicMock()
+    indexes = {'a': _index(self.path_a), 'b': _index(self.path_b)}
+    old = Registry(_server_config(indexes))
+
+    # Rewrite one of the embeddings files in place.
+    with open(self.path_b, 'a') as f:
+      f.write('sv2,new sentence\n')
+    new = Registry(_server_config(indexes), previous=old)
+
+    self.assertEqual(new.reused_models, ['m1'])
+    self.assertIs(new.get_embedding_model('m1'), old.get_embedding_model('m1'))
+    self.assertIs(new.get_attribute_model(), old.get_attribute_model())
+    self.assertEqual(new.reused_indexes, ['a'])
+    self.assertIs(new.get_index('a'), old.get_index('a'))
+    self.assertIsNot(new.get_index('b'), old.get_index('b'))
+    self.assertEqual(mock_model.call_count, 1)
+    self.assertEqual(mock_store.call_count, 3)
+
+  def test_background_load_swaps_registry(self, mock_model, mock_store):
+    mock_model.side_effect = lambda _: mock.MagicMock()
+    mock_store.side_effect = lambda _: mock.MagicMock()
+    indexes = {'a': _index(self.path_a)}
+    app = Flask(__name__)
+    old = Registry(_server_config(indexes))
+    app.config[REGISTRY_KEY] = old
+    reg_loader = loader.RegistryLoader(app)
+
+    with mock.patch.object(registry.config_reader, 'read_catalog'), \
+        mock.patch.object(registry.config_reader, 'read_env'), \
+        mock.patch.object(registry.config_reader, 'get_server_config',
+                          return_value=_server_config(indexes)):
+      self.assertTrue(reg_loader.start())
+      reg_loader.wait()
+
+    status = reg_loader.status()
+    self.assertEqual(status['state'], loader.LoadState.DONE)
+    self.assertEqual(status['reused_indexes'], ['a'])
+    self.assertEqual(status['rebuilt_indexes'], [])
+    self.assertIsNot(app.config[REGISTRY_KEY], old)
+    self.assertIs(app.config[REGISTRY_KEY].get_index('a'), old.get_index('a'))
+
+  def test_load_route_waits(self, mock_model, mock_store):
+    mock_model.side_effect = lambda _: mock.MagicMock()
+    mock_store.side_effect = lambda _: mock.MagicMock()
+    indexes = {'a': _index(self.path_a)}
+    app = Flask(__name__)
+    app.register_blueprint(routes.bp)
+    old = Registry(_server_config(indexes))
+    app.config[REGISTRY_KEY] = old
+    app.config[loader.LOADER_KEY] = loader.RegistryLoader(app)
+
+    with mock.patch.object(registry.config_reader, 'read_catalog'), \
+        mock.patch.object(registry.config_reader, 'read_env'), \
+        mock.patch.object(registry.config_reader, 'get_server_config',
+                          return_value=_server_config(indexes)):
+      resp = app.test_client().post('/api/load/?wait=true', json={})
+
+    self.assertEqual(resp.status_code, 200)
+    self.assertEqual(resp.get_json()['version'], '1')
+    self.assertEqual(app.config[loader.LOADER_KEY].status()['state'],
+                     loader.LoadState.DONE)
+    self.assertIsNot(app.config[REGISTRY_KEY], old)
@@ -228,6 +228,8 @@ function run_py_test {
   # Disabled nodejs e2e test to avoid dependency on dev
   uv run --project server --group test python3 -m pytest -n auto server/tests/ -s --ignore=server/tests/nodejs_e2e_test.py ${@}
   uv run --project server --group test python3 -m pytest -n auto shared/tests/ -s ${@}
+  # The mixer stand-in runs on the server dependencies.
+  uv run --project server --group test python3 -m pytest -n auto tools/mixer_standin/ -s ${@}
 
   # Run nl server tests
   uv run --project nl_server --group test python3 -m pytest nl_server/tests/ -s ${@}
@@ -29,7 +29,10 @@ from google.api_core.exceptions import PermissionDenied
 from google.cloud import secretmanager
 import google.cloud.logging
 
-from server.lib import topic_cache
+from server.lib import lazy_config
+from server.lib import sv_metadata
+from server.lib import template_context
+from server.lib import tracing
 import server.lib.cache as lib_cache
 import server.lib.config as lib_config
 from server.lib.disaster_dashboard import get_disaster_dashboard_data
@@ -37,17 +40,22 @@ from server.lib.feature_flags import assign_spanner_cohort
 from server.lib.feature_flags import DATA_OVERVIEW_FEATURE_FLAG
 from server.lib.feature_flags import ENABLE_NL_AGENT_DETECTOR
 from server.lib.feature_flags import is_feature_enabled
+from server.lib.feature_flags import set_feature_flags
 import server.lib.i18n as i18n
 from server.lib.nl.common.bad_words import EMPTY_BANNED_WORDS
 from server.lib.nl.common.bad_words import load_bad_words
 from server.lib.nl.detection import llm_prompt
 from server.lib.nl.detection.agent.agent import create_detection_agent
+from server.lib.startup import StartupTimer
+from server.lib.startup import StaticConfig
 import server.lib.util as libutil
 from server.routes.tools import html as tools_html
 import server.services.bigtable as bt
 from server.services.discovery import configure_endpoints_from_ingress
 from server.services.discovery import get_health_check_urls
 from shared.lib import gcp as lib_gcp
+from shared.lib import metrics
+from shared.lib import profiling
 from shared.lib import utils as lib_utils
 
 BLOCKLIST_SVG_FILE = "/datacommons/svg/blocklist_svg.json"
@@ -59,6 +67,11 @@ DEFAULT_NL_ROOT = "http://127.0.0.1:6060"
 _secret_client = None
 
 
+class _WebsiteApp(Flask):
+  # Lets optional subsystems be built on first access to their app config.
+  config_class = lazy_config.LazyConfig
+
+
 def _get_api_key(env_keys=[], gcp_project='', gcp_path=''):
   """Gets an api key first from the environment, then from GCP secrets.
   
@@ -140,7 +153,7 @@ def register_routes_base_dc(app):
   app.register_blueprint(disaster_api.bp)
 
 
-def register_routes_disasters(app):
+def register_routes_disasters(app, static_config):
   # Install blueprints specific to disasters
   from server.routes.disaster import html as disaster_html
   app.register_blueprint(disaster_html.bp)
@@ -152,30 +165,31 @@ def register_routes_disasters(app):
     return
 
   # load disaster dashboard configs
-  app.config[
-      'DISASTER_DASHBOARD_CONFIG'] = libutil.get_disaster_dashboard_config()
-  app.config['DISASTER_EVENT_CONFIG'] = libutil.get_disaster_event_config()
+  lazy_config.register(app, 'DISASTER_DASHBOARD_CONFIG',
+                       lambda: static_config.get('DISASTER_DASHBOARD_CONFIG'))
+  lazy_config.register(app, 'DISASTER_EVENT_CONFIG',
+                       lambda: static_config.get('DISASTER_EVENT_CONFIG'))
 
   if app.config['INTEGRATION']:
     return
 
   # load disaster json data
   if os.environ.get('ENABLE_DISASTER_JSON') == 'true':
-    disaster_dashboard_data = get_disaster_dashboard_data(
-        app.config['GCS_BUCKET'])
-    app.config['DISASTER_DASHBOARD_DATA'] = disaster_dashboard_data
+    gcs_bucket = app.config['GCS_BUCKET']
+    lazy_config.register(app, 'DISASTER_DASHBOARD_DATA',
+                         lambda: get_disaster_dashboard_data(gcs_bucket))
 
 
-def register_routes_sustainability(app):
+def register_routes_sustainability(app, static_config):
   # Install blueprint for sustainability page
   from server.routes.sustainability import html as sustainability_html
   app.register_blueprint(sustainability_html.bp)
   if app.config['TEST']:
     return
   # load sustainability config
-  app.config[
-      'DISASTER_SUSTAINABILITY_CONFIG'] = libutil.get_disaster_sustainability_config(
-      )
+  lazy_config.register(
+      app, 'DISASTER_SUSTAINABILITY_CONFIG',
+      lambda: static_config.get('DISASTER_SUSTAINABILITY_CONFIG'))
 
 
 def register_routes_datagemma(app, cfg):
@@ -286,7 +300,8 @@ def register_routes_common(app):
 
 
 def create_app(nl_root=DEFAULT_NL_ROOT):
-  app = Flask(__name__, static_folder='dist', static_url_path='')
+  timer = StartupTimer()
+  app = _WebsiteApp(__name__, static_folder='dist', static_url_path='')
 
   cfg = lib_config.get_config()
 
@@ -325,7 +340,7 @@ def create_app(nl_root=DEFAULT_NL_ROOT):
 
   lib_cache.cache.init_app(app)
   lib_cache.model_cache.init_app(app)
-  app.config['FEATURE_FLAGS'] = libutil.load_feature_flags()
+  set_feature_flags(app, libutil.load_feature_flags())
   app.config['REDIRECTS'] = libutil.load_redirects() if not cfg.CUSTOM else {}
 
   # Configure ingress
@@ -333,15 +348,20 @@ def create_app(nl_root=DEFAULT_NL_ROOT):
   ingress_config_path = os.environ.get('INGRESS_CONFIG_PATH')
   if ingress_config_path:
     configure_endpoints_from_ingress(ingress_config_path)
+  timer.end_phase('config')
+
+  # Static config values, from the startup snapshot when it is current.
+  static_config = StaticConfig(app.config['STARTUP_SNAPSHOT_PATH'])
+  timer.end_phase('snapshot')
 
   register_routes_common(app)
   register_routes_base_dc(app)
 
   if cfg.SHOW_DISASTER:
-    register_routes_disasters(app)
+    register_routes_disasters(app, static_config)
 
   if cfg.SHOW_SUSTAINABILITY:
-    register_routes_sustainability(app)
+    register_routes_sustainability(app, static_config)
 
   if _enable_datagemma():
     register_routes_datagemma(app, cfg)
@@ -349,32 +369,16 @@ def create_app(nl_root=DEFAULT_NL_ROOT):
   if is_feature_enabled(DATA_OVERVIEW_FEATURE_FLAG, app):
     from server.routes.data_overview import html as data_overview_html
     app.register_blueprint(data_overview_html.bp)
+  timer.end_phase('routes')
 
-  # Load topic page config
-  topic_page_configs = libutil.get_topic_page_config()
-  app.config['TOPIC_PAGE_CONFIG'] = topic_page_configs
-  app.config['TOPIC_PAGE_SUMMARY'] = libutil.get_topics_summary(
-      topic_page_configs)
-
-  # Load chart config
-  chart_config = libutil.get_chart_config()
-  app.config['CHART_CONFIG'] = chart_config
-  ranked_statvars = set()
-  for chart in chart_config:
-    ranked_statvars = ranked_statvars.union(
-        chart['statsVars']) if 'statsVars' in chart else ranked_statvars
-    ranked_statvars = ranked_statvars.union(
-        chart['variables']) if 'variables' in chart else ranked_statvars
-    if 'relatedChart' in chart and 'denominator' in chart['relatedChart']:
-      ranked_statvars.add(chart['relatedChart']['denominator'])
-  app.config['RANKED_STAT_VARS'] = ranked_statvars
-  app.config['CACHED_GEOJSONS'] = libutil.get_cached_geojsons()
-  app.config['HOMEPAGE_TOPICS'] = libutil.get_json(
-      "config/home_page/topics.json")
-  app.config['HOMEPAGE_PARTNERS'] = libutil.get_json(
-      "config/home_page/partners.json")
-  app.config['HOMEPAGE_SAMPLE_QUESTIONS'] = libutil.get_json(
-      "config/home_page/sample_questions.json")
+  # Load topic page config, chart config, geojsons and homepage config
+  for key in [
+      'TOPIC_PAGE_CONFIG', 'TOPIC_PAGE_SUMMARY', 'CHART_CONFIG',
+      'RANKED_STAT_VARS', 'CACHED_GEOJSONS', 'HOMEPAGE_TOPICS',
+      'HOMEPAGE_PARTNERS', 'HOMEPAGE_SAMPLE_QUESTIONS'
+  ]:
+    app.config[key] = static_config.get(key)
+  timer.end_phase('static_config')
 
   if cfg.TEST or cfg.LITE:
     app.config['MAPS_API_KEY'] = ''
@@ -398,6 +402,7 @@ def create_app(nl_root=DEFAULT_NL_ROOT):
   if cfg.LOCAL or cfg.WEBDRIVER or cfg.INTEGRATION:
     app.config['DC_API_KEY'] = _get_api_key(['DC_API_KEY', 'dc_api_key'],
                                             cfg.SECRET_PROJECT, 'mixer-api-key')
+  timer.end_phase('api_keys')
 
   # Initialize translations
   babel = Babel(app, default_domain='all')
@@ -414,14 +419,21 @@ def create_app(nl_root=DEFAULT_NL_ROOT):
       libutil.check_backend_ready([app.config['NL_ROOT'] + '/healthz'])
 
     # This also requires disaster and event routes.
-    app.config['NL_DISASTER_CONFIG'] = libutil.get_nl_disaster_config()
+    app.config['NL_DISASTER_CONFIG'] = static_config.get('NL_DISASTER_CONFIG')
     if app.config['LOG_QUERY']:
       app.config['NL_TABLE'] = bt.get_nl_table()
+      app.config[bt.QUERY_LOG_WRITER_KEY] = bt.QueryLogWriter(
+          app,
+          app.config['NL_TABLE'],
+          queue_size=app.config['QUERY_LOG_QUEUE_SIZE'],
+          batch_size=app.config['QUERY_LOG_BATCH_SIZE'],
+          flush_sec=app.config['QUERY_LOG_FLUSH_SEC'],
+          version_refresh_sec=app.config['QUERY_LOG_VERSION_REFRESH_SEC'])
     else:
       app.config['NL_TABLE'] = None
 
     if cfg.USE_LLM:
-      app.config['LLM_PROMPT_TEXT'] = llm_prompt.get_prompts()
+      lazy_config.register(app, 'LLM_PROMPT_TEXT', llm_prompt.get_prompts)
       app.config['LLM_API_KEY'] = _get_api_key(['LLM_API_KEY'],
                                                cfg.SECRET_PROJECT,
                                                'palm-api-key')
@@ -432,26 +444,33 @@ def create_app(nl_root=DEFAULT_NL_ROOT):
             os.environ.get("AGENT_MODEL", default_model),
             os.environ.get("DC_MCP_URL"))
 
-    app.config[
-        'NL_BAD_WORDS'] = EMPTY_BANNED_WORDS if cfg.CUSTOM else load_bad_words(
-        )
-    app.config['NL_CHART_TITLES'] = libutil.get_nl_chart_titles()
-    app.config['TOPIC_CACHE'] = topic_cache.load(app.config['NL_CHART_TITLES'])
-    app.config['SDG_PERCENT_VARS'] = libutil.get_sdg_percent_vars()
-    app.config['SPECIAL_DC_NON_COUNTRY_ONLY_VARS'] = \
-      libutil.get_special_dc_non_countery_only_vars()
+    if cfg.CUSTOM:
+      app.config['NL_BAD_WORDS'] = EMPTY_BANNED_WORDS
+    else:
+      lazy_config.register(app, 'NL_BAD_WORDS', load_bad_words)
+    app.config['NL_CHART_TITLES'] = static_config.get('NL_CHART_TITLES')
+    lazy_config.register(app, 'TOPIC_CACHE',
+                         lambda: static_config.get('TOPIC_CACHE'))
+    lazy_config.register(
+        app, sv_metadata.SEED_KEY,
+        lambda: sv_metadata.load_seed(app.config['SV_METADATA_SNAPSHOT_PATH']))
+    app.config['SDG_PERCENT_VARS'] = static_config.get('SDG_PERCENT_VARS')
+    app.config['SPECIAL_DC_NON_COUNTRY_ONLY_VARS'] = static_config.get(
+        'SPECIAL_DC_NON_COUNTRY_ONLY_VARS')
     # TODO: need to handle singular vs plural in the titles
-    app.config['NL_PROP_TITLES'] = libutil.get_nl_prop_titles()
+    app.config['NL_PROP_TITLES'] = static_config.get('NL_PROP_TITLES')
 
   # Get and save the list of variables that we should not allow per capita for.
-  app.config['NOPC_VARS'] = libutil.get_nl_no_percapita_vars()
+  app.config['NOPC_VARS'] = static_config.get('NOPC_VARS')
+  timer.end_phase('nl')
 
   # Set custom dc template folder if set, otherwise use the environment name
   custom_dc_template_folder = app.config.get(
       'CUSTOM_DC_TEMPLATE_FOLDER', None) or app.config.get('ENV', None)
 
-  app.config['VIS_TOOL_EXAMPLES'] = tools_html.get_all_tool_examples(
-      app, custom_dc_template_folder)
+  lazy_config.register(
+      app, 'VIS_TOOL_EXAMPLES',
+      lambda: tools_html.get_all_tool_examples(app, custom_dc_template_folder))
 
   # Get and save the blocklisted svgs.
   blocklist_svg = []
@@ -481,6 +500,23 @@ def create_app(nl_root=DEFAULT_NL_ROOT):
 
   app.config['HEADER_JSON_PATH'] = header_json_path
   app.config['FOOTER_JSON_PATH'] = footer_json_path
+  menu_context = template_context.MenuContext(
+      header_json_path,
+      footer_json_path,
+      reload=app.config['RELOAD_TEMPLATE_MENUS'])
+  if app.config['ENABLE_RENDER_TIMING']:
+    template_context.init_render_timing(app)
+  if app.config['ENABLE_TRACING']:
+    tracing.init(app)
+  profiling.init(app)
+
+  def collect_metrics():
+    writer = app.config.get(bt.QUERY_LOG_WRITER_KEY)
+    if writer:
+      writer.record_metrics()
+
+  metrics.init(app, 'website', collect=collect_metrics)
+  timer.end_phase('templates')
 
   # Set whether to filter stat vars with low geographic coverage in the
   # map and scatter tools.
@@ -489,6 +525,7 @@ def create_app(nl_root=DEFAULT_NL_ROOT):
   if not cfg.TEST:
     urls = get_health_check_urls()
     libutil.check_backend_ready(urls)
+  timer.end_phase('backend_check')
 
   # Add variables to the per-request global context.
   @app.before_request
@@ -525,13 +562,8 @@ def create_app(nl_root=DEFAULT_NL_ROOT):
   # Provides locale and other common parameters in all templates
   @app.context_processor
   def inject_common_parameters():
-    header_menu = libutil.get_json(app.config['HEADER_JSON_PATH'])
-    footer_menu = libutil.get_json(app.config['FOOTER_JSON_PATH'])
-
-    common_variables = {
-        'HEADER_MENU': json.dumps(header_menu),
-        'FOOTER_MENU': json.dumps(footer_menu),
-    }
+    # HEADER_MENU and FOOTER_MENU, serialized once at startup.
+    common_variables = menu_context.get()
     locale_variable = dict(locale=get_locale())
     return {**common_variables, **locale_variable}
 
@@ -573,4 +605,18 @@ def create_app(nl_root=DEFAULT_NL_ROOT):
       app.jinja_env.globals['BASE_HTML'] = os.path.join('custom_dc/custom',
                                                         'base.html')
   flask_cors.CORS(app)
+  timer.end_phase('app_setup')
+
+  # Build the lazy app config entries this deployment uses before the workers
+  # are forked.
+  eager_config_keys = os.environ.get('EAGER_CONFIG_KEYS')
+  if eager_config_keys is not None:
+    eager_config_keys = [k for k in eager_config_keys.split(',') if k]
+  else:
+    eager_config_keys = cfg.EAGER_CONFIG_KEYS
+  lazy_config.warmup(app, eager_config_keys)
+  timer.end_phase('warmup')
+  app.config['STARTUP_TIMING'] = timer.summary()
+  timer.record_metrics()
+  timer.log()
   return app
@@ -33,6 +33,16 @@ class Config:
   # Eanbling this to "True" requires adding "bigtable/user" acccess for the
   # service account in datcom-store IAM settings
   LOG_QUERY = False
+  # Logged queries are written to Bigtable in the background, in batches of up
+  # to QUERY_LOG_BATCH_SIZE rows. A row waits at most QUERY_LOG_FLUSH_SEC for
+  # its batch to fill up, and is dropped if QUERY_LOG_QUEUE_SIZE rows are
+  # already waiting.
+  QUERY_LOG_QUEUE_SIZE = 1000
+  QUERY_LOG_BATCH_SIZE = 50
+  QUERY_LOG_FLUSH_SEC = 1
+  # How often the mixer and NL server versions logged with queries are
+  # refreshed.
+  QUERY_LOG_VERSION_REFRESH_SEC = 600
   # Whether to log request payload for datacommons.py requests
   LOG_DC_REQUEST_PAYLOAD = False
   # Percentage of requests to log payload for (0-100)
@@ -125,3 +135,46 @@ class Config:
                                                 '')
   # Threshold for Spanner vector search embeddings resolution in NL search.
   SPANNER_EMBEDDING_THRESHOLD = 0.6
+  # Optional: local path of a stat var hierarchy snapshot built by
+  # tools/sv_hierarchy. When set, stat var ancestors and categories are
+  # resolved from the snapshot instead of walking the hierarchy in the mixer.
+  SV_HIERARCHY_SNAPSHOT_PATH = os.environ.get('SV_HIERARCHY_SNAPSHOT_PATH', '')
+  # How often to check the stat var hierarchy snapshot for changes.
+  SV_HIERARCHY_REFRESH_SEC = 3600
+  # Optional: local path of a stat var metadata snapshot built by
+  # tools/sv_metadata. Names, descriptions and footnotes of the stat vars in
+  # the snapshot are read from it instead of the mixer.
+  SV_METADATA_SNAPSHOT_PATH = os.environ.get('SV_METADATA_SNAPSHOT_PATH', '')
+  # Optional: local path of a place availability index built by
+  # tools/place_availability. When set, the place page charts are filtered with
+  # it instead of fetching observations for the place, its children and peers.
+  PLACE_AVAILABILITY_INDEX_PATH = os.environ.get(
+      'PLACE_AVAILABILITY_INDEX_PATH', '')
+  # How often to check the place availability index for changes.
+  PLACE_AVAILABILITY_REFRESH_SEC = 3600
+  # Optional: local path of a startup snapshot built by tools/startup_snapshot.
+  # When it is current, the static config (chart and topic page configs,
+  # geojsons, NL configs, topic cache) is loaded from it instead of the files.
+  STARTUP_SNAPSHOT_PATH = os.environ.get('STARTUP_SNAPSHOT_PATH', '')
+  # Optional subsystems registered with server/lib/lazy_config.py to build at
+  # startup instead of on first use, or ['*'] for all of them. Overridden by
+  # the comma separated EAGER_CONFIG_KEYS environment variable, eg. an empty
+  # one for replicas that only serve the API.
+  EAGER_CONFIG_KEYS = ['*']
+  # Reload the header and footer menus of the templates when their files
+  # change. Otherwise they are read once at startup.
+  RELOAD_TEMPLATE_MENUS = False
+  # Report the time spent rendering each template of a request in the
+  # Server-Timing response header.
+  ENABLE_RENDER_TIMING = False
+  # Trace the mixer, NL server, cache, LLM, Maps and translation calls of
+  # requests (server/lib/tracing.py), and summarize them in the Server-Timing
+  # response header.
+  ENABLE_TRACING = os.environ.get('ENABLE_TRACING', '').lower() == 'true'
+  # Fraction of the requests that are traced.
+  TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', '1'))
+  # Optional: OTLP/HTTP collector endpoint to export the traces to, eg.
+  # http://localhost:4318/v1/traces.
+  TRACE_EXPORT_ENDPOINT = os.environ.get('TRACE_EXPORT_ENDPOINT', '')
+  # Optional: local file to append the traces to, as OTLP JSON lines.
+  TRACE_EXPORT_PATH = os.environ.get('TRACE_EXPORT_PATH', '')
@@ -25,6 +25,8 @@ class Config(_base.Config):
   SHOW_DISASTER = False
   USE_LLM = False
   USE_MEMCACHE = False
+  # Load the optional subsystems on first use.
+  EAGER_CONFIG_KEYS = []
 
 
 class LocalConfig(Config, local.Config):
@@ -26,3 +26,5 @@ class Config(_base.Config):
   USE_MEMCACHE = False
   ENABLE_BQ = True
   DISABLE_CRAWLERS = True
+  ENABLE_RENDER_TIMING = True
+  ENABLE_TRACING = True
@@ -25,6 +25,9 @@ class Config(_base.Config):
   LOG_CACHED_MIXER_RESPONSE_USAGE = False
   ENABLE_EMBEDDINGS_PLAYGROUND = True
   ENABLE_DATAGEMMA_EVAL_TOOLS = True
+  RELOAD_TEMPLATE_MENUS = True
+  ENABLE_RENDER_TIMING = True
+  ENABLE_TRACING = True
 
 
 class DCConfig(Config):
@@ -12,12 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import contextvars
 import functools
 import json
 import logging
 import os
 from pathlib import Path
-from typing import Callable, Optional, Union
+from typing import (Any, Callable, Dict, Hashable, Iterable, List, Optional,
+                    Union)
 
 from flask import g
 from flask import has_request_context
@@ -29,8 +31,11 @@ from flask_caching.backends.nullcache import NullCache
 from flask_caching.backends.rediscache import RedisCache
 from flask_caching.backends.simplecache import SimpleCache
 
+from server.lib import tracing
 import server.lib.config as lib_config
 import server.lib.redis as lib_redis
+from server.routes import TIMEOUT
+from shared.lib import metrics
 from shared.lib.constants import LOG_CACHED_MIXER_RESPONSE_USAGE
 from shared.lib.constants import MIXER_RESPONSE_ID_FIELD
 
@@ -46,6 +51,16 @@ cache = None
 # model_cache is flask cache for endpoints that invoke vertex models.
 model_cache = None
 
+_CALLS = metrics.counter(
+    'cache_calls_total',
+    'Calls to the functions cached by cache_and_log_mixer_usage and '
+    'memoize_and_log_mixer_usage, by whether the result was cached.',
+    ['decorator', 'function', 'result'])
+
+# Set when a cached function is run because its result was not cached.
+_computed: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    'cache_computed', default=False)
+
 
 class CohortAwareBackendMixin:
   """Mixin to inject Spanner cohort key suffixing into any standard cache backend."""
@@ -67,10 +82,14 @@ class CohortAwareBackendMixin:
     return key
 
   def get(self, key, *args, **kwargs):
-    return super().get(self._suffix_key(key), *args, **kwargs)
+    with tracing.span('cache.get') as span:
+      value = super().get(self._suffix_key(key), *args, **kwargs)
+      span.set(hit=value is not None)
+    return value
 
   def set(self, key, value, *args, **kwargs):
-    return super().set(self._suffix_key(key), value, *args, **kwargs)
+    with tracing.span('cache.set'):
+      return super().set(self._suffix_key(key), value, *args, **kwargs)
 
   def add(self, key, value, *args, **kwargs):
     return super().add(self._suffix_key(key), value, *args, **kwargs)
@@ -107,11 +126,18 @@ class CohortAwareBackendMixin:
 
   def get_many(self, *keys, **kwargs):
     suffixed_keys = [self._suffix_key(k) for k in keys]
-    return super().get_many(*suffixed_keys, **kwargs)
+    # The get_many of some backends calls get for each key.
+    with tracing.span('cache.get_many',
+                      keys=len(keys)) as span, tracing.suppressed():
+      values = super().get_many(*suffixed_keys, **kwargs)
+      span.set(hits=sum(1 for v in values if v is not None))
+    return values
 
   def set_many(self, mapping, *args, **kwargs):
     suffixed_mapping = {self._suffix_key(k): v for k, v in mapping.items()}
-    return super().set_many(suffixed_mapping, *args, **kwargs)
+    with tracing.span('cache.set_many',
+                      keys=len(mapping)), tracing.suppressed():
+      return super().set_many(suffixed_mapping, *args, **kwargs)
 
 
 class CohortAwareRedisCache(CohortAwareBackendMixin, RedisCache):
@@ -243,6 +269,70 @@ def should_skip_cache():
     return False
 
 
+def _many_key(prefix: str, key: Hashable) -> str:
+  return ':'.join([prefix, *(key if isinstance(key, tuple) else (key,))])
+
+
+def get_cached_many(prefix: str, keys: List[Hashable]) -> Dict[Hashable, Any]:
+  """
+  Returns the values cached under the prefix for the keys that have one. A
+  tuple key is cached under its parts joined with ':'.
+
+  Nothing is read when the request skips the cache, and errors of the cache
+  backend are logged as misses.
+  """
+  if not keys or should_skip_cache():
+    return {}
+  try:
+    values = cache.get_many(*[_many_key(prefix, key) for key in keys])
+  except Exception:
+    logger.warning('Failed to read cached %s values', prefix, exc_info=True)
+    return {}
+  return {key: value for key, value in zip(keys, values) if value is not None}
+
+
+def set_cached_many(prefix: str, values: Dict[Hashable, Any]) -> None:
+  """Caches values by key under the prefix, logging errors of the backend."""
+  if not values:
+    return
+  try:
+    cache.set_many(
+        {
+            _many_key(prefix, key): value for key, value in values.items()
+        },
+        timeout=TIMEOUT)
+  except Exception:
+    logger.warning('Failed to cache %s values', prefix, exc_info=True)
+
+
+def cached_many(
+    prefix: str, keys: Iterable[Hashable], fetch_fn: Callable[[List[Hashable]],
+                                                              Dict[Hashable,
+                                                                   Any]]
+) -> Dict[Hashable, Any]:
+  """
+  Returns the value of each key, reading the cached keys with get_cached_many
+  and fetching the rest with a single call to fetch_fn, whose values are then
+  cached.
+
+  fetch_fn returns the values of the keys it is called with. Keys it returns no
+  value (or None) for are left out of the result and not cached, so results
+  without data must be cached as a non-None value, eg. {}.
+  """
+  keys = list(dict.fromkeys(keys))
+  result = get_cached_many(prefix, keys)
+  missing = [key for key in keys if key not in result]
+  if missing:
+    fetched = {
+        key: value
+        for key, value in fetch_fn(missing).items()
+        if value is not None
+    }
+    set_cached_many(prefix, fetched)
+    result.update(fetched)
+  return result
+
+
 def cache_and_log_mixer_usage(timeout: int = 300,
                               query_string: bool = False,
                               make_cache_key: Optional[Callable] = None,
@@ -277,10 +367,10 @@ def cache_and_log_mixer_usage(timeout: int = 300,
     cached_fn = cache.cached(timeout=timeout,
                              query_string=query_string,
                              make_cache_key=make_cache_key,
-                             unless=unless)(fn)
+                             unless=unless)(_mark_computed(fn))
 
     # Handles logging the mixer response ID
-    return _cache_wrapper(fn, cached_fn)
+    return _cache_wrapper(fn, cached_fn, 'cached')
 
   return decorator
 
@@ -306,10 +396,67 @@ def memoize_and_log_mixer_usage(timeout: int = 300,
   def decorator(fn: Callable) -> Callable:
     # This is either the memoized result or the evaluation of the function,
     # if it wasn't cached previously
-    memoized_fn = cache.memoize(timeout=timeout, unless=unless)(fn)
+    memoized_fn = cache.memoize(timeout=timeout,
+                                unless=unless)(_mark_computed(fn))
 
     # Handles logging the mixer response ID
-    return _cache_wrapper(fn, memoized_fn)
+    return _cache_wrapper(fn, memoized_fn, 'memoize')
+
+  return decorator
+
+
+def memoize_async_and_log_mixer_usage(memoized_fn: Callable,
+                                      unless: Callable = None) -> Callable:
+  """
+  Decorator that memoizes a coroutine function's result and logs Mixer
+  response IDs, sharing the cache of a sync function.
+
+  The coroutine function must take the same arguments as memoized_fn, a
+  function decorated with `memoize_and_log_mixer_usage`, and return the same
+  result: results cached by either function are used by both. The cache is
+  read and written from the caller's event loop, as it is in memory or a
+  single Redis round trip away.
+
+  Args:
+    memoized_fn (function): The sync function whose cache entries are shared.
+    unless (function): A condition to skip memoization. If it evaluates to
+      True, memoization is skipped.
+
+  Returns:
+    function: A decorator that wraps the target coroutine function with
+      memoization and logging.
+  """
+
+  def decorator(fn: Callable) -> Callable:
+    function = f'{fn.__module__}.{fn.__qualname__}'
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs) -> dict:
+      cache_key = None
+      result = None
+      if not (unless and unless()):
+        try:
+          cache_key = memoized_fn.make_cache_key(memoized_fn.uncached, *args,
+                                                 **kwargs)
+          result = cache.get(cache_key)
+        except Exception:
+          logger.exception('Exception possibly due to cache backend.')
+          cache_key = None
+      computed = result is None
+      if computed:
+        result = await fn(*args, **kwargs)
+        if cache_key is not None:
+          try:
+            cache.set(cache_key, result, timeout=memoized_fn.cache_timeout)
+          except Exception:
+            logger.exception('Exception possibly due to cache backend.')
+      _CALLS.inc(decorator='memoize',
+                 function=function,
+                 result='miss' if computed else 'hit')
+      log_mixer_response_id(result)
+      return result
+
+    return wrapper
 
   return decorator
 
@@ -351,23 +498,55 @@ def log_mixer_response_id(result: Union[dict, Response]) -> None:
     logger.info(f"Error logging the mixer response ID for result {result}: {e}")
 
 
-def _cache_wrapper(fn: Callable, cached_fn: Callable) -> Callable:
+def _mark_computed(fn: Callable) -> Callable:
+  """Wraps a function to record that it ran, ie. its result was not cached.
+
+  The wrapper has the name and signature of the function, so the cache keys
+  are the same as for the function itself.
+  """
+
+  @functools.wraps(fn)
+  def computed_fn(*args, **kwargs):
+    _computed.set(True)
+    return fn(*args, **kwargs)
+
+  return computed_fn
+
+
+def _cache_wrapper(fn: Callable, cached_fn: Callable,
+                   decorator: str) -> Callable:
   """Wraps a cached or memoized function to log Mixer response IDs.
 
   Args:
     fn (function): The original function being wrapped.
     cached_fn (function): The cached or memoized version of the original
-      function.
+      function, wrapped by _mark_computed.
+    decorator (str): The cache decorator, cached or memoize, for the cache
+      metrics.
 
   Returns:
-    function: A wrapper function that executes the cached function and logs
-      mixer response IDs.
+    function: A wrapper function that executes the cached function, counts
+      cache hits and misses and logs mixer response IDs.
   """
+  function = f'{fn.__module__}.{fn.__qualname__}'
 
   @functools.wraps(fn)
   def wrapper(*args, **kwargs) -> dict:
-    result = cached_fn(*args, **kwargs)
+    token = _computed.set(False)
+    try:
+      result = cached_fn(*args, **kwargs)
+      computed = _computed.get()
+    finally:
+      _computed.reset(token)
+    _CALLS.inc(decorator=decorator,
+               function=function,
+               result='miss' if computed else 'hit')
     log_mixer_response_id(result)
     return result
 
+  # As on the functions returned by cache.cached and cache.memoize, eg. for
+  # delete_memoized and memoize_async_and_log_mixer_usage.
+  wrapper.uncached = cached_fn.uncached
+  wrapper.cache_timeout = cached_fn.cache_timeout
+  wrapper.make_cache_key = cached_fn.make_cache_key
   return wrapper
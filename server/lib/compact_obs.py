@@ -0,0 +1,348 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Compact, array-backed alternatives to the nested dictionaries returned by
+fetch._compact_point and fetch._compact_series.
+
+The observations of each variable are stored as a few flat arrays (CSR-style
+offsets from entities to facets and from facets to observations), and entity,
+facet and date strings are interned into a pool shared by the whole result.
+Reading result['data'][variable][entity] builds the same dictionary the
+non-compact result holds, so callers that only read the result work unchanged,
+while a result for thousands of entities is a handful of objects to keep,
+cache and pickle.
+"""
+
+import abc
+from array import array
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List
+
+from shared.lib.constants import MIXER_RESPONSE_ID_FIELD
+
+# Kinds of observation values, so that ints and floats read back unchanged.
+# Ints are exact up to 2**53.
+_NO_VALUE = 0
+_FLOAT_VALUE = 1
+_INT_VALUE = 2
+# Code of a missing observation date.
+_NO_DATE = -1
+# Selected facet row of an entity without facets.
+_NO_ROW = -1
+
+
+class _StringPool:
+  """Interns strings as int codes."""
+  __slots__ = ('strings', '_codes')
+
+  def __init__(self):
+    self.strings: List[str] = []
+    self._codes: Dict[str, int] = {}
+
+  def code(self, s: str) -> int:
+    c = self._codes.get(s)
+    if c is None:
+      c = len(self.strings)
+      self._codes[s] = c
+      self.strings.append(s)
+    return c
+
+  def find(self, s: str) -> int | None:
+    return self._codes.get(s)
+
+  # The code lookup table is rebuilt rather than pickled.
+  def __getstate__(self):
+    return (self.strings,)
+
+  def __setstate__(self, state):
+    self.strings = state[0]
+    self._codes = {s: i for i, s in enumerate(self.strings)}
+
+
+class _VariableObs:
+  """Observations of a variable for all its entities."""
+  __slots__ = ('entities', 'has_facets', 'facet_offsets', 'selected', 'facets',
+               'obs_counts', 'earliest_dates', 'latest_dates', 'has_obs',
+               'obs_offsets', 'dates', 'values', 'value_kinds', '_rows')
+
+  def __init__(self):
+    # Per entity
+    self.entities = array('i')
+    self.has_facets = array('b')
+    self.facet_offsets = array('i', [0])
+    # The facet row used when not all facets are returned, or _NO_ROW.
+    self.selected = array('i')
+    # Per facet row
+    self.facets = array('i')
+    self.obs_counts = array('q')
+    self.earliest_dates = array('i')
+    self.latest_dates = array('i')
+    self.has_obs = array('b')
+    self.obs_offsets = array('i', [0])
+    # Per observation
+    self.dates = array('i')
+    self.values = array('d')
+    self.value_kinds = array('b')
+    self._rows: Dict[int, int] = None
+
+  def add_facet(self, facet: Dict, pool: _StringPool):
+    self.facets.append(pool.code(facet.get('facetId', '')))
+    self.obs_counts.append(facet.get('obsCount', 0))
+    self.earliest_dates.append(pool.code(facet.get('earliestDate', '')))
+    self.latest_dates.append(pool.code(facet.get('latestDate', '')))
+    self.has_obs.append('observations' in facet)
+    observations = facet.get('observations', [])
+    code = pool.code
+    self.dates.extend([
+        _NO_DATE if date is None else code(date)
+        for date in [obs.get('date') for obs in observations]
+    ])
+    values = [obs.get('value') for obs in observations]
+    self.value_kinds.extend([
+        _NO_VALUE
+        if value is None else _INT_VALUE if type(value) is int else _FLOAT_VALUE
+        for value in values
+    ])
+    self.values.extend([0 if value is None else value for value in values])
+    self.obs_offsets.append(len(self.dates))
+
+  def row(self, entity_code: int) -> int | None:
+    """Returns the index of an entity."""
+    if self._rows is None:
+      self._rows = {c: i for i, c in enumerate(self.entities)}
+    return self._rows.get(entity_code)
+
+  def observations(self, row: int, strings: List[str]) -> List[Dict]:
+    result = []
+    for i in range(self.obs_offsets[row], self.obs_offsets[row + 1]):
+      obs = {}
+      if self.dates[i] != _NO_DATE:
+        obs['date'] = strings[self.dates[i]]
+      if self.value_kinds[i] == _INT_VALUE:
+        obs['value'] = int(self.values[i])
+      elif self.value_kinds[i] == _FLOAT_VALUE:
+        obs['value'] = self.values[i]
+      result.append(obs)
+    return result
+
+  def __getstate__(self):
+    return tuple(getattr(self, slot) for slot in self.__slots__[:-1])
+
+  def __setstate__(self, state):
+    for slot, value in zip(self.__slots__[:-1], state):
+      setattr(self, slot, value)
+    self._rows = None
+
+
+class _CompactObs(Mapping, abc.ABC):
+  """
+  Read-only mapping with the keys and values of a compacted observation
+  result: 'facets', 'data' and the mixer response IDs.
+  """
+  __slots__ = ('all_facets', '_pool', '_variables', '_facets', '_response_ids')
+
+  def __init__(self, resp: Dict, all_facets: bool):
+    self.all_facets = all_facets
+    self._pool = _StringPool()
+    self._variables: Dict[str, _VariableObs] = {}
+    self._facets = dict(resp.get('facets', {})) if all_facets else {}
+    for var, var_obs in resp.get('byVariable', {}).items():
+      obs = _VariableObs()
+      self._variables[var] = obs
+      for entity, entity_obs in var_obs.get('byEntity', {}).items():
+        obs.entities.append(self._pool.code(entity))
+        obs.has_facets.append('orderedFacets' in entity_obs)
+        first_row = len(obs.facets)
+        for facet in entity_obs.get('orderedFacets', []):
+          obs.add_facet(facet, self._pool)
+        obs.facet_offsets.append(len(obs.facets))
+        row = _NO_ROW
+        if len(obs.facets) > first_row:
+          row = self._select(obs, first_row, len(obs.facets))
+        obs.selected.append(row)
+        if not all_facets and row != _NO_ROW:
+          facet_id = self._pool.strings[obs.facets[row]]
+          self._facets[facet_id] = resp['facets'][facet_id]
+    self._response_ids = resp.get(MIXER_RESPONSE_ID_FIELD, [])
+
+  @abc.abstractmethod
+  def _select(self, obs: _VariableObs, start: int, end: int) -> int:
+    """The facet row to use for an entity when not all facets are returned."""
+
+  @abc.abstractmethod
+  def _facet_value(self, obs: _VariableObs, row: int) -> Dict:
+    """The value of an entity for a facet row."""
+
+  @abc.abstractmethod
+  def _no_facets_value(self) -> Dict:
+    """The value of an entity with no facets, when not all are returned."""
+
+  def _entity_value(self, obs: _VariableObs, i: int) -> Any:
+    if not obs.has_facets[i]:
+      return [] if self.all_facets else self._no_facets_value()
+    if self.all_facets:
+      return [
+          self._facet_value(obs, row)
+          for row in range(obs.facet_offsets[i], obs.facet_offsets[i + 1])
+      ]
+    if obs.selected[i] == _NO_ROW:
+      return {}
+    return self._facet_value(obs, obs.selected[i])
+
+  def __getitem__(self, key: str) -> Any:
+    if key == 'facets':
+      return self._facets
+    if key == 'data':
+      return _DataView(self)
+    if key == MIXER_RESPONSE_ID_FIELD:
+      return self._response_ids
+    raise KeyError(key)
+
+  def __iter__(self) -> Iterator[str]:
+    return iter(('facets', 'data', MIXER_RESPONSE_ID_FIELD))
+
+  def __len__(self) -> int:
+    return 3
+
+  def to_dict(self) -> Dict:
+    """Returns the result as nested dictionaries, eg. to serialize to JSON."""
+    return {
+        'facets': self._facets,
+        'data': {
+            var: dict(_EntityView(self, obs).items())
+            for var, obs in self._variables.items()
+        },
+        MIXER_RESPONSE_ID_FIELD: self._response_ids,
+    }
+
+  def __getstate__(self):
+    return (self.all_facets, self._pool, self._variables, self._facets,
+            self._response_ids)
+
+  def __setstate__(self, state):
+    (self.all_facets, self._pool, self._variables, self._facets,
+     self._response_ids) = state
+
+
+class _DataView(Mapping):
+  """Variable to entity observations."""
+  __slots__ = ('_result',)
+
+  def __init__(self, result: _CompactObs):
+    self._result = result
+
+  def __getitem__(self, var: str) -> '_EntityView':
+    return _EntityView(self._result, self._result._variables[var])
+
+  def __iter__(self) -> Iterator[str]:
+    return iter(self._result._variables)
+
+  def __len__(self) -> int:
+    return len(self._result._variables)
+
+
+class _EntityView(Mapping):
+  """Entity to observations of a variable."""
+  __slots__ = ('_result', '_obs')
+
+  def __init__(self, result: _CompactObs, obs: _VariableObs):
+    self._result = result
+    self._obs = obs
+
+  def __getitem__(self, entity: str) -> Any:
+    code = self._result._pool.find(entity)
+    i = None if code is None else self._obs.row(code)
+    if i is None:
+      raise KeyError(entity)
+    return self._result._entity_value(self._obs, i)
+
+  def __iter__(self) -> Iterator[str]:
+    strings = self._result._pool.strings
+    return (strings[c] for c in self._obs.entities)
+
+  def __len__(self) -> int:
+    return len(self._obs.entities)
+
+  def items(self):
+    # Avoids looking up every entity by its string.
+    strings = self._result._pool.strings
+    return [(strings[c], self._result._entity_value(self._obs, i))
+            for i, c in enumerate(self._obs.entities)]
+
+  def values(self):
+    return [
+        self._result._entity_value(self._obs, i)
+        for i in range(len(self._obs.entities))
+    ]
+
+
+class CompactPoints(_CompactObs):
+  """Compact equivalent of fetch._compact_point."""
+  __slots__ = ()
+
+  def _select(self, obs: _VariableObs, start: int, end: int) -> int:
+    # The facet with the latest date
+    best = start
+    best_date = self._point_date(obs, start)
+    for row in range(start + 1, end):
+      date = self._point_date(obs, row)
+      if date > best_date:
+        best = row
+        best_date = date
+    return best
+
+  def _point_date(self, obs: _VariableObs, row: int) -> str:
+    start = obs.obs_offsets[row]
+    if start == obs.obs_offsets[row + 1] or obs.dates[start] == _NO_DATE:
+      return ''
+    return self._pool.strings[obs.dates[start]]
+
+  def _facet_value(self, obs: _VariableObs, row: int) -> Dict:
+    result = {'facet': self._pool.strings[obs.facets[row]]}
+    start = obs.obs_offsets[row]
+    if start != obs.obs_offsets[row + 1]:
+      if obs.dates[start] != _NO_DATE:
+        result['date'] = self._pool.strings[obs.dates[start]]
+      if obs.value_kinds[start] == _INT_VALUE:
+        result['value'] = int(obs.values[start])
+      elif obs.value_kinds[start] == _FLOAT_VALUE:
+        result['value'] = obs.values[start]
+    return result
+
+  def _no_facets_value(self) -> Dict:
+    return {}
+
+
+class CompactSeries(_CompactObs):
+  """Compact equivalent of fetch._compact_series."""
+  __slots__ = ()
+
+  def _select(self, obs: _VariableObs, start: int, end: int) -> int:
+    # There should be only one series
+    return start
+
+  def _facet_value(self, obs: _VariableObs, row: int) -> Dict:
+    strings = self._pool.strings
+    result = {
+        'facet': strings[obs.facets[row]],
+        'obsCount': obs.obs_counts[row],
+        'earliestDate': strings[obs.earliest_dates[row]],
+        'latestDate': strings[obs.latest_dates[row]]
+    }
+    if obs.has_obs[row]:
+      result['series'] = obs.observations(row, strings)
+    return result
+
+  def _no_facets_value(self) -> Dict:
+    return {'series': []}
@@ -0,0 +1,268 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Named, bounded thread pools for the blocking calls of async views.
+
+asyncio.to_thread runs calls on the default executor of the running loop. As
+Flask runs each async view on a new loop, each request started threads of its
+own, with no limit across the requests of a worker, and slow calls of one
+subsystem could take the threads needed by another. Instead, each subsystem
+has a pool in POOLS with:
+- a fixed number of threads,
+- a limit on the number of tasks waiting for a thread, and
+- a policy for the tasks submitted when that limit is reached:
+  - BLOCK: the caller waits until a task of the pool finishes,
+  - CALLER_RUNS: the task runs in the caller's thread,
+  - REJECT: ExecutorRejectedError is raised.
+
+Usage:
+
+  place = await executors.run('place', fetch_place, place_dcid, locale)
+
+or, from sync code:
+
+  future = executors.submit('existence', fetch_fn, variables, entities)
+
+As with asyncio.to_thread, tasks run in a copy of the caller's context, so
+they see the Flask app and request contexts and are traced with the request.
+A task submitted from a thread of the same pool runs in that thread, so that
+nested submissions can not deadlock a full pool.
+"""
+
+import asyncio
+import collections
+import concurrent.futures
+import contextvars
+import dataclasses
+import functools
+import os
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from shared.lib import metrics
+
+BLOCK = 'block'
+CALLER_RUNS = 'caller_runs'
+REJECT = 'reject'
+
+
+class ExecutorRejectedError(RuntimeError):
+  """A task was submitted to a full pool whose policy is REJECT."""
+
+
+@dataclasses.dataclass(frozen=True)
+class PoolConfig:
+  max_workers: int
+  # Tasks waiting for a thread, beyond which the policy applies.
+  max_queue: int
+  policy: str = BLOCK
+
+
+POOLS: Dict[str, PoolConfig] = {
+    # Place page charts, summary and overview table.
+    'place': PoolConfig(max_workers=16, max_queue=64),
+    # Nearby, similar, parent and peer places of the place page, some of
+    # which are looked up with Maps.
+    'place_related': PoolConfig(max_workers=8, max_queue=32),
+    'metadata': PoolConfig(max_workers=8, max_queue=32),
+    'node': PoolConfig(max_workers=8, max_queue=32),
+    # Maps predictions and stat var search. Suggestions of a rejected task are
+    # left out of the response.
+    'autocomplete': PoolConfig(max_workers=8, max_queue=16, policy=REJECT),
+    'nl_existence': PoolConfig(max_workers=8, max_queue=32),
+    # Existence cache misses, fetched from the threads of the other pools.
+    'existence': PoolConfig(max_workers=8, max_queue=32, policy=CALLER_RUNS),
+}
+
+_ACTIVE_THREADS = metrics.gauge('executor_active_threads',
+                                'Threads running a task, by pool.', ['pool'],
+                                mode='sum')
+_QUEUED_TASKS = metrics.gauge('executor_queued_tasks',
+                              'Tasks waiting for a thread, by pool.', ['pool'],
+                              mode='sum')
+_QUEUE_WAIT_SECONDS = metrics.histogram(
+    'executor_queue_wait_seconds',
+    'Time from the submission of tasks to their start, by pool.', ['pool'])
+_TASK_SECONDS = metrics.histogram('executor_task_seconds',
+                                  'Run time of tasks, by pool.', ['pool'])
+_FULL_POOL_TASKS = metrics.counter(
+    'executor_full_pool_tasks_total',
+    'Tasks submitted to a full pool, by pool and policy.', ['pool', 'policy'])
+
+# The pool of the current thread, if it is a pool thread.
+_local = threading.local()
+
+
+class Pool:
+  """A bounded thread pool. See the module docstring."""
+
+  def __init__(self, name: str, config: PoolConfig):
+    if config.policy not in (BLOCK, CALLER_RUNS, REJECT):
+      raise ValueError(f'Unknown policy for pool {name}: {config.policy}')
+    self.name = name
+    self.config = config
+    self._lock = threading.Lock()
+    self._executor: concurrent.futures.ThreadPoolExecutor = None
+    self._pid = None
+    # Tasks submitted and not finished, at most max_workers + max_queue.
+    self._in_flight = 0
+    self._active = 0
+    # Futures of the BLOCK callers waiting for a task to finish.
+    self._waiters = collections.deque()
+
+  def _ensure_started(self):
+    # Called with the lock held. Threads do not survive a fork, and the app is
+    # created before gunicorn forks its workers.
+    if self._pid != os.getpid():
+      self._executor = concurrent.futures.ThreadPoolExecutor(
+          max_workers=self.config.max_workers,
+          thread_name_prefix=f'executor-{self.name}')
+      self._in_flight = 0
+      self._active = 0
+      self._waiters.clear()
+      self._pid = os.getpid()
+
+  def _record(self):
+    _ACTIVE_THREADS.set(self._active, pool=self.name)
+    _QUEUED_TASKS.set(self._in_flight - self._active, pool=self.name)
+
+  def _admit(self) -> concurrent.futures.Future | None | str:
+    """
+    Reserves room for a task. Returns None if there was room, CALLER_RUNS if
+    the task is to run in the caller's thread, or else a future that is done
+    once room is handed over to the caller.
+    """
+    with self._lock:
+      self._ensure_started()
+      if self._in_flight < self.config.max_workers + self.config.max_queue:
+        self._in_flight += 1
+        self._record()
+        return None
+      _FULL_POOL_TASKS.inc(pool=self.name, policy=self.config.policy)
+      if self.config.policy == REJECT:
+        raise ExecutorRejectedError(f'Executor pool {self.name} is full')
+      if self.config.policy == CALLER_RUNS:
+        return CALLER_RUNS
+      waiter = concurrent.futures.Future()
+      self._waiters.append(waiter)
+      return waiter
+
+  def _release(self):
+    """Hands the room of a finished task over to a waiting caller."""
+    with self._lock:
+      while self._waiters:
+        waiter = self._waiters.popleft()
+        if waiter.set_running_or_notify_cancel():
+          waiter.set_result(None)
+          break
+      else:
+        self._in_flight -= 1
+      self._record()
+
+  def _run_task(self, call: Callable[[], Any], submitted: float) -> Any:
+    start = time.perf_counter()
+    _QUEUE_WAIT_SECONDS.observe(start - submitted, pool=self.name)
+    with self._lock:
+      self._active += 1
+      self._record()
+    _local.pool = self
+    try:
+      return call()
+    finally:
+      _local.pool = None
+      _TASK_SECONDS.observe(time.perf_counter() - start, pool=self.name)
+      with self._lock:
+        self._active -= 1
+      self._release()
+
+  async def run(self, fn: Callable, *args, **kwargs) -> Any:
+    """Runs fn(*args, **kwargs) on a thread of the pool and returns its result.
+
+    Raises ExecutorRejectedError if the pool is full and its policy is REJECT.
+    """
+    submitted = time.perf_counter()
+    call = functools.partial(contextvars.copy_context().run, fn, *args,
+                             **kwargs)
+    if getattr(_local, 'pool', None) is self:
+      return call()
+    admission = self._admit()
+    if admission == CALLER_RUNS:
+      return call()
+    if admission is not None:
+      try:
+        await asyncio.wrap_future(admission)
+      except asyncio.CancelledError:
+        # Room handed over after the caller was cancelled is passed on.
+        if not admission.cancel():
+          self._release()
+        raise
+    return await asyncio.wrap_future(self._submit(call, submitted))
+
+  def submit(self, fn: Callable, *args, **kwargs) -> concurrent.futures.Future:
+    """Submits fn(*args, **kwargs) from sync code, like run.
+
+    With BLOCK, the caller's thread waits for room. With CALLER_RUNS, or from a
+    thread of the pool, fn runs before the (done) future is returned.
+    """
+    submitted = time.perf_counter()
+    call = functools.partial(contextvars.copy_context().run, fn, *args,
+                             **kwargs)
+    if getattr(_local, 'pool', None) is self:
+      return _run_now(call)
+    admission = self._admit()
+    if admission == CALLER_RUNS:
+      return _run_now(call)
+    if admission is not None:
+      admission.result()
+    return self._submit(call, submitted)
+
+  def _submit(self, call: Callable[[], Any],
+              submitted: float) -> concurrent.futures.Future:
+    try:
+      return self._executor.submit(self._run_task, call, submitted)
+    except RuntimeError:
+      # The executor is shut down at interpreter exit.
+      self._release()
+      raise
+
+
+def _run_now(call: Callable[[], Any]) -> concurrent.futures.Future:
+  future = concurrent.futures.Future()
+  try:
+    future.set_result(call())
+  except Exception as e:
+    future.set_exception(e)
+  return future
+
+
+_pools: Dict[str, Pool] = {
+    name: Pool(name, config) for name, config in POOLS.items()
+}
+
+
+def get(name: str) -> Pool:
+  """Returns the pool of this name in POOLS."""
+  return _pools[name]
+
+
+async def run(pool: str, fn: Callable, *args, **kwargs) -> Any:
+  """Runs fn(*args, **kwargs) on a thread of the named pool."""
+  return await _pools[pool].run(fn, *args, **kwargs)
+
+
+def submit(pool: str, fn: Callable, *args,
+           **kwargs) -> concurrent.futures.Future:
+  """Submits fn(*args, **kwargs) to the named pool from sync code."""
+  return _pools[pool].submit(fn, *args, **kwargs)
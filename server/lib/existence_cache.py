@@ -0,0 +1,97 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Existence results cached per (variable, entity) pair in the shared cache.
+
+Existence checks are made for many different combinations of variables and
+places, so caching whole requests rarely hits. Here each pair is cached on its
+own, including the pairs without data, and a request only fetches the pairs
+that are not cached yet.
+"""
+
+import collections
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+from server.lib import executors
+from server.lib.cache import cached_many
+
+_CACHE_KEY_PREFIX = 'existence'
+
+# Above this number of batches, the missing pairs are fetched in a single call
+# for all the missing variables and entities.
+_MAX_MISS_BATCHES = 4
+
+Pair = Tuple[str, str]
+# Fetches the values of all the (variable, entity) pairs of the variables and
+# entities, including those without data.
+FetchFn = Callable[[List[str], List[str]], Dict[Pair, Any]]
+
+
+def miss_batches(
+    missing: Dict[str, Set[str]]) -> List[Tuple[List[str], List[str]]]:
+  """
+  Returns the (variables, entities) calls that fetch the missing variables of
+  each entity. Entities missing the same variables share a call.
+  """
+  var_set2entities = collections.defaultdict(list)
+  for entity, variables in missing.items():
+    if variables:
+      var_set2entities[frozenset(variables)].append(entity)
+  if len(var_set2entities) > _MAX_MISS_BATCHES:
+    all_vars = set().union(*var_set2entities.keys())
+    all_entities = [
+        e for entities in var_set2entities.values() for e in entities
+    ]
+    return [(sorted(all_vars), sorted(all_entities))]
+  return [(sorted(variables), sorted(entities))
+          for variables, entities in var_set2entities.items()]
+
+
+def _fetch_missing(fetch_fn: FetchFn, pairs: List[Pair]) -> Dict[Pair, Any]:
+  missing = collections.defaultdict(set)
+  for v, e in pairs:
+    missing[e].add(v)
+  batches = miss_batches(missing)
+  if len(batches) == 1:
+    responses = [fetch_fn(*batches[0])]
+  else:
+    futures = [
+        executors.submit('existence', fetch_fn, variables, entities)
+        for variables, entities in batches
+    ]
+    responses = [future.result() for future in futures]
+  wanted = set(pairs)
+  fetched = {}
+  for (batch_vars, batch_entities), resp in zip(batches, responses):
+    for v in batch_vars:
+      for e in batch_entities:
+        if (v, e) in wanted and resp.get((v, e)) is not None:
+          fetched[(v, e)] = resp[(v, e)]
+  return fetched
+
+
+def get_pairs(kind: str, variables: List[str], entities: List[str],
+              fetch_fn: FetchFn) -> Dict[Pair, Any]:
+  """
+  Returns the value of every (variable, entity) pair, reading the cached pairs
+  from the cache of this kind and fetching the rest with fetch_fn.
+
+  fetch_fn must return a non-None value for each pair it is called with, so
+  that pairs without data are cached too.
+  """
+  variables = [v for v in dict.fromkeys(variables) if v]
+  entities = [e for e in dict.fromkeys(entities) if e]
+  pairs = [(v, e) for v in variables for e in entities]
+  return cached_many(f'{_CACHE_KEY_PREFIX}:{kind}', pairs,
+                     lambda missing: _fetch_missing(fetch_fn, missing))
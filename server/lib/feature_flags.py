@@ -13,11 +13,17 @@
 # limitations under the License.
 """Common library for functions related to feature flags"""
 
+from dataclasses import dataclass
+import functools
 import hashlib
 import ipaddress
 import random
+from types import MappingProxyType
+from typing import Dict, List, Mapping
 
 from flask import current_app
+from flask import Flask
+from flask import g
 from flask import has_request_context
 from flask import request as flask_request
 
@@ -48,6 +54,74 @@ USE_SEPARATE_PROPERTY_VALUE_CALLS_FOR_SPANNER = 'use_separate_property_value_cal
 USE_CONFIG_THRESHOLD_FOR_SPANNER_EMBEDDING = 'use_config_threshold_for_spanner_embedding'
 ENABLE_SCHEMA_DRIVEN_TOPIC_RESOLUTION = 'enable_schema_driven_topic_resolution'
 
+# Key of the compiled FeatureFlagTable in app.extensions.
+_FLAG_TABLE_EXTENSION = 'feature_flag_table'
+
+
+@dataclass(frozen=True)
+class FlagDecision:
+  """How to decide whether a feature is enabled."""
+  enabled: bool
+  # Percentage of requests the feature is enabled for, None for all of them.
+  rollout_percentage: float | None = None
+
+
+_DISABLED = FlagDecision(enabled=False)
+
+
+class FeatureFlagTable:
+  """Immutable decision table compiled from the FEATURE_FLAGS app config."""
+
+  def __init__(self, feature_flags: Dict | None):
+    # The app config it was compiled from.
+    self.source = feature_flags
+    self.decisions: Mapping[str, FlagDecision] = MappingProxyType({
+        name:
+            FlagDecision(enabled=bool(flag.get('enabled', False)),
+                         rollout_percentage=flag.get('rollout_percentage'))
+        for name, flag in (feature_flags or {}).items()
+    })
+
+  def get(self, feature_name: str) -> FlagDecision:
+    return self.decisions.get(feature_name, _DISABLED)
+
+
+class _ReadOnlyDict(dict):
+  """A dict that raises TypeError on in-place changes."""
+
+  def _read_only(self, *args, **kwargs):
+    raise TypeError(
+        'FEATURE_FLAGS is read-only, change it with set_feature_flags')
+
+  __setitem__ = __delitem__ = __ior__ = _read_only
+  clear = pop = popitem = setdefault = update = _read_only
+
+  def __reduce__(self):
+    return (_ReadOnlyDict, (dict(self),))
+
+
+def set_feature_flags(app: Flask, feature_flags: Dict | None):
+  """Sets the FEATURE_FLAGS app config and compiles its decision table.
+
+  The config is stored read-only, so that it cannot change in place without
+  its table being compiled again.
+  """
+  feature_flags = _ReadOnlyDict({
+      name: _ReadOnlyDict(flag) for name, flag in (feature_flags or {}).items()
+  })
+  app.config['FEATURE_FLAGS'] = feature_flags
+  app.extensions[_FLAG_TABLE_EXTENSION] = FeatureFlagTable(feature_flags)
+
+
+def get_feature_flag_table(app: Flask) -> FeatureFlagTable:
+  """Returns the decision table of the app's FEATURE_FLAGS config."""
+  table = app.extensions.get(_FLAG_TABLE_EXTENSION)
+  # Compile again if FEATURE_FLAGS was replaced without set_feature_flags.
+  if table is None or table.source is not app.config.get('FEATURE_FLAGS'):
+    set_feature_flags(app, app.config.get('FEATURE_FLAGS'))
+    table = app.extensions[_FLAG_TABLE_EXTENSION]
+  return table
+
 
 def is_feature_override_enabled(feature_name: str, request=None) -> bool:
   """Check if a URL param to manually enable a feature is present.
@@ -108,11 +182,27 @@ def is_feature_enabled(feature_name: str, app=None, request=None) -> bool:
     request = flask_request
 
   if feature_name == DIVERT_TO_SPANNER and has_request_context():
-    from flask import g
     if 'use_spanner' not in g:
       g.use_spanner = assign_spanner_cohort(app, request)
     return g.use_spanner
 
+  # Each flag is evaluated at most once per request, so that rollouts are
+  # consistent within the request.
+  memoize = (has_request_context() and
+             request in (flask_request, flask_request._get_current_object()) and
+             app in (current_app, current_app._get_current_object()))
+  if memoize:
+    decisions = g.setdefault('feature_flag_decisions', {})
+    if feature_name in decisions:
+      return decisions[feature_name]
+
+  result = _decide(feature_name, app, request)
+  if memoize:
+    decisions[feature_name] = result
+  return result
+
+
+def _decide(feature_name: str, app, request) -> bool:
   # Check for URL parameter overrides
   if is_feature_override_enabled(feature_name, request):
     return True
@@ -121,16 +211,56 @@ def is_feature_enabled(feature_name: str, app=None, request=None) -> bool:
     return False
 
   # Check for feature flags in the app config
-  feature_flags = app.config.get('FEATURE_FLAGS', {})
-  is_feature_enabled = feature_flags.get(feature_name, {}).get('enabled', False)
+  decision = get_feature_flag_table(app).get(feature_name)
 
   # Apply rollout percentage if specified
-  if is_feature_enabled and 'rollout_percentage' in feature_flags.get(
-      feature_name, {}):
-    rollout_percentage = feature_flags[feature_name]['rollout_percentage']
-    return random.random() * 100 < rollout_percentage
+  if decision.enabled and decision.rollout_percentage is not None:
+    return random.random() * 100 < decision.rollout_percentage
+
+  return decision.enabled
+
+
+class IpPrefixSet:
+  """IP addresses and CIDR networks, indexed by prefix length.
+
+  An address matches if its first prefix length bits are in the set for any
+  of the prefix lengths, so a lookup costs one set lookup per distinct prefix
+  length rather than one comparison per pattern.
+  """
 
-  return is_feature_enabled
+  def __init__(self, ip_patterns: List[str]):
+    # IP version -> prefix length -> network prefixes as ints
+    self._prefixes: Dict[int, Dict[int, set[int]]] = {4: {}, 6: {}}
+    for pattern in ip_patterns:
+      try:
+        if '/' in pattern:
+          network = ipaddress.ip_network(pattern, strict=False)
+        else:
+          network = ipaddress.ip_network(ipaddress.ip_address(pattern))
+      except ValueError:
+        continue
+      max_len = network.max_prefixlen
+      self._prefixes[network.version].setdefault(network.prefixlen, set()).add(
+          int(network.network_address) >> (max_len - network.prefixlen))
+
+  def __contains__(self, ip_str: str) -> bool:
+    if not ip_str:
+      return False
+    try:
+      ip = ipaddress.ip_address(ip_str)
+    except ValueError:
+      return False
+    ip_int = int(ip)
+    for prefix_len, prefixes in self._prefixes[ip.version].items():
+      if ip_int >> (ip.max_prefixlen - prefix_len) in prefixes:
+        return True
+    return False
+
+
+@functools.lru_cache(maxsize=8)
+def _compile_ip_list(ip_list: str) -> IpPrefixSet:
+  """Compiles a comma-separated list of IPs and CIDRs from the app config."""
+  return IpPrefixSet([i.strip() for i in ip_list.split(',') if i.strip()])
 
 
 def ip_in_list(ip_str: str, ip_patterns: list[str]) -> bool:
@@ -146,23 +276,7 @@ def ip_in_list(ip_str: str, ip_patterns: list[str]) -> bool:
   """
   if not ip_str or not ip_patterns:
     return False
-  try:
-    ip = ipaddress.ip_address(ip_str)
-  except ValueError:
-    return False
-
-  for pattern in ip_patterns:
-    try:
-      if '/' in pattern:
-        network = ipaddress.ip_network(pattern, strict=False)
-        if ip in network:
-          return True
-      else:
-        if ip == ipaddress.ip_address(pattern):
-          return True
-    except ValueError:
-      pass
-  return False
+  return ip_str in IpPrefixSet(ip_patterns)
 
 
 def assign_spanner_cohort(app, request) -> bool:
@@ -182,9 +296,8 @@ def assign_spanner_cohort(app, request) -> bool:
     return False
 
   # Check feature flag configuration
-  feature_flags = app.config.get('FEATURE_FLAGS', {})
-  flag_config = feature_flags.get(DIVERT_TO_SPANNER, {})
-  if not flag_config.get('enabled', False):
+  flag_decision = get_feature_flag_table(app).get(DIVERT_TO_SPANNER)
+  if not flag_decision.enabled:
     return False
 
   # Extract the original client IP (the first/leftmost IP in the X-Forwarded-For chain)
@@ -200,22 +313,14 @@ def assign_spanner_cohort(app, request) -> bool:
   # Check IP-based cohort overrides
   force_non_spanner_raw = app.config.get(
       'DB_COHORT_FORCE_NON_SPANNER_IPS') or ''
-  if force_non_spanner_raw:
-    force_non_spanner_ips = [
-        i.strip() for i in force_non_spanner_raw.split(',') if i.strip()
-    ]
-    if ip_in_list(ip, force_non_spanner_ips):
-      return False
+  if force_non_spanner_raw and ip in _compile_ip_list(force_non_spanner_raw):
+    return False
 
   force_spanner_raw = app.config.get('DB_COHORT_FORCE_SPANNER_IPS') or ''
-  if force_spanner_raw:
-    force_spanner_ips = [
-        i.strip() for i in force_spanner_raw.split(',') if i.strip()
-    ]
-    if ip_in_list(ip, force_spanner_ips):
-      return True
-
-  rollout_percentage = flag_config.get('rollout_percentage', 0)
+  if force_spanner_raw and ip in _compile_ip_list(force_spanner_raw):
+    return True
+
+  rollout_percentage = flag_decision.rollout_percentage or 0
   if rollout_percentage >= 100:
     return True
   if rollout_percentage <= 0:
@@ -19,6 +19,9 @@ import copy
 import re
 from typing import Dict, List
 
+from server.lib import existence_cache
+from server.lib.compact_obs import CompactPoints
+from server.lib.compact_obs import CompactSeries
 import server.services.datacommons as dc
 from shared.lib.constants import MIXER_RESPONSE_ID_FIELD
 
@@ -175,7 +178,7 @@ def _compact_series(series_resp, all_facets):
   return result
 
 
-def point_core(entities, variables, date, all_facets):
+def point_core(entities, variables, date, all_facets, compact=False):
   """Fetchs observation point for given entities, variables and date.
 
   The response is in the following format:
@@ -191,9 +194,13 @@ def point_core(entities, variables, date, all_facets):
       }
     }
   }
+
+  If compact is True, the same content is returned as a read-only CompactPoints.
   """
   resp = dc.obs_point(entities, variables, date)
   resp['facets'] = get_processed_facets(resp.get('facets', {}))
+  if compact:
+    return CompactPoints(resp, all_facets)
   return _compact_point(resp, all_facets)
 
 
@@ -202,7 +209,8 @@ def point_within_core(ancestor_entity,
                       variables,
                       date,
                       all_facets,
-                      facet_ids=None):
+                      facet_ids=None,
+                      compact=False):
   """Fetchs observation point for descendent entities of certain type.
 
   The response is in the following format:
@@ -218,14 +226,18 @@ def point_within_core(ancestor_entity,
       }
     }
   }
+
+  If compact is True, the same content is returned as a read-only CompactPoints.
   """
   resp = dc.obs_point_within(ancestor_entity, descendent_type, variables, date,
                              facet_ids)
   resp['facets'] = get_processed_facets(resp.get('facets', {}))
+  if compact:
+    return CompactPoints(resp, all_facets)
   return _compact_point(resp, all_facets)
 
 
-def series_core(entities, variables, all_facets, facet_ids=None):
+def series_core(entities, variables, all_facets, facet_ids=None, compact=False):
   """Fetches observation series for given entities and variables.
 
   The response is in the following format:
@@ -241,9 +253,13 @@ def series_core(entities, variables, all_facets, facet_ids=None):
       }
     }
   }
+
+  If compact is True, the same content is returned as a read-only CompactSeries.
   """
   resp = dc.obs_series(entities, variables, facet_ids)
   resp['facets'] = get_processed_facets(resp.get('facets', {}))
+  if compact:
+    return CompactSeries(resp, all_facets)
   return _compact_series(resp, all_facets)
 
 
@@ -268,18 +284,45 @@ def series_facet(entities, variables, all_facets):
   }
 
   """
+  kind = 'series_facet:all' if all_facets else 'series_facet'
+  pairs = existence_cache.get_pairs(
+      kind, variables,
+      entities, lambda variables, entities: _series_facet_pairs(
+          variables, entities, all_facets))
+  processed_series = {'facets': {}, 'data': {}}
+  for (var, entity), pair in pairs.items():
+    if 'data' not in pair:
+      continue
+    processed_series['data'].setdefault(var, {})[entity] = pair['data']
+    processed_series['facets'].update(pair['facets'])
+  # Callers add per place fields to the facet objects, so they must not be the
+  # cached ones.
+  processed_series['facets'] = copy.deepcopy(processed_series['facets'])
+  return processed_series
+
+
+# Returns the series facets of each (variable, entity) pair as
+# {'data': [<facet series>...], 'facets': {<facet_id>: <facet object>}}, or {}
+# for a pair that is not in the response.
+def _series_facet_pairs(variables, entities, all_facets):
   resp = dc.series_facet(entities, variables)
   compacted_series = _compact_series(resp, all_facets)
-  processed_series = {'facets': compacted_series.get('facets', {}), 'data': {}}
-  # Update compacted series so that the entity data is always a list.
+  facets = compacted_series.get('facets', {})
+  result = {(var, entity): {} for var in variables for entity in entities}
   for var, var_obs in compacted_series.get('data', {}).items():
-    processed_series['data'][var] = {}
     for entity, entity_obs in var_obs.items():
+      # Update compacted series so that the entity data is always a list.
       if not all_facets:
-        processed_series['data'][var][entity] = [entity_obs]
-      else:
-        processed_series['data'][var][entity] = entity_obs
-  return processed_series
+        entity_obs = [entity_obs]
+      result[(var, entity)] = {
+          'data': entity_obs,
+          'facets': {
+              x['facet']: facets[x['facet']]
+              for x in entity_obs
+              if x.get('facet') in facets
+          }
+      }
+  return result
 
 
 def point_within_facet(ancestor_entity, descendent_type, variables, date,
@@ -296,7 +339,8 @@ def series_within_core(ancestor_entity,
                        descendent_type,
                        variables,
                        all_facets,
-                       facet_ids=None):
+                       facet_ids=None,
+                       compact=False):
   """Fetchs observation series for for descendent entities of certain type.
 
   The response is in the following format:
@@ -312,10 +356,14 @@ def series_within_core(ancestor_entity,
       }
     }
   }
+
+  If compact is True, the same content is returned as a read-only CompactSeries.
   """
   resp = dc.obs_series_within(ancestor_entity, descendent_type, variables,
                               facet_ids)
   resp['facets'] = get_processed_facets(resp.get('facets', {}))
+  if compact:
+    return CompactSeries(resp, all_facets)
   return _compact_series(resp, all_facets)
 
 
@@ -330,19 +378,43 @@ def observation_existence(variables, entities):
       }
 
   """
+  pairs = existence_cache.get_pairs('observation', variables, entities,
+                                    _observation_existence_pairs)
   result = {}
   # Populate result
   for var in variables:
     result[var] = {}
     for e in entities:
-      result[var][e] = False
+      result[var][e] = pairs.get((var, e), False)
+  return result
+
+
+def _observation_existence_pairs(variables, entities):
+  result = {(var, e): False for var in variables for e in entities}
   # Fetch existence check data
   resp = dc.v2observation(select=['variable', 'entity'],
                           entity={'dcids': entities},
                           variable={'dcids': variables})
   for var, entity_obs in resp.get('byVariable', {}).items():
     for e in entity_obs.get('byEntity', {}):
-      result[var][e] = True
+      result[(var, e)] = True
+  return result
+
+
+def entities_with_data(resp):
+  """Gets the entities with observations of each variable from a
+  dc.obs_existence_async or dc.obs_existence_within_async response.
+
+  Returns:
+      {
+        <variable_dcid>: [<entity_dcid>, ...]
+      }
+  """
+  result = {}
+  for var, entity_obs in resp.get('byVariable', {}).items():
+    entities = list(entity_obs.get('byEntity', {}))
+    if entities:
+      result[var] = entities
   return result
 
 
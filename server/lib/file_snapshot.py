@@ -0,0 +1,113 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Values loaded from local snapshot files, eg. the stat var hierarchy and the
+place availability index, and loaded again when the files are replaced.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+
+class FileSnapshot:
+  """
+  Holds the value loaded from a file, and loads it again when the modification
+  time of the file changes, checking at most once every refresh_sec seconds.
+
+  The first load is made on the calling thread. With background, later loads
+  are made on a background thread and the old value is served meanwhile.
+  """
+
+  def __init__(self,
+               name: str,
+               path: str,
+               refresh_sec: int,
+               load_fn: Callable[[str], Any],
+               background: bool = False):
+    self.name = name
+    self.path = path
+    self.refresh_sec = refresh_sec
+    self._load_fn = load_fn
+    self._background = background
+    self._lock = threading.Lock()
+    self._value = None
+    self._mtime = None
+    self._last_check = 0
+    self._reloading = False
+
+  def _is_fresh(self) -> bool:
+    return time.time() - self._last_check < self.refresh_sec
+
+  def get(self) -> Any:
+    """Returns the value, or None if the file could never be loaded."""
+    if self._is_fresh():
+      return self._value
+    with self._lock:
+      if self._is_fresh():
+        return self._value
+      if self._value is None or not self._background:
+        # Nothing to serve yet, or no background loads, so load on the calling
+        # thread.
+        self._reload()
+      elif not self._reloading:
+        self._reloading = True
+        self._last_check = time.time()
+        threading.Thread(target=self._reload_in_background, daemon=True).start()
+    return self._value
+
+  def _reload_in_background(self):
+    try:
+      with self._lock:
+        self._reload()
+    finally:
+      self._reloading = False
+
+  # Must be called with the lock held.
+  def _reload(self):
+    self._last_check = time.time()
+    try:
+      mtime = os.path.getmtime(self.path)
+      if mtime == self._mtime:
+        return
+      start = time.time()
+      self._value = self._load_fn(self.path)
+      self._mtime = mtime
+      logging.info('Loaded %s %s (version %s, %s entries) in %.2fs', self.name,
+                   self.path, getattr(self._value, 'version', ''),
+                   len(self._value),
+                   time.time() - start)
+    except Exception:
+      logging.exception('Failed to load %s %s', self.name, self.path)
+
+
+_snapshots: Dict[Tuple[str, str], FileSnapshot] = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_snapshot(name: str,
+                 path: str,
+                 refresh_sec: int,
+                 load_fn: Callable[[str], Any],
+                 background: bool = False) -> FileSnapshot:
+  """Returns the process-wide FileSnapshot of a file, creating it if needed."""
+  snapshot = _snapshots.get((name, path))
+  if not snapshot:
+    with _snapshots_lock:
+      snapshot = _snapshots.setdefault((name, path),
+                                       FileSnapshot(name, path, refresh_sec,
+                                                    load_fn, background))
+  return snapshot
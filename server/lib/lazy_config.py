@@ -0,0 +1,125 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+App config entries that are built on first access.
+
+Optional subsystems (disaster data, the NL topic cache, bad words, prompts...)
+are registered with a loader instead of being loaded in create_app. The first
+read of the entry from LazyConfig, eg. current_app.config['TOPIC_CACHE'], runs
+the loader exactly once, and later reads get the value. `key in config` is
+true for a registered entry whether or not it was built yet.
+
+Entries listed in EAGER_CONFIG_KEYS are built at startup by warmup(), so that
+deployments that use them load them before gunicorn forks the workers.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from flask import Config
+from flask import Flask
+
+# Value of EAGER_CONFIG_KEYS to build all the entries at startup.
+ALL_KEYS = '*'
+
+
+class _LazyValue:
+  """Placeholder of a config entry that is not built yet."""
+  __slots__ = ('loader', 'lock')
+
+  def __init__(self, loader: Callable[[], Any]):
+    self.loader = loader
+    self.lock = threading.Lock()
+
+  def resolve(self, config: 'LazyConfig', key: str) -> Any:
+    with self.lock:
+      value = dict.__getitem__(config, key)
+      # Built by another thread while this one waited for the lock.
+      if value is not self:
+        return value
+      start = time.time()
+      value = self.loader()
+      dict.__setitem__(config, key, value)
+      logging.info('Loaded app config %s in %.2fs', key, time.time() - start)
+      return value
+
+
+class LazyConfig(Config):
+  """Flask config that builds the entries registered with register() when
+  they are first read."""
+
+  def __getitem__(self, key: str) -> Any:
+    value = super().__getitem__(key)
+    if isinstance(value, _LazyValue):
+      return value.resolve(self, key)
+    return value
+
+  def get(self, key: str, default: Any = None) -> Any:
+    if key in self:
+      return self[key]
+    return default
+
+  # Bulk reads build the entries too. Overriding __iter__ makes dict(config)
+  # and {**config} go through __getitem__ instead of copying the placeholders.
+
+  def __iter__(self) -> Iterator[str]:
+    return super().__iter__()
+
+  def items(self) -> List[Tuple[str, Any]]:
+    return [(key, self[key]) for key in self]
+
+  def values(self) -> List[Any]:
+    return [self[key] for key in self]
+
+  def copy(self) -> Dict[str, Any]:
+    return dict(self.items())
+
+  def pop(self, key: str, *default: Any) -> Any:
+    value = super().pop(key, *default)
+    if isinstance(value, _LazyValue):
+      return value.loader()
+    return value
+
+  def lazy_keys(self) -> List[str]:
+    """Returns the registered entries that are not built yet."""
+    return [
+        key for key, value in dict.items(self) if isinstance(value, _LazyValue)
+    ]
+
+
+def register(app: Flask, key: str, loader: Callable[[], Any]):
+  """
+  Sets app.config[key] to be built by loader on first access, or right away
+  if the app config is not a LazyConfig.
+  """
+  if isinstance(app.config, LazyConfig):
+    app.config[key] = _LazyValue(loader)
+  else:
+    app.config[key] = loader()
+
+
+def warmup(app: Flask, keys: List[str]):
+  """Builds the given registered entries, or all of them for ALL_KEYS."""
+  if not isinstance(app.config, LazyConfig):
+    return
+  lazy_keys = app.config.lazy_keys()
+  if ALL_KEYS in keys:
+    keys = lazy_keys
+  for key in keys:
+    if key in lazy_keys:
+      app.config[key]
+    elif key not in app.config:
+      logging.warning('Unknown app config %s to warm up', key)
@@ -120,7 +120,8 @@ def rank_places_by_series_growth(
   series_data = fetch.series_core(entities=places,
                                   variables=[sv],
                                   all_facets=get_all_facets,
-                                  facet_ids=facet_ids)
+                                  facet_ids=facet_ids,
+                                  compact=True)
   place2denom = _compute_place_to_denom(sv, places)
   # Count the RPC section (since we have multiple exit points)
   counters.timeit('rank_places_by_series_growth', start)
@@ -405,8 +406,11 @@ def filter_and_rank_places(
   if not date:
     # When there's no date specified, use latest date
     date = 'LATEST'
-  api_resp = fetch.point_within_core(parent_place.dcid, child_type.value, [sv],
-                                     date, False)
+  api_resp = fetch.point_within_core(parent_place.dcid,
+                                     child_type.value, [sv],
+                                     date,
+                                     False,
+                                     compact=True)
   sv_data = api_resp.get('data', {}).get(sv, {})
   child_and_value = []
   for child_place, value_data in sv_data.items():
@@ -439,9 +443,12 @@ def filter_and_rank_places_per_capita(
     child_type: types.ContainedInPlaceType,
     sv: str,
     filter: types.QuantityClassificationAttributes = None) -> List[types.Place]:
-  api_resp = fetch.point_within_core(parent_place.dcid, child_type.value,
+  api_resp = fetch.point_within_core(parent_place.dcid,
+                                     child_type.value,
                                      [sv, constants.DEFAULT_DENOMINATOR],
-                                     'LATEST', False)
+                                     'LATEST',
+                                     False,
+                                     compact=True)
 
   p2denom = {}
   for p, d in api_resp.get('data', {}).get(constants.DEFAULT_DENOMINATOR,
@@ -18,7 +18,9 @@ from typing import Dict, List
 
 from flask import current_app
 
+# Imported as a module, since topic_cache imports this module indirectly.
 from server.lib import fetch
+from server.lib import topic_cache
 from server.lib.feature_flags import ENABLE_SCHEMA_DRIVEN_TOPIC_RESOLUTION
 from server.lib.feature_flags import is_feature_enabled
 from server.lib.nl.common import utils
@@ -345,6 +347,12 @@ def get_topic_vars_recurive(topic: str,
   """
   if not utils.is_topic(topic) or rank >= TOPIC_RANK_LIMIT:
     return []
+  closure = _cached_closure(topic, dc)
+  if closure is not None:
+    # The recursion below stops at the first var past max_svs.
+    if max_svs > 0:
+      return list(closure.vars[:max(max_svs - cur_svs, 0) + 1])
+    return list(closure.vars)
   svs = _TOPIC_DCID_TO_SV_OVERRIDE.get(topic, [])
   if not svs:
     svs = _members(topic, 'relevantVariable', dc)
@@ -362,6 +370,22 @@ def get_topic_vars_recurive(topic: str,
   return new_svs
 
 
+def _cached_closure(topic: str, dc: str) -> 'topic_cache.TopicClosure | None':
+  """Returns the precomputed expansion of the topic from the TOPIC_CACHE graph,
+  if the topic and all its sub-topics are cached and none is overridden."""
+  if 'TOPIC_CACHE' not in current_app.config or dc not in current_app.config[
+      'TOPIC_CACHE']:
+    return None
+  cache = current_app.config['TOPIC_CACHE'][dc]
+  if not isinstance(cache, topic_cache.TopicCache):
+    return None
+  closure = cache.graph.closure(topic)
+  if closure is None or not closure.topics.isdisjoint(
+      _TOPIC_DCID_TO_SV_OVERRIDE):
+    return None
+  return closure
+
+
 def get_topic_vars(topic: str, dc: str = DCNames.MAIN_DC.value):
   """Returns immediate member variables, SVPGs, or sub-topics for a topic."""
   if not utils.is_topic(topic):
@@ -32,6 +32,7 @@ import server.lib.nl.detection.date
 import server.lib.nl.detection.types as types
 from server.lib.nl.fulfillment.types import Sv2Place2Date
 import server.lib.nl.fulfillment.utils as futils
+from server.lib.place_resolver import get_place_resolver
 import server.services.datacommons as dc
 import shared.lib.constants as shared_constants
 
@@ -461,7 +462,7 @@ def get_all_child_places(main_place_dcid: str, contained_place_type: str,
 def get_immediate_parent_places(main_place_dcid: str, parent_place_type: str,
                                 counters: ctr.Counters) -> List[types.Place]:
   start = time.time()
-  resp = fetch.raw_property_values([main_place_dcid], 'containedInPlace')
+  resp = get_place_resolver().get_parents([main_place_dcid])
   counters.timeit('get_immediate_parent_places', start)
   results = []
   nodes = resp.get(main_place_dcid, [])
@@ -481,11 +482,13 @@ def get_immediate_parent_places(main_place_dcid: str, parent_place_type: str,
 
 # Returns a list of parent place names for a dcid.
 def parent_place_names(dcid: str) -> List[str]:
-  parent_dcids = fetch.property_values(nodes=[dcid],
-                                       prop='containedInPlace')[dcid]
+  resolver = get_place_resolver()
+  parent_dcids = [
+      p['dcid'] for p in resolver.get_parents([dcid])[dcid] if p.get('dcid')
+  ]
   if parent_dcids:
-    names = fetch.property_values(nodes=parent_dcids, prop='name')
-    ret = [names[p][0] for p in parent_dcids]
+    names = resolver.get_names(parent_dcids)
+    ret = [names[p] for p in parent_dcids]
     return ret
   return None
 
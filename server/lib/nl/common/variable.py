@@ -28,6 +28,7 @@ import server.lib.nl.common.topic as topic
 import server.lib.nl.common.utils as utils
 from server.lib.nl.explore.params import DCNames
 import server.lib.shared as shared
+from server.lib.sv_metadata import get_sv_metadata_store
 import server.services.datacommons as dc
 
 # Have an upper limit so we don't do too many existence checks.
@@ -303,7 +304,9 @@ def get_sv_name(all_svs: List[str],
                 sv_chart_titles: Dict,
                 dc: str = DCNames.MAIN_DC.value) -> Dict:
   max_pages = _get_max_pages()
-  sv2name_raw = fetch.property_values(all_svs, 'name', max_pages=max_pages)
+  sv2name_raw = get_sv_metadata_store().get_values(all_svs,
+                                                   'name',
+                                                   max_pages=max_pages)
   uncurated_names = {
       sv: names[0] if names else sv for sv, names in sv2name_raw.items()
   }
@@ -351,9 +354,9 @@ def get_sv_unit(all_svs: List[str]) -> Dict:
 
 def get_sv_description(all_svs: List[str]) -> Dict:
   max_pages = _get_max_pages()
-  sv2desc_dc = fetch.property_values(all_svs,
-                                     'description',
-                                     max_pages=max_pages)
+  sv2desc_dc = get_sv_metadata_store().get_values(all_svs,
+                                                  'description',
+                                                  max_pages=max_pages)
   sv2desc_dc = {sv: desc[0] if desc else '' for sv, desc in sv2desc_dc.items()}
   sv_desc_map = {}
   for sv in all_svs:
@@ -368,9 +371,9 @@ def get_sv_description(all_svs: List[str]) -> Dict:
 
 def get_sv_footnote(all_svs: List[str]) -> Dict:
   max_pages = _get_max_pages()
-  sv2footnote_raw = fetch.property_values(all_svs,
-                                          'footnote',
-                                          max_pages=max_pages)
+  sv2footnote_raw = get_sv_metadata_store().get_values(all_svs,
+                                                       'footnote',
+                                                       max_pages=max_pages)
   uncurated_footnotes = {
       sv: footnotes[0] if footnotes else ''
       for sv, footnotes in sv2footnote_raw.items()
@@ -23,6 +23,7 @@ from google.adk.tools.mcp_tool.mcp_session_manager import \
 from google.adk.tools.mcp_tool.mcp_toolset import McpToolset
 from google.genai import types
 
+from server.lib import tracing
 from server.lib.nl.detection.agent.instructions import AGENT_INSTRUCTIONS
 from server.lib.nl.detection.agent.types import AgentDetection
 
@@ -84,13 +85,14 @@ class DetectionAgent:
       # NOTE: runner.run_async returns an async generator.
       # We must fully iterate over it (consuming all streamed results) to ensure
       # the agent's work is finished before fetching the final session state.
-      async for _ in self.runner.run_async(new_message=query_content,
-                                           user_id=session.user_id,
-                                           session_id=session.id):
-        # The pass statement is used as a placeholder for the intentionally empty
-        # loop body. We only need to iterate through the generator to
-        # ensure the agent's execution completes, ignoring intermediate outputs.
-        pass
+      with tracing.span('llm.agent', model=self.model):
+        async for _ in self.runner.run_async(new_message=query_content,
+                                             user_id=session.user_id,
+                                             session_id=session.id):
+          # The pass statement is used as a placeholder for the intentionally empty
+          # loop body. We only need to iterate through the generator to
+          # ensure the agent's execution completes, ignoring intermediate outputs.
+          pass
 
       updated_session = await self.runner.session_service.get_session(
           app_name=self.runner.app_name,
@@ -24,6 +24,7 @@ from google import genai
 from google.genai import types
 import json5
 
+from server.lib import tracing
 from server.lib.nl.common import counters
 
 _GEMINI_3_0_FLASH = 'gemini-3-flash-preview'
@@ -90,9 +91,10 @@ def detect_with_gemini(query: str, history: List[List[str]],
       f'{api_version}/{model_name}',
   )
 
-  gemini_response = gemini_client.models.generate_content(model=model_name,
-                                                          contents=text,
-                                                          config=config)
+  with tracing.span('llm', model=model_name):
+    gemini_response = gemini_client.models.generate_content(model=model_name,
+                                                            contents=text,
+                                                            config=config)
 
   ctr.timeit('gemini_pro_call', start_time)
 
@@ -15,10 +15,10 @@
 from dataclasses import dataclass
 from typing import Dict, List, Set
 
-from server.lib.fetch import property_values
 from server.lib.nl.detection.types import Entity
 from server.lib.nl.detection.types import Place
 from server.lib.nl.detection.types import PlaceDetection
+from server.lib.place_resolver import get_place_resolver
 import server.services.datacommons as dc
 import shared.lib.utils as utils
 
@@ -168,7 +168,7 @@ def get_place_from_dcids(place_dcids: List[str], debug_logs: Dict) -> any:
   if not place_dcids:
     return [], {}
   parent_places = {p: [] for p in place_dcids}
-  place_info_result = dc.get_place_info(place_dcids)
+  place_info_result = get_place_resolver().get_place_info(place_dcids)
   dcid2place = {}
   for res in place_info_result.get('data', []):
     if 'node' not in res or 'info' not in res:
@@ -233,11 +233,10 @@ def _get_non_place_entities(all_entities: List[str],
   places = set([p.dcid for p in resolved_places])
   non_place_entities = [e for e in all_entities if not e in places]
   if non_place_entities:
-    names = property_values(non_place_entities, 'name')
+    names = get_place_resolver().get_names(non_place_entities)
     # TODO: get type as well for downstream decisions
     for e in non_place_entities:
-      e_names = names.get(e, [])
-      e_name = e_names[0] if len(e_names) > 0 else e
+      e_name = names.get(e) or e
       entities.append(Entity(dcid=e, name=e_name, type=''))
   return entities
 
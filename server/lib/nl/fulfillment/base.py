@@ -13,8 +13,10 @@
 # limitations under the License.
 
 import copy
+from dataclasses import dataclass
+from dataclasses import field
 import time
-from typing import List
+from typing import Any, Dict, Iterator, List, Tuple
 
 from server.lib.nl.common import constants
 from server.lib.nl.common import utils
@@ -28,8 +30,8 @@ from server.lib.nl.detection.types import Place
 from server.lib.nl.explore import params
 from server.lib.nl.fulfillment import simple
 from server.lib.nl.fulfillment.existence import chart_vars_fetch
+from server.lib.nl.fulfillment.existence import ExistencePlanner
 from server.lib.nl.fulfillment.existence import ExtensionExistenceCheckTracker
-from server.lib.nl.fulfillment.existence import get_places_to_check
 from server.lib.nl.fulfillment.existence import MainExistenceCheckTracker
 from server.lib.nl.fulfillment.handlers import get_populate_handlers
 from server.lib.nl.fulfillment.types import PopulateState
@@ -80,27 +82,72 @@ def populate_charts(state: PopulateState) -> bool:
   return success
 
 
+#
+# A place fallback level: the places and place-type to try adding charts for,
+# and the counters to record when falling back to it.
+#
+@dataclass
+class _FallbackLevel:
+  places: List[Place]
+  place_type: ContainedInPlaceType
+  counters: List[Tuple[str, Any]] = field(default_factory=list)
+
+
+# The place-type and counters to set if no fallback level has charts, recorded
+# while the levels are walked.
+@dataclass
+class _FallbackPlan:
+  final_place_type: ContainedInPlaceType
+  failure_counters: List[Tuple[str, Any]] = field(default_factory=list)
+
+
 #
 # Populate charts for given places and SVs. If there's a failure, attempt fallback
 # to parent places, or parent place-types (for contained-in query-types).
 #
+# A level is only worked out, and its existence checks run (in parallel), once
+# the levels before it have no charts.
+#
 # REQUIRES: places and svs are non-empty.
 def _add_charts_with_place_fallback(state: PopulateState,
                                     places: List[Place]) -> bool:
-  # Add charts for the given places.
-  if _add_charts_with_existence_check(state, places):
-    return True
-  # That failed, we'll attempt fallback.
+  plan = _FallbackPlan(final_place_type=state.place_type)
+  planner = ExistencePlanner(state)
+  for level in _place_fallback_levels(state, places, plan):
+    places_to_check = planner.plan([(level.places, level.place_type)])[0]
+    for counter, value in level.counters:
+      state.uttr.counters.err(counter, value)
+    state.place_type = level.place_type
+    if _add_charts_with_existence_check(state, level.places, places_to_check,
+                                        planner):
+      return True
+
+  state.place_type = plan.final_place_type
+  for counter, value in plan.failure_counters:
+    state.uttr.counters.err(counter, value)
+  return False
+
+
+#
+# Yields the fallback levels for the places, starting with the places
+# themselves, and records the final place-type and failure counters in plan.
+# Parent places are only looked up when the next level is asked for.
+#
+def _place_fallback_levels(state: PopulateState, places: List[Place],
+                           plan: _FallbackPlan) -> Iterator[_FallbackLevel]:
+  place_type = state.place_type
+  yield _FallbackLevel(places, place_type)
 
   # TODO: Support fallback for comparison query-type.
   if state.disable_fallback:
-    return False
+    return
 
   if len(places) > 1:
     # This is a worst case sanity check because the only expected caller
     # with num-places > 1 (comparison.py) should disable fallback.
-    state.uttr.counters.err('failed_sanitycheck_fallbackwithtoomanyplaces', '')
-    return False
+    plan.failure_counters.append(
+        ('failed_sanitycheck_fallbackwithtoomanyplaces', ''))
+    return
 
   place = places[0]  # Caller populate_charts ensures this exists
 
@@ -113,88 +160,93 @@ def _add_charts_with_place_fallback(state: PopulateState,
         name='Earth',
         place_type='Place',
     )
-    state.uttr.counters.err('parent_place_fallback', {
+    yield _FallbackLevel([earth], place_type, [('parent_place_fallback', {
         'child': place.dcid,
         'parent': earth.dcid
-    })
-    return _add_charts_with_existence_check(state, [earth])
+    })])
+    return
 
   # Get the place-type.  Either of child-place (contained-in query-type),
   # or of the place itself.
   # Use child type only if user had specified the child type.
   has_child_place_type = False
-  if state.place_type and not state.had_default_place_type:
+  if place_type and not state.had_default_place_type:
     has_child_place_type = True
-    pt = state.place_type
+    pt = place_type
   else:
     pt = place.place_type
   if isinstance(pt, str):
     if pt not in set([it.value for it in ContainedInPlaceType]):
-      state.uttr.counters.err('failed_unknown_placetype', pt)
-      return False
+      plan.failure_counters.append(('failed_unknown_placetype', pt))
+      return
     pt = ContainedInPlaceType(pt)
 
-  # Walk up the parent type hierarchy trying to add charts.
+  # Walk up the parent type hierarchy.
   parent_type = utils.get_parent_place_type(pt, place)
-  parent_type = _maybe_switch_parent_type(state, place, parent_type,
-                                          has_child_place_type)
+  parent_type, place_type = _maybe_switch_parent_type(place_type, place,
+                                                      parent_type,
+                                                      has_child_place_type)
   while parent_type:
-    if state.place_type:
+    counters = []
+    if place_type:
       if parent_type == place.place_type:
         # This is no longer contained-in, so break
         break
       # Pick next parent type.
-      state.uttr.counters.err('parent_place_type_fallback', parent_type)
-      state.place_type = parent_type
+      counters.append(('parent_place_type_fallback', parent_type))
+      place_type = parent_type
     else:
       # Pick parent place.
       parents = utils.get_immediate_parent_places(place.dcid, parent_type,
                                                   state.uttr.counters)
       if not parents:
-        state.uttr.counters.err('failed_get_parent_places', {
+        plan.failure_counters.append(('failed_get_parent_places', {
             'dcid': place.dcid,
             'type': parent_type
-        })
-        return False
+        }))
+        break
 
       # There's typically a single parent, pick the first.
-      state.uttr.counters.err('parent_place_fallback', {
+      counters.append(('parent_place_fallback', {
           'child': place.dcid,
           'parent': parents[0].dcid
-      })
+      }))
       place = parents[0]
 
-    if _add_charts_with_existence_check(state, [place]):
-      return True
-    # Else, try next parent type.
+    yield _FallbackLevel([place], place_type, counters)
+    # Try next parent type.
     parent_type = utils.get_parent_place_type(parent_type, place)
-    parent_type = _maybe_switch_parent_type(state, place, parent_type,
-                                            has_child_place_type)
+    parent_type, place_type = _maybe_switch_parent_type(place_type, place,
+                                                        parent_type,
+                                                        has_child_place_type)
 
-  return False
+  plan.final_place_type = place_type
 
 
+# Returns the parent type and the place type to use for it.
 def _maybe_switch_parent_type(
-    state: PopulateState, place: Place, parent_type: ContainedInPlaceType,
-    has_child_place_type: bool) -> ContainedInPlaceType:
-  if (has_child_place_type and state.place_type and
+    place_type: ContainedInPlaceType, place: Place,
+    parent_type: ContainedInPlaceType, has_child_place_type: bool
+) -> Tuple[ContainedInPlaceType, ContainedInPlaceType]:
+  if (has_child_place_type and place_type and
       (not parent_type or parent_type.value == place.place_type)):
     # This is the scenario where we have nowhere up to go
     # for child-type hierarchy. Walk up the main-place hierarchy.
-    state.place_type = None
+    place_type = None
     pt = ContainedInPlaceType(place.place_type)
     parent_type = utils.get_parent_place_type(pt, place)
-  return parent_type
+  return parent_type, place_type
 
 
 # Add charts given a place and a list of stat-vars.
-def _add_charts_with_existence_check(state: PopulateState,
-                                     places: List[Place]) -> bool:
+def _add_charts_with_existence_check(state: PopulateState, places: List[Place],
+                                     places_to_check: Dict[str, str],
+                                     planner: ExistencePlanner) -> bool:
   # This may set state.uttr.place_fallback
   _maybe_set_fallback(state, places)
 
-  # If there is a child place_type, get child place samples for existence check.
-  state.places_to_check = get_places_to_check(state, places)
+  # If there is a child place_type, these are child place samples.
+  state.places_to_check = places_to_check
 
   if not state.places_to_check:
     # Counter updated in get_sample_child_places
@@ -205,7 +257,7 @@ def _add_charts_with_existence_check(state: PopulateState,
   # Avoid any mutations in existence tracker.
   chart_vars_map = copy.deepcopy(state.chart_vars_map)
   tracker = MainExistenceCheckTracker(state, state.places_to_check,
-                                      chart_vars_map)
+                                      chart_vars_map, planner)
   tracker.perform_existence_check()
   state.exist_chart_vars_list = chart_vars_fetch(tracker)
 
@@ -446,4 +498,4 @@ def _get_max_num_charts(state: PopulateState) -> int:
   # multiple sources.
   if params.is_special_dc(state.uttr.insight_ctx):
     return _EXTREME_MAX_NUM_CHARTS
-  return _DEFAULT_MAX_NUM_CHARTS
\ No newline at end of file
+  return _DEFAULT_MAX_NUM_CHARTS
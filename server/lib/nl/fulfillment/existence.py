@@ -13,12 +13,18 @@
 # limitations under the License.
 
 from collections import OrderedDict
+import concurrent.futures
+import dataclasses
 from dataclasses import dataclass
-from typing import Dict, List
+import time
+from typing import Dict, List, Tuple
 
+from server.lib import executors
 from server.lib.nl.common import constants
 from server.lib.nl.common import utils
 from server.lib.nl.detection.date import get_date_range_strings
+from server.lib.nl.detection.types import ContainedInPlaceType
+from server.lib.nl.detection.types import EventType
 from server.lib.nl.detection.types import Place
 import server.lib.nl.fulfillment.existence as ext
 from server.lib.nl.fulfillment.types import ChartVars
@@ -47,15 +53,97 @@ class SVExistenceCheckState:
   chart_vars_list: List[ChartVarsExistenceCheckState]
 
 
+def _results(futures: List[concurrent.futures.Future]) -> List:
+  return [future.result() for future in futures]
+
+
+#
+# Runs the SV and event existence checks of place fallback levels as one round
+# of parallel calls. The trackers below then find their results here.
+#
+class ExistencePlanner:
+
+  def __init__(self, state: PopulateState):
+    self.state = state
+    self.svs = set()
+    self.events: List[EventType] = []
+    for chart_vars_list in state.chart_vars_map.values():
+      for chart_vars in chart_vars_list:
+        if chart_vars.event and chart_vars.event not in self.events:
+          self.events.append(chart_vars.event)
+        # Same as the SVs of MainExistenceCheckTracker.
+        self.svs.update(chart_vars.svs)
+    # (sorted places, svs) -> sv_existence_for_places_check_single_point result
+    self._sv_checks: Dict[Tuple, Tuple] = {}
+    # (place, event) -> event existence
+    self._event_checks: Dict[Tuple[str, EventType], bool] = {}
+
+  # Returns the places to check of each level, given as (places, place_type),
+  # after running the existence checks of all of them.
+  def plan(
+      self, levels: List[Tuple[List[Place], ContainedInPlaceType]]
+  ) -> List[Dict[str, str]]:
+    start = time.time()
+    # The places to check depend on the place type of the level.
+    places_to_check_list = _results([
+        executors.submit('nl_existence', get_places_to_check,
+                         dataclasses.replace(self.state, place_type=place_type),
+                         places) for places, place_type in levels
+    ])
+
+    sv_keys = []
+    event_keys = []
+    for place2keys in places_to_check_list:
+      if not place2keys:
+        continue
+      places = tuple(sorted(place2keys.keys()))
+      if self.svs and (places, frozenset(self.svs)) not in sv_keys:
+        sv_keys.append((places, frozenset(self.svs)))
+      for event in self.events:
+        if (list(place2keys)[0], event) not in event_keys:
+          event_keys.append((list(place2keys)[0], event))
+
+    counters = self.state.uttr.counters
+    sv_futures = [
+        executors.submit('nl_existence',
+                         utils.sv_existence_for_places_check_single_point,
+                         places=list(places),
+                         svs=list(svs),
+                         single_date=self.state.single_date,
+                         date_range=self.state.date_range,
+                         counters=counters) for places, svs in sv_keys
+    ]
+    event_futures = [
+        executors.submit('nl_existence', utils.event_existence_for_place, place,
+                         event, counters) for place, event in event_keys
+    ]
+    self._sv_checks.update(zip(sv_keys, _results(sv_futures)))
+    self._event_checks.update(zip(event_keys, _results(event_futures)))
+    counters.timeit('existence_planner', start)
+    return places_to_check_list
+
+  def get_sv_existence(self, places: List[str], svs: List[str]) -> Tuple:
+    """Returns the planned SV existence check result, or None."""
+    return self._sv_checks.get((tuple(places), frozenset(svs)))
+
+  def get_event_existence(self, place: str, event: EventType) -> bool:
+    """Returns the planned event existence check result, or None."""
+    return self._event_checks.get((place, event))
+
+
 #
 # Common existence check tracker shared between main SVs and extension SVs.
 #
 class ExistenceCheckTracker:
 
   # NOTE: If sv2extensions is set, then this is for extensions only.
-  def __init__(self, state: PopulateState, place2keys: Dict):
+  def __init__(self,
+               state: PopulateState,
+               place2keys: Dict,
+               planner: ExistencePlanner = None):
     self.state = state
     self.place2keys = place2keys
+    self.planner = planner
     self.places = sorted(place2keys.keys())
     self.all_svs = set()
     self.exist_sv_states: List[SVExistenceCheckState] = []
@@ -142,11 +230,16 @@ class ExistenceCheckTracker:
     return sv_place_latest_dates
 
   def _run(self):
-    # Perform batch existence check.
-    # TODO: Optimize this!
-    self.existing_svs, existsv2places = \
-      utils.sv_existence_for_places_check_single_point(
-        places=self.places, svs=list(self.all_svs), single_date=self.state.single_date, date_range=self.state.date_range, counters=self.state.uttr.counters)
+    # Perform batch existence check, unless the planner already did.
+    planned = None
+    if self.planner:
+      planned = self.planner.get_sv_existence(self.places, self.all_svs)
+    if planned is not None:
+      self.existing_svs, existsv2places = planned
+    else:
+      self.existing_svs, existsv2places = \
+        utils.sv_existence_for_places_check_single_point(
+          places=self.places, svs=list(self.all_svs), single_date=self.state.single_date, date_range=self.state.date_range, counters=self.state.uttr.counters)
 
     sv_place_facet = self._get_sv_place_facet()
     sv_place_latest_dates = {}
@@ -200,10 +293,13 @@ class ExistenceCheckTracker:
 #
 class MainExistenceCheckTracker(ExistenceCheckTracker):
 
-  def __init__(self, state: PopulateState, place2keys: Dict[str, str],
-               sv2chartvarslist: OrderedDict[str, List[ChartVars]]):
-    super().__init__(state, place2keys)
-    places = place2keys.keys()
+  def __init__(self,
+               state: PopulateState,
+               place2keys: Dict[str, str],
+               sv2chartvarslist: OrderedDict[str, List[ChartVars]],
+               planner: ExistencePlanner = None):
+    super().__init__(state, place2keys, planner)
+    places = list(place2keys.keys())
 
     # Loop over all SVs, and construct existence check state.
     for sv, chart_vars_list in sv2chartvarslist.items():
@@ -213,8 +309,14 @@ class MainExistenceCheckTracker(ExistenceCheckTracker):
                                                 exist_svs=[],
                                                 exist_sv_facets={})
         if chart_vars.event:
-          exist_cv.exist_event = utils.event_existence_for_place(
-              places[0], chart_vars.event, self.state.uttr.counters)
+          exist_event = None
+          if planner:
+            exist_event = planner.get_event_existence(places[0],
+                                                      chart_vars.event)
+          if exist_event is None:
+            exist_event = utils.event_existence_for_place(
+                places[0], chart_vars.event, self.state.uttr.counters)
+          exist_cv.exist_event = exist_event
           if not exist_cv.exist_event:
             state.uttr.counters.err(
                 'failed_event_existence_check', {
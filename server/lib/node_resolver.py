@@ -0,0 +1,136 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Bulk, deduplicated resolution of node properties for a single request."""
+
+import asyncio
+import collections
+import logging
+from typing import Any, Iterable, Protocol
+
+from server.lib.cache import get_cached_many
+from server.lib.cache import set_cached_many
+from server.services import datacommons as dc
+
+_CACHE_KEY_PREFIX = 'node_resolver'
+
+
+class NodeResolutionError(RuntimeError):
+  """A bulk lookup of a resolution round failed.
+
+  The lookups of the round that succeeded are resolved, and the nodes of the
+  failed ones are left unresolved (and uncached) rather than reported as having
+  no such property.
+  """
+
+
+class NodeResolver:
+  """
+  Collects the DCIDs needed for each v2node property and resolves them in
+  rounds: every round makes at most one bulk call per property, and all the
+  calls of a round run in parallel.
+
+  Node data is kept for the whole request and also cached per DCID in the
+  shared cache, so the same DCID is never fetched twice for a property no
+  matter which batch it was requested in.
+  """
+
+  def __init__(self):
+    # property -> dcid -> node data (the value of 'data'[dcid] in a v2node
+    # response, {} if the node has no such property).
+    self._data: dict[str, dict[str, dict]] = collections.defaultdict(dict)
+    self._pending: dict[str, set[str]] = collections.defaultdict(set)
+    self.num_rounds = 0
+
+  def add(self, prop: str, dcids: Iterable[str]) -> None:
+    """Requests a property for the DCIDs in the next round."""
+    for dcid in dcids:
+      if dcid and dcid not in self._data[prop]:
+        self._pending[prop].add(dcid)
+
+  def has_pending(self) -> bool:
+    return any(self._pending.values())
+
+  async def resolve(self) -> None:
+    """Resolves everything requested so far in a single round.
+
+    Raises NodeResolutionError if any of the bulk lookups failed.
+    """
+    pending = {prop: dcids for prop, dcids in self._pending.items() if dcids}
+    self._pending = collections.defaultdict(set)
+    if not pending:
+      return
+    self.num_rounds += 1
+    props = list(pending.keys())
+    results = await asyncio.gather(
+        *[self._fetch(prop, sorted(pending[prop])) for prop in props],
+        return_exceptions=True)
+    errors = []
+    for prop, result in zip(props, results):
+      if isinstance(result, Exception):
+        logging.error('Failed to resolve %s for %s nodes: %s', prop,
+                      len(pending[prop]), result)
+        errors.append(result)
+        continue
+      for dcid in pending[prop]:
+        self._data[prop][dcid] = result.get(dcid, {})
+    if errors:
+      raise NodeResolutionError(
+          f'Failed to resolve {len(errors)} of {len(props)} properties'
+      ) from errors[0]
+
+  async def _fetch(self, prop: str, dcids: list[str]) -> dict[str, dict]:
+    prefix = f'{_CACHE_KEY_PREFIX}:{prop}'
+    result = get_cached_many(prefix, dcids)
+    missing = [dcid for dcid in dcids if dcid not in result]
+    if missing:
+      resp_data = (await dc.v2node_async(missing, prop)).get('data', {})
+      fetched = {dcid: resp_data.get(dcid, {}) for dcid in missing}
+      set_cached_many(prefix, fetched)
+      result.update(fetched)
+    return result
+
+  def is_resolved(self, dcid: str, prop: str) -> bool:
+    return dcid in self._data.get(prop, {})
+
+  def get_nodes(self, dcid: str, prop: str, arc: str) -> list[dict[str, Any]]:
+    """Returns the nodes of an arc of a resolved DCID."""
+    return self._data.get(prop, {}).get(dcid,
+                                        {}).get('arcs',
+                                                {}).get(arc,
+                                                        {}).get('nodes', [])
+
+  def get_value(self, dcid: str, prop: str, arc: str) -> str | None:
+    """Returns the value of the first node of an arc of a resolved DCID."""
+    nodes = self.get_nodes(dcid, prop, arc)
+    if nodes:
+      return nodes[0].get('value')
+    return None
+
+
+class Planner(Protocol):
+  """A multi-step lookup that requests what it needs one round at a time."""
+
+  def plan(self, resolver: NodeResolver) -> None:
+    """Consumes the results of the last round and requests the next lookups."""
+    ...
+
+
+async def run_planners(resolver: NodeResolver, *planners: Planner) -> None:
+  """Runs rounds until none of the planners need anything else."""
+  while True:
+    for planner in planners:
+      planner.plan(resolver)
+    if not resolver.has_pending():
+      return
+    await resolver.resolve()
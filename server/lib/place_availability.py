@@ -0,0 +1,230 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Data availability of the place page chart variables, read from an index
+# built offline by tools/place_availability/build_index.py.
+#
+# The index has an entry per place, with the variables that have data for the
+# place, and an entry per (parent place, child place type), with the variables
+# that have data for at least 1, 2 and 3 of the children and whether any child
+# has a geoJSON geometry. The variable sets are bitmaps over the variables of
+# the index; identical bitmaps are stored once, so most entries only hold the
+# row numbers of shared bitmaps.
+#
+# The file is memory mapped and looked up in place:
+#
+#   magic (8 bytes)
+#   header length (uint32), header JSON: {"version", "svs", "num_keys",
+#     "num_rows"}
+#   key offsets: uint32 * (num_keys + 1), into the key blob
+#   entries: (row_1, row_2, row_3, flags) uint32 * 4 per key
+#   rows: num_rows bitmaps of ceil(len(svs) / 8) bytes, row 0 is empty
+#   key blob: the sorted UTF-8 keys
+#
+# All integers are little endian.
+#
+
+import json
+import mmap
+import struct
+from typing import Dict, List, Tuple
+
+from flask import current_app
+from flask import has_app_context
+
+from server.lib import file_snapshot
+
+MAGIC = b'DCPAVL01'
+# Entry flag set when a child place has a geoJSON geometry.
+FLAG_GEO = 1
+# Highest count of places with data that the index records.
+MAX_COUNT = 3
+
+_ENTRY = struct.Struct('<4I')
+_UINT32 = struct.Struct('<I')
+
+
+def place_key(place_dcid: str) -> str:
+  return place_dcid
+
+
+def child_key(parent_dcid: str, child_type: str) -> str:
+  # DCIDs and types never contain tabs.
+  return f'{parent_dcid}\t{child_type}'
+
+
+def _bitmap(sv_indexes: List[int], row_bytes: int) -> bytes:
+  row = bytearray(row_bytes)
+  for i in sv_indexes:
+    row[i >> 3] |= 1 << (i & 7)
+  return bytes(row)
+
+
+def write_index(path: str,
+                svs: List[str],
+                entries: Dict[str, Tuple[List[List[str]], int]],
+                version: str = ''):
+  """
+  Writes an index file.
+
+  Args:
+    svs: the variables of the index.
+    entries: key -> ([variables with data for >= 1, >= 2 and >= 3 places],
+      flags). Place keys only have the first list.
+  """
+  sv_index = {sv: i for i, sv in enumerate(svs)}
+  row_bytes = (len(svs) + 7) // 8
+  rows = [bytes(row_bytes)]
+  row_index = {rows[0]: 0}
+  keys = sorted(entries)
+  key_blob = bytearray()
+  key_offsets = [0]
+  records = bytearray()
+  for key in keys:
+    sv_lists, flags = entries[key]
+    row_ids = []
+    for n in range(MAX_COUNT):
+      sv_list = sv_lists[n] if n < len(sv_lists) else []
+      row = _bitmap([sv_index[sv] for sv in sv_list if sv in sv_index],
+                    row_bytes)
+      if row not in row_index:
+        row_index[row] = len(rows)
+        rows.append(row)
+      row_ids.append(row_index[row])
+    records += _ENTRY.pack(*row_ids, flags)
+    key_blob += key.encode('utf-8')
+    key_offsets.append(len(key_blob))
+  header = json.dumps({
+      'version': version,
+      'svs': svs,
+      'num_keys': len(keys),
+      'num_rows': len(rows)
+  }).encode('utf-8')
+  with open(path, 'wb') as f:
+    f.write(MAGIC)
+    f.write(_UINT32.pack(len(header)))
+    f.write(header)
+    f.write(struct.pack(f'<{len(key_offsets)}I', *key_offsets))
+    f.write(records)
+    f.write(b''.join(rows))
+    f.write(key_blob)
+
+
+class PlaceAvailability:
+  """Lookups in an index file mapped in memory."""
+
+  def __init__(self, path: str):
+    with open(path, 'rb') as f:
+      self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if self._buf[:len(MAGIC)] != MAGIC:
+      raise ValueError(f'Not a place availability index: {path}')
+    pos = len(MAGIC)
+    (header_len,) = _UINT32.unpack_from(self._buf, pos)
+    pos += _UINT32.size
+    header = json.loads(self._buf[pos:pos + header_len].decode('utf-8'))
+    pos += header_len
+    self.version = header.get('version', '')
+    self.svs: List[str] = header['svs']
+    self._sv_index = {sv: i for i, sv in enumerate(self.svs)}
+    self._num_keys = header['num_keys']
+    self._row_bytes = (len(self.svs) + 7) // 8
+    self._offsets_pos = pos
+    self._entries_pos = pos + (self._num_keys + 1) * _UINT32.size
+    self._rows_pos = self._entries_pos + self._num_keys * _ENTRY.size
+    self._keys_pos = self._rows_pos + header['num_rows'] * self._row_bytes
+
+  def __len__(self):
+    return self._num_keys
+
+  def _key(self, i: int) -> bytes:
+    start, end = struct.unpack_from('<2I', self._buf,
+                                    self._offsets_pos + i * _UINT32.size)
+    return self._buf[self._keys_pos + start:self._keys_pos + end]
+
+  def _find(self, key: str) -> Tuple[int, int, int, int] | None:
+    target = key.encode('utf-8')
+    lo, hi = 0, self._num_keys - 1
+    while lo <= hi:
+      mid = (lo + hi) // 2
+      mid_key = self._key(mid)
+      if mid_key == target:
+        return _ENTRY.unpack_from(self._buf,
+                                  self._entries_pos + mid * _ENTRY.size)
+      if mid_key < target:
+        lo = mid + 1
+      else:
+        hi = mid - 1
+    return None
+
+  def _has_bit(self, row: int, sv: str) -> bool:
+    i = self._sv_index[sv]
+    byte = self._buf[self._rows_pos + row * self._row_bytes + (i >> 3)]
+    return bool(byte & (1 << (i & 7)))
+
+  def covers(self, svs: List[str]) -> bool:
+    """Returns whether all the variables are in the index."""
+    return all(sv in self._sv_index for sv in svs)
+
+  def place_svs(self, place_dcid: str, svs: List[str]) -> List[str] | None:
+    """
+    Returns the variables with data for the place, or None if the place is not
+    in the index.
+    """
+    entry = self._find(place_key(place_dcid))
+    if entry is None:
+      return None
+    return [sv for sv in svs if self._has_bit(entry[0], sv)]
+
+  def child_counts(self, parent_dcid: str, child_type: str,
+                   svs: List[str]) -> Dict[str, int] | None:
+    """
+    Returns the number of children of the type with data for each variable,
+    up to MAX_COUNT, for the variables with data. Returns None if the parent
+    and child type are not in the index.
+    """
+    entry = self._find(child_key(parent_dcid, child_type))
+    if entry is None:
+      return None
+    counts = {}
+    for sv in svs:
+      count = sum(1 for row in entry[:MAX_COUNT] if self._has_bit(row, sv))
+      if count:
+        counts[sv] = count
+    return counts
+
+  def children_have_geo(self, parent_dcid: str, child_type: str) -> bool | None:
+    """
+    Returns whether a child of the type has a geoJSON geometry, or None if the
+    parent and child type are not in the index.
+    """
+    entry = self._find(child_key(parent_dcid, child_type))
+    if entry is None:
+      return None
+    return bool(entry[3] & FLAG_GEO)
+
+
+def get_index() -> PlaceAvailability | None:
+  """
+  Returns the index configured by PLACE_AVAILABILITY_INDEX_PATH, or None if no
+  index is available.
+  """
+  if not has_app_context():
+    return None
+  path = current_app.config.get('PLACE_AVAILABILITY_INDEX_PATH')
+  if not path:
+    return None
+  return file_snapshot.get_snapshot(
+      'place availability index', path,
+      current_app.config.get('PLACE_AVAILABILITY_REFRESH_SEC', 3600),
+      PlaceAvailability).get()
@@ -0,0 +1,182 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Request-scoped store of what is known about places."""
+
+from dataclasses import dataclass
+from dataclasses import field
+import threading
+from typing import Dict, List
+
+from flask import g
+from flask import has_app_context
+
+from server.lib import fetch
+import server.services.datacommons as dc
+
+
+@dataclass
+class PlaceEntry:
+  # None until known. The values are those of the mixer calls the helpers
+  # made before, eg. name is '' for a node without a name.
+  name: str | None = None
+  types: List[str] | None = None
+  # Raw containedInPlace arcs, with dcid, name and types.
+  parents: List[Dict] | None = None
+  # The get_place_info item of the place, {} if it has none.
+  place_info: Dict | None = None
+  # Raw nameWithLanguage values, keyed by the requested locales.
+  i18n_names: Dict[str, List[str]] = field(default_factory=dict)
+
+
+class PlaceResolver:
+  """
+  Holds the names, types, parents and i18n names learned about each DCID
+  during a request, eg. an NL query, and fetches the missing ones with one
+  batched call per field.
+
+  Fields learned as a side effect are kept too: the parents arcs give the
+  names and types of the parents, and place info gives the names of the
+  place and its ancestors.
+
+  The resolver of a request is shared by the threads its views run tasks on,
+  so each field is looked up and filled under a lock of its own: a thread
+  waits for the fetch of the same field by another thread rather than making
+  it again.
+  """
+
+  def __init__(self):
+    self._entries: Dict[str, PlaceEntry] = {}
+    self._locks = {
+        attr: threading.Lock()
+        for attr in ['name', 'types', 'parents', 'place_info', 'i18n_names']
+    }
+    # Number of mixer calls made, for debugging.
+    self.num_calls = 0
+
+  def _entry(self, dcid: str) -> PlaceEntry:
+    return self._entries.setdefault(dcid, PlaceEntry())
+
+  def _entries_of(self, dcids: List[str]) -> Dict[str, PlaceEntry]:
+    """Returns the entries of the (deduped, non-empty) DCIDs."""
+    return {dcid: self._entry(dcid) for dcid in dict.fromkeys(dcids) if dcid}
+
+  def get_names(self, dcids: List[str]) -> Dict[str, str]:
+    """Returns the name of each DCID, '' if it has none."""
+    with self._locks['name']:
+      entries = self._entries_of(dcids)
+      missing = [dcid for dcid, entry in entries.items() if entry.name is None]
+      if missing:
+        self.num_calls += 1
+        resp = fetch.property_values(missing, 'name')
+        for dcid in missing:
+          values = resp.get(dcid, [])
+          entries[dcid].name = values[0] if values else ''
+    return {dcid: entries[dcid].name or '' for dcid in dcids if dcid}
+
+  def get_types(self, dcids: List[str]) -> Dict[str, List[str]]:
+    """Returns the typeOf values of each DCID."""
+    with self._locks['types']:
+      entries = self._entries_of(dcids)
+      missing = [dcid for dcid, entry in entries.items() if entry.types is None]
+      if missing:
+        self.num_calls += 1
+        resp = fetch.property_values(missing, 'typeOf')
+        for dcid in missing:
+          entries[dcid].types = resp.get(dcid, [])
+    return {dcid: entries[dcid].types or [] for dcid in dcids if dcid}
+
+  def get_parents(self, dcids: List[str]) -> Dict[str, List[Dict]]:
+    """Returns the raw containedInPlace arcs of each DCID."""
+    with self._locks['parents']:
+      entries = self._entries_of(dcids)
+      missing = [
+          dcid for dcid, entry in entries.items() if entry.parents is None
+      ]
+      if missing:
+        self.num_calls += 1
+        resp = fetch.raw_property_values(missing, 'containedInPlace')
+        for dcid in missing:
+          parents = resp.get(dcid, []) or []
+          entries[dcid].parents = parents
+          for parent in parents:
+            if not parent.get('dcid'):
+              continue
+            parent_entry = self._entry(parent['dcid'])
+            if parent_entry.name is None and 'name' in parent:
+              parent_entry.name = parent['name']
+            if parent_entry.types is None and 'types' in parent:
+              parent_entry.types = parent['types']
+    return {dcid: entries[dcid].parents or [] for dcid in dcids if dcid}
+
+  def get_place_info(self, dcids: List[str]) -> Dict:
+    """Returns the place info of the DCIDs, in the dc.get_place_info format."""
+    with self._locks['place_info']:
+      entries = self._entries_of(dcids)
+      missing = [
+          dcid for dcid, entry in entries.items() if entry.place_info is None
+      ]
+      if missing:
+        self.num_calls += 1
+        resp = dc.get_place_info(missing)
+        infos = {item.get('node'): item for item in resp.get('data', [])}
+        for dcid in missing:
+          item = infos.get(dcid, {})
+          entries[dcid].place_info = item
+          info = item.get('info', {})
+          for place in [info.get('self', {})] + info.get('parents', []):
+            if place.get('dcid') and 'name' in place:
+              place_entry = self._entry(place['dcid'])
+              if place_entry.name is None:
+                place_entry.name = place['name']
+    return {
+        'data': [
+            entry.place_info for entry in entries.values() if entry.place_info
+        ]
+    }
+
+  def get_i18n_names(self, dcids: List[str],
+                     locales: List[str]) -> Dict[str, List[str]]:
+    """Returns the raw nameWithLanguage values of each DCID for the locales."""
+    key = ','.join(locales)
+    with self._locks['i18n_names']:
+      entries = self._entries_of(dcids)
+      missing = [
+          dcid for dcid, entry in entries.items() if key not in entry.i18n_names
+      ]
+      if missing:
+        self.num_calls += 1
+        resp = fetch.property_values(missing,
+                                     'nameWithLanguage',
+                                     constraints=f'{{$lang:[{key}]}}',
+                                     max_pages=None)
+        for dcid in missing:
+          entries[dcid].i18n_names[key] = resp.get(dcid, [])
+    return {dcid: entries[dcid].i18n_names[key] for dcid in dcids if dcid}
+
+
+_resolver_lock = threading.Lock()
+
+
+def get_place_resolver() -> PlaceResolver:
+  """
+  Returns the place resolver of the current request (app context), or a new
+  one outside of a request.
+  """
+  if not has_app_context():
+    return PlaceResolver()
+  # The tasks of a request share its app context, and may be the first to ask.
+  with _resolver_lock:
+    if 'place_resolver' not in g:
+      g.place_resolver = PlaceResolver()
+    return g.place_resolver
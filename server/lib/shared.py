@@ -17,6 +17,7 @@ import re
 from typing import Set
 
 import server.lib.fetch as fetch
+from server.lib.place_resolver import get_place_resolver
 
 
 def names(dcids, prop=None):
@@ -46,12 +47,9 @@ def names(dcids, prop=None):
     default_name_dcids = dcids
   # if there are dcids to get default name for, do it now
   if default_name_dcids:
-    response = fetch.property_values(default_name_dcids, 'name')
+    response = get_place_resolver().get_names(default_name_dcids)
     for dcid in default_name_dcids:
-      result[dcid] = ''
-    for dcid, values in response.items():
-      if values:
-        result[dcid] = values[0]
+      result[dcid] = response.get(dcid, '')
   return result
 
 
@@ -0,0 +1,296 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Startup snapshot of the static app configuration, and startup phase timing.
+
+create_app reads chart configs, topic page configs, cached geojsons, the NL
+configs and the topic cache from the files under server/config. The snapshot
+built by tools/startup_snapshot holds all of them in one pickle, preceded by a
+header with the hash of those files and of the constants in server/lib/util.py
+and server/lib/topic_cache.py that name them. A worker uses the snapshot only
+if the hash still matches, and otherwise (or for values not in the snapshot)
+falls back to the loaders in server/lib/util.py.
+"""
+
+import gc
+import hashlib
+import io
+import logging
+import os
+import pickle
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from google.protobuf.message import Message
+
+from server.config import subject_page_pb2
+from server.lib import topic_cache
+import server.lib.util as libutil
+from shared.lib import metrics
+from shared.lib.custom_dc_util import is_custom_dc
+
+# Bump when a loader below or the snapshot format changes, so that older
+# snapshots are ignored.
+SNAPSHOT_VERSION = 2
+
+# App config key to the function that loads its value. Loaders get the
+# StaticConfig so they can use other values.
+_LOADERS: Dict[str, Callable[['StaticConfig'], Any]] = {
+    'TOPIC_PAGE_CONFIG':
+        lambda _: libutil.get_topic_page_config(),
+    'TOPIC_PAGE_SUMMARY':
+        lambda c: libutil.get_topics_summary(c.get('TOPIC_PAGE_CONFIG')),
+    'CHART_CONFIG':
+        lambda _: libutil.get_chart_config(),
+    'RANKED_STAT_VARS':
+        lambda c: libutil.get_ranked_stat_vars(c.get('CHART_CONFIG')),
+    'CACHED_GEOJSONS':
+        lambda _: libutil.get_cached_geojsons(),
+    'HOMEPAGE_TOPICS':
+        lambda _: libutil.get_json('config/home_page/topics.json'),
+    'HOMEPAGE_PARTNERS':
+        lambda _: libutil.get_json('config/home_page/partners.json'),
+    'HOMEPAGE_SAMPLE_QUESTIONS':
+        lambda _: libutil.get_json('config/home_page/sample_questions.json'),
+    'DISASTER_DASHBOARD_CONFIG':
+        lambda _: libutil.get_disaster_dashboard_config(),
+    'DISASTER_EVENT_CONFIG':
+        lambda _: libutil.get_disaster_event_config(),
+    'DISASTER_SUSTAINABILITY_CONFIG':
+        lambda _: libutil.get_disaster_sustainability_config(),
+    'NL_DISASTER_CONFIG':
+        lambda _: libutil.get_nl_disaster_config(),
+    'NL_CHART_TITLES':
+        lambda _: libutil.get_nl_chart_titles(),
+    'TOPIC_CACHE':
+        lambda c: topic_cache.load(c.get('NL_CHART_TITLES')),
+    'SDG_PERCENT_VARS':
+        lambda _: libutil.get_sdg_percent_vars(),
+    'SPECIAL_DC_NON_COUNTRY_ONLY_VARS':
+        lambda _: libutil.get_special_dc_non_countery_only_vars(),
+    'NL_PROP_TITLES':
+        lambda _: libutil.get_nl_prop_titles(),
+    'NOPC_VARS':
+        lambda _: libutil.get_nl_no_percapita_vars(),
+}
+
+
+def _snapshot_keys() -> List[str]:
+  keys = list(_LOADERS)
+  # Custom DCs merge their own topic cache, which is not a snapshot source.
+  if is_custom_dc():
+    keys.remove('TOPIC_CACHE')
+  return keys
+
+
+def _source_constants() -> List[Any]:
+  """Returns the constants that name the source files and shape the values."""
+  return [
+      libutil.PLACE_EXPLORER_CATEGORIES,
+      libutil.TOPIC_PAGE_CONFIGS,
+      libutil.CACHED_GEOJSON_FILES,
+      libutil.NL_CHART_TITLE_FILES,
+      topic_cache.TOPIC_CACHE_FILES,
+  ]
+
+
+def _source_files() -> List[str]:
+  """Returns the paths of the files the loaders above read."""
+  root = libutil.get_repo_root()
+  config_files = ['subject_page.proto']
+  config_files += [
+      f'chart_config/{category}.json'
+      for category in libutil.PLACE_EXPLORER_CATEGORIES
+  ]
+  config_files += [
+      f'topic_page/{topic_id}/{filename}.textproto'
+      for topic_id, filenames in libutil.TOPIC_PAGE_CONFIGS.items()
+      for filename in filenames
+  ]
+  config_files += [
+      f'geojson/{prop}/{filename}.json'
+      for place_types in libutil.CACHED_GEOJSON_FILES.values()
+      for props in place_types.values()
+      for prop, filename in props.items()
+  ]
+  config_files += [
+      f'home_page/{filename}'
+      for filename in ['topics.json', 'partners.json', 'sample_questions.json']
+  ]
+  config_files += [
+      f'subject_page/{filename}' for filename in [
+          'dashboard.textproto', 'events.textproto', 'sustainability.textproto',
+          'disaster_event_spec.textproto'
+      ]
+  ]
+  config_files += [
+      f'nl_page/{filename}' for filename in libutil.NL_CHART_TITLE_FILES + [
+          'disasters.textproto', 'sdg_percent_vars.csv',
+          'sdg_non_country_vars.json', 'undata_non_country_vars.json',
+          'prop_titles.json', 'nl_vars_percapita_ranking.csv'
+      ]
+  ]
+  files = [os.path.join(root, 'config', f) for f in config_files]
+  # The topic cache paths are relative to the repo root.
+  files += [
+      os.path.join(os.path.dirname(root), f)
+      for fpath_list in topic_cache.TOPIC_CACHE_FILES.values()
+      for f in fpath_list
+  ]
+  return sorted(set(files))
+
+
+def source_hash() -> str:
+  """
+  Returns the hash of the snapshot version, the source constants and the
+  source files.
+  """
+  root = libutil.get_repo_root()
+  h = hashlib.sha256(f'v{SNAPSHOT_VERSION}'.encode())
+  h.update(repr(_source_constants()).encode())
+  for file_path in _source_files():
+    h.update(os.path.relpath(file_path, root).encode())
+    with open(file_path, 'rb') as f:
+      h.update(f.read())
+  return h.hexdigest()
+
+
+def _parse_proto(type_name: str, data: bytes) -> Message:
+  return getattr(subject_page_pb2, type_name).FromString(data)
+
+
+class _SnapshotPickler(pickle.Pickler):
+  """Pickles the SubjectPageConfig protos as their binary encoding."""
+
+  def reducer_override(self, obj):
+    if isinstance(obj, Message):
+      return _parse_proto, (type(obj).__name__, obj.SerializeToString())
+    return NotImplemented
+
+
+def build_snapshot(path: str) -> List[str]:
+  """Writes the snapshot to path, and returns the keys it holds."""
+  config = StaticConfig()
+  keys = _snapshot_keys()
+  header = {'version': SNAPSHOT_VERSION, 'source_hash': source_hash()}
+  buf = io.BytesIO()
+  pickler = _SnapshotPickler(buf, protocol=pickle.HIGHEST_PROTOCOL)
+  pickler.dump(header)
+  # The header is unpickled on its own.
+  pickler.clear_memo()
+  pickler.dump({key: config.get(key) for key in keys})
+  # Write the whole file at once so that a worker never reads half of it.
+  tmp_path = f'{path}.tmp'
+  with open(tmp_path, 'wb') as f:
+    f.write(buf.getvalue())
+  os.replace(tmp_path, path)
+  return keys
+
+
+def load_snapshot(path: str) -> Dict[str, Any] | None:
+  """
+  Returns the values in the snapshot at path, or None if the snapshot can not
+  be read or is stale.
+  """
+  start = time.time()
+  try:
+    with open(path, 'rb') as f:
+      header = pickle.load(f)
+      expected_hash = source_hash()
+      if header.get('version') != SNAPSHOT_VERSION or header.get(
+          'source_hash') != expected_hash:
+        logging.warning(
+            'Ignoring stale startup snapshot %s (version %s, hash %s), '
+            'expected version %s, hash %s', path, header.get('version'),
+            header.get('source_hash'), SNAPSHOT_VERSION, expected_hash)
+        return None
+      # The snapshot holds millions of small objects, and collecting while
+      # they are created takes most of the load time.
+      gc_enabled = gc.isenabled()
+      gc.disable()
+      try:
+        values = pickle.load(f)
+      finally:
+        if gc_enabled:
+          gc.enable()
+  except Exception:
+    logging.exception('Failed to load startup snapshot %s', path)
+    return None
+  # A custom DC may have built the snapshot before setting IS_CUSTOM_DC.
+  keys = set(_snapshot_keys())
+  values = {k: v for k, v in values.items() if k in keys}
+  logging.info('Loaded startup snapshot %s (%s values) in %.2fs', path,
+               len(values),
+               time.time() - start)
+  return values
+
+
+class StaticConfig:
+  """
+  Static app config values, from the snapshot if there is a current one, or
+  else loaded from their files on first use.
+  """
+
+  def __init__(self, snapshot_path: str = ''):
+    self._values: Dict[str, Any] = {}
+    if snapshot_path:
+      self._values = load_snapshot(snapshot_path) or {}
+    self.from_snapshot = bool(self._values)
+
+  def get(self, key: str) -> Any:
+    if key not in self._values:
+      self._values[key] = _LOADERS[key](self)
+    return self._values[key]
+
+
+_STARTUP_SECONDS = metrics.gauge('startup_seconds',
+                                 'Time taken by app startup.',
+                                 mode='max')
+_STARTUP_PHASE_SECONDS = metrics.gauge('startup_phase_seconds',
+                                       'Time taken by each phase of startup.',
+                                       ['phase'],
+                                       mode='max')
+
+
+class StartupTimer:
+  """Times the phases of app startup."""
+
+  def __init__(self):
+    self._start = time.perf_counter()
+    self._last = self._start
+    self.phases: List[Tuple[str, float]] = []
+
+  def end_phase(self, name: str):
+    """Ends the phase started by the previous end_phase call."""
+    now = time.perf_counter()
+    self.phases.append((name, now - self._last))
+    self._last = now
+
+  def summary(self) -> Dict:
+    return {
+        'total_sec': round(self._last - self._start, 3),
+        'phases': {
+            name: round(sec, 3) for name, sec in self.phases
+        }
+    }
+
+  def record_metrics(self):
+    """Sets the startup gauges, as in summary."""
+    _STARTUP_SECONDS.set(self._last - self._start)
+    for name, sec in self.phases:
+      _STARTUP_PHASE_SECONDS.set(sec, phase=name)
+
+  def log(self):
+    logging.info('App startup took %.2fs: %s', self._last - self._start,
+                 ', '.join(f'{name} {sec:.2f}s' for name, sec in self.phases))
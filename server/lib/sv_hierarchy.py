@@ -0,0 +1,244 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# An in-memory index of the stat var hierarchy, loaded from a local snapshot.
+#
+# The snapshot is a JSON file produced by tools/sv_hierarchy/build_snapshot.py:
+#
+#   {
+#     "version": "...",
+#     "nodes": [
+#       {"dcid": "dc/g/Demographics", "name": "Demographics",
+#        "parents": ["dc/g/Root"]},
+#       {"dcid": "Count_Person", "parents": ["dc/g/Demographics"]},
+#       ...
+#     ]
+#   }
+#
+# where "parents" holds both the memberOf and specializationOf arcs of a node.
+#
+
+from array import array
+import json
+import logging
+from typing import Dict, List, Set
+
+from flask import current_app
+from flask import has_app_context
+
+from server.lib import file_snapshot
+
+ROOT = 'dc/g/Root'
+_CUSTOM_PREFIX = 'dc/g/Custom_'
+# Same limit as the live walk in datacommons.get_variable_ancestors.
+MAX_ANCESTOR_DEPTH = 20
+_NO_PARENT = -1
+
+
+class SvHierarchy:
+  """
+  Parent/child adjacency of stat vars and stat var groups stored as CSR-style
+  int arrays over interned node ids, plus the precomputed path to the root.
+  """
+
+  def __init__(self, nodes: List[Dict], version: str = ''):
+    self.version = version
+    self._ids: List[str] = []
+    self._index: Dict[str, int] = {}
+    self._names: Dict[int, str] = {}
+    for node in nodes:
+      self._intern(node['dcid'])
+      if node.get('name'):
+        self._names[self._index[node['dcid']]] = node['name']
+    # Listed nodes are interned first, so any id below this is fully known.
+    self._num_listed = len(self._ids)
+    # Parents may reference nodes that are not listed themselves (eg. Root).
+    for node in nodes:
+      for p in node.get('parents', []):
+        self._intern(p)
+    self._root = self._index.get(ROOT, _NO_PARENT)
+
+    num_nodes = len(self._ids)
+    parents_by_node: List[List[int]] = [[] for _ in range(num_nodes)]
+    children_by_node: List[List[int]] = [[] for _ in range(num_nodes)]
+    for node in nodes:
+      i = self._index[node['dcid']]
+      for p in sorted(set(node.get('parents', []))):
+        parents_by_node[i].append(self._index[p])
+        children_by_node[self._index[p]].append(i)
+    self._parent_offsets, self._parents = _to_csr(parents_by_node)
+    self._child_offsets, self._children = _to_csr(children_by_node)
+
+    # The parent followed when tracing a node to the root.
+    self._selected_parent = array('i', [_NO_PARENT] * num_nodes)
+    for i in range(num_nodes):
+      self._selected_parent[i] = self._select_parent(i)
+    # Full paths are only materialized for groups; a stat var's path is its
+    # selected parent followed by the path of that parent.
+    self._group_paths: Dict[int, tuple] = {}
+    for i in range(num_nodes):
+      if self._child_offsets[i] != self._child_offsets[i + 1]:
+        self._group_paths[i] = self._trace(i)
+    # Top-level categories of each group.
+    self._group_tops: Dict[int, frozenset] = {
+        i: self._walk_tops(i) for i in self._group_paths
+    }
+
+  def _intern(self, dcid: str) -> int:
+    if dcid not in self._index:
+      self._index[dcid] = len(self._ids)
+      self._ids.append(dcid)
+    return self._index[dcid]
+
+  def _parent_ids(self, i: int) -> array:
+    return self._parents[self._parent_offsets[i]:self._parent_offsets[i + 1]]
+
+  def _select_parent(self, i: int) -> int:
+    """
+    Same tie-breaking as the live walk: prefer the first dc/g/Custom_ parent,
+    otherwise take the first parent alphabetically.
+    """
+    parents = sorted(self._ids[p] for p in self._parent_ids(i))
+    if not parents:
+      return _NO_PARENT
+    selected = next((p for p in parents if p.startswith(_CUSTOM_PREFIX)),
+                    parents[0])
+    return self._index[selected]
+
+  def _trace(self, i: int) -> tuple:
+    path = []
+    visited = {i}
+    curr = i
+    while len(path) < MAX_ANCESTOR_DEPTH:
+      parent = self._selected_parent[curr]
+      if parent == _NO_PARENT or parent == self._root:
+        break
+      if parent in visited:
+        logging.error(
+            f'Cycle detected in StatVar hierarchy at {self._ids[parent]}')
+        break
+      path.append(parent)
+      visited.add(parent)
+      curr = parent
+    return tuple(path)
+
+  def __contains__(self, dcid: str) -> bool:
+    i = self._index.get(dcid)
+    return i is not None and i < self._num_listed
+
+  def __len__(self) -> int:
+    return len(self._ids)
+
+  def get_name(self, dcid: str) -> str:
+    i = self._index.get(dcid)
+    if i is None:
+      return ''
+    return self._names.get(i, '')
+
+  def get_parents(self, dcid: str) -> List[str]:
+    i = self._index.get(dcid)
+    if i is None:
+      return []
+    return [self._ids[p] for p in self._parent_ids(i)]
+
+  def get_children(self, dcid: str) -> List[str]:
+    i = self._index.get(dcid)
+    if i is None:
+      return []
+    start, end = self._child_offsets[i], self._child_offsets[i + 1]
+    return [self._ids[c] for c in self._children[start:end]]
+
+  def get_ancestors(self, dcid: str) -> List[str]:
+    """
+    Returns the path of a node to the root, excluding the node and the root.
+    Matches the result of datacommons.get_variable_ancestors.
+    """
+    i = self._index.get(dcid)
+    if i is None:
+      return []
+    if i in self._group_paths:
+      path = self._group_paths[i]
+    else:
+      parent = self._selected_parent[i]
+      if parent == _NO_PARENT or parent == self._root:
+        path = ()
+      elif parent in self._group_paths and i not in self._group_paths[parent]:
+        path = ((parent,) + self._group_paths[parent])[:MAX_ANCESTOR_DEPTH]
+      else:
+        path = self._trace(i)
+    return [self._ids[p] for p in path]
+
+  def get_top_categories(self, dcid: str) -> List[str]:
+    """
+    Returns the top-level groups (direct children of the root) a node rolls
+    up to through any of its parents. A node without parents is not its own
+    category.
+    """
+    i = self._index.get(dcid)
+    if i is None:
+      return []
+    tops: Set[int] = set()
+    for p in self._parent_ids(i):
+      if p != self._root:
+        tops.update(self._group_tops.get(p) or self._walk_tops(p))
+    return sorted(self._ids[t] for t in tops)
+
+  def _walk_tops(self, i: int) -> frozenset:
+    tops = set()
+    visited = set()
+    stack = [i]
+    while stack:
+      n = stack.pop()
+      if n in visited:
+        continue
+      visited.add(n)
+      valid_parents = [p for p in self._parent_ids(n) if p != self._root]
+      if valid_parents:
+        stack.extend(valid_parents)
+      else:
+        tops.add(n)
+    return frozenset(tops)
+
+
+def _to_csr(adjacency: List[List[int]]) -> tuple[array, array]:
+  offsets = array('i', [0])
+  values = array('i')
+  for row in adjacency:
+    values.extend(row)
+    offsets.append(len(values))
+  return offsets, values
+
+
+def load_file(path: str) -> SvHierarchy:
+  with open(path, 'r') as fp:
+    snapshot = json.load(fp)
+  return SvHierarchy(snapshot.get('nodes', []), snapshot.get('version', ''))
+
+
+def get_hierarchy() -> SvHierarchy | None:
+  """
+  Returns the stat var hierarchy from the snapshot configured by
+  SV_HIERARCHY_SNAPSHOT_PATH, or None if no snapshot is available.
+  """
+  if not has_app_context():
+    return None
+  path = current_app.config.get('SV_HIERARCHY_SNAPSHOT_PATH')
+  if not path:
+    return None
+  return file_snapshot.get_snapshot('stat var hierarchy snapshot',
+                                    path,
+                                    current_app.config.get(
+                                        'SV_HIERARCHY_REFRESH_SEC', 3600),
+                                    load_file,
+                                    background=True).get()
@@ -0,0 +1,141 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Store of the stat var properties shown with charts (name, description and
+# footnote).
+#
+# It can be seeded from a local snapshot of popular stat vars, a JSON file
+# produced by tools/sv_metadata/build_snapshot.py:
+#
+#   {
+#     "version": "...",
+#     "svs": {
+#       "Count_Person": {"name": ["Total Population"], "description": [],
+#                        "footnote": []},
+#       ...
+#     }
+#   }
+#
+
+import json
+import logging
+import time
+from typing import Dict, List
+
+from flask import current_app
+from flask import g
+from flask import has_app_context
+
+from server.lib import fetch
+from server.lib.cache import cached_many
+
+# Properties fetched for every stat var.
+PROPS = ['name', 'description', 'footnote']
+
+# App config key of the snapshot entries.
+SEED_KEY = 'SV_METADATA_SEED'
+
+_CACHE_KEY_PREFIX = 'sv_metadata'
+
+# Property -> values of a stat var.
+Metadata = Dict[str, List[str]]
+
+
+def load_seed(path: str) -> Dict[str, Metadata]:
+  """Returns the stat var entries of a snapshot file, or {} without one."""
+  if not path:
+    return {}
+  start = time.time()
+  try:
+    with open(path, 'r') as fp:
+      snapshot = json.load(fp)
+  except Exception:
+    logging.exception('Failed to load stat var metadata snapshot %s', path)
+    return {}
+  svs = snapshot.get('svs', {})
+  logging.info('Loaded stat var metadata snapshot %s (%s stat vars) in %.2fs',
+               snapshot.get('version', ''), len(svs),
+               time.time() - start)
+  return svs
+
+
+class SvMetadataStore:
+  """
+  Holds the PROPS values of the stat vars used in a request. All the
+  properties of the stat vars that are missing are fetched together, in one
+  call, and each stat var is kept in the shared cache. Values fetched with
+  different page limits are kept apart.
+
+  Stat vars in the seed (the snapshot) are never fetched.
+  """
+
+  def __init__(self, seed: Dict[str, Metadata] | None = None):
+    self._seed = seed or {}
+    # max_pages -> stat var -> metadata
+    self._entries: Dict[int | None, Dict[str, Metadata]] = {}
+    # Number of mixer calls made, for debugging.
+    self.num_calls = 0
+
+  def get(self,
+          svs: List[str],
+          max_pages: int | None = 1) -> Dict[str, Metadata]:
+    """Returns the values of each property in PROPS for each stat var."""
+    entries = self._entries.setdefault(max_pages, {})
+    missing = []
+    for sv in dict.fromkeys(svs):
+      if not sv or sv in entries:
+        continue
+      if sv in self._seed:
+        entries[sv] = self._seed[sv]
+      else:
+        missing.append(sv)
+    if missing:
+      pages = 'all' if max_pages is None else max_pages
+      entries.update(
+          cached_many(f'{_CACHE_KEY_PREFIX}:{pages}', missing,
+                      lambda svs: self._fetch(svs, max_pages)))
+    return {sv: entries[sv] for sv in svs if sv}
+
+  def _fetch(self, svs: List[str],
+             max_pages: int | None) -> Dict[str, Metadata]:
+    self.num_calls += 1
+    resp = fetch.multiple_property_values(svs, PROPS, max_pages=max_pages)
+    return {
+        sv: {
+            prop: resp.get(sv, {}).get(prop, []) for prop in PROPS
+        } for sv in svs
+    }
+
+  def get_values(self,
+                 svs: List[str],
+                 prop: str,
+                 max_pages: int | None = 1) -> Dict[str, List[str]]:
+    """Returns the values of a property of each stat var, like
+    fetch.property_values."""
+    return {
+        sv: metadata.get(prop, [])
+        for sv, metadata in self.get(svs, max_pages).items()
+    }
+
+
+def get_sv_metadata_store() -> SvMetadataStore:
+  """
+  Returns the stat var metadata store of the current request (app context),
+  or a new one outside of a request.
+  """
+  if not has_app_context():
+    return SvMetadataStore()
+  if 'sv_metadata_store' not in g:
+    g.sv_metadata_store = SvMetadataStore(current_app.config.get(SEED_KEY))
+  return g.sv_metadata_store
@@ -0,0 +1,130 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Precomputed template context and per-request template render timing."""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List
+
+from flask import before_render_template
+from flask import Flask
+from flask import g
+from flask import has_request_context
+from flask import Response
+from flask import template_rendered
+
+from server.lib import tracing
+import server.lib.util as libutil
+
+# How often the menu files are checked for changes when reloading is enabled.
+_RELOAD_CHECK_SEC = 1
+
+
+class MenuContext:
+  """
+  The header and footer menus serialized for templates.
+
+  The menus only depend on the config, not on the locale or the request, so
+  they are read and serialized once. With reload set, the files are checked
+  for changes (at most once a second) and serialized again when they change,
+  for local development.
+  """
+
+  def __init__(self, header_path: str, footer_path: str, reload: bool = False):
+    self._paths = {'HEADER_MENU': header_path, 'FOOTER_MENU': footer_path}
+    self._reload = reload
+    self._lock = threading.Lock()
+    self._mtimes: Dict[str, float] = {}
+    self._last_check = 0
+    self._context: Dict[str, str] = {}
+    self._load()
+
+  def _get_mtimes(self) -> Dict[str, float]:
+    return {
+        key: os.path.getmtime(os.path.join(libutil.get_repo_root(), path))
+        for key, path in self._paths.items()
+    }
+
+  def _load(self):
+    self._mtimes = self._get_mtimes()
+    self._last_check = time.time()
+    self._context = {
+        key: json.dumps(libutil.get_json(path))
+        for key, path in self._paths.items()
+    }
+
+  def get(self) -> Dict[str, str]:
+    if self._reload and time.time() - self._last_check >= _RELOAD_CHECK_SEC:
+      with self._lock:
+        self._last_check = time.time()
+        try:
+          if self._get_mtimes() != self._mtimes:
+            self._load()
+            logging.info('Reloaded header and footer menus')
+        except Exception:
+          # Keep serving the last menus, eg. while a file is being written.
+          logging.exception('Failed to reload header and footer menus')
+    return self._context
+
+
+def _on_before_render(sender, template, context, **extra):
+  if has_request_context():
+    g.setdefault('render_starts', []).append(time.perf_counter())
+
+
+def _on_rendered(sender, template, context, **extra):
+  if not has_request_context() or not g.get('render_starts'):
+    return
+  duration_ms = (time.perf_counter() - g.render_starts.pop()) * 1000
+  g.setdefault('render_timings', []).append((template.name, duration_ms))
+  end_ns = time.time_ns()
+  tracing.record('render',
+                 end_ns - int(duration_ms * 1e6),
+                 end_ns,
+                 template=template.name)
+
+
+def get_render_timings() -> List[tuple[str, float]]:
+  """Returns (template name, milliseconds) of the templates rendered so far."""
+  if not has_request_context():
+    return []
+  return list(g.get('render_timings', []))
+
+
+def _add_server_timing(response: Response) -> Response:
+  timings = get_render_timings()
+  if not timings:
+    return response
+  metrics = [
+      f'render;desc="{name}";dur={duration_ms:.1f}'
+      for name, duration_ms in timings
+  ]
+  existing = response.headers.get('Server-Timing')
+  if existing:
+    metrics.insert(0, existing)
+  response.headers['Server-Timing'] = ', '.join(metrics)
+  return response
+
+
+def init_render_timing(app: Flask):
+  """
+  Records the time spent rendering each template of a request and reports it
+  in the Server-Timing response header.
+  """
+  before_render_template.connect(_on_before_render, app)
+  template_rendered.connect(_on_rendered, app)
+  app.after_request(_add_server_timing)
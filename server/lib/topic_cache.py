@@ -15,11 +15,12 @@
 # An in-memory cache for topics.
 #
 
+from array import array
 from dataclasses import dataclass
 import json
 import logging
 import os
-from typing import Dict, List, Self, Set
+from typing import Dict, FrozenSet, List, Self, Set, Tuple
 
 from server.lib.nl.common import utils
 from server.lib.nl.explore.params import DCNames
@@ -90,12 +91,108 @@ _EXTENDED_SVG_OVERRIDE_MAP = {
 }
 
 
+@dataclass(frozen=True)
+class TopicClosure:
+  # The SVs and SVPGs under a topic, in the order a depth-first walk of the
+  # topic members finds them. A var under several sub-topics is repeated.
+  vars: Tuple[str, ...]
+  # The topics walked, including the topic itself.
+  topics: FrozenSet[str]
+
+
+class TopicGraph:
+  """
+  The topic cache members compiled into flat arrays.
+
+  Every dcid in the cache is interned to an int id. The members of the node
+  with id i are members[offsets[i]:offsets[i + 1]], in the cache order (CSR
+  layout). Nodes that are not in the cache, eg. SVs, have no members.
+
+  The closures of all the topics are computed here, so that opening a topic
+  is a tuple slice and the graph is read-only once built.
+  """
+
+  def __init__(self, out_map: Dict[str, Node]):
+    self.dcids: List[str] = []
+    self.index: Dict[str, int] = {}
+    for dcid, node in out_map.items():
+      self._intern(dcid)
+      for m in node.vars:
+        self._intern(m)
+    self.is_node = [dcid in out_map for dcid in self.dcids]
+    self.is_topic = [utils.is_topic(dcid) for dcid in self.dcids]
+    self.offsets = array('I', [0])
+    self.members = array('I')
+    for dcid in self.dcids:
+      node = out_map.get(dcid)
+      if node:
+        self.members.extend(self.index[m] for m in node.vars)
+      self.offsets.append(len(self.members))
+    self._closures: Dict[int, TopicClosure | None] = {}
+    for i, is_topic in enumerate(self.is_topic):
+      if is_topic:
+        self._closure(i, set())
+
+  def _intern(self, dcid: str):
+    if dcid not in self.index:
+      self.index[dcid] = len(self.dcids)
+      self.dcids.append(dcid)
+
+  def __len__(self) -> int:
+    return len(self.dcids)
+
+  def get_members(self, dcid: str) -> List[str]:
+    i = self.index.get(dcid)
+    if i is None:
+      return []
+    return [
+        self.dcids[m] for m in self.members[self.offsets[i]:self.offsets[i + 1]]
+    ]
+
+  def closure(self, topic: str) -> TopicClosure | None:
+    """
+    Returns the SVs and SVPGs under the topic, recursing into sub-topics, or
+    None if the topic or a sub-topic is not in the cache, since the members of
+    those are only known to the KG.
+    """
+    i = self.index.get(topic)
+    if i is None:
+      return None
+    return self._closures.get(i)
+
+  def _closure(self, i: int, walking: Set[int]) -> TopicClosure | None:
+    if i in self._closures:
+      return self._closures[i]
+    if not self.is_node[i] or i in walking:
+      # Not in the cache, or a cycle.
+      return None
+    walking.add(i)
+    vars = []
+    topics = {self.dcids[i]}
+    result = None
+    for m in self.members[self.offsets[i]:self.offsets[i + 1]]:
+      if self.is_topic[m]:
+        sub = self._closure(m, walking)
+        if sub is None:
+          break
+        vars.extend(sub.vars)
+        topics.update(sub.topics)
+      else:
+        vars.append(self.dcids[m])
+    else:
+      result = TopicClosure(vars=tuple(vars), topics=frozenset(topics))
+    walking.remove(i)
+    self._closures[i] = result
+    return result
+
+
 class TopicCache:
 
   def __init__(self, out_map: Dict[str, Node],
                in_map: Dict[str, Dict[str, Set[str]]]):
     self.out_map = out_map
     self.in_map = in_map
+    self.graph = TopicGraph(out_map)
 
   def merge(self, other: Self):
     logging.info("Merging topic caches: out maps (%s, %s), in maps (%s, %s).",
@@ -103,6 +200,7 @@ class TopicCache:
                  len(other.in_map))
     self.out_map.update(other.out_map)
     self.in_map.update(other.in_map)
+    self.graph = TopicGraph(self.out_map)
     logging.info("After merging topic caches: out map (%s), in map (%s).",
                  len(self.out_map), len(self.in_map))
 
@@ -0,0 +1,306 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Per-request traces of the calls made while serving a request.
+
+Spans are recorded for the mixer and NL server calls, cache gets and sets,
+LLM, Maps and translation calls, and template renders. The spans of a request
+are children of a request span, and are:
+- summarized by kind in the Server-Timing response header, eg.
+  'mixer;dur=412.0;desc="7 calls, 1.2 MB"', and
+- exported with OpenTelemetry to an OTLP/HTTP collector and/or appended to a
+  local file as OTLP JSON lines.
+
+Usage:
+
+  with tracing.span('mixer', url=path) as span:
+    resp = requests.post(...)
+    span.set(response_bytes=len(resp.content))
+
+The trace of a request is held in a context variable, so spans recorded in
+the tasks of server/lib/executors.py belong to the request that started them.
+When tracing is disabled or the request is not sampled, span() only looks up
+the context variable.
+"""
+
+import base64
+import contextlib
+import contextvars
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Sequence
+
+from flask import Flask
+from flask import request
+from flask import Response
+from google.protobuf import json_format
+from opentelemetry import propagate
+from opentelemetry import trace
+from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+from opentelemetry.exporter.otlp.proto.http.trace_exporter import \
+    OTLPSpanExporter
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace.export import SpanExporter
+from opentelemetry.sdk.trace.export import SpanExportResult
+from opentelemetry.sdk.trace.sampling import ParentBased
+from opentelemetry.sdk.trace.sampling import TraceIdRatioBased
+
+_provider: TracerProvider | None = None
+_tracer: trace.Tracer | None = None
+
+_current: contextvars.ContextVar[
+    'RequestTrace | None'] = contextvars.ContextVar('trace', default=None)
+
+
+class Span:
+  """A span being recorded, whose attributes can be set until it ends."""
+
+  __slots__ = ('attributes',)
+
+  def __init__(self, attributes: Dict[str, Any]):
+    self.attributes = attributes
+
+  def set(self, **attributes):
+    self.attributes.update(attributes)
+
+
+class _NoopSpan:
+
+  def set(self, **attributes):
+    pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _KindTotals:
+  """Totals of the spans of one kind in a request, for Server-Timing."""
+
+  __slots__ = ('ms', 'calls', 'lookups', 'hits', 'bytes')
+
+  def __init__(self):
+    self.ms = 0.0
+    self.calls = 0
+    self.lookups = 0
+    self.hits = 0
+    self.bytes = 0
+
+  def add(self, duration_ms: float, attributes: Dict[str, Any]):
+    self.ms += duration_ms
+    self.calls += 1
+    if 'hit' in attributes:
+      self.lookups += 1
+      self.hits += bool(attributes['hit'])
+    elif 'hits' in attributes:
+      self.lookups += attributes.get('keys', 0)
+      self.hits += attributes['hits']
+    self.bytes += attributes.get('response_bytes', 0)
+
+  def desc(self) -> str:
+    parts = [f'{self.calls} calls']
+    if self.lookups:
+      parts.append(f'{self.hits}/{self.lookups} hits')
+    if self.bytes:
+      parts.append(_format_bytes(self.bytes))
+    return ', '.join(parts)
+
+
+def _format_bytes(num_bytes: int) -> str:
+  if num_bytes >= 1 << 20:
+    return f'{num_bytes / (1 << 20):.1f} MB'
+  if num_bytes >= 1 << 10:
+    return f'{num_bytes / (1 << 10):.1f} KB'
+  return f'{num_bytes} B'
+
+
+class RequestTrace:
+  """The spans of a request."""
+
+  def __init__(self, tracer: trace.Tracer, root: trace.Span):
+    self._tracer = tracer
+    self.root = root
+    self._context = trace.set_span_in_context(root)
+    self._start = time.perf_counter()
+    self._lock = threading.Lock()
+    self._totals: Dict[str, _KindTotals] = {}
+
+  def add(self, name: str, start_ns: int, end_ns: int, attributes: Dict[str,
+                                                                        Any]):
+    """Records a span that ran from start_ns to end_ns (time.time_ns())."""
+    otel_span = self._tracer.start_span(
+        name,
+        context=self._context,
+        start_time=start_ns,
+        attributes={
+            k: v for k, v in attributes.items() if v is not None
+        })
+    otel_span.end(end_time=end_ns)
+    # Kinds are the first part of the names, eg. cache for cache.get.
+    kind = name.split('.', 1)[0]
+    with self._lock:
+      self._totals.setdefault(kind, _KindTotals()).add(
+          (end_ns - start_ns) / 1e6, attributes)
+
+  def server_timing(self) -> List[str]:
+    """Returns the Server-Timing metrics of the spans so far."""
+    total_ms = (time.perf_counter() - self._start) * 1000
+    metrics = [f'total;dur={total_ms:.1f}']
+    with self._lock:
+      for kind, totals in sorted(self._totals.items()):
+        metrics.append(f'{kind};dur={totals.ms:.1f};desc="{totals.desc()}"')
+    return metrics
+
+
+def current() -> RequestTrace | None:
+  """Returns the trace of the current request, if it is traced."""
+  return _current.get()
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes) -> Iterator[Span | _NoopSpan]:
+  """Records a span of the current request around the block."""
+  request_trace = _current.get()
+  if request_trace is None:
+    yield _NOOP_SPAN
+    return
+  recorded = Span(attributes)
+  start_ns = time.time_ns()
+  try:
+    yield recorded
+  except Exception as e:
+    recorded.attributes['error'] = type(e).__name__
+    raise
+  finally:
+    request_trace.add(name, start_ns, time.time_ns(), recorded.attributes)
+
+
+@contextlib.contextmanager
+def suppressed() -> Iterator[None]:
+  """Records no spans in the block, eg. for the calls made by a traced one."""
+  token = _current.set(None)
+  try:
+    yield
+  finally:
+    _current.reset(token)
+
+
+def record(name: str, start_ns: int, end_ns: int, **attributes):
+  """Records a span of the current request that has already ended."""
+  request_trace = _current.get()
+  if request_trace is not None:
+    request_trace.add(name, start_ns, end_ns, attributes)
+
+
+class OtlpJsonFileExporter(SpanExporter):
+  """
+  Appends spans to a file as OTLP JSON, one export request per line, the
+  format read by the OpenTelemetry collector otlpjsonfile receiver.
+  """
+
+  def __init__(self, path: str):
+    self._path = path
+    self._lock = threading.Lock()
+
+  def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+    data = json_format.MessageToDict(encode_spans(spans),
+                                     use_integers_for_enums=True)
+    # OTLP JSON has hex trace and span ids, where protobuf JSON has base64.
+    for resource_spans in data.get('resourceSpans', []):
+      for scope_spans in resource_spans.get('scopeSpans', []):
+        for span_data in scope_spans.get('spans', []):
+          for key in ('traceId', 'spanId', 'parentSpanId'):
+            if span_data.get(key):
+              span_data[key] = base64.b64decode(span_data[key]).hex()
+    try:
+      with self._lock, open(self._path, 'a') as f:
+        f.write(json.dumps(data, separators=(',', ':')) + '\n')
+    except OSError:
+      logging.exception('Failed to write traces to %s', self._path)
+      return SpanExportResult.FAILURE
+    return SpanExportResult.SUCCESS
+
+  def shutdown(self):
+    pass
+
+
+def _start_request():
+  parent = propagate.extract(request.headers)
+  route = request.url_rule.rule if request.url_rule else request.path
+  root = _tracer.start_span(f'{request.method} {route}',
+                            context=parent,
+                            kind=trace.SpanKind.SERVER,
+                            attributes={
+                                'http.request.method': request.method,
+                                'http.route': route,
+                                'url.path': request.path,
+                            })
+  if not root.is_recording():
+    # Not sampled.
+    return
+  _current.set(RequestTrace(_tracer, root))
+
+
+def _end_request(response: Response) -> Response:
+  request_trace = _current.get()
+  if request_trace is None:
+    return response
+  request_trace.root.set_attribute('http.response.status_code',
+                                   response.status_code)
+  metrics = request_trace.server_timing()
+  existing = response.headers.get('Server-Timing')
+  if existing:
+    metrics.insert(0, existing)
+  response.headers['Server-Timing'] = ', '.join(metrics)
+  return response
+
+
+def _teardown_request(e):
+  request_trace = _current.get()
+  if request_trace is None:
+    return
+  if e is not None:
+    request_trace.root.set_status(trace.Status(trace.StatusCode.ERROR, str(e)))
+  request_trace.root.end()
+  _current.set(None)
+
+
+def init(app: Flask, service_name: str = 'website'):
+  """Traces the requests of the app, as configured in the app config."""
+  global _provider, _tracer
+  _provider = TracerProvider(
+      resource=Resource.create({'service.name': service_name}),
+      sampler=ParentBased(TraceIdRatioBased(app.config['TRACE_SAMPLE_RATE'])))
+  if app.config['TRACE_EXPORT_ENDPOINT']:
+    _provider.add_span_processor(
+        BatchSpanProcessor(
+            OTLPSpanExporter(endpoint=app.config['TRACE_EXPORT_ENDPOINT'])))
+  if app.config['TRACE_EXPORT_PATH']:
+    _provider.add_span_processor(
+        BatchSpanProcessor(OtlpJsonFileExporter(
+            app.config['TRACE_EXPORT_PATH'])))
+  _tracer = _provider.get_tracer(__name__)
+  app.before_request(_start_request)
+  app.after_request(_end_request)
+  app.teardown_request(_teardown_request)
+
+
+def flush():
+  """Exports the spans that have ended."""
+  if _provider:
+    _provider.force_flush()
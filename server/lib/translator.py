@@ -12,18 +12,23 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import hashlib
 import re
 
 from flask import current_app
 from langdetect import detect as lang_detect
 import requests
 
+from server.lib import tracing
+from server.lib.cache import cached_many
 from server.lib.nl.common.counters import Counters
 from shared.lib.constants import EN_LANG_CODE
 
 _API_URL = "https://translation.googleapis.com/language/translate/v2"
 _API_HEADER = {"content-type": "application/json"}
 
+_CACHE_KEY_PREFIX = "translation"
+
 
 # Detects the query language and translates non-English queries to English.
 # Returns a tuple of detected query language and the translated query.
@@ -33,7 +38,7 @@ def detect_lang_and_translate(query, counters: Counters) -> (str, str):
     if lang.startswith(EN_LANG_CODE):
       return lang, query
 
-    translations = _translate([query], lang, EN_LANG_CODE)
+    translations = _translate_with_cache([query], lang, EN_LANG_CODE, counters)
 
     if translations:
       counters.info(
@@ -99,9 +104,10 @@ def translate_page_config(page_config: dict, i18n_lang: str,
       tokenizers.append(tokenizer)
       strings_for_translation.append(tokenizer.string_for_translation)
 
-    translated_strings = _translate(queries=strings_for_translation,
-                                    source_lang=EN_LANG_CODE,
-                                    target_lang=i18n_lang)
+    translated_strings = _translate_with_cache(queries=strings_for_translation,
+                                               source_lang=EN_LANG_CODE,
+                                               target_lang=i18n_lang,
+                                               counters=counters)
 
     translated_strings_with_tokens_reinserted = []
     for translated_string, tokenizer in zip(translated_strings, tokenizers):
@@ -165,6 +171,43 @@ def _get_strings_for_translation(page_config: dict) -> list[str]:
   return list(strings.keys())
 
 
+def _query_hash(query: str) -> str:
+  # Hashed, as page config strings can be long.
+  return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+# Translates the queries, looking each one up in the shared cache first.
+# Only the queries that are not cached are sent, in a single API call.
+# The queries are the strings sent for translation, so the tokens replaced by
+# TranslationStringTokenizer are reinserted after the lookup as before.
+# Returns an empty list if the API did not return a translation per query.
+def _translate_with_cache(queries: list[str], source_lang: str,
+                          target_lang: str, counters: Counters) -> list[str]:
+  hash2query = {_query_hash(q): q for q in queries}
+  missing = []
+
+  def fetch(hashes: list[str]) -> dict[str, str]:
+    missing.extend(hash2query[h] for h in hashes)
+    fetched = _translate(missing, source_lang, target_lang)
+    if len(fetched) != len(missing):
+      counters.err("translation_count_mismatch", {
+          "num_queries": len(missing),
+          "num_translations": len(fetched)
+      })
+      return {}
+    return dict(zip(hashes, fetched))
+
+  translations = cached_many(f"{_CACHE_KEY_PREFIX}:{source_lang}:{target_lang}",
+                             hash2query, fetch)
+  counters.info("translation_cache", {
+      "hits": len(hash2query) - len(missing),
+      "misses": len(missing)
+  })
+  if len(translations) != len(hash2query):
+    return []
+  return [translations[_query_hash(q)] for q in queries]
+
+
 def _translate(queries: list[str], source_lang: str,
                target_lang: str) -> list[str]:
   # The name "LLM_API_KEY" is a misnomer.
@@ -179,9 +222,12 @@ def _translate(queries: list[str], source_lang: str,
       "source": source_lang,
       "target": target_lang,
   }
-  response = requests.post(f"{_API_URL}?key={api_key}",
-                           json=request,
-                           headers=_API_HEADER).json()
+  with tracing.span('translate', queries=len(queries)) as span:
+    response = requests.post(f"{_API_URL}?key={api_key}",
+                             json=request,
+                             headers=_API_HEADER)
+    span.set(status=response.status_code, response_bytes=len(response.content))
+  response = response.json()
   translations = []
   for translation in response.get("data", {}).get("translations", []):
     translations.append(translation.get("translatedText", ""))
@@ -17,10 +17,8 @@ import datetime
 from functools import wraps
 import gzip
 import hashlib
-from itertools import groupby
 import json
 import logging
-from operator import itemgetter
 import os
 import re
 import time
@@ -35,6 +33,7 @@ from flask import request
 from google.cloud import storage
 from google.cloud.exceptions import NotFound
 from google.protobuf import text_format
+import numpy as np
 
 from server.config import subject_page_pb2
 import server.lib.fetch as fetch
@@ -293,6 +292,19 @@ def get_chart_config():
   return chart_config
 
 
+# Returns the set of stat vars in the chart config that places are ranked by.
+def get_ranked_stat_vars(chart_config):
+  ranked_statvars = set()
+  for chart in chart_config:
+    ranked_statvars = ranked_statvars.union(
+        chart['statsVars']) if 'statsVars' in chart else ranked_statvars
+    ranked_statvars = ranked_statvars.union(
+        chart['variables']) if 'variables' in chart else ranked_statvars
+    if 'relatedChart' in chart and 'denominator' in chart['relatedChart']:
+      ranked_statvars.add(chart['relatedChart']['denominator'])
+  return ranked_statvars
+
+
 # Get the SubjectPageConfig of the textproto at the given filepath
 def get_subject_page_config(filepath):
   with open(filepath, 'r') as f:
@@ -629,6 +641,146 @@ def gzip_compress_response(raw_content, is_json):
   return response
 
 
+def _intern(values: List[str]) -> tuple[np.ndarray, np.ndarray]:
+  """Returns the sorted unique values and the index of each value in them."""
+  # Interning with a dict and sorting only the unique values is much faster
+  # than np.unique on an array of strings.
+  index = {}
+  codes = np.fromiter((index.setdefault(v, len(index)) for v in values),
+                      dtype=np.int64,
+                      count=len(values))
+  uniques = np.array(list(index), dtype=str)
+  order = np.argsort(uniques)
+  rank = np.empty(len(order), dtype=np.int64)
+  rank[order] = np.arange(len(order))
+  return uniques[order], rank[codes]
+
+
+class ObsDateColumns:
+  """
+  Columnar view of observations for the observation date coverage analysis.
+
+  Each observation is a row of int codes into the sorted unique variables,
+  facets and dates, so codes order the same way as the strings they stand for
+  and grouping by (variable, date, facet) is a single sort of a combined key.
+  Counts are of observations, the same as the flattened list of dictionaries,
+  so entities themselves are not kept.
+  """
+
+  def __init__(self, variables: np.ndarray, variable_codes: np.ndarray,
+               facets: np.ndarray, facet_codes: np.ndarray, dates: np.ndarray,
+               date_codes: np.ndarray):
+    self.variables = variables
+    self.variable_codes = variable_codes
+    self.facets = facets
+    self.facet_codes = facet_codes
+    self.dates = dates
+    self.date_codes = date_codes
+
+  @classmethod
+  def from_obs_series_response(cls, obs_series_response) -> 'ObsDateColumns':
+    # Variable and facet are the same for all the observations of a series, so
+    # they are interned once per series and repeated.
+    series_variables = []
+    series_facets = []
+    series_lengths = []
+    dates = []
+    for variable, variable_entry in obs_series_response["byVariable"].items():
+      for variable_entity_entry in variable_entry["byEntity"].values():
+        for ordered_facet in variable_entity_entry.get('orderedFacets', []):
+          observations = ordered_facet['observations']
+          series_variables.append(variable)
+          series_facets.append(ordered_facet['facetId'])
+          series_lengths.append(len(observations))
+          dates.extend(observation['date'] for observation in observations)
+    lengths = np.asarray(series_lengths, dtype=np.int64)
+    variables, variable_codes = _intern(series_variables)
+    facets, facet_codes = _intern(series_facets)
+    return cls(variables, np.repeat(variable_codes, lengths), facets,
+               np.repeat(facet_codes, lengths), *_intern(dates))
+
+  @classmethod
+  def from_flattened_observations(
+      cls, flattened_observations: List[dict]) -> 'ObsDateColumns':
+    return cls(*_intern([o['variable'] for o in flattened_observations]),
+               *_intern([o['facet'] for o in flattened_observations]),
+               *_intern([o['date'] for o in flattened_observations]))
+
+  def filter_facets(self, facet_ids: List[str]) -> 'ObsDateColumns':
+    """Returns the observations from the given facets."""
+    keep = np.isin(self.facets, list(facet_ids))[self.facet_codes]
+    return ObsDateColumns(self.variables, self.variable_codes[keep],
+                          self.facets, self.facet_codes[keep], self.dates,
+                          self.date_codes[keep])
+
+  def _count_by_variable_date_facet(
+      self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns (variable codes, date codes, facet codes, counts) of the groups,
+    sorted by variable, then date, then facet.
+    """
+    num_dates = len(self.dates)
+    num_facets = len(self.facets)
+    keys = (self.variable_codes * num_dates +
+            self.date_codes) * num_facets + self.facet_codes
+    group_keys, counts = np.unique(keys, return_counts=True)
+    variable_date_keys, facet_codes = np.divmod(group_keys, num_facets)
+    variable_codes, date_codes = np.divmod(variable_date_keys, num_dates)
+    return variable_codes, date_codes, facet_codes, counts
+
+  def dates_by_variable(self) -> List[dict]:
+    """
+    Same result as flattened_observations_to_dates_by_variable on the
+    flattened observations.
+    """
+    if not self.date_codes.size:
+      return []
+    variables = self.variables.tolist()
+    dates = self.dates.tolist()
+    facets = self.facets.tolist()
+    dates_by_variable = []
+    last_variable_code = last_date_code = None
+    for variable_code, date_code, facet_code, count in zip(
+        *(a.tolist() for a in self._count_by_variable_date_facet())):
+      if variable_code != last_variable_code:
+        dates_by_variable_item = {
+            'variable': variables[variable_code],
+            'observationDates': []
+        }
+        dates_by_variable.append(dates_by_variable_item)
+        last_variable_code = variable_code
+        last_date_code = None
+      if date_code != last_date_code:
+        observation_dates_item = {'date': dates[date_code], 'entityCount': []}
+        dates_by_variable_item['observationDates'].append(
+            observation_dates_item)
+        last_date_code = date_code
+      observation_dates_item['entityCount'].append({
+          'count': count,
+          'facet': facets[facet_code]
+      })
+    return dates_by_variable
+
+  def get_highest_coverage_date(self, max_dates_to_check: int,
+                                max_years_to_check: int) -> str | None:
+    """
+    Same result as _get_highest_coverage_date on dates_by_variable(), without
+    building the dictionaries.
+    """
+    if not self.date_codes.size:
+      return None
+    variable_codes, date_codes, _, counts = self._count_by_variable_date_facet()
+    # Groups are sorted, so the facets of a (variable, date) are contiguous.
+    variable_date_keys = variable_codes * len(self.dates) + date_codes
+    starts = np.flatnonzero(
+        np.r_[True, variable_date_keys[1:] != variable_date_keys[:-1]])
+    return _get_highest_coverage_date_from_counts(
+        variable_codes[starts],
+        self.variables.tolist(), self.dates[date_codes[starts]],
+        np.maximum.reduceat(counts,
+                            starts), max_dates_to_check, max_years_to_check)
+
+
 def flatten_obs_series_response(obs_series_response):
   """
   Flatten the observation series response into a list of dictionaries.
@@ -722,33 +874,8 @@ def flattened_observations_to_dates_by_variable(
       }
   ]
   """
-  # Final result is grouped by variable, then date, then facet, then count.
-  dates_by_variable = []
-  flattened_observations.sort(key=itemgetter('variable'))
-  # Group by variable
-  for variable_key, observations_for_variable_group in groupby(
-      flattened_observations, key=itemgetter('variable')):
-    dates_by_variable_item = {'variable': variable_key, 'observationDates': []}
-    dates_by_variable.append(dates_by_variable_item)
-    observations_for_variable = list(observations_for_variable_group)
-    observations_for_variable.sort(key=itemgetter('date'))
-    # Group by date
-    for date_key, observations_for_date_group in groupby(
-        observations_for_variable, key=itemgetter('date')):
-      observation_dates_item = {'date': date_key, 'entityCount': []}
-      dates_by_variable_item['observationDates'].append(observation_dates_item)
-      observations_for_date = list(observations_for_date_group)
-      observations_for_date.sort(key=itemgetter('facet'))
-      # Group by facet
-      for facet_key, observations_for_facet_group in groupby(
-          observations_for_date, key=itemgetter('facet')):
-        # Count all records iwth this variable, date, and facet
-        entity_count_item = {
-            'count': len(list(observations_for_facet_group)),
-            'facet': facet_key
-        }
-        observation_dates_item['entityCount'].append(entity_count_item)
-  return dates_by_variable
+  return ObsDateColumns.from_flattened_observations(
+      flattened_observations).dates_by_variable()
 
 
 def get_series_dates_from_entities(entities: List[str], variables: List[str]):
@@ -843,12 +970,10 @@ def get_series_dates_from_entities(entities: List[str], variables: List[str]):
   }
   """
   obs_series_response = dc.obs_series(entities=entities, variables=variables)
-  flattened_observations = flatten_obs_series_response(obs_series_response)
-  dates_by_variable = flattened_observations_to_dates_by_variable(
-      flattened_observations)
+  columns = ObsDateColumns.from_obs_series_response(obs_series_response)
 
   result = {
-      'datesByVariable': dates_by_variable,
+      'datesByVariable': columns.dates_by_variable(),
       'facets': obs_series_response.get('facets', {})
   }
   return result
@@ -873,71 +998,94 @@ def _get_highest_coverage_date(observation_dates_by_variable,
     max_years_to_check: Only consider entity counts going back this number of
       years
   """
-  recent_date_counts_dict = {}
+  group_variables = []
+  group_ids = []
+  dates = []
+  counts = []
   for observation_entity_counts_by_date in observation_dates_by_variable:
-    recent_date_counts = _get_recent_date_counts(
-        observation_entity_counts_by_date, max_dates_to_check,
-        max_years_to_check)
-    for date_count in recent_date_counts:
-      date_count_date = date_count["date"]
-      if not date_count_date in recent_date_counts_dict:
-        recent_date_counts_dict[date_count_date] = 0
-      recent_date_counts_dict[date_count_date] += date_count["count"]
-
-  highest_coverage_date = None
-  highest_count = 0
-  for coverage_date, count in recent_date_counts_dict.items():
-    if count > highest_count:
-      highest_count = count
-      highest_coverage_date = coverage_date
-  return highest_coverage_date
-
-
-def _get_recent_date_counts(observation_entity_counts_by_date,
-                            max_dates_to_check: int,
-                            max_years_to_check: int) -> List[Dict]:
-  # Get observation dates in descending order
-  descending_observation_dates = [
-      observation_date for observation_date in list(
-          reversed(observation_entity_counts_by_date.get(
-              'observationDates', [])))
-  ]
+    group_id = len(group_variables)
+    group_variables.append(observation_entity_counts_by_date['variable'])
+    for observation_date in observation_entity_counts_by_date.get(
+        'observationDates', []):
+      group_ids.append(group_id)
+      dates.append(observation_date['date'])
+      # The greatest entity (observation) count among the facets of the date
+      counts.append(
+          max((entity_count.get('count', 0)
+               for entity_count in observation_date.get('entityCount', [])),
+              default=0))
+  return _get_highest_coverage_date_from_counts(
+      np.asarray(group_ids, dtype=np.int64), group_variables,
+      np.asarray(dates, dtype=str), np.asarray(counts, dtype=np.int64),
+      max_dates_to_check, max_years_to_check)
+
+
+def _get_highest_coverage_date_from_counts(
+    group_ids: np.ndarray, group_variables: List[str], dates: np.ndarray,
+    counts: np.ndarray, max_dates_to_check: int,
+    max_years_to_check: int) -> str | None:
+  """
+  Array implementation of the _get_highest_coverage_date heuristic.
+
+  Args:
+    group_ids: For each row, the index of its variable in group_variables. The
+      rows of a variable are contiguous and in the order of its observation
+      dates.
+    group_variables: The variable of each group.
+    dates: For each row, the observation date.
+    counts: For each row, the greatest entity count among the facets.
+    max_dates_to_check: Only consider entity counts going back this number of
+      observation groups
+    max_years_to_check: Only consider entity counts going back this number of
+      years
+  """
   # Exclude erroneous data for particular variables with dates in the future
   # TODO: Remove this check once data is corrected in b/327667797
-  if observation_entity_counts_by_date[
-      'variable'] in FILTER_FUTURE_OBSERVATIONS_FROM_VARIABLES:
-    todays_date = str(datetime.date.today())
-    descending_observation_dates = [
-        observation_date for observation_date in descending_observation_dates
-        if observation_date['date'] < todays_date
-    ]
-  if len(descending_observation_dates) == 0:
-    return []
+  filtered_groups = np.array([
+      variable in FILTER_FUTURE_OBSERVATIONS_FROM_VARIABLES
+      for variable in group_variables
+  ],
+                             dtype=bool)
+  if group_ids.size:
+    keep = ~filtered_groups[group_ids] | (dates < str(datetime.date.today()))
+    group_ids, dates, counts = group_ids[keep], dates[keep], counts[keep]
+  if not group_ids.size:
+    return None
+
+  # Position of each row when the dates of its variable are in descending
+  # order.
+  num_groups = len(group_variables)
+  group_sizes = np.bincount(group_ids, minlength=num_groups)
+  group_ends = np.cumsum(group_sizes)
+  descending_rank = group_ends[group_ids] - 1 - np.arange(group_ids.size)
+
   # Heuristic to fetch the "max_dates_to_check" most recent
   # observation dates or observation dates going back
   # "max_years_to_check" years, whichever is greater
   cutoff_year = str(datetime.date.today().year - max_years_to_check)
-  latest_observation_dates_from_year = [
-      o for o in descending_observation_dates if o['date'] > cutoff_year
-  ]
-  obs_dates_cutoff = max(len(latest_observation_dates_from_year),
-                         max_dates_to_check)
-  observation_dates = descending_observation_dates[:obs_dates_cutoff]
-
-  # finds the greatest entity (observation) count among the facets in the
-  # given list of observation dates
-  date_counts = []
-  for obs in observation_dates:
-    entity_counts = obs.get('entityCount', [])
-
-    count = 0
-    if entity_counts:
-      count = max(entity_counts,
-                  key=lambda item: item.get('count', 0)).get('count', 0)
-
-    date_counts.append({'date': obs.get('date'), 'count': count})
-
-  return date_counts
+  num_recent = np.bincount(group_ids[dates > cutoff_year], minlength=num_groups)
+  obs_dates_cutoff = np.maximum(num_recent, max_dates_to_check)
+  in_window = descending_rank < obs_dates_cutoff[group_ids]
+  group_ids = group_ids[in_window]
+  descending_rank = descending_rank[in_window]
+  dates = dates[in_window]
+  counts = counts[in_window]
+  if not group_ids.size:
+    return None
+
+  # Sum the counts of each date. Ties go to the date seen first when reading
+  # the variables in order, each from its most recent date.
+  order = np.lexsort((descending_rank, group_ids))
+  coverage_dates, first_seen, date_codes = np.unique(dates[order],
+                                                     return_index=True,
+                                                     return_inverse=True)
+  date_counts = np.zeros(len(coverage_dates), dtype=np.int64)
+  np.add.at(date_counts, date_codes, counts[order])
+  highest_count = date_counts.max()
+  if highest_count <= 0:
+    return None
+  candidates = np.flatnonzero(date_counts == highest_count)
+  return str(coverage_dates[candidates[np.argmin(first_seen[candidates])]])
 
 
 def _filter_series_dates_by_facet(series_dates_response: Dict,
@@ -1026,19 +1174,24 @@ def fetch_highest_coverage(variables: List[str],
   MAX_DATES_TO_CHECK = 5
   MAX_YEARS_TO_CHECK = 5
   if entities is not None:
-    series_dates_response = get_series_dates_from_entities(entities, variables)
+    # Coverage is computed directly on the columns of the series response.
+    columns = ObsDateColumns.from_obs_series_response(
+        dc.obs_series(entities=entities, variables=variables))
+    if facet_ids:
+      columns = columns.filter_facets(facet_ids)
+    highest_coverage_date = columns.get_highest_coverage_date(
+        max_dates_to_check=MAX_DATES_TO_CHECK,
+        max_years_to_check=MAX_YEARS_TO_CHECK)
   else:
     series_dates_response = dc.get_series_dates(parent_entity, child_type,
                                                 variables)
-  if facet_ids:
-    series_dates_response = _filter_series_dates_by_facet(
-        series_dates_response, facet_ids)
-
-  observation_dates_by_variable = series_dates_response['datesByVariable']
-  highest_coverage_date = _get_highest_coverage_date(
-      observation_dates_by_variable,
-      max_dates_to_check=MAX_DATES_TO_CHECK,
-      max_years_to_check=MAX_YEARS_TO_CHECK)
+    if facet_ids:
+      series_dates_response = _filter_series_dates_by_facet(
+          series_dates_response, facet_ids)
+    highest_coverage_date = _get_highest_coverage_date(
+        series_dates_response['datesByVariable'],
+        max_dates_to_check=MAX_DATES_TO_CHECK,
+        max_years_to_check=MAX_YEARS_TO_CHECK)
 
   # If no highest coverage date is found, return an empty response
   if not highest_coverage_date:
@@ -1186,4 +1339,4 @@ def resolve_flask_app(app=None):
   """
   if app is None and has_app_context():
     app = current_app
-  return app
\ No newline at end of file
+  return app
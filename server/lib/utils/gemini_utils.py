@@ -18,6 +18,8 @@ from typing import Optional, Union
 from google import genai
 from pydantic import BaseModel
 
+from server.lib import tracing
+
 
 def get_gemini_config(schema: Optional[BaseModel] = None) -> dict:
   config = {
@@ -50,10 +52,11 @@ def call_gemini(
   gemini = genai.Client(api_key=api_key)
 
   try:
-    gemini_response = gemini.models.generate_content(
-        model=gemini_model,
-        contents=formatted_prompt,
-        config=generate_content_config)
+    with tracing.span('llm', model=gemini_model):
+      gemini_response = gemini.models.generate_content(
+          model=gemini_model,
+          contents=formatted_prompt,
+          config=generate_content_config)
     if schema and gemini_response.parsed:
       return gemini_response.parsed
     elif gemini_response.text:
@@ -12,7 +12,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import asyncio
 import json
 import time
 from typing import Dict, List
@@ -422,11 +421,10 @@ def prepare_response_common(data_dict: Dict,
   if client:
     data_dict['client'] = client
   if (current_app.config['LOG_QUERY'] and (not test or test == _SANITY_TEST)):
-    # Asynchronously log as bigtable write takes O(100ms)
-    loop = asyncio.new_event_loop()
+    # Logged by a background writer as bigtable write takes O(100ms)
     session_info = futils.get_session_info(data_dict['context'], has_data)
     data_dict['session'] = session_info
-    loop.run_until_complete(bt.write_row(session_info, data_dict, dbg_counters))
+    bt.write_row(session_info, data_dict)
 
   return data_dict
 
@@ -490,11 +488,10 @@ def abort(
     _set_blocked(data_dict)
 
   if (current_app.config['LOG_QUERY'] and (not test or test == _SANITY_TEST)):
-    # Asynchronously log as bigtable write takes O(100ms)
-    loop = asyncio.new_event_loop()
+    # Logged by a background writer as bigtable write takes O(100ms)
     session_info = futils.get_session_info(context_history, False)
     data_dict['session'] = session_info
-    loop.run_until_complete(bt.write_row(session_info, data_dict, debug_logs))
+    bt.write_row(session_info, data_dict)
 
   return data_dict
 
@@ -22,6 +22,7 @@ from flask import g
 from flask import jsonify
 from flask import request
 
+from server.lib import executors
 from server.lib.cache import cache
 from server.lib.cache import cache_and_log_mixer_usage
 from server.lib.util import error_response
@@ -65,13 +66,14 @@ async def place_charts(place_dcid: str):
     highlight, and the current place type to highlight.
     Returns a Tuple with the Place override, the child place type & place type.
     """
-    parent_place_override_task = asyncio.to_thread(
-        place_utils.get_place_override,
+    parent_place_override_task = executors.run(
+        'place', place_utils.get_place_override,
         place_utils.get_parent_places(place_dcid), g.locale)
-    child_place_type_to_highlight_task = asyncio.to_thread(
-        place_utils.get_child_place_type_to_highlight, place)
-    place_type_task = asyncio.to_thread(place_utils.place_type_to_highlight,
-                                        place.types)
+    child_place_type_to_highlight_task = executors.run(
+        'place', place_utils.get_child_place_type_to_highlight, place)
+    place_type_task = executors.run('place',
+                                    place_utils.place_type_to_highlight,
+                                    place.types)
 
     # return place, parent_place_override_task, child_place_type_to_highlight_task, place_type_task
     return await asyncio.gather(parent_place_override_task,
@@ -89,7 +91,8 @@ async def place_charts(place_dcid: str):
   full_chart_config = place_utils.read_chart_configs()
 
   # Blocking call to fetch the current place info
-  place = await asyncio.to_thread(place_utils.fetch_place, place_dcid, g.locale)
+  place = await executors.run('place', place_utils.fetch_place, place_dcid,
+                              g.locale)
 
   parent_place_override, child_place_type_to_highlight, place_type = await fetch_place_types(
       place)
@@ -97,7 +100,8 @@ async def place_charts(place_dcid: str):
   parent_place_dcid = parent_place_override.dcid if parent_place_override else None
 
   # Filter out place page charts that don't have any data for the current place_dcid
-  chart_config_existing_data = await asyncio.to_thread(
+  chart_config_existing_data = await executors.run(
+      'place',
       place_utils.filter_chart_config_for_data_existence,
       chart_config=full_chart_config,
       place_dcid=place_dcid,
@@ -149,8 +153,8 @@ async def related_places(place_dcid: str):
   place = place_utils.fetch_place(place_dcid, g.locale)
 
   # Fetch the child place types, find type to highlight.
-  ordered_child_place_types, child_places_by_type = await asyncio.to_thread(
-      place_utils.get_child_places_by_type, place)
+  ordered_child_place_types, child_places_by_type = await executors.run(
+      'place_related', place_utils.get_child_places_by_type, place)
   primary_child_place_type = ordered_child_place_types[
       0] if ordered_child_place_types else None
 
@@ -160,14 +164,18 @@ async def related_places(place_dcid: str):
      for nearby places, similar places, parent places and peer places within parent.
      Returns lists of DCIDs or Places for each type of related places."""
 
-    nearby_task = asyncio.to_thread(place_utils.fetch_nearby_place_dcids, place,
-                                    g.locale)
-    similar_task = asyncio.to_thread(place_utils.fetch_similar_place_dcids,
-                                     place, g.locale)
-    parent_places_task = asyncio.to_thread(place_utils.get_parent_places,
-                                           place.dcid, g.locale)
-    peers_within_parent_task = asyncio.to_thread(
-        place_utils.fetch_peer_places_within, place.dcid, place.types)
+    nearby_task = executors.run('place_related',
+                                place_utils.fetch_nearby_place_dcids, place,
+                                g.locale)
+    similar_task = executors.run('place_related',
+                                 place_utils.fetch_similar_place_dcids, place,
+                                 g.locale)
+    parent_places_task = executors.run('place_related',
+                                       place_utils.get_parent_places,
+                                       place.dcid, g.locale)
+    peers_within_parent_task = executors.run(
+        'place_related', place_utils.fetch_peer_places_within, place.dcid,
+        place.types)
 
     nearby_place_dcids, similar_place_dcids, parent_places, peers_within_parent = await asyncio.gather(
         nearby_task, similar_task, parent_places_task, peers_within_parent_task)
@@ -23,7 +23,9 @@ import flask
 from flask import current_app
 from flask_babel import gettext
 
+from server.lib import executors
 from server.lib import fetch
+from server.lib import place_availability
 from server.lib.cache import cache
 from server.lib.i18n import DEFAULT_LOCALE
 from server.lib.i18n import locale_choices
@@ -189,33 +191,29 @@ def filter_chart_config_for_category(
 
 
 def count_places_per_stat_var(
-    obs_point_response,
+    places_with_data: Dict[str, List[str]],
     stat_var_dcids: list[str],
     place_count_threshold: int = 1,
     places_to_consider: list[str] = []) -> List[Dict[str, int]]:
   """
-  Returns a count of places with data for each stat var.
+  Returns a count of places with data for each stat var, from the places with
+  data of each stat var (see fetch.entities_with_data).
   Removes the Stat var entirely if there are 0 places with data.
-  If there are more than 2 places with data, we just store it as 2.
+  The count stops at place_count_threshold.
   """
   stat_var_to_places_with_data = {}
   places_to_consider = places_to_consider[:15] if places_to_consider else []
   for stat_var_dcid in stat_var_dcids:
-    places_with_data = 0
-    observations = obs_point_response["byVariable"].get(stat_var_dcid,
-                                                        {}).get("byEntity", {})
-    for place_dcid in observations:
-      if not observations[place_dcid]:
-        continue
-
+    places_with_data_count = 0
+    for place_dcid in places_with_data.get(stat_var_dcid, []):
       if not places_to_consider or place_dcid in places_to_consider:
-        places_with_data += 1
+        places_with_data_count += 1
 
-        if places_with_data == place_count_threshold:
+        if places_with_data_count == place_count_threshold:
           break  # At least place_count_threshold number of places, no need to keep iterating.
 
-    if places_with_data > 0:
-      stat_var_to_places_with_data[stat_var_dcid] = places_with_data
+    if places_with_data_count > 0:
+      stat_var_to_places_with_data[stat_var_dcid] = places_with_data_count
 
   return stat_var_to_places_with_data
 
@@ -236,52 +234,79 @@ async def filter_chart_config_for_data_existence(
       List[Dict]: A filtered list of chart configurations where at least one statistical variable has data for the specified place.
   """
 
-  async def fetch_and_process_stats():
-    """Fetches and processes observation data concurrently."""
-    current_place_obs_point_task = asyncio.to_thread(
-        dc.safe_obs_point, [place_dcid], current_place_stat_var_dcids)
-    child_places_obs_point_within_task = asyncio.to_thread(
-        dc.safe_obs_point_within, place_dcid, child_place_type,
-        child_places_stat_var_dcids)
-    peer_places_obs_point_within_task = asyncio.to_thread(
-        dc.safe_obs_point_within, parent_place_dcid, place_type,
-        peer_places_stat_var_dcids)
-
-    fetch_peer_places_task = asyncio.to_thread(fetch_peer_places_within,
-                                               place_dcid, [place_type])
-
-    current_place_obs_point_response, child_places_obs_point_within, peer_places_obs_point_within, fetch_peer_places = await asyncio.gather(
-        current_place_obs_point_task, child_places_obs_point_within_task,
-        peer_places_obs_point_within_task, fetch_peer_places_task)
-    count_places_per_child_sv_task = asyncio.to_thread(
-        count_places_per_stat_var, child_places_obs_point_within,
-        child_places_stat_var_dcids, 2)
-    count_places_per_peer_sv_task = asyncio.to_thread(
-        count_places_per_stat_var, peer_places_obs_point_within,
-        peer_places_stat_var_dcids, 2, fetch_peer_places)
-    count_places_per_sv_task = asyncio.to_thread(
-        count_places_per_stat_var, current_place_obs_point_response,
+  # Offline-built availability index, which answers the checks below without
+  # mixer calls for the places and variables it covers.
+  index = place_availability.get_index()
+
+  async def current_place_counts():
+    if index and index.covers(current_place_stat_var_dcids):
+      svs = index.place_svs(place_dcid, current_place_stat_var_dcids)
+      if svs is not None:
+        return {sv: 1 for sv in svs}
+    current_place_existence = await dc.safe_obs_existence_async(
+        [place_dcid], current_place_stat_var_dcids)
+    return count_places_per_stat_var(
+        fetch.entities_with_data(current_place_existence),
         current_place_stat_var_dcids, 1)
 
-    # Check if child place & peer places have geo data available. These can run concurrently.
-    child_geo_task = asyncio.to_thread(
-        check_geo_data_exists, place_dcid,
-        child_place_type) if found_child_place_map else asyncio.Future()
-    if not found_child_place_map:
-      child_geo_task.set_result(False)
+  async def child_places_counts():
+    if index and index.covers(child_places_stat_var_dcids):
+      counts = index.child_counts(place_dcid, child_place_type,
+                                  child_places_stat_var_dcids)
+      if counts is not None:
+        return {sv: min(count, 2) for sv, count in counts.items()}
+    child_places_existence = await dc.safe_obs_existence_within_async(
+        place_dcid, child_place_type, child_places_stat_var_dcids)
+    return count_places_per_stat_var(
+        fetch.entities_with_data(child_places_existence),
+        child_places_stat_var_dcids, 2)
+
+  async def peer_places_counts():
+    if index and parent_place_dcid and index.covers(peer_places_stat_var_dcids):
+      counts = index.child_counts(parent_place_dcid, place_type,
+                                  peer_places_stat_var_dcids)
+      place_svs = index.place_svs(place_dcid, peer_places_stat_var_dcids)
+      if counts is not None and place_svs is not None:
+        # Peers exclude the place itself.
+        peer_counts = {}
+        for sv, count in counts.items():
+          count -= 1 if sv in place_svs else 0
+          if count > 0:
+            peer_counts[sv] = min(count, 2)
+        return peer_counts
+    peer_places_existence, fetch_peer_places = await asyncio.gather(
+        dc.safe_obs_existence_within_async(parent_place_dcid, place_type,
+                                           peer_places_stat_var_dcids),
+        executors.run('place_related', fetch_peer_places_within, place_dcid,
+                      [place_type]))
+    return count_places_per_stat_var(
+        fetch.entities_with_data(peer_places_existence),
+        peer_places_stat_var_dcids, 2, fetch_peer_places)
 
-    peer_geo_task = asyncio.to_thread(
-        check_geo_data_exists, parent_place_dcid, place_type
-    ) if found_peer_places_map and parent_place_dcid else asyncio.Future()
-    if not (found_peer_places_map and parent_place_dcid):
-      peer_geo_task.set_result(False)
+  async def geo_data_exists(parent_dcid: str, child_type: str):
+    if index:
+      has_geo = index.children_have_geo(parent_dcid, child_type)
+      if has_geo is not None:
+        return has_geo
+    return await executors.run('place_related', check_geo_data_exists,
+                               parent_dcid, child_type)
 
-    # Gather all tasks, including the ones previously created with asyncio.to_thread
-    current_place_stat_vars_with_observations, child_stat_var_to_places_with_data, peer_stat_var_to_places_with_data, child_places_have_geo_data, peer_places_have_geo_data = await asyncio.gather(
-        count_places_per_sv_task, count_places_per_child_sv_task,
-        count_places_per_peer_sv_task, child_geo_task, peer_geo_task)
+  async def no_geo_data():
+    return False
 
-    return current_place_stat_vars_with_observations, child_stat_var_to_places_with_data, peer_stat_var_to_places_with_data, child_places_have_geo_data, peer_places_have_geo_data
+  async def fetch_and_process_stats():
+    """Fetches and processes observation data concurrently."""
+    # Check if child place & peer places have geo data available.
+    child_geo_task = geo_data_exists(
+        place_dcid,
+        child_place_type) if found_child_place_map else no_geo_data()
+    peer_geo_task = geo_data_exists(
+        parent_place_dcid, place_type
+    ) if found_peer_places_map and parent_place_dcid else no_geo_data()
+
+    return await asyncio.gather(current_place_counts(), child_places_counts(),
+                                peer_places_counts(), child_geo_task,
+                                peer_geo_task)
 
   # Get a flat list of all statistical variable dcids in the chart config
   current_place_stat_var_dcids = []
@@ -1293,11 +1318,11 @@ async def _fetch_summary_data(
     locale: The locale to fetch the data in
 
   """
-  place = asyncio.to_thread(fetch_place, place_dcid, locale)
-  parent_places = asyncio.to_thread(get_parent_places, place_dcid, locale)
-  place_observations = asyncio.to_thread(dc.obs_point, [place_dcid],
-                                         variable_dcids,
-                                         date="LATEST")
+  place = executors.run('place', fetch_place, place_dcid, locale)
+  parent_places = executors.run('place', get_parent_places, place_dcid, locale)
+  place_observations = dc.obs_point_async([place_dcid],
+                                          variable_dcids,
+                                          date="LATEST")
   return await asyncio.gather(place, parent_places, place_observations)
 
 
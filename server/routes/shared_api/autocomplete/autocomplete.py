@@ -23,6 +23,7 @@ from flask import Blueprint
 from flask import jsonify
 from flask import request
 
+from server.lib import executors
 from server.lib.feature_flags import ENABLE_STAT_VAR_AUTOCOMPLETE
 from server.lib.feature_flags import is_feature_enabled
 from server.routes.shared_api.autocomplete import helpers
@@ -66,8 +67,8 @@ async def autocomplete():
     concept_result = stat_vars.analyze_query_concepts(original_query)
     if concept_result:
       tasks.append(
-          asyncio.to_thread(stat_vars.search_stat_vars,
-                            concept_result['cleaned_query']))
+          executors.run('autocomplete', stat_vars.search_stat_vars,
+                        concept_result['cleaned_query']))
       task_metadata.append({
           'source': 'core_concept_sv',
           'original_phrase': concept_result['original_phrase']
@@ -87,7 +88,8 @@ async def autocomplete():
   for ngram_query in ngram_queries:
     # Custom place suggestions
     tasks.append(
-        asyncio.to_thread(helpers.get_custom_place_suggestions, ngram_query))
+        executors.run('autocomplete', helpers.get_custom_place_suggestions,
+                      ngram_query))
     task_metadata.append({
         'source': 'custom_place',
         'matched_query': ngram_query
@@ -95,8 +97,8 @@ async def autocomplete():
 
     # Google Maps place predictions
     tasks.append(
-        asyncio.to_thread(helpers.get_place_predictions, [ngram_query], lang,
-                          'ngram_place'))
+        executors.run('autocomplete', helpers.get_place_predictions,
+                      [ngram_query], lang, 'ngram_place'))
     task_metadata.append({
         'source': 'ngram_place',
         'matched_query': ngram_query
@@ -105,7 +107,9 @@ async def autocomplete():
     # Stat var n-gram search
     if lang == 'en' and is_feature_enabled(ENABLE_STAT_VAR_AUTOCOMPLETE,
                                            request=request):
-      tasks.append(asyncio.to_thread(stat_vars.search_stat_vars, ngram_query))
+      tasks.append(
+          executors.run('autocomplete', stat_vars.search_stat_vars,
+                        ngram_query))
       task_metadata.append({'source': 'ngram_sv', 'matched_query': ngram_query})
 
   # Run all tasks concurrently and gather results.
@@ -22,6 +22,7 @@ from urllib.parse import urlencode
 from flask import current_app
 import requests
 
+from server.lib import tracing
 from server.routes.shared_api.autocomplete.types import ScoredPrediction
 from server.routes.shared_api.place import findplacedcid
 from shared.lib.constants import STOP_WORDS
@@ -168,7 +169,9 @@ def execute_maps_request(query: str, language: str) -> Dict:
       'input': query,
       'language': language
   }
-  response = requests.post(MAPS_API_URL + urlencode(request_obj), json={})
+  with tracing.span('maps') as span:
+    response = requests.post(MAPS_API_URL + urlencode(request_obj), json={})
+    span.set(status=response.status_code, response_bytes=len(response.content))
   return json.loads(response.text)
 
 
@@ -22,7 +22,12 @@ from flask import jsonify
 from flask import request
 from flask import Response
 
+from server.lib import executors
 from server.lib import fetch
+from server.lib import sv_hierarchy
+from server.lib.node_resolver import NodeResolutionError
+from server.lib.node_resolver import NodeResolver
+from server.lib.node_resolver import run_planners
 from server.services import datacommons as dc
 
 bp = Blueprint("metadata", __name__, url_prefix='/api/metadata')
@@ -31,6 +36,9 @@ bp = Blueprint("metadata", __name__, url_prefix='/api/metadata')
 # to prevent infinite loops or excessive API calls in deep graphs.
 MAX_CATEGORY_DEPTH = 50
 
+# The v2node property to look up both parent arcs of a stat var or group.
+_PARENTS_PROP = '->[memberOf,specializationOf]'
+
 # A list of specific provenance DCIDs where the 'measurementMethod' attribute
 # should be hidden, because it is flawed or not meaningful.
 MEASUREMENT_METHODS_SUPPRESSION_PROVENANCES: set[str] = {"WikipediaStatsData"}
@@ -62,15 +70,6 @@ def title_case(string: str) -> str:
   ])
 
 
-def _get_arc_nodes(data_dict: dict[str, Any], node_id: str,
-                   arc_name: str) -> list[dict[str, Any]]:
-  """Extracts nodes for a given arc from a v2node response dictionary."""
-  return data_dict.get('data', {}).get(node_id,
-                                       {}).get('arcs',
-                                               {}).get(arc_name,
-                                                       {}).get('nodes', [])
-
-
 def _get_node_name(node_list: list[dict[str, Any]],
                    linked_names_map: dict[str, str]) -> str | None:
   """Helper to resolve a node's display name from either a literal value or linked reference."""
@@ -109,13 +108,6 @@ def _extract_active_facets(
   return list(set(active_facets))
 
 
-async def _fetch_node_data(dcids: set[str], prop: str) -> dict[str, Any]:
-  """Helper to fetch node data only if the list of DCIDs is not empty."""
-  if not dcids:
-    return {}
-  return await asyncio.to_thread(dc.v2node, list(dcids), prop)
-
-
 def _extract_facet_date_ranges(
     obs_resp: dict, stat_vars: list[str]) -> dict[str, dict[str, str]]:
   """Extracts min/max dates for facets."""
@@ -147,64 +139,80 @@ def _extract_facet_date_ranges(
   return facet_date_ranges
 
 
+class _SecondaryMetadataPlanner:
+  """Resolves human-readable strings for provenances, measurement methods and
+  units from the Knowledge Graph.
+
+  Takes two rounds: the provenance nodes, measurement method descriptions and
+  unit names first, then the names of the entities linked from provenances.
+  """
+
+  def __init__(self, provenance_endpoints: set[str],
+               measurement_methods: set[str], units: set[str]):
+    self.provenance_endpoints = provenance_endpoints
+    self.measurement_methods = measurement_methods
+    self.units = units
+    self._step = 0
+
+  def plan(self, resolver: NodeResolver) -> None:
+    if self._step == 0:
+      resolver.add('->*', self.provenance_endpoints)
+      resolver.add('->description', self.measurement_methods)
+      resolver.add('->name', self.units)
+    elif self._step == 1:
+      resolver.add('->name', self._linked_prov_dcids(resolver))
+    self._step += 1
+
+  def _linked_prov_dcids(self, resolver: NodeResolver) -> set[str]:
+    linked_prov_dcids: set[str] = set()
+    for dcid in self.provenance_endpoints:
+      for arc in ['source', 'isPartOf', 'licenseType']:
+        for n in resolver.get_nodes(dcid, '->*', arc):
+          if 'dcid' in n:
+            linked_prov_dcids.add(n['dcid'])
+    return linked_prov_dcids
+
+  def result(self, resolver: NodeResolver) -> tuple[dict, dict, dict, dict]:
+    prov_map: dict[str, dict[str, Any]] = {}
+    for dcid in self.provenance_endpoints:
+      if not resolver.is_resolved(dcid, '->*'):
+        continue
+      prov_map[dcid] = {
+          arc: resolver.get_nodes(dcid, '->*', arc)
+          for arc in ['source', 'isPartOf', 'name', 'url', 'licenseType']
+      }
+
+    linked_names_map: dict[str, str] = {}
+    for n_dcid in self._linked_prov_dcids(resolver):
+      name = resolver.get_value(n_dcid, '->name', 'name')
+      if name:
+        linked_names_map[n_dcid] = name
+
+    mm_map: dict[str, str] = {}
+    for mm in self.measurement_methods:
+      if resolver.get_nodes(mm, '->description', 'description'):
+        mm_map[mm] = resolver.get_value(mm, '->description', 'description')
+    unit_map: dict[str, str] = {}
+    for u in self.units:
+      if resolver.get_nodes(u, '->name', 'name'):
+        unit_map[u] = resolver.get_value(u, '->name', 'name')
+
+    return prov_map, linked_names_map, mm_map, unit_map
+
+
 async def _fetch_secondary_metadata(
     provenance_endpoints: set[str], measurement_methods: set[str],
     units: set[str]) -> tuple[dict, dict, dict, dict]:
   """Shared helper to resolve human-readable strings from the Knowledge Graph."""
-  # Look up names and descriptions of provenances, measurement methods and units
+  resolver = NodeResolver()
+  planner = _SecondaryMetadataPlanner(provenance_endpoints, measurement_methods,
+                                      units)
   try:
-    prov_res, mm_res, unit_res = await asyncio.gather(
-        _fetch_node_data(provenance_endpoints, '->*'),
-        _fetch_node_data(measurement_methods, '->description'),
-        _fetch_node_data(units, '->name'))
-  except Exception:
+    await run_planners(resolver, planner)
+  except NodeResolutionError:
+    # Strings that could not be resolved are left out.
     logging.exception("Failed to fetch secondary metadata from DC")
-    prov_res, mm_res, unit_res = {}, {}, {}
-
-  # Process secondary lookups
-  prov_map: dict[str, dict[str, Any]] = {}
-  linked_prov_dcids: set[str] = set()
-
-  if 'data' in prov_res:
-    for dcid in prov_res['data']:
-      prov_map[dcid] = {
-          'source': _get_arc_nodes(prov_res, dcid, 'source'),
-          'isPartOf': _get_arc_nodes(prov_res, dcid, 'isPartOf'),
-          'name': _get_arc_nodes(prov_res, dcid, 'name'),
-          'url': _get_arc_nodes(prov_res, dcid, 'url'),
-          'licenseType': _get_arc_nodes(prov_res, dcid, 'licenseType'),
-      }
-      # Collect DCIDs of linked entities for human-readable resolution
-      for n in prov_map[dcid]['source'] + prov_map[dcid]['isPartOf'] + prov_map[
-          dcid]['licenseType']:
-        if 'dcid' in n:
-          linked_prov_dcids.add(n['dcid'])
-
-  linked_names_map: dict[str, str] = {}
-  if linked_prov_dcids:
-    try:
-      linked_names_resp = await asyncio.to_thread(dc.v2node,
-                                                  list(linked_prov_dcids),
-                                                  '->name')
-      for n_dcid in linked_prov_dcids:
-        n_arcs = _get_arc_nodes(linked_names_resp, n_dcid, 'name')
-        if n_arcs:
-          linked_names_map[n_dcid] = n_arcs[0].get('value')
-    except Exception:
-      logging.exception("Failed to resolve linked provenance names")
-
-  mm_map: dict[str, str] = {
-      mm: _get_arc_nodes(mm_res, mm, 'description')[0].get('value')
-      for mm in measurement_methods
-      if _get_arc_nodes(mm_res, mm, 'description')
-  }
-  unit_map: dict[str, str] = {
-      u: _get_arc_nodes(unit_res, u, 'name')[0].get('value')
-      for u in units
-      if _get_arc_nodes(unit_res, u, 'name')
-  }
-
-  return prov_map, linked_names_map, mm_map, unit_map
+  return planner.result(resolver)
 
 
 def _traverse_to_top_category(node: str, parent_map: dict[str, list[str]],
@@ -229,107 +237,138 @@ def _traverse_to_top_category(node: str, parent_map: dict[str, list[str]],
       _traverse_to_top_category(p, parent_map, visited, top_nodes, original_sv)
 
 
-async def fetch_categories_async(stat_vars: list[str]) -> dict[str, list[str]]:
-  """Traverses the category hierarchy tree up to top-level topics.
-
-  This function identifies the categories (top-level topics) associated with a list 
-    of Statistical Variables. It returns a mapping where each key is a stat_var 
-    DCID and the value is a list of human-readable names of its top-level parents.
-
-    The implementation uses a two-stage traversal:
-    1. Breadth-First Search (BFS): Iteratively climbs the 'memberOf' and 
-       'specializationOf' arcs across all input variables simultaneously to 
-       map the parent hierarchy.
-    2. Depth-First Search (DFS): Performed locally on the resulting parent_map 
-       to trace individual paths from each stat_var to its root-level ancestors 
-       (excluding the generic 'dc/g/Root').
-
-    Args:
-        stat_vars: A list of Statistical Variable DCIDs.
-
-    Returns:
-        A dictionary mapping stat_var DCIDs to a list of display names for their 
-        top-level categories.
-    """
-  parent_map = collections.defaultdict(list)
-  current_nodes = set(stat_vars)
-  visited = set()
-  depth = 0
-
-  # Progressively fetch parent nodes level-by-level (BFS).
-  # This batches v2node calls by depth to minimize network round-trips.
-  while current_nodes and depth < MAX_CATEGORY_DEPTH:
-    visited.update(current_nodes)
-
-    member_task = asyncio.to_thread(dc.v2node, list(current_nodes),
-                                    '->memberOf')
-    spec_task = asyncio.to_thread(dc.v2node, list(current_nodes),
-                                  '->specializationOf')
-    resp_member, resp_spec = await asyncio.gather(member_task, spec_task)
+class _CategoryPlanner:
+  """Traverses the category hierarchy tree of stat vars up to top-level topics.
+
+  Stat vars found in the local stat var hierarchy snapshot are resolved
+  without any lookups. For the others, the 'memberOf' and 'specializationOf'
+  arcs of all of them are climbed together, one level per round (BFS), and
+  individual paths from each stat_var to its root-level ancestors (excluding
+  the generic 'dc/g/Root') are then traced locally (DFS). A final round
+  resolves the names of the top-level categories.
+  """
+
+  def __init__(self, stat_vars: list[str]):
+    self.stat_vars = stat_vars
+    self._hierarchy = sv_hierarchy.get_hierarchy()
+    self._parent_map = collections.defaultdict(list)
+    self._visited = set()
+    self._depth = 0
+    self._requested: set[str] = set()
+    self._names_requested = False
+    self._sv_top_levels: dict[str, list[str]] = {}
+    self._current_nodes = set()
+    for sv in stat_vars:
+      if self._hierarchy and sv in self._hierarchy:
+        self._sv_top_levels[sv] = self._hierarchy.get_top_categories(sv)
+      else:
+        self._current_nodes.add(sv)
+    self._live_svs = set(self._current_nodes)
+
+  def plan(self, resolver: NodeResolver) -> None:
+    if self._requested:
+      self._consume_parents(resolver)
+    if self._current_nodes and self._depth < MAX_CATEGORY_DEPTH:
+      self._visited.update(self._current_nodes)
+      self._requested = self._current_nodes
+      resolver.add(_PARENTS_PROP, self._requested)
+      return
+    if not self._names_requested:
+      self._names_requested = True
+      self._trace_top_levels()
+      resolver.add('->name', [
+          p for p in self._top_level_dcids()
+          if not (self._hierarchy and self._hierarchy.get_name(p))
+      ])
 
+  def _consume_parents(self, resolver: NodeResolver) -> None:
     next_nodes = set()
-    for node in current_nodes:
+    for node in self._requested:
       parents = set()
-      parents.update([
-          n.get('dcid')
-          for n in _get_arc_nodes(resp_member, node, 'memberOf')
-          if n.get('dcid')
-      ])
-      parents.update([
-          n.get('dcid')
-          for n in _get_arc_nodes(resp_spec, node, 'specializationOf')
-          if n.get('dcid')
-      ])
+      for arc in ['memberOf', 'specializationOf']:
+        parents.update([
+            n.get('dcid')
+            for n in resolver.get_nodes(node, _PARENTS_PROP, arc)
+            if n.get('dcid')
+        ])
 
       parent_list = list(parents)
-      parent_map[node].extend(parent_list)
+      self._parent_map[node].extend(parent_list)
 
       for p in parent_list:
         # Use visited set to prevent graph cycles
-        if p != 'dc/g/Root' and p not in visited:
+        if p != 'dc/g/Root' and p not in self._visited:
           next_nodes.add(p)
 
-    current_nodes = next_nodes
-    depth += 1
+    self._requested = set()
+    self._current_nodes = next_nodes
+    self._depth += 1
+
+  def _trace_top_levels(self) -> None:
+    # Using the parent_map built above, we resolve which topic-level topics
+    # each variable eventually rolls up to.
+    for sv in self._live_svs:
+      tops = set()
+      _traverse_to_top_category(sv, self._parent_map, set(), tops, sv)
+      self._sv_top_levels[sv] = list(tops)
+
+  def _top_level_dcids(self) -> set[str]:
+    all_top_level_dcids = set()
+    for tops in self._sv_top_levels.values():
+      all_top_level_dcids.update(tops)
+    return all_top_level_dcids
+
+  def _incomplete_stat_vars(self, resolver: NodeResolver) -> list[str]:
+    """Returns the stat vars whose category lookups failed."""
+    if not self._names_requested:
+      # The parent lookups did not finish.
+      return sorted(self._live_svs)
+    return sorted(sv for sv, tops in self._sv_top_levels.items() if any(
+        not (self._hierarchy and self._hierarchy.get_name(p)) and
+        not resolver.is_resolved(p, '->name') for p in tops))
+
+  def result(self, resolver: NodeResolver) -> dict[str, list[str]]:
+    """Returns the display names of the top-level categories of each stat var.
+
+    If a name isn't found in the Knowledge Graph, we fall back to a
+    simplified version of the DCID. Stat vars whose lookups failed get the
+    categories found so far.
+    """
+    incomplete = self._incomplete_stat_vars(resolver)
+    if incomplete:
+      logging.warning('Failed to resolve the categories of %s stat vars: %s',
+                      len(incomplete), incomplete)
+    category_map: dict[str, list[str]] = {}
+    for sv in self.stat_vars:
+      names = []
+      for p in self._sv_top_levels.get(sv, []):
+        # Use the official name if available; otherwise, extract the last
+        # chunk of the DCIC (if it contains multiple parts delimited by slashes)
+        name = self._hierarchy.get_name(p) if self._hierarchy else ''
+        names.append(name or resolver.get_value(p, '->name', 'name') or
+                     p.split('/')[-1])
+      category_map[sv] = names
+    return category_map
 
-  sv_top_levels = collections.defaultdict(list)
-  all_top_level_dcids = set()
 
-  # Traverse individual paths from each stat_var to its top-level categories.
-  # Using the parent_map built above, we resolve which topic-level topics
-  # each variable eventually rolls up to.
-  for sv in stat_vars:
-    tops = set()
-
-    _traverse_to_top_category(sv, parent_map, set(), tops, sv)
-    sv_top_levels[sv] = list(tops)
-    all_top_level_dcids.update(tops)
-
-  # Resolve human-readable names for the top-level categories.
-  # If a name isn't found in the Knowledge Graph, we fall back to a
-  # simplified version of the DCID.
-  category_map: dict[str, list[str]] = {}
-  if all_top_level_dcids:
-    parent_name_resp = await asyncio.to_thread(dc.v2node,
-                                               list(all_top_level_dcids),
-                                               '->name')
-    parent_name_map = {}
-    for pid in all_top_level_dcids:
-      nodes = _get_arc_nodes(parent_name_resp, pid, 'name')
-      if nodes:
-        parent_name_map[pid] = nodes[0].get('value')
+async def fetch_categories_async(stat_vars: list[str]) -> dict[str, list[str]]:
+  """Traverses the category hierarchy tree up to top-level topics.
 
-    for sv in stat_vars:
-      category_map[sv] = [
-          # Use the official name if available; otherwise, extract the last
-          # chunk of the DCIC (if it contains multiple parts delimited by slashes)
-          parent_name_map.get(p) or p.split('/')[-1]
-          for p in sv_top_levels.get(sv, [])
-      ]
-  else:
-    category_map = {sv: [] for sv in stat_vars}
+  This function identifies the categories (top-level topics) associated with a list
+    of Statistical Variables. It returns a mapping where each key is a stat_var
+    DCID and the value is a list of human-readable names of its top-level parents.
 
-  return category_map
+    Args:
+        stat_vars: A list of Statistical Variable DCIDs.
+
+    Returns:
+        A dictionary mapping stat_var DCIDs to a list of display names for their
+        top-level categories.
+    """
+  resolver = NodeResolver()
+  planner = _CategoryPlanner(stat_vars)
+  await run_planners(resolver, planner)
+  return planner.result(resolver)
 
 
 def _build_metadata_payload(
@@ -454,11 +493,16 @@ async def get_metadata() -> tuple[Response, int] | Response:
   if frontend_facets:
     v2obs_kwargs['filter'] = {'facetIds': frontend_facets}
 
+  # All node lookups of the request (names, category parents, provenances,
+  # measurement methods, units) are deduped across stat vars and resolved in
+  # a fixed number of rounds with one bulk call per property per round.
+  resolver = NodeResolver()
+  resolver.add('->name', stat_vars)
+  categories = _CategoryPlanner(stat_vars)
+  categories.plan(resolver)
   try:
-    name_resp, obs_resp, category_map = await asyncio.gather(
-        asyncio.to_thread(dc.v2node, stat_vars, '->name'),
-        asyncio.to_thread(dc.v2observation, **v2obs_kwargs),
-        fetch_categories_async(stat_vars))
+    obs_resp, _ = await asyncio.gather(dc.v2observation_async(**v2obs_kwargs),
+                                       resolver.resolve())
   except Exception:
     logging.exception("Failed to fetch primary metadata from DC")
     return jsonify({'error': 'Failed to communicate with Data Commons service'
@@ -467,12 +511,10 @@ async def get_metadata() -> tuple[Response, int] | Response:
   # Process Stat Var Names into a lookup dictionary
   stat_var_names: dict[str, str] = {}
   stat_var_list: list[dict[str, str]] = []
-  if 'data' in name_resp:
-    for sv in stat_vars:
-      nodes = _get_arc_nodes(name_resp, sv, 'name')
-      name = nodes[0].get('value') if nodes else sv
-      stat_var_names[sv] = name
-      stat_var_list.append({"dcid": sv, "name": name})
+  for sv in stat_vars:
+    name = resolver.get_value(sv, '->name', 'name') or sv
+    stat_var_names[sv] = name
+    stat_var_list.append({"dcid": sv, "name": name})
 
   # Collate active facets per stat var
   sv_active_facets: dict[str, list[str]] = {
@@ -503,8 +545,15 @@ async def get_metadata() -> tuple[Response, int] | Response:
 
   facet_date_ranges = _extract_facet_date_ranges(obs_resp, stat_vars)
 
-  prov_map, linked_names_map, mm_map, unit_map = await _fetch_secondary_metadata(
-      provenance_endpoints, measurement_methods, units)
+  secondary = _SecondaryMetadataPlanner(provenance_endpoints,
+                                        measurement_methods, units)
+  try:
+    await run_planners(resolver, categories, secondary)
+  except NodeResolutionError:
+    # Categories and strings that could not be resolved are left out.
+    logging.exception("Failed to fetch secondary metadata from DC")
+  category_map = categories.result(resolver)
+  prov_map, linked_names_map, mm_map, unit_map = secondary.result(resolver)
 
   # Assemble and return the final response
   metadata_map = _build_metadata_payload(stat_vars, stat_var_names,
@@ -552,9 +601,10 @@ async def enrich_facets() -> tuple[Response, int] | Response:
       # If the place is known to have many children, pre-fetch entities for batching.
       if parent_place in _BATCHED_CALL_PLACES.get(enclosed_place_type, []):
         try:
-          child_places_resp = await asyncio.to_thread(fetch.descendent_places,
-                                                      [parent_place],
-                                                      enclosed_place_type)
+          child_places_resp = await executors.run('metadata',
+                                                  fetch.descendent_places,
+                                                  [parent_place],
+                                                  enclosed_place_type)
           entities = child_places_resp.get(parent_place, [])
           # If successful, clear the expression to use the explicit entity list.
           entity_expression = ""
@@ -581,7 +631,7 @@ async def enrich_facets() -> tuple[Response, int] | Response:
       kwargs = base_kwargs.copy()
       kwargs['entity'] = {'expression': entity_expression}
       kwargs['variable'] = {'dcids': stat_vars}
-      tasks.append(asyncio.to_thread(dc.v2observation, **kwargs))
+      tasks.append(dc.v2observation_async(**kwargs))
 
     elif entities:
       # We have explicit entities
@@ -591,7 +641,7 @@ async def enrich_facets() -> tuple[Response, int] | Response:
         kwargs = base_kwargs.copy()
         kwargs['entity'] = {'dcids': entities[i:i + ent_batch_size]}
         kwargs['variable'] = {'dcids': stat_vars}
-        tasks.append(asyncio.to_thread(dc.v2observation, **kwargs))
+        tasks.append(dc.v2observation_async(**kwargs))
 
     # 4. Run tasks and then merge
     try:
@@ -24,6 +24,7 @@ from flask import g
 from flask import request
 from flask import Response
 
+from server.lib import executors
 from server.lib import fetch
 from server.lib.feature_flags import DIVERT_TO_SPANNER
 from server.lib.feature_flags import is_feature_enabled
@@ -66,7 +67,7 @@ async def triples(direction, dcid):
 
   if use_separate_calls:
     # 1. Fetch the list of properties for the node
-    props_dict = await asyncio.to_thread(fetch.properties, [dcid], out)
+    props_dict = await executors.run('node', fetch.properties, [dcid], out)
     props = props_dict.get(dcid, [])
 
     result = {}
@@ -89,7 +90,7 @@ async def triples(direction, dcid):
     for prop in props:
       wrapped_task = copy_current_request_context(
           lambda p=prop: fetch_prop_values(p, parent_g))
-      tasks.append(asyncio.to_thread(wrapped_task))
+      tasks.append(executors.run('node', wrapped_task))
 
     resps = await asyncio.gather(*tasks)
 
@@ -100,7 +101,7 @@ async def triples(direction, dcid):
           result.setdefault(p, []).extend(val.get('nodes', []))
     return result
 
-  fallback_resp = await asyncio.to_thread(fetch.triples, [dcid], out)
+  fallback_resp = await executors.run('node', fetch.triples, [dcid], out)
   return fallback_resp.get(dcid, {})
 
 
@@ -28,6 +28,7 @@ from server.lib.cache import cache
 import server.lib.i18n as i18n
 from server.lib.i18n_messages import get_place_type_to_locale_message
 from server.lib.i18n_messages import get_place_type_to_locale_message_plural
+from server.lib.place_resolver import get_place_resolver
 from server.lib.shared import names
 from server.routes import TIMEOUT
 import server.services.datacommons as dc
@@ -120,13 +121,13 @@ bp = Blueprint("api_place", __name__, url_prefix='/api/place')
 
 
 def get_place_type(place_dcids):
-  place_types = fetch.property_values(place_dcids, 'typeOf')
+  place_types = get_place_resolver().get_types(place_dcids)
   ret = {}
   for dcid in place_dcids:
     # We prefer to use specific type like "State", "County" over
     # "AdministrativeArea"
     chosen_type = ''
-    for place_type in place_types[dcid]:
+    for place_type in place_types.get(dcid, []):
       if (chosen_type in ['', 'Place'] or
           chosen_type.startswith('AdministrativeArea')):
         chosen_type = place_type
@@ -183,11 +184,7 @@ def get_i18n_name(dcids, should_resolve_all=True):
   if not dcids:
     return {}
   locales = i18n.locale_choices(g.locale)
-  locales_str = ",".join(locales)
-  response = fetch.property_values(dcids,
-                                   "nameWithLanguage",
-                                   constraints=f"{{$lang:[{locales_str}]}}",
-                                   max_pages=None)
+  response = get_place_resolver().get_i18n_names(dcids, locales)
   result = {}
   dcids_default_name = []
   for dcid in dcids:
@@ -382,7 +379,7 @@ def parent_places(dcids, include_admin_areas=False):
   """
   result = {dcid: {} for dcid in dcids}
   try:
-    place_info = dc.get_place_info(dcids)
+    place_info = get_place_resolver().get_place_info(dcids)
   except ValueError:
     return result
   for item in place_info.get('data', []):
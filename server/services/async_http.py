@@ -0,0 +1,101 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Pooled async HTTP client for the mixer and NL server calls."""
+
+import asyncio
+import os
+import threading
+
+import httpx
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+class AsyncHttpClient:
+  """
+  An httpx.AsyncClient running on an event loop in a background thread.
+
+  Flask runs each async view, and each memoized coroutine, on an event loop
+  of its own that ends with the call. A client used on such a loop could not
+  keep its connections for the next request. Calls made with this client run
+  on one long-lived loop instead and are awaited from the caller's loop, so
+  connections are pooled across requests and a call does not hold a thread
+  while it waits.
+
+  The loop is started on first use in each process, as the app is created
+  before gunicorn forks its workers.
+  """
+
+  def __init__(self,
+               max_connections: int = 100,
+               max_keepalive_connections: int = 20,
+               transport: httpx.AsyncBaseTransport = None):
+    self._limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections)
+    self._transport = transport
+    self._lock = threading.Lock()
+    self._loop: asyncio.AbstractEventLoop = None
+    self._client: httpx.AsyncClient = None
+    self._pid = None
+
+  def _ensure_started(self) -> asyncio.AbstractEventLoop:
+    if self._pid == os.getpid():
+      return self._loop
+    with self._lock:
+      if self._pid != os.getpid():
+        loop = asyncio.new_event_loop()
+        # As with requests, calls have no timeout.
+        self._client = httpx.AsyncClient(limits=self._limits,
+                                         timeout=None,
+                                         transport=self._transport)
+        threading.Thread(target=loop.run_forever,
+                         name='async-http-client',
+                         daemon=True).start()
+        self._loop = loop
+        self._pid = os.getpid()
+      return self._loop
+
+  async def request(self, method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Sends a request with the arguments of httpx.AsyncClient.request.
+
+    The response is returned as a requests.Response, so it is handled like
+    the responses of the sync calls.
+    """
+    loop = self._ensure_started()
+    future = asyncio.run_coroutine_threadsafe(
+        self._client.request(method, url, **kwargs), loop)
+    return _to_requests_response(await asyncio.wrap_future(future))
+
+  def close(self):
+    """Closes the connections and stops the loop, eg. in tests."""
+    with self._lock:
+      if self._pid != os.getpid():
+        return
+      asyncio.run_coroutine_threadsafe(self._client.aclose(),
+                                       self._loop).result()
+      self._loop.call_soon_threadsafe(self._loop.stop)
+      self._pid = None
+
+
+def _to_requests_response(response: httpx.Response) -> requests.Response:
+  result = requests.Response()
+  result.status_code = response.status_code
+  result.reason = response.reason_phrase
+  result.headers = CaseInsensitiveDict(response.headers)
+  result.url = str(response.url)
+  result.encoding = response.encoding
+  result._content = response.content
+  return result
@@ -12,19 +12,26 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
 from datetime import datetime
 from datetime import timedelta
 import json
+import logging
 import os
-from typing import Dict
+import queue
+import threading
+import time
+from typing import Dict, List, Tuple
 
 from flask import current_app
+from flask import Flask
 import google.auth
 from google.cloud import bigtable
 from google.cloud.bigtable import row_filters
 
 import server.lib.nl.common.constants as nl_constants
 from server.services import datacommons as dc
+from shared.lib import metrics
 
 _PROJECT_ID = 'datcom-store'
 _INSTANCE_ID = 'website-data'
@@ -39,6 +46,17 @@ _COL_FEEDBACK = 'feedback'
 
 _SPAN_IN_DAYS = 3
 
+# Key of the QueryLogWriter in the app config.
+QUERY_LOG_WRITER_KEY = 'NL_QUERY_LOG_WRITER'
+
+_QUEUE_SIZE = metrics.gauge('query_log_queue_size',
+                            'Query log rows waiting to be written.',
+                            mode='sum')
+_ROWS = metrics.gauge(
+    'query_log_rows',
+    'Query log rows by outcome, since the live workers started.', ['outcome'],
+    mode='sum')
+
 
 def get_row_key(session_id, project_id):
   # The session_id starts with a rand to avoid hotspots.
@@ -59,36 +77,195 @@ def get_project_id():
   return project_id
 
 
-async def write_row(session_info: Dict, data: Dict, ctr: Dict):
-  if not session_info.get('id', None):
-    return
-  table = current_app.config['NL_TABLE']
-  if not table:
-    return
-  project_id = get_project_id()
-  # The session_id starts with a rand to avoid hotspots.
-  row_key = get_row_key(session_info['id'], project_id)
-  row = table.direct_row(row_key)
+def _get_version() -> Dict:
   mixer_version = dc.version()
-  version = {
+  return {
       'website_hash': os.environ.get("WEBSITE_HASH"),
       'mixer_hash': mixer_version.get('gitHash', ''),
       'table': mixer_version.get('tables', ''),
       'embeddings': dc.nl_server_config()
   }
+
+
+def _make_row(table, project_id: str, version_str: str, session_info: Dict,
+              data: Dict, counters: collections.Counter):
+  # The session_id starts with a rand to avoid hotspots.
+  row = table.direct_row(get_row_key(session_info['id'], project_id))
   # Rely on timestamp in BT server
   row.set_cell(_COLUMN_FAMILY, _COL_PROJECT.encode(), project_id)
-  row.set_cell(_COLUMN_FAMILY, _COL_VERSION.encode(), json.dumps(version))
+  row.set_cell(_COLUMN_FAMILY, _COL_VERSION.encode(), version_str)
   row.set_cell(_COLUMN_FAMILY, _COL_SESSION.encode(), json.dumps(session_info))
   try:
     row.set_cell(_COLUMN_FAMILY, _COL_DATA.encode(), json.dumps(data))
-  except TypeError as e:
-    if 'ERROR' not in ctr:
-      ctr['ERROR'] = {}
-    ctr['ERROR']['FAILED_unserializable_data_dict'] = f'{e}'
+  except (TypeError, ValueError) as e:
+    counters['unserializable'] += 1
     row.set_cell(_COLUMN_FAMILY, _COL_DATA.encode(),
                  json.dumps({'FATAL': f'{e}'}))
-  table.mutate_rows([row])
+  return row
+
+
+class QueryLogWriter:
+  """
+  Writes query log rows to Bigtable from a background thread.
+
+  Requests only put the row into a bounded queue. A worker thread takes rows
+  off the queue in batches of up to batch_size (waiting at most flush_sec for
+  a batch to fill up) and writes each batch with a single mutate_rows call.
+  When the queue is full the row is dropped, so logging never blocks a
+  request. The mixer and NL server versions logged with every row are fetched
+  by the worker and refreshed every version_refresh_sec.
+
+  The worker is started on first use in each process, as the app is created
+  before gunicorn forks its workers.
+  """
+
+  def __init__(self,
+               app: Flask,
+               table,
+               queue_size: int = 1000,
+               batch_size: int = 50,
+               flush_sec: float = 1,
+               version_refresh_sec: float = 600):
+    self._app = app
+    self._table = table
+    self._queue_size = queue_size
+    self._batch_size = batch_size
+    self._flush_sec = flush_sec
+    self._version_refresh_sec = version_refresh_sec
+    self._lock = threading.Lock()
+    self._queue: queue.Queue = None
+    self._thread: threading.Thread = None
+    self._pid = None
+    self._counters = collections.Counter()
+    self._project_id: str = None
+    self._version_str = json.dumps({})
+    self._version_time = 0
+
+  def submit(self, session_info: Dict, data: Dict) -> bool:
+    """
+    Queues a row to be written. Returns False if the row is dropped.
+
+    The data is serialized by the worker, so it must not be modified after
+    being submitted.
+    """
+    if not session_info.get('id', None):
+      return False
+    q = self._ensure_started()
+    try:
+      q.put_nowait((session_info, data))
+    except queue.Full:
+      with self._lock:
+        self._counters['dropped'] += 1
+        dropped = self._counters['dropped']
+      # Log the first drop and then every 100th.
+      if dropped % 100 == 1:
+        logging.warning('Query log queue is full, %s rows dropped so far',
+                        dropped)
+      return False
+    with self._lock:
+      self._counters['queued'] += 1
+    return True
+
+  def flush(self):
+    """Blocks until all the queued rows are written (or failed)."""
+    q = self._queue
+    if q:
+      q.join()
+
+  def stats(self) -> Dict[str, int]:
+    with self._lock:
+      result = dict(self._counters)
+    q = self._queue
+    result['queue_size'] = q.qsize() if q else 0
+    return result
+
+  def record_metrics(self):
+    """Sets the query log gauges from the stats of this worker."""
+    stats = self.stats()
+    _QUEUE_SIZE.set(stats.pop('queue_size'))
+    for outcome, count in stats.items():
+      _ROWS.set(count, outcome=outcome)
+
+  def _ensure_started(self) -> queue.Queue:
+    if self._pid == os.getpid() and self._thread.is_alive():
+      return self._queue
+    with self._lock:
+      if self._pid != os.getpid() or not self._thread.is_alive():
+        if self._pid != os.getpid():
+          # Rows queued in the parent process are not carried over.
+          self._queue = queue.Queue(maxsize=self._queue_size)
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run,
+                                        name='nl-query-log-writer',
+                                        daemon=True)
+        self._thread.start()
+      return self._queue
+
+  def _run(self):
+    q = self._queue
+    with self._app.app_context():
+      while True:
+        batch = self._next_batch(q)
+        try:
+          self._write(batch)
+        except Exception:
+          logging.exception('Failed to write %s query log rows', len(batch))
+          with self._lock:
+            self._counters['failed'] += len(batch)
+        finally:
+          for _ in batch:
+            q.task_done()
+
+  def _next_batch(self, q: queue.Queue) -> List[Tuple[Dict, Dict]]:
+    batch = [q.get()]
+    deadline = time.time() + self._flush_sec
+    while len(batch) < self._batch_size:
+      remaining = deadline - time.time()
+      if remaining <= 0:
+        break
+      try:
+        batch.append(q.get(timeout=remaining))
+      except queue.Empty:
+        break
+    return batch
+
+  def _refresh_version(self):
+    if time.time() - self._version_time < self._version_refresh_sec:
+      return
+    # Only try once per interval, and keep the last known version on errors.
+    self._version_time = time.time()
+    try:
+      self._version_str = json.dumps(_get_version())
+    except Exception:
+      logging.exception('Failed to get versions for the query log')
+
+  def _write(self, batch: List[Tuple[Dict, Dict]]):
+    if self._project_id is None:
+      self._project_id = get_project_id()
+    self._refresh_version()
+    counters = collections.Counter()
+    rows = [
+        _make_row(self._table, self._project_id, self._version_str,
+                  session_info, data, counters) for session_info, data in batch
+    ]
+    statuses = self._table.mutate_rows(rows)
+    failed = sum(1 for status in statuses if status.code != 0)
+    counters['failed'] += failed
+    counters['written'] += len(rows) - failed
+    counters['batches'] += 1
+    with self._lock:
+      self._counters.update(counters)
+
+
+def write_row(session_info: Dict, data: Dict) -> bool:
+  """
+  Queues a query log row for the background writer. Returns False if query
+  logging is disabled or the row is dropped.
+  """
+  writer: QueryLogWriter = current_app.config.get(QUERY_LOG_WRITER_KEY)
+  if not writer:
+    return False
+  return writer.submit(session_info, data)
 
 
 def read_success_rows():
@@ -17,7 +17,9 @@ import asyncio
 import collections
 import json
 import logging
+import time
 from typing import Dict, List
+from urllib.parse import urlparse
 
 from flask import current_app
 from flask import g
@@ -27,13 +29,18 @@ from flask import request
 import requests
 
 from server.lib import log
+from server.lib import sv_hierarchy
+from server.lib import tracing
 from server.lib.cache import cache
 from server.lib.cache import memoize_and_log_mixer_usage
+from server.lib.cache import memoize_async_and_log_mixer_usage
 from server.lib.cache import should_skip_cache
 import server.lib.config as libconfig
 from server.routes import TIMEOUT
+from server.services.async_http import AsyncHttpClient
 from server.services.discovery import get_health_check_urls
 from server.services.discovery import get_service_url
+from shared.lib import metrics
 from shared.lib.constants import MIXER_RESPONSE_ID_FIELD
 from shared.lib.constants import MIXER_RESPONSE_ID_HEADER
 from shared.lib.constants import PLACE_TYPE_RANK
@@ -43,6 +50,22 @@ from shared.lib.constants import UNKNOWN_SURFACE
 cfg = libconfig.get_config()
 logger = logging.getLogger(__name__)
 
+# Pooled connections of the async calls, shared by all the requests of a
+# worker.
+_async_client = AsyncHttpClient()
+
+_CALLS = metrics.counter('backend_calls_total',
+                         'Calls to the mixer and NL server, by endpoint.',
+                         ['backend', 'endpoint', 'status'])
+_CALL_SECONDS = metrics.histogram(
+    'backend_call_duration_seconds',
+    'Time taken by the calls to the mixer and NL server, by endpoint.',
+    ['backend', 'endpoint'])
+_RESPONSE_BYTES = metrics.counter(
+    'backend_response_bytes_total',
+    'Bytes received from the mixer and NL server, by endpoint.',
+    ['backend', 'endpoint'])
+
 
 def get_basic_request_headers() -> dict:
   headers = {
@@ -66,14 +89,25 @@ def get_basic_request_headers() -> dict:
   return headers
 
 
-# Log the mixer response IDs to capture this call to mixer in the mixer usage logs
-@memoize_and_log_mixer_usage(timeout=TIMEOUT, unless=should_skip_cache)
-def get(url: str):
-  headers = get_basic_request_headers()
-  # Send the request and verify the request succeeded
-  call_logger = log.ExtremeCallLogger()
-  response = requests.get(url, headers=headers)
-  call_logger.finish(response)
+def _service_name(url: str) -> str:
+  """Returns the backend of a call, and its tracing span name: nl or mixer."""
+  nl_root = current_app.config.get('NL_ROOT') if has_app_context() else None
+  if nl_root and url.startswith(nl_root):
+    return 'nl'
+  return 'mixer'
+
+
+def _record_call(backend: str, endpoint: str, start: float,
+                 response: requests.Response):
+  _CALLS.inc(backend=backend, endpoint=endpoint, status=response.status_code)
+  _CALL_SECONDS.observe(time.perf_counter() - start,
+                        backend=backend,
+                        endpoint=endpoint)
+  _RESPONSE_BYTES.inc(len(response.content), backend=backend, endpoint=endpoint)
+
+
+def _response_json(response: requests.Response) -> Dict:
+  """Returns the JSON of a successful response, with its mixer response ID."""
   if response.status_code != 200:
     raise ValueError(
         "An HTTP {} code ({}) was returned by the mixer:\n{}".format(
@@ -88,6 +122,37 @@ def get(url: str):
   return res_json
 
 
+# Log the mixer response IDs to capture this call to mixer in the mixer usage logs
+@memoize_and_log_mixer_usage(timeout=TIMEOUT, unless=should_skip_cache)
+def get(url: str):
+  headers = get_basic_request_headers()
+  # Send the request and verify the request succeeded
+  call_logger = log.ExtremeCallLogger()
+  backend, endpoint = _service_name(url), urlparse(url).path
+  start = time.perf_counter()
+  with tracing.span(backend, url=endpoint) as span:
+    response = requests.get(url, headers=headers)
+    span.set(status=response.status_code, response_bytes=len(response.content))
+  _record_call(backend, endpoint, start, response)
+  call_logger.finish(response)
+  return _response_json(response)
+
+
+@memoize_async_and_log_mixer_usage(get, unless=should_skip_cache)
+async def get_async(url: str):
+  """Async version of get, sharing its cache."""
+  headers = get_basic_request_headers()
+  call_logger = log.ExtremeCallLogger()
+  backend, endpoint = _service_name(url), urlparse(url).path
+  start = time.perf_counter()
+  with tracing.span(backend, url=endpoint) as span:
+    response = await _async_client.request("GET", url, headers=headers)
+    span.set(status=response.status_code, response_bytes=len(response.content))
+  _record_call(backend, endpoint, start, response)
+  call_logger.finish(response)
+  return _response_json(response)
+
+
 def post(url: str, req: Dict):
 
   # Get json string so the request can be flask cached.
@@ -97,6 +162,12 @@ def post(url: str, req: Dict):
   return post_wrapper(url, req_str)
 
 
+async def post_async(url: str, req: Dict):
+  """Async version of post, sharing its cache."""
+  req_str = json.dumps(req, sort_keys=True)
+  return await post_wrapper_async(url, req_str)
+
+
 # Log the mixer response IDs to capture this call to mixer in the mixer usage logs
 @memoize_and_log_mixer_usage(timeout=TIMEOUT, unless=should_skip_cache)
 def post_wrapper(url, req_str: str, headers_str: str | None = None):
@@ -106,21 +177,33 @@ def post_wrapper(url, req_str: str, headers_str: str | None = None):
 
   # Send the request and verify the request succeeded
   call_logger = log.ExtremeCallLogger(req, url=url)
-  response = requests.post(url, json=req, headers=headers)
+  backend, endpoint = _service_name(url), urlparse(url).path
+  start = time.perf_counter()
+  with tracing.span(backend, url=endpoint, request_bytes=len(req_str)) as span:
+    response = requests.post(url, json=req, headers=headers)
+    span.set(status=response.status_code, response_bytes=len(response.content))
+  _record_call(backend, endpoint, start, response)
   call_logger.finish(response)
+  return _response_json(response)
 
-  if response.status_code != 200:
-    raise ValueError(
-        "An HTTP {} code ({}) was returned by the mixer:\n{}".format(
-            response.status_code, response.reason,
-            response.json()["message"]))
-  res_json = response.json()
-  response_id = response.headers.get(MIXER_RESPONSE_ID_HEADER)
-  # This is used to log cached mixer usage and is a list to be compatible with other cached
-  # objects that include multiple mixer responses.
-  if response_id:
-    res_json[MIXER_RESPONSE_ID_FIELD] = [response_id]
-  return res_json
+
+@memoize_async_and_log_mixer_usage(post_wrapper, unless=should_skip_cache)
+async def post_wrapper_async(url, req_str: str, headers_str: str | None = None):
+  """Async version of post_wrapper, sharing its cache."""
+  req = json.loads(req_str)
+  headers = get_basic_request_headers()
+  call_logger = log.ExtremeCallLogger(req, url=url)
+  backend, endpoint = _service_name(url), urlparse(url).path
+  start = time.perf_counter()
+  with tracing.span(backend, url=endpoint, request_bytes=len(req_str)) as span:
+    response = await _async_client.request("POST",
+                                           url,
+                                           json=req,
+                                           headers=headers)
+    span.set(status=response.status_code, response_bytes=len(response.content))
+  _record_call(backend, endpoint, start, response)
+  call_logger.finish(response)
+  return _response_json(response)
 
 
 def obs_point(entities, variables, date="LATEST"):
@@ -132,18 +215,27 @@ def obs_point(entities, variables, date="LATEST"):
         date (optional): The date of the observation. If not set, the latest
             observation is returned.
     """
-  url = get_service_url("/v2/observation")
-  return post(
-      url, {
-          "select": ["date", "value", "variable", "entity"],
-          "entity": {
-              "dcids": sorted(entities)
-          },
-          "variable": {
-              "dcids": sorted(variables)
-          },
-          "date": date,
-      })
+  return post(get_service_url("/v2/observation"),
+              _obs_point_req(entities, variables, date))
+
+
+async def obs_point_async(entities, variables, date="LATEST"):
+  """Async version of obs_point."""
+  return await post_async(get_service_url("/v2/observation"),
+                          _obs_point_req(entities, variables, date))
+
+
+def _obs_point_req(entities, variables, date):
+  return {
+      "select": ["date", "value", "variable", "entity"],
+      "entity": {
+          "dcids": sorted(entities)
+      },
+      "variable": {
+          "dcids": sorted(variables)
+      },
+      "date": date,
+  }
 
 
 def obs_point_within(parent_entity,
@@ -185,6 +277,56 @@ def obs_point_within(parent_entity,
   return post(url, req)
 
 
+async def obs_existence_async(entities, variables):
+  """Gets which entities have observations of each variable, without the
+    observations.
+
+    Args:
+        entities: A list of entities DCIDs.
+        variables: A list of statistical variables.
+
+    Returns:
+        Dict with a key "byVariable", where each variable has a "byEntity" dict
+        keyed by the entities with observations of the variable.
+    """
+  return await post_async(
+      get_service_url("/v2/observation"), {
+          "select": ["variable", "entity"],
+          "entity": {
+              "dcids": sorted(entities)
+          },
+          "variable": {
+              "dcids": sorted(variables)
+          },
+      })
+
+
+async def obs_existence_within_async(parent_entity, child_type, variables):
+  """Gets which child places of a certain place type contained in a parent
+    place have observations of each variable, without the observations.
+
+    Args:
+        parent_entity: Parent place DCID as a string.
+        child_type: Type of child places as a string.
+        variables: List of statistical variable DCIDs each as a string.
+
+    Returns:
+        Same as obs_existence_async.
+    """
+  return await post_async(
+      get_service_url("/v2/observation"), {
+          "select": ["variable", "entity"],
+          "entity": {
+              "expression":
+                  "{0}<-containedInPlace+{{typeOf:{1}}}".format(
+                      parent_entity, child_type)
+          },
+          "variable": {
+              "dcids": sorted(variables)
+          },
+      })
+
+
 def obs_series(entities, variables, facet_ids=None):
   """Gets the observation time series for the given entities of the given
     variable.
@@ -283,13 +425,23 @@ def v2observation(select, entity, variable, filter=None):
       variable: A dict in the form of {'dcids':, 'expression':}
       filter: Optional dict in the form of {'facetIds': [...]} etc.
     """
+  return post(get_service_url("/v2/observation"),
+              _v2observation_req(select, entity, variable, filter))
+
+
+async def v2observation_async(select, entity, variable, filter=None):
+  """Async version of v2observation."""
+  return await post_async(get_service_url("/v2/observation"),
+                          _v2observation_req(select, entity, variable, filter))
+
+
+def _v2observation_req(select, entity, variable, filter):
   # Remove None from dcids and sort them. Note do not sort in place to avoid
   # changing the original input.
   if "dcids" in entity:
     entity["dcids"] = sorted([x for x in entity["dcids"] if x])
   if "dcids" in variable:
     variable["dcids"] = sorted([x for x in variable["dcids"] if x])
-  url = get_service_url("/v2/observation")
   req = {
       "select": select,
       "entity": entity,
@@ -297,7 +449,7 @@ def v2observation(select, entity, variable, filter=None):
   }
   if filter:
     req["filter"] = filter
-  return post(url, req)
+  return req
 
 
 def v2node(nodes, prop):
@@ -307,13 +459,19 @@ def v2node(nodes, prop):
         nodes: A list of node dcids.
         prop: The property to query for.
     """
-  return post(
-      get_service_url("/v2/node"),
-      {
-          "nodes": sorted(nodes),
-          "property": prop,
-      },
-  )
+  return post(get_service_url("/v2/node"), _v2node_req(nodes, prop))
+
+
+async def v2node_async(nodes, prop):
+  """Async version of v2node."""
+  return await post_async(get_service_url("/v2/node"), _v2node_req(nodes, prop))
+
+
+def _v2node_req(nodes, prop):
+  return {
+      "nodes": sorted(nodes),
+      "property": prop,
+  }
 
 
 def _merge_v2node_response(result, paged_response):
@@ -406,6 +564,10 @@ def variable_info(nodes: List[str]) -> Dict:
 @cache.memoize(timeout=TIMEOUT, unless=should_skip_cache)
 def get_variable_ancestors(dcid: str):
   """Gets the path of a stat var to the root of the stat var hierarchy."""
+  hierarchy = sv_hierarchy.get_hierarchy()
+  if hierarchy and dcid in hierarchy:
+    return hierarchy.get_ancestors(dcid)
+
   ancestors = []
   curr = dcid
   visited = {dcid}
@@ -690,6 +852,24 @@ def nl_search_vars(
     skip_topics="",
 ):
   """Search sv from NL server."""
+  return post(_nl_search_vars_url(index_types, reranker, skip_topics),
+              {"queries": queries})
+
+
+async def nl_search_vars_async(
+    queries,
+    index_types: List[str],
+    reranker="",
+    skip_topics="",
+):
+  """Async version of nl_search_vars."""
+  return await post_async(
+      _nl_search_vars_url(index_types, reranker, skip_topics),
+      {"queries": queries})
+
+
+def _nl_search_vars_url(index_types: List[str], reranker: str,
+                        skip_topics: str) -> str:
   idx_params = ",".join(index_types)
   nl_root = current_app.config["NL_ROOT"]
   url = f"{nl_root}/api/search_vars?idx={idx_params}"
@@ -697,7 +877,7 @@ def nl_search_vars(
     url = f"{url}&reranker={reranker}"
   if skip_topics:
     url = f"{url}&skip_topics={skip_topics}"
-  return post(url, {"queries": queries})
+  return url
 
 
 async def nl_search_vars_in_parallel(
@@ -716,8 +896,7 @@ async def nl_search_vars_in_parallel(
     """
 
   async def search_for_index(index):
-    result = await asyncio.to_thread(
-        nl_search_vars,
+    result = await nl_search_vars_async(
         queries=queries,
         index_types=[index],
         skip_topics="true" if skip_topics else "",
@@ -797,30 +976,26 @@ def filter_statvars(stat_vars, entities):
   )
 
 
-def safe_obs_point(entities, variables, date='LATEST'):
+async def safe_obs_existence_async(entities, variables):
+  """
+  Calls obs_existence_async with error handling.
+  If an error occurs, returns a dict with an empty byVariable key.
   """
-    Calls obs_point with error handling.
-    If an error occurs, returns a dict with an empty byVariable key.
-    """
   try:
-    return obs_point(entities, variables, date)
+    return await obs_existence_async(entities, variables)
   except Exception as e:
-    logger.error(f"Error in obs_point call: {str(e)}", exc_info=True)
+    logger.error(f"Error in obs_existence call: {str(e)}", exc_info=True)
     return {"byVariable": {}}
 
 
-def safe_obs_point_within(parent_entity,
-                          child_type,
-                          variables,
-                          date='LATEST',
-                          facet_ids=None):
+async def safe_obs_existence_within_async(parent_entity, child_type, variables):
   """
-  Calls obs_point_within with error handling.
+  Calls obs_existence_within_async with error handling.
   If an error occurs, returns a dict with an empty byVariable key.
   """
   try:
-    return obs_point_within(parent_entity, child_type, variables, date,
-                            facet_ids)
+    return await obs_existence_within_async(parent_entity, child_type,
+                                            variables)
   except Exception as e:
-    logger.error(f"Error in obs_point_within call: {str(e)}", exc_info=True)
+    logger.error(f"Error in obs_existence_within call: {str(e)}", exc_info=True)
     return {"byVariable": {}}
@@ -13,11 +13,13 @@
 # limitations under the License.
 
 import unittest
+from unittest import mock
 
 from flask import g
 from flask_caching import Cache
 
 from server.__init__ import create_app
+from server.lib import cache as lib_cache
 
 
 class TestCohortAwareCache(unittest.TestCase):
@@ -148,3 +150,32 @@ class TestCohortAwareCache(unittest.TestCase):
       self.assertEqual(local_cache.get("counter"), 55)
       local_cache.cache.dec("counter", 1)
       self.assertEqual(local_cache.get("counter"), 54)
+
+  def test_memoize_and_log_mixer_usage_counts_hits(self):
+    local_cache = Cache(
+        self.app,
+        config={
+            'CACHE_TYPE': 'server.lib.cache.cohort_aware_simple_cache_factory'
+        })
+    call_count = 0
+
+    with mock.patch.object(lib_cache, 'cache', local_cache):
+
+      @lib_cache.memoize_and_log_mixer_usage(timeout=300)
+      def my_logged_fn(val):
+        nonlocal call_count
+        call_count += 1
+        return {'value': val}
+
+    function = f'{my_logged_fn.__module__}.{my_logged_fn.__qualname__}'
+    with self.app.test_request_context():
+      self.assertEqual(my_logged_fn('foo'), {'value': 'foo'})
+      self.assertEqual(my_logged_fn('foo'), {'value': 'foo'})
+      self.assertEqual(my_logged_fn('bar'), {'value': 'bar'})
+      self.assertEqual(call_count, 2)
+
+    for result, count in [('hit', 1), ('miss', 2)]:
+      self.assertEqual(
+          lib_cache._CALLS.value(decorator='memoize',
+                                 function=function,
+                                 result=result), count)
@@ -0,0 +1,172 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import pickle
+import unittest
+
+from server.lib import fetch
+from server.lib.compact_obs import CompactPoints
+from server.lib.compact_obs import CompactSeries
+from shared.lib.constants import MIXER_RESPONSE_ID_FIELD
+
+_RESP = {
+    'byVariable': {
+        'Count_Person': {
+            'byEntity': {
+                'geoId/01': {
+                    'orderedFacets': [{
+                        'facetId':
+                            'f1',
+                        'obsCount':
+                            2,
+                        'earliestDate':
+                            '2020',
+                        'latestDate':
+                            '2021',
+                        'observations': [{
+                            'date': '2020',
+                            'value': 100
+                        }, {
+                            'date': '2021',
+                            'value': 101.5
+                        }]
+                    }, {
+                        'facetId': 'f2',
+                        'observations': [{
+                            'date': '2022'
+                        }]
+                    }]
+                },
+                'geoId/02': {
+                    'orderedFacets': [{
+                        'facetId': 'f2',
+                        'observations': [{
+                            'date': '2019',
+                            'value': 7
+                        }]
+                    }]
+                },
+                'geoId/03': {}
+            }
+        },
+        'Median_Age_Person': {
+            'byEntity': {
+                'geoId/01': {
+                    'orderedFacets': [{
+                        'facetId': 'f1',
+                        'obsCount': 1
+                    }]
+                }
+            }
+        },
+        'Count_Household': {}
+    },
+    'facets': {
+        'f1': {
+            'importName': 'import1'
+        },
+        'f2': {
+            'importName': 'import2'
+        },
+    },
+    MIXER_RESPONSE_ID_FIELD: ['id1']
+}
+
+
+class TestCompactObs(unittest.TestCase):
+
+  def test_same_as_compact_point(self):
+    for all_facets in [True, False]:
+      expected = fetch._compact_point(copy.deepcopy(_RESP), all_facets)
+      result = CompactPoints(copy.deepcopy(_RESP), all_facets)
+      self.assertEqual(result.to_dict(), expected)
+      self.assertEqual(result, expected)
+      self.assertEqual(result['data']['Count_Person']['geoId/01'],
+                       expected['data']['Count_Person']['geoId/01'])
+
+  def test_same_as_compact_series(self):
+    for all_facets in [True, False]:
+      expected = fetch._compact_series(copy.deepcopy(_RESP), all_facets)
+      result = CompactSeries(copy.deepcopy(_RESP), all_facets)
+      self.assertEqual(result.to_dict(), expected)
+      self.assertEqual(result, expected)
+
+  def test_accessors(self):
+    result = CompactSeries(copy.deepcopy(_RESP), False)
+    data = result.get('data', {})
+    self.assertEqual(list(data), [
+        'Count_Person',
+        'Median_Age_Person',
+        'Count_Household',
+    ])
+    self.assertIn('geoId/02', data['Count_Person'])
+    self.assertNotIn('geoId/04', data['Count_Person'])
+    self.assertNotIn('f1', data['Count_Person'])
+    self.assertEqual(data.get('Count_Household', {}).get('geoId/01', {}), {})
+    self.assertEqual(data['Count_Person']['geoId/02']['series'], [{
+        'date': '2019',
+        'value': 7
+    }])
+    self.assertEqual(data['Count_Person']['geoId/03'], {'series': []})
+    # Int and float values keep their types.
+    series = data['Count_Person']['geoId/01']['series']
+    self.assertIsInstance(series[0]['value'], int)
+    self.assertIsInstance(series[1]['value'], float)
+    self.assertEqual(result['facets'], {
+        'f1': {
+            'importName': 'import1'
+        },
+        'f2': {
+            'importName': 'import2'
+        }
+    })
+    self.assertEqual(result[MIXER_RESPONSE_ID_FIELD], ['id1'])
+    with self.assertRaises(KeyError):
+      result['unknown']
+
+  def test_pickle(self):
+    result = CompactSeries(copy.deepcopy(_RESP), True)
+    unpickled = pickle.loads(pickle.dumps(result))
+    self.assertEqual(unpickled.to_dict(), result.to_dict())
+    self.assertEqual(unpickled['data']['Count_Person']['geoId/02'],
+                     result['data']['Count_Person']['geoId/02'])
+
+  def test_pickle_is_smaller(self):
+    resp = {
+        'byVariable': {
+            'Count_Person': {
+                'byEntity': {
+                    f'geoId/{i:05d}': {
+                        'orderedFacets': [{
+                            'facetId':
+                                'f1',
+                            'observations': [{
+                                'date': str(year),
+                                'value': i * year
+                            } for year in range(2000, 2020)]
+                        }]
+                    } for i in range(500)
+                }
+            }
+        },
+        'facets': {
+            'f1': {}
+        }
+    }
+    compact = CompactSeries(copy.deepcopy(resp), False)
+    self.assertEqual(compact, fetch._compact_series(copy.deepcopy(resp), False))
+    self.assertLess(
+        len(pickle.dumps(compact)),
+        len(pickle.dumps(fetch._compact_series(copy.deepcopy(resp), False))))
@@ -0,0 +1,112 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import contextvars
+import threading
+import unittest
+
+from server.lib import executors
+
+_var = contextvars.ContextVar('var', default=None)
+
+
+class TestExecutors(unittest.IsolatedAsyncioTestCase):
+
+  def setUp(self):
+    self.release = threading.Event()
+    self.addCleanup(self.release.set)
+
+  def _pool(self, name: str, policy: str) -> executors.Pool:
+    return executors.Pool(
+        name, executors.PoolConfig(max_workers=1, max_queue=1, policy=policy))
+
+  async def _fill(self, pool: executors.Pool) -> list:
+    """Submits a running and a queued task that wait for self.release."""
+    tasks = [asyncio.create_task(pool.run(self.release.wait)) for _ in range(2)]
+    while executors._QUEUED_TASKS.value(pool=pool.name) != 1:
+      await asyncio.sleep(0.01)
+    return tasks
+
+  async def test_run(self):
+    _var.set('request')
+    name, value = await executors.run(
+        'place', lambda: (threading.current_thread().name, _var.get()))
+    self.assertTrue(name.startswith('executor-place'))
+    self.assertEqual(value, 'request')
+    with self.assertRaises(ZeroDivisionError):
+      await executors.run('place', lambda: 1 / 0)
+
+  async def test_reject(self):
+    pool = self._pool('test_reject', executors.REJECT)
+    tasks = await self._fill(pool)
+    self.assertEqual(executors._ACTIVE_THREADS.value(pool=pool.name), 1)
+    with self.assertRaises(executors.ExecutorRejectedError):
+      await pool.run(lambda: None)
+    self.assertEqual(
+        executors._FULL_POOL_TASKS.value(pool=pool.name,
+                                         policy=executors.REJECT), 1)
+    self.release.set()
+    await asyncio.gather(*tasks)
+    self.assertEqual(await pool.run(lambda: 1), 1)
+    self.assertEqual(executors._QUEUED_TASKS.value(pool=pool.name), 0)
+    self.assertEqual(executors._ACTIVE_THREADS.value(pool=pool.name), 0)
+    # The bucket counts of the three tasks, followed by their sum.
+    self.assertEqual(sum(executors._TASK_SECONDS.value(pool=pool.name)[:-1]), 3)
+
+  async def test_caller_runs(self):
+    pool = self._pool('test_caller_runs', executors.CALLER_RUNS)
+    tasks = await self._fill(pool)
+    self.assertEqual(await pool.run(threading.get_ident), threading.get_ident())
+    self.release.set()
+    await asyncio.gather(*tasks)
+
+  async def test_submit(self):
+    pool = self._pool('test_submit', executors.CALLER_RUNS)
+    self.assertNotEqual(
+        pool.submit(threading.get_ident).result(), threading.get_ident())
+    tasks = await self._fill(pool)
+    future = pool.submit(threading.get_ident)
+    self.assertTrue(future.done())
+    self.assertEqual(future.result(), threading.get_ident())
+    with self.assertRaises(ZeroDivisionError):
+      pool.submit(lambda: 1 / 0).result()
+    self.release.set()
+    await asyncio.gather(*tasks)
+
+  async def test_block(self):
+    pool = self._pool('test_block', executors.BLOCK)
+    tasks = await self._fill(pool)
+    blocked = asyncio.create_task(pool.run(lambda: 'done'))
+    cancelled = asyncio.create_task(pool.run(lambda: 'cancelled'))
+    await asyncio.sleep(0.05)
+    self.assertFalse(blocked.done())
+    cancelled.cancel()
+    self.release.set()
+    self.assertEqual(await blocked, 'done')
+    await asyncio.gather(*tasks)
+    with self.assertRaises(asyncio.CancelledError):
+      await cancelled
+    # The room of the cancelled caller was not leaked.
+    self.assertEqual(pool._in_flight, 0)
+
+  async def test_nested(self):
+    pool = self._pool('test_nested', executors.BLOCK)
+
+    def outer():
+      # A full pool can not run the inner task on another thread.
+      return asyncio.run(pool.run(threading.get_ident)), threading.get_ident()
+
+    inner, outer = await pool.run(outer)
+    self.assertEqual(inner, outer)
@@ -0,0 +1,187 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import unittest
+from unittest import mock
+
+from server.lib import cache as lib_cache
+from server.lib import existence_cache
+from server.lib import fetch
+from server.tests.utils import DictCache
+
+# Variables with data for each entity.
+_DATA = {
+    'geoId/06': ['Count_Person', 'Median_Age_Person'],
+    'geoId/06085': ['Count_Person'],
+}
+
+
+def _v2observation(select, entity, variable):
+  by_variable = {}
+  for var in variable['dcids']:
+    by_variable[var] = {
+        'byEntity': {
+            e: {} for e in entity['dcids'] if var in _DATA.get(e, [])
+        }
+    }
+  return {'byVariable': by_variable}
+
+
+def _series_facet(entities, variables):
+  by_variable = {}
+  for var in variables:
+    by_variable[var] = {
+        'byEntity': {
+            e: {
+                'orderedFacets': [{
+                    'facetId': f'{var}_facet',
+                    'obsCount': 2,
+                    'earliestDate': '2020',
+                    'latestDate': '2021'
+                }]
+            } for e in entities if var in _DATA.get(e, [])
+        }
+    }
+  facets = {f'{var}_facet': {'importName': var} for var in variables}
+  return {'byVariable': by_variable, 'facets': facets}
+
+
+class TestMissBatches(unittest.TestCase):
+
+  def test_grouped_by_missing_variables(self):
+    self.assertEqual(
+        existence_cache.miss_batches({
+            'a': {'v1', 'v2'},
+            'b': {'v1', 'v2'},
+            'c': {'v3'},
+            'd': set()
+        }), [(['v1', 'v2'], ['a', 'b']), (['v3'], ['c'])])
+
+  def test_many_batches_merged(self):
+    missing = {f'e{i}': {f'v{i}'} for i in range(6)}
+    self.assertEqual(
+        existence_cache.miss_batches(missing),
+        [([f'v{i}' for i in range(6)], [f'e{i}' for i in range(6)])])
+
+
+class TestExistenceCache(unittest.TestCase):
+
+  def setUp(self):
+    self.cache = DictCache()
+    patcher = mock.patch.object(lib_cache, 'cache', self.cache)
+    patcher.start()
+    self.addCleanup(patcher.stop)
+
+  @mock.patch.object(fetch.dc, 'v2observation', side_effect=_v2observation)
+  def test_observation_existence(self, mock_v2observation):
+    want = {
+        'Count_Person': {
+            'geoId/06': True,
+            'geoId/06085': True
+        },
+        'Median_Age_Person': {
+            'geoId/06': True,
+            'geoId/06085': False
+        }
+    }
+    variables = ['Count_Person', 'Median_Age_Person']
+    self.assertEqual(
+        fetch.observation_existence(variables, ['geoId/06', 'geoId/06085']),
+        want)
+    # Pairs without data are cached too.
+    self.assertEqual(len(self.cache.data), 4)
+    self.assertEqual(
+        fetch.observation_existence(variables, ['geoId/06085', 'geoId/06']),
+        want)
+    self.assertEqual(mock_v2observation.call_count, 1)
+
+    # Only the new pairs are fetched.
+    self.assertEqual(
+        fetch.observation_existence(['Count_Person', 'Count_Farm'],
+                                    ['geoId/06', 'geoId/06085', 'country/USA']),
+        {
+            'Count_Person': {
+                'geoId/06': True,
+                'geoId/06085': True,
+                'country/USA': False
+            },
+            'Count_Farm': {
+                'geoId/06': False,
+                'geoId/06085': False,
+                'country/USA': False
+            }
+        })
+    # The batches are fetched in parallel.
+    self.assertCountEqual(mock_v2observation.call_args_list[1:], [
+        mock.call(select=['variable', 'entity'],
+                  entity={'dcids': ['geoId/06', 'geoId/06085']},
+                  variable={'dcids': ['Count_Farm']}),
+        mock.call(select=['variable', 'entity'],
+                  entity={'dcids': ['country/USA']},
+                  variable={'dcids': ['Count_Farm', 'Count_Person']}),
+    ])
+
+  @mock.patch.object(fetch.dc, 'v2observation', side_effect=_v2observation)
+  def test_in_event_loop(self, mock_v2observation):
+    fetch.observation_existence(['Count_Person'], ['geoId/06'])
+
+    async def observation_existence():
+      # Two batches, fetched from within a running event loop.
+      return fetch.observation_existence(['Count_Person', 'Count_Farm'],
+                                         ['geoId/06', 'geoId/06085'])
+
+    self.assertEqual(
+        asyncio.run(observation_existence()), {
+            'Count_Person': {
+                'geoId/06': True,
+                'geoId/06085': True
+            },
+            'Count_Farm': {
+                'geoId/06': False,
+                'geoId/06085': False
+            }
+        })
+    self.assertEqual(mock_v2observation.call_count, 3)
+
+  @mock.patch.object(fetch.dc, 'series_facet', side_effect=_series_facet)
+  def test_series_facet(self, mock_series_facet):
+    want = {
+        'facets': {
+            'Median_Age_Person_facet': {
+                'importName': 'Median_Age_Person'
+            }
+        },
+        'data': {
+            'Median_Age_Person': {
+                'geoId/06': [{
+                    'facet': 'Median_Age_Person_facet',
+                    'obsCount': 2,
+                    'earliestDate': '2020',
+                    'latestDate': '2021'
+                }]
+            }
+        }
+    }
+    for _ in range(2):
+      resp = fetch.series_facet(['geoId/06', 'geoId/06085'],
+                                ['Median_Age_Person'], True)
+      self.assertEqual(resp, want)
+      # Changes made by the caller are not cached.
+      resp['facets']['Median_Age_Person_facet']['facetId'] = 'x'
+    mock_series_facet.assert_called_once()
+
+    # The single facet results are cached separately.
+    fetch.series_facet(['geoId/06'], ['Median_Age_Person'], False)
+    self.assertEqual(mock_series_facet.call_count, 2)
@@ -14,11 +14,15 @@
 
 # Tests for feature flag utility functions
 
+import json
 import unittest
+from unittest import mock
 
+from flask import Flask
 from flask import g
 
 from server.__init__ import create_app
+from server.lib import feature_flags
 from server.lib.feature_flags import FEATURE_FLAG_URL_OVERRIDE_DISABLE_PARAM
 from server.lib.feature_flags import FEATURE_FLAG_URL_OVERRIDE_ENABLE_PARAM
 from server.lib.feature_flags import is_feature_enabled
@@ -279,3 +283,102 @@ class TestFeatureFlags(unittest.TestCase):
     # Clean up configs
     self.app.config["DB_COHORT_FORCE_SPANNER_IPS"] = ""
     self.app.config["DB_COHORT_FORCE_NON_SPANNER_IPS"] = ""
+
+
+class TestFeatureFlagTable(unittest.TestCase):
+  """Tests the compiled feature flag decisions."""
+
+  def setUp(self):
+    self.app = Flask(__name__)
+    feature_flags.set_feature_flags(
+        self.app, {
+            'on': {
+                'enabled': True
+            },
+            'off': {
+                'enabled': False
+            },
+            'half': {
+                'enabled': True,
+                'rollout_percentage': 50
+            },
+        })
+
+  def test_decisions(self):
+    table = feature_flags.get_feature_flag_table(self.app)
+    self.assertEqual(table.get('on'), feature_flags.FlagDecision(True))
+    self.assertEqual(table.get('half'), feature_flags.FlagDecision(True, 50))
+    self.assertEqual(table.get('unknown'), feature_flags.FlagDecision(False))
+    with self.assertRaises(TypeError):
+      table.decisions['on'] = feature_flags.FlagDecision(False)
+
+  def test_config_read_only(self):
+    self.assertTrue(is_feature_enabled('on', app=self.app))
+    with self.assertRaises(TypeError):
+      self.app.config['FEATURE_FLAGS']['on']['enabled'] = False
+    with self.assertRaises(TypeError):
+      self.app.config['FEATURE_FLAGS'].pop('on')
+    self.assertTrue(is_feature_enabled('on', app=self.app))
+
+    # Changes go through set_feature_flags.
+    flags = dict(self.app.config['FEATURE_FLAGS'])
+    flags['on'] = {'enabled': False}
+    feature_flags.set_feature_flags(self.app, flags)
+    self.assertFalse(is_feature_enabled('on', app=self.app))
+
+  def test_config_replaced(self):
+    self.assertTrue(is_feature_enabled('on', app=self.app))
+    # A replaced config is compiled on next use, and read-only from then on.
+    self.app.config['FEATURE_FLAGS'] = {'on': {'enabled': False}}
+    self.assertFalse(is_feature_enabled('on', app=self.app))
+    with self.assertRaises(TypeError):
+      self.app.config['FEATURE_FLAGS']['on']['enabled'] = True
+    self.assertEqual(json.loads(json.dumps(self.app.config['FEATURE_FLAGS'])),
+                     {'on': {
+                         'enabled': False
+                     }})
+
+  @mock.patch.object(feature_flags.random, 'random')
+  def test_evaluated_once_per_request(self, mock_random):
+    mock_random.side_effect = [0.1, 0.9]
+    with self.app.test_request_context('/'):
+      self.assertTrue(is_feature_enabled('half'))
+      self.assertTrue(is_feature_enabled('half'))
+      self.assertTrue(is_feature_enabled('on'))
+    self.assertEqual(mock_random.call_count, 1)
+    with self.app.test_request_context('/'):
+      self.assertFalse(is_feature_enabled('half'))
+    # Outside of a request, every call is a new decision.
+    mock_random.side_effect = [0.1, 0.9]
+    self.assertTrue(is_feature_enabled('half', app=self.app))
+    self.assertFalse(is_feature_enabled('half', app=self.app))
+
+  def test_ip_prefix_set(self):
+    ips = feature_flags.IpPrefixSet([
+        '192.168.1.1', '10.0.0.0/8', '172.16.5.0/255.255.255.0',
+        '2001:db8::/32', '::1', 'invalid', '10.0.0.0/99'
+    ])
+    for ip in ['192.168.1.1', '10.5.2.3', '172.16.5.200', '2001:db8::5', '::1']:
+      self.assertIn(ip, ips)
+    for ip in ['192.168.1.2', '11.0.0.1', '172.16.6.1', '2001:db9::1', '', 'x']:
+      self.assertNotIn(ip, ips)
+    self.assertTrue(feature_flags.ip_in_list('10.1.1.1', ['10.1.0.0/16']))
+    self.assertFalse(feature_flags.ip_in_list('10.1.1.1', []))
+
+  def test_spanner_ip_lists_compiled_once(self):
+    feature_flags.set_feature_flags(
+        self.app,
+        {'divert_to_spanner': {
+            'enabled': True,
+            'rollout_percentage': 0
+        }})
+    self.app.config['DB_COHORT_FORCE_SPANNER_IPS'] = '192.168.1.1, 10.0.0.0/8'
+    feature_flags._compile_ip_list.cache_clear()
+    for ip, expected in [('10.1.2.3', True), ('192.168.1.1', True),
+                         ('192.168.1.2', False)]:
+      with self.app.test_request_context('/', headers={'X-Forwarded-For': ip
+                                                      }) as ctx:
+        self.assertEqual(
+            feature_flags.assign_spanner_cohort(self.app, ctx.request),
+            expected)
+    self.assertEqual(feature_flags._compile_ip_list.cache_info().misses, 1)
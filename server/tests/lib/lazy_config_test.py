@@ -0,0 +1,114 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import unittest
+
+from flask import Flask
+
+from server.lib import lazy_config
+
+
+class _LazyApp(Flask):
+  config_class = lazy_config.LazyConfig
+
+
+class TestLazyConfig(unittest.TestCase):
+
+  def setUp(self):
+    self.app = _LazyApp(__name__)
+    self.calls = []
+
+  def _loader(self, key, value, delay=0):
+
+    def load():
+      self.calls.append(key)
+      time.sleep(delay)
+      return value
+
+    return load
+
+  def test_built_on_first_access(self):
+    lazy_config.register(self.app, 'TOPIC_CACHE',
+                         self._loader('TOPIC_CACHE', {'main': 1}))
+    self.assertIn('TOPIC_CACHE', self.app.config)
+    self.assertEqual(self.calls, [])
+    self.assertEqual(self.app.config['TOPIC_CACHE'], {'main': 1})
+    self.assertEqual(self.app.config.get('TOPIC_CACHE'), {'main': 1})
+    self.assertEqual(self.app.config.get('MISSING', 'default'), 'default')
+    self.assertEqual(self.calls, ['TOPIC_CACHE'])
+    self.assertEqual(self.app.config.lazy_keys(), [])
+
+  def test_built_on_bulk_access(self):
+    lazy_config.register(self.app, 'A', self._loader('A', 'a'))
+    lazy_config.register(self.app, 'B', self._loader('B', 'b'))
+    self.assertEqual(self.app.config.copy()['A'], 'a')
+    self.assertEqual(self.calls, ['A', 'B'])
+    lazy_config.register(self.app, 'C', self._loader('C', 'c'))
+    self.assertEqual(dict(self.app.config.items())['C'], 'c')
+    lazy_config.register(self.app, 'D', self._loader('D', 'd'))
+    self.assertIn('d', self.app.config.values())
+    lazy_config.register(self.app, 'E', self._loader('E', 'e'))
+    self.assertEqual(dict(self.app.config)['E'], 'e')
+    self.assertEqual({**self.app.config}['E'], 'e')
+    lazy_config.register(self.app, 'F', self._loader('F', 'f'))
+    self.assertEqual(self.app.config.pop('F'), 'f')
+    self.assertEqual(self.calls, ['A', 'B', 'C', 'D', 'E', 'F'])
+    self.assertEqual(self.app.config.lazy_keys(), [])
+
+  def test_built_once_across_threads(self):
+    lazy_config.register(self.app, 'NL_BAD_WORDS',
+                         self._loader('NL_BAD_WORDS', ['a'], delay=0.05))
+    start = threading.Barrier(8)
+
+    def read(_):
+      start.wait()
+      return self.app.config['NL_BAD_WORDS']
+
+    with ThreadPoolExecutor(8) as executor:
+      results = list(executor.map(read, range(8)))
+    self.assertEqual(results, [['a']] * 8)
+    self.assertEqual(self.calls, ['NL_BAD_WORDS'])
+
+  def test_failed_load_is_retried(self):
+    results = [ValueError('unavailable'), 'data']
+
+    def load():
+      result = results.pop(0)
+      if isinstance(result, Exception):
+        raise result
+      return result
+
+    lazy_config.register(self.app, 'DISASTER_DASHBOARD_DATA', load)
+    with self.assertRaises(ValueError):
+      self.app.config['DISASTER_DASHBOARD_DATA']
+    self.assertEqual(self.app.config['DISASTER_DASHBOARD_DATA'], 'data')
+
+  def test_warmup(self):
+    for key in ['A', 'B', 'C']:
+      lazy_config.register(self.app, key, self._loader(key, key.lower()))
+    lazy_config.warmup(self.app, ['B', 'UNKNOWN'])
+    self.assertEqual(self.calls, ['B'])
+    self.assertEqual(sorted(self.app.config.lazy_keys()), ['A', 'C'])
+    lazy_config.warmup(self.app, [lazy_config.ALL_KEYS])
+    self.assertEqual(sorted(self.calls), ['A', 'B', 'C'])
+    self.assertEqual(self.app.config.lazy_keys(), [])
+
+  def test_plain_config_is_eager(self):
+    app = Flask(__name__)
+    lazy_config.register(app, 'TOPIC_CACHE', self._loader('TOPIC_CACHE', {}))
+    self.assertEqual(self.calls, ['TOPIC_CACHE'])
+    self.assertEqual(app.config['TOPIC_CACHE'], {})
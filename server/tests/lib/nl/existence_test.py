@@ -0,0 +1,187 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from server.lib.nl.common import utils
+import server.lib.nl.common.counters as ctr
+from server.lib.nl.detection.types import EventType
+from server.lib.nl.detection.types import Place
+from server.lib.nl.fulfillment import base
+from server.lib.nl.fulfillment import existence
+from server.lib.nl.fulfillment.types import ChartVars
+from server.lib.nl.fulfillment.types import PopulateState
+
+_COUNTY = Place(dcid='geoId/06085', name='Santa Clara', place_type='County')
+_STATE = Place(dcid='geoId/06', name='California', place_type='State')
+_COUNTRY = Place(dcid='country/USA', name='USA', place_type='Country')
+
+
+def _state(chart_vars_map):
+  uttr = MagicMock()
+  uttr.counters = ctr.Counters()
+  return PopulateState(uttr=uttr, chart_vars_map=chart_vars_map)
+
+
+def _sv_existence(places, svs, single_date, date_range, counters):
+  # Only the state has data.
+  if places != ['geoId/06']:
+    return {}, {}
+  return ({
+      sv: {
+          'geoId/06': {}
+      } for sv in svs
+  }, {
+      sv: {
+          'geoId/06': False
+      } for sv in svs
+  })
+
+
+class TestExistencePlanner(unittest.TestCase):
+
+  @patch.object(utils, 'event_existence_for_place')
+  @patch.object(utils,
+                'sv_existence_for_places_check_single_point',
+                side_effect=_sv_existence)
+  def test_plan(self, mock_sv_existence, mock_event_existence):
+    mock_event_existence.side_effect = lambda place, event, _: place == 'geoId/06'
+    state = _state({
+        'Count_Person': [ChartVars(svs=['Count_Person'])],
+        'Median_Age_Person': [
+            ChartVars(svs=['Median_Age_Person', 'Count_Person'])
+        ],
+        'fire': [ChartVars(event=EventType.FIRE)],
+    })
+    planner = existence.ExistencePlanner(state)
+    places_to_check_list = planner.plan([([_COUNTY], None), ([_STATE], None)])
+    self.assertEqual(places_to_check_list, [{
+        'geoId/06085': 'geoId/06085'
+    }, {
+        'geoId/06': 'geoId/06'
+    }])
+    self.assertEqual(mock_sv_existence.call_count, 2)
+    self.assertEqual(mock_event_existence.call_count, 2)
+    self.assertEqual(planner.get_event_existence('geoId/06085', EventType.FIRE),
+                     False)
+
+    # The trackers use the planned checks.
+    for place2keys, want_svs in [
+        (places_to_check_list[0], []),
+        (places_to_check_list[1], ['Count_Person', 'Median_Age_Person']),
+    ]:
+      tracker = existence.MainExistenceCheckTracker(state, place2keys,
+                                                    state.chart_vars_map,
+                                                    planner)
+      tracker.perform_existence_check()
+      self.assertEqual(sorted(tracker.existing_svs), want_svs)
+    self.assertEqual(mock_sv_existence.call_count, 2)
+    self.assertEqual(mock_event_existence.call_count, 2)
+    self.assertTrue(tracker.exist_sv_states[-1].chart_vars_list[0].exist_event)
+
+    # Other checks are not planned.
+    self.assertIsNone(planner.get_sv_existence(['geoId/06'], ['Count_Farm']))
+
+  @patch.object(utils, 'event_existence_for_place', return_value=False)
+  @patch.object(utils,
+                'sv_existence_for_places_check_single_point',
+                side_effect=_sv_existence)
+  def test_plan_in_event_loop(self, mock_sv_existence, _):
+    planner = existence.ExistencePlanner(
+        _state({'Count_Person': [ChartVars(svs=['Count_Person'])]}))
+
+    async def plan():
+      return planner.plan([([_COUNTY], None), ([_STATE], None)])
+
+    self.assertEqual(len(asyncio.run(plan())), 2)
+    self.assertEqual(mock_sv_existence.call_count, 2)
+
+
+class TestPlaceFallbackPlan(unittest.TestCase):
+
+  @patch.object(utils, 'get_immediate_parent_places')
+  def test_parent_places(self, mock_parent_places):
+    parents = {_COUNTY.dcid: [_STATE], _STATE.dcid: [_COUNTRY]}
+    mock_parent_places.side_effect = lambda dcid, _, __: parents.get(dcid, [])
+    state = _state({'Count_Person': [ChartVars(svs=['Count_Person'])]})
+
+    plan = base._FallbackPlan(final_place_type=None)
+    levels = list(base._place_fallback_levels(state, [_COUNTY], plan))
+    self.assertEqual([level.places for level in levels],
+                     [[_COUNTY], [_STATE], [_COUNTRY]])
+    self.assertEqual(levels[1].counters, [('parent_place_fallback', {
+        'child': 'geoId/06085',
+        'parent': 'geoId/06'
+    })])
+    self.assertEqual(plan.failure_counters, [])
+
+    # No fallback for comparisons.
+    state.disable_fallback = True
+    levels = list(
+        base._place_fallback_levels(state, [_COUNTY, _STATE],
+                                    base._FallbackPlan(final_place_type=None)))
+    self.assertEqual([level.places for level in levels], [[_COUNTY, _STATE]])
+
+  @patch.object(utils, 'event_existence_for_place')
+  @patch.object(utils, 'get_immediate_parent_places')
+  @patch.object(utils,
+                'sv_existence_for_places_check_single_point',
+                side_effect=_sv_existence)
+  def test_fallback_checks_run_once(self, mock_sv_existence, mock_parent_places,
+                                    mock_event_existence):
+    parents = {_COUNTY.dcid: [_STATE]}
+    mock_parent_places.side_effect = lambda dcid, _, __: parents.get(dcid, [])
+    state = _state({'Count_Person': [ChartVars(svs=['Count_Person'])]})
+    state.uttr.places = [_COUNTY]
+    with patch.object(base,
+                      '_add_charts_with_existence_check',
+                      return_value=False) as mock_add_charts:
+      self.assertFalse(base._add_charts_with_place_fallback(state, [_COUNTY]))
+    # Each level was checked when it was tried.
+    self.assertEqual(
+        [c.kwargs['places'] for c in mock_sv_existence.call_args_list],
+        [['geoId/06085'], ['geoId/06']])
+    self.assertEqual([c.args[1] for c in mock_add_charts.call_args_list],
+                     [[_COUNTY], [_STATE]])
+    mock_event_existence.assert_not_called()
+    self.assertEqual(
+        state.uttr.counters.get()['ERROR'], {
+            'parent_place_fallback': [{
+                'child': 'geoId/06085',
+                'parent': 'geoId/06'
+            }],
+            'failed_get_parent_places': [{
+                'dcid': 'geoId/06',
+                'type': utils.types.ContainedInPlaceType.COUNTRY
+            }]
+        })
+
+  @patch.object(utils, 'get_immediate_parent_places')
+  @patch.object(utils,
+                'sv_existence_for_places_check_single_point',
+                side_effect=_sv_existence)
+  def test_later_levels_not_planned(self, mock_sv_existence,
+                                    mock_parent_places):
+    state = _state({'Count_Person': [ChartVars(svs=['Count_Person'])]})
+    state.uttr.places = [_COUNTY]
+    with patch.object(base,
+                      '_add_charts_with_existence_check',
+                      return_value=True):
+      self.assertTrue(base._add_charts_with_place_fallback(state, [_COUNTY]))
+    # The first level has charts, so no parent is looked up or checked.
+    mock_parent_places.assert_not_called()
+    self.assertEqual(mock_sv_existence.call_count, 1)
@@ -18,6 +18,7 @@ from unittest.mock import patch
 
 from flask import Flask
 
+from server.lib import topic_cache
 from server.lib.nl.common import topic
 
 
@@ -434,3 +435,44 @@ class TestInvalidDcHandling(unittest.TestCase):
               'name': 'Parent Topic',
               'types': ['Topic']
           }])
+
+  @patch('server.lib.nl.common.topic.is_feature_enabled')
+  def test_get_topic_vars_recursive_cached(self, mock_is_feature_enabled):
+    mock_is_feature_enabled.return_value = False
+    nodes = [{
+        'dcid': ['dc/topic/Health'],
+        'typeOf': ['Topic'],
+        'relevantVariableList': ['sv1', 'dc/topic/Sub', 'sv4']
+    }, {
+        'dcid': ['dc/topic/Sub'],
+        'typeOf': ['Topic'],
+        'relevantVariableList': ['sv2', 'dc/svpg/sv3']
+    }, {
+        'dcid': ['dc/topic/Overridden'],
+        'typeOf': ['Topic'],
+        'relevantVariableList': ['sv1', 'dc/topic/AgricultureEmissionsByGas']
+    }]
+    self.app.config['TOPIC_CACHE'] = {
+        'main': topic_cache._load_nodes('main', nodes, {})
+    }
+    with self.app.app_context():
+      all_svs = ['sv1', 'sv2', 'dc/svpg/sv3', 'sv4']
+      self.assertIsNotNone(topic._cached_closure('dc/topic/Health', 'main'))
+      for max_svs in range(5):
+        want = all_svs[:max_svs + 1] if max_svs else all_svs
+        self.assertEqual(
+            topic.get_topic_vars_recurive('dc/topic/Health',
+                                          dc='main',
+                                          max_svs=max_svs), want)
+        # Same as the recursion through the cache members.
+        with patch.object(topic, '_cached_closure', return_value=None):
+          self.assertEqual(
+              topic.get_topic_vars_recurive('dc/topic/Health',
+                                            dc='main',
+                                            max_svs=max_svs), want)
+
+      # Overridden sub-topics are expanded with their override.
+      self.assertIsNone(topic._cached_closure('dc/topic/Overridden', 'main'))
+      self.assertEqual(
+          topic.get_topic_vars_recurive('dc/topic/Overridden', dc='main'),
+          ['sv1', 'dc/svpg/AgricultureEmissionsByGas'])
@@ -0,0 +1,207 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import unittest
+from unittest import mock
+
+from flask import Flask
+from flask_caching import Cache
+
+from server.lib import cache as lib_cache
+from server.lib import node_resolver
+from server.routes.shared_api import metadata
+
+# dcid -> prop -> node data
+_GRAPH = {
+    'Count_Person': {
+        '->name': {
+            'arcs': {
+                'name': {
+                    'nodes': [{
+                        'value': 'Total Population'
+                    }]
+                }
+            }
+        },
+        '->[memberOf,specializationOf]': {
+            'arcs': {
+                'memberOf': {
+                    'nodes': [{
+                        'dcid': 'dc/g/Demographics'
+                    }]
+                }
+            }
+        },
+    },
+    'Count_Person_Female': {
+        '->[memberOf,specializationOf]': {
+            'arcs': {
+                'memberOf': {
+                    'nodes': [{
+                        'dcid': 'dc/g/Person_Gender'
+                    }]
+                }
+            }
+        },
+    },
+    'dc/g/Person_Gender': {
+        '->[memberOf,specializationOf]': {
+            'arcs': {
+                'specializationOf': {
+                    'nodes': [{
+                        'dcid': 'dc/g/Demographics'
+                    }]
+                }
+            }
+        },
+    },
+    'dc/g/Demographics': {
+        '->name': {
+            'arcs': {
+                'name': {
+                    'nodes': [{
+                        'value': 'Demographics'
+                    }]
+                }
+            }
+        },
+        '->[memberOf,specializationOf]': {
+            'arcs': {
+                'specializationOf': {
+                    'nodes': [{
+                        'dcid': 'dc/g/Root'
+                    }]
+                }
+            }
+        },
+    },
+}
+
+
+def _v2node(nodes, prop):
+  return {'data': {n: _GRAPH.get(n, {}).get(prop, {}) for n in nodes}}
+
+
+@mock.patch('server.lib.node_resolver.dc.v2node_async', side_effect=_v2node)
+class TestNodeResolver(unittest.TestCase):
+
+  def setUp(self):
+    self.app = Flask(__name__)
+    self.cache = Cache(
+        self.app,
+        config={
+            'CACHE_TYPE': 'server.lib.cache.cohort_aware_simple_cache_factory'
+        })
+    patcher = mock.patch.object(lib_cache, 'cache', self.cache)
+    patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def test_dedupes_and_batches_per_property(self, mock_v2node):
+    resolver = node_resolver.NodeResolver()
+    resolver.add('->name', ['Count_Person', 'dc/g/Demographics'])
+    resolver.add('->name', ['Count_Person'])
+    resolver.add('->[memberOf,specializationOf]', ['Count_Person'])
+    with self.app.test_request_context():
+      asyncio.run(resolver.resolve())
+    self.assertEqual(mock_v2node.call_count, 2)
+    self.assertEqual(resolver.num_rounds, 1)
+    self.assertEqual(resolver.get_value('Count_Person', '->name', 'name'),
+                     'Total Population')
+    self.assertTrue(resolver.is_resolved('dc/g/Demographics', '->name'))
+
+    # Already resolved nodes are not requested again.
+    resolver.add('->name', ['Count_Person'])
+    self.assertFalse(resolver.has_pending())
+
+  def test_cached_per_dcid(self, mock_v2node):
+    with self.app.test_request_context():
+      resolver = node_resolver.NodeResolver()
+      resolver.add('->name', ['Count_Person'])
+      asyncio.run(resolver.resolve())
+
+      # A new request with an overlapping batch only fetches the new node.
+      resolver = node_resolver.NodeResolver()
+      resolver.add('->name', ['Count_Person', 'dc/g/Demographics'])
+      asyncio.run(resolver.resolve())
+    self.assertEqual(mock_v2node.call_args_list[-1],
+                     mock.call(['dc/g/Demographics'], '->name'))
+    self.assertEqual(resolver.get_value('Count_Person', '->name', 'name'),
+                     'Total Population')
+
+  def test_failed_lookup_raises(self, mock_v2node):
+
+    def fail_names(nodes, prop):
+      if prop == '->name':
+        raise ValueError('mixer error')
+      return _v2node(nodes, prop)
+
+    mock_v2node.side_effect = fail_names
+    resolver = node_resolver.NodeResolver()
+    resolver.add('->name', ['Count_Person'])
+    resolver.add('->[memberOf,specializationOf]', ['Count_Person'])
+    with self.app.test_request_context():
+      with self.assertRaises(node_resolver.NodeResolutionError):
+        asyncio.run(resolver.resolve())
+    self.assertFalse(resolver.is_resolved('Count_Person', '->name'))
+    self.assertIsNone(resolver.get_value('Count_Person', '->name', 'name'))
+    self.assertTrue(
+        resolver.is_resolved('Count_Person', '->[memberOf,specializationOf]'))
+
+    # The failed lookup was not cached, so it is fetched again.
+    mock_v2node.side_effect = _v2node
+    resolver = node_resolver.NodeResolver()
+    resolver.add('->name', ['Count_Person'])
+    with self.app.test_request_context():
+      asyncio.run(resolver.resolve())
+    self.assertEqual(mock_v2node.call_args_list[-1],
+                     mock.call(['Count_Person'], '->name'))
+    self.assertEqual(resolver.get_value('Count_Person', '->name', 'name'),
+                     'Total Population')
+
+  @mock.patch('server.routes.shared_api.metadata.sv_hierarchy.get_hierarchy',
+              return_value=None)
+  def test_categories_one_call_per_round(self, _, mock_v2node):
+    with self.app.test_request_context():
+      got = asyncio.run(
+          metadata.fetch_categories_async(
+              ['Count_Person', 'Count_Person_Female']))
+    self.assertEqual(got, {
+        'Count_Person': ['Demographics'],
+        'Count_Person_Female': ['Demographics'],
+    })
+    # Two levels of parents and one round of category names.
+    self.assertEqual(mock_v2node.call_count, 3)
+
+  @mock.patch('server.routes.shared_api.metadata.sv_hierarchy.get_hierarchy',
+              return_value=None)
+  def test_failed_categories_logged(self, _, mock_v2node):
+
+    def fail_second_level(nodes, prop):
+      if 'dc/g/Person_Gender' in nodes:
+        raise ValueError('mixer error')
+      return _v2node(nodes, prop)
+
+    mock_v2node.side_effect = fail_second_level
+    resolver = node_resolver.NodeResolver()
+    planner = metadata._CategoryPlanner(['Count_Person', 'Count_Person_Female'])
+    with self.app.test_request_context():
+      with self.assertRaises(node_resolver.NodeResolutionError):
+        asyncio.run(node_resolver.run_planners(resolver, planner))
+    with self.assertLogs(level='WARNING') as logs:
+      got = planner.result(resolver)
+    self.assertEqual(got, {'Count_Person': [], 'Count_Person_Female': []})
+    self.assertIn(
+        'Failed to resolve the categories of 2 stat vars: '
+        "['Count_Person', 'Count_Person_Female']", logs.output[0])
@@ -0,0 +1,83 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+import unittest
+
+from flask import Flask
+
+from server.lib import place_availability as pa
+
+_SVS = [f'sv{i}' for i in range(20)]
+
+_ENTRIES = {
+    pa.place_key('geoId/06'): ([['sv0', 'sv9', 'sv19']], 0),
+    pa.place_key('geoId/36'): ([['sv0', 'sv9', 'sv19']], 0),
+    pa.place_key('geoId/04'): ([[]], 0),
+    pa.child_key('geoId/06', 'County'): ([['sv0', 'sv1', 'sv2'], ['sv0', 'sv1'],
+                                          ['sv0']], pa.FLAG_GEO),
+    pa.child_key('country/USA', 'State'): ([['sv0'], [], []], 0),
+}
+
+
+class TestPlaceAvailability(unittest.TestCase):
+
+  def setUp(self):
+    tmp_dir = tempfile.TemporaryDirectory()
+    self.addCleanup(tmp_dir.cleanup)
+    self.path = os.path.join(tmp_dir.name, 'index')
+    pa.write_index(self.path, _SVS, _ENTRIES, version='v1')
+
+  def test_lookups(self):
+    index = pa.PlaceAvailability(self.path)
+    self.assertEqual(index.version, 'v1')
+    self.assertEqual(len(index), len(_ENTRIES))
+    self.assertEqual(index.place_svs('geoId/06', ['sv19', 'sv1', 'sv0']),
+                     ['sv19', 'sv0'])
+    self.assertEqual(index.place_svs('geoId/04', _SVS), [])
+    self.assertIsNone(index.place_svs('geoId/01', _SVS))
+
+    self.assertEqual(index.child_counts('geoId/06', 'County', _SVS), {
+        'sv0': 3,
+        'sv1': 2,
+        'sv2': 1
+    })
+    self.assertIsNone(index.child_counts('geoId/06', 'City', _SVS))
+    self.assertTrue(index.children_have_geo('geoId/06', 'County'))
+    self.assertFalse(index.children_have_geo('country/USA', 'State'))
+    self.assertIsNone(index.children_have_geo('geoId/06', 'City'))
+
+    self.assertTrue(index.covers(['sv0', 'sv19']))
+    self.assertFalse(index.covers(['sv0', 'Count_Person']))
+
+  def test_identical_rows_stored_once(self):
+    index = pa.PlaceAvailability(self.path)
+    # The empty row, the California and New York row, and the 3 County rows
+    # (the USA State row is the same as the last one).
+    self.assertEqual(index._keys_pos - index._rows_pos, 5 * 3)
+
+  def test_reloaded_when_replaced(self):
+    app = Flask(__name__)
+    app.config['PLACE_AVAILABILITY_INDEX_PATH'] = self.path
+    app.config['PLACE_AVAILABILITY_REFRESH_SEC'] = 0
+    with app.app_context():
+      self.assertEqual(pa.get_index().version, 'v1')
+      new_path = self.path + '.new'
+      pa.write_index(new_path, _SVS, {}, version='v2')
+      os.replace(new_path, self.path)
+      os.utime(self.path, (0, 0))
+      self.assertEqual(pa.get_index().version, 'v2')
+    with Flask(__name__).app_context():
+      self.assertIsNone(pa.get_index())
@@ -0,0 +1,184 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import concurrent.futures
+import time
+import unittest
+from unittest import mock
+
+from flask import Flask
+
+from server.lib import place_resolver
+from server.lib.nl.common import utils as nl_utils
+
+_NAMES = {'geoId/06': ['California'], 'geoId/06085': ['Santa Clara County']}
+
+_PARENTS = {
+    'geoId/06085': [{
+        'dcid': 'geoId/06',
+        'name': 'California',
+        'types': ['State', 'AdministrativeArea1']
+    }, {
+        'dcid': 'country/USA',
+        'name': 'United States',
+        'types': ['Country']
+    }]
+}
+
+_PLACE_INFO = {
+    'geoId/06': {
+        'node': 'geoId/06',
+        'info': {
+            'self': {
+                'dcid': 'geoId/06',
+                'name': 'California',
+                'type': 'State'
+            },
+            'parents': [{
+                'dcid': 'country/USA',
+                'name': 'United States',
+                'type': 'Country'
+            }]
+        }
+    }
+}
+
+
+def _property_values(nodes, prop, **kwargs):
+  if prop == 'name':
+    return {n: _NAMES.get(n, []) for n in nodes}
+  if prop == 'nameWithLanguage':
+    return {n: [f'{_NAMES[n][0]}@fr'] for n in nodes if n in _NAMES}
+  return {n: [] for n in nodes}
+
+
+def _slow(fn):
+
+  def slow_fn(*args, **kwargs):
+    time.sleep(0.05)
+    return fn(*args, **kwargs)
+
+  return slow_fn
+
+
+class TestPlaceResolver(unittest.TestCase):
+
+  def setUp(self):
+    self.mocks = {}
+    for name, side_effect in [
+        ('property_values', _property_values),
+        ('raw_property_values', lambda nodes, prop: {
+            n: _PARENTS.get(n, []) for n in nodes
+        }),
+    ]:
+      patcher = mock.patch.object(place_resolver.fetch,
+                                  name,
+                                  side_effect=side_effect)
+      self.mocks[name] = patcher.start()
+      self.addCleanup(patcher.stop)
+    patcher = mock.patch.object(
+        place_resolver.dc,
+        'get_place_info',
+        side_effect=lambda dcids:
+        {'data': [_PLACE_INFO[d] for d in dcids if d in _PLACE_INFO]})
+    self.mocks['get_place_info'] = patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def test_fields_fetched_once(self):
+    resolver = place_resolver.PlaceResolver()
+    self.assertEqual(resolver.get_names(['geoId/06', 'bogus']), {
+        'geoId/06': 'California',
+        'bogus': ''
+    })
+    self.assertEqual(resolver.get_names(['bogus', 'geoId/06085']), {
+        'bogus': '',
+        'geoId/06085': 'Santa Clara County'
+    })
+    self.assertEqual(self.mocks['property_values'].call_args_list, [
+        mock.call(['geoId/06', 'bogus'], 'name'),
+        mock.call(['geoId/06085'], 'name')
+    ])
+
+    self.assertEqual(resolver.get_i18n_names(['geoId/06'], ['fr', 'en']),
+                     {'geoId/06': ['California@fr']})
+    resolver.get_i18n_names(['geoId/06'], ['fr', 'en'])
+    self.assertEqual(self.mocks['property_values'].call_count, 3)
+    self.assertEqual(resolver.num_calls, 3)
+
+  def test_learned_from_parents_and_place_info(self):
+    resolver = place_resolver.PlaceResolver()
+    self.assertEqual(resolver.get_parents(['geoId/06085']), _PARENTS)
+    self.assertEqual(resolver.get_types(['geoId/06', 'country/USA']), {
+        'geoId/06': ['State', 'AdministrativeArea1'],
+        'country/USA': ['Country']
+    })
+    self.assertEqual(resolver.get_names(['geoId/06', 'country/USA']), {
+        'geoId/06': 'California',
+        'country/USA': 'United States'
+    })
+    self.mocks['property_values'].assert_not_called()
+
+    self.assertEqual(resolver.get_place_info(['geoId/06', 'bogus']),
+                     {'data': [_PLACE_INFO['geoId/06']]})
+    self.assertEqual(resolver.get_place_info(['bogus', 'geoId/06']),
+                     {'data': [_PLACE_INFO['geoId/06']]})
+    self.mocks['get_place_info'].assert_called_once_with(['geoId/06', 'bogus'])
+
+  def test_shared_across_threads(self):
+    resolver = place_resolver.PlaceResolver()
+    # Slow lookups, so that the threads ask for the same fields at once.
+    for m in self.mocks.values():
+      m.side_effect = _slow(m.side_effect)
+
+    def lookup(_):
+      return (resolver.get_names(['geoId/06', 'geoId/06085']),
+              resolver.get_parents(['geoId/06085']),
+              resolver.get_place_info(['geoId/06']),
+              resolver.get_i18n_names(['geoId/06'], ['fr']))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+      results = list(executor.map(lookup, range(8)))
+    for result in results:
+      self.assertEqual(result, ({
+          'geoId/06': 'California',
+          'geoId/06085': 'Santa Clara County'
+      }, _PARENTS, {
+          'data': [_PLACE_INFO['geoId/06']]
+      }, {
+          'geoId/06': ['California@fr']
+      }))
+    # Each field was fetched once, by the first thread to ask for it.
+    self.assertEqual(self.mocks['property_values'].call_count, 2)
+    self.assertEqual(self.mocks['raw_property_values'].call_count, 1)
+    self.assertEqual(self.mocks['get_place_info'].call_count, 1)
+
+  def test_request_scoped(self):
+    app = Flask(__name__)
+    with app.app_context():
+      resolver = place_resolver.get_place_resolver()
+      self.assertIs(place_resolver.get_place_resolver(), resolver)
+      self.assertEqual(nl_utils.parent_place_names('geoId/06085'),
+                       ['California', 'United States'])
+      self.assertEqual(
+          nl_utils.get_immediate_parent_places('geoId/06085', 'Country',
+                                               mock.MagicMock()),
+          [
+              nl_utils.types.Place(dcid='country/USA',
+                                   name='United States',
+                                   place_type='Country')
+          ])
+      self.assertEqual(self.mocks['raw_property_values'].call_count, 1)
+      self.mocks['property_values'].assert_not_called()
+    with app.app_context():
+      self.assertIsNot(place_resolver.get_place_resolver(), resolver)
@@ -0,0 +1,144 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from server.config import subject_page_pb2
+from server.lib import startup
+
+
+def _page_config(topic_name):
+  config = subject_page_pb2.SubjectPageConfig()
+  config.metadata.topic_name = topic_name
+  return config
+
+
+class TestStartupSnapshot(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp_dir = tempfile.TemporaryDirectory()
+    self.source_dir = os.path.join(self.tmp_dir.name, 'config')
+    os.mkdir(self.source_dir)
+    self.source_file = os.path.join(self.source_dir, 'chart.json')
+    with open(self.source_file, 'w') as f:
+      f.write('[]')
+    self.snapshot_path = os.path.join(self.tmp_dir.name, 'snapshot.pkl')
+    self.loads = []
+
+    def loader(key, value):
+
+      def load(_):
+        self.loads.append(key)
+        return value
+
+      return load
+
+    loaders = {
+        'TOPIC_PAGE_CONFIG':
+            loader('TOPIC_PAGE_CONFIG', {'health': [_page_config('Health')]}),
+        'CHART_CONFIG':
+            loader('CHART_CONFIG', [{
+                'statsVars': ['Count_Person']
+            }]),
+        'RANKED_STAT_VARS':
+            lambda c:
+            {v for chart in c.get('CHART_CONFIG') for v in chart['statsVars']},
+    }
+    for patcher in [
+        mock.patch.object(startup, '_LOADERS', loaders),
+        mock.patch.object(startup,
+                          '_source_files',
+                          return_value=[self.source_file])
+    ]:
+      patcher.start()
+      self.addCleanup(patcher.stop)
+
+  def tearDown(self):
+    self.tmp_dir.cleanup()
+
+  def test_load_snapshot(self):
+    self.assertEqual(startup.build_snapshot(self.snapshot_path),
+                     ['TOPIC_PAGE_CONFIG', 'CHART_CONFIG', 'RANKED_STAT_VARS'])
+    self.loads.clear()
+
+    config = startup.StaticConfig(self.snapshot_path)
+    self.assertTrue(config.from_snapshot)
+    self.assertEqual(config.get('RANKED_STAT_VARS'), {'Count_Person'})
+    self.assertEqual(config.get('TOPIC_PAGE_CONFIG'),
+                     {'health': [_page_config('Health')]})
+    self.assertEqual(self.loads, [])
+
+  def test_stale_snapshot(self):
+    startup.build_snapshot(self.snapshot_path)
+    self.loads.clear()
+    with open(self.source_file, 'w') as f:
+      f.write('[{}]')
+
+    self.assertIsNone(startup.load_snapshot(self.snapshot_path))
+    config = startup.StaticConfig(self.snapshot_path)
+    self.assertFalse(config.from_snapshot)
+    self.assertEqual(config.get('RANKED_STAT_VARS'), {'Count_Person'})
+    self.assertEqual(self.loads, ['CHART_CONFIG'])
+
+  def test_source_constant_change(self):
+    startup.build_snapshot(self.snapshot_path)
+    with mock.patch.object(startup.libutil, 'NL_CHART_TITLE_FILES',
+                           ['chart_titles_by_sv.json']):
+      self.assertIsNone(startup.load_snapshot(self.snapshot_path))
+
+  def test_version_change(self):
+    startup.build_snapshot(self.snapshot_path)
+    with mock.patch.object(startup, 'SNAPSHOT_VERSION',
+                           startup.SNAPSHOT_VERSION + 1):
+      self.assertIsNone(startup.load_snapshot(self.snapshot_path))
+
+  def test_missing_snapshot(self):
+    self.assertIsNone(startup.load_snapshot(self.snapshot_path))
+    self.assertFalse(startup.StaticConfig(self.snapshot_path).from_snapshot)
+
+
+class TestSourceFiles(unittest.TestCase):
+
+  def test_source_files(self):
+    files = startup._source_files()
+    root = startup.libutil.get_repo_root()
+    for path in [
+        'chart_config/economics.json', 'topic_page/sdg/sdg.textproto',
+        'geojson/geoJsonCoordinatesUN/earth_country_dp13.json',
+        'nl_page/topic_cache.json'
+    ]:
+      self.assertIn(os.path.join(root, 'config', path), files)
+    # Files no loader reads are left out.
+    self.assertNotIn(
+        os.path.join(root, 'config', 'nl_page', 'geminipro_prompt.txt'), files)
+
+
+class TestStartupTimer(unittest.TestCase):
+
+  @mock.patch.object(startup.time, 'perf_counter')
+  def test_phases(self, mock_perf_counter):
+    mock_perf_counter.side_effect = [10, 10.5, 12]
+    timer = startup.StartupTimer()
+    timer.end_phase('config')
+    timer.end_phase('routes')
+    self.assertEqual(timer.summary(), {
+        'total_sec': 2,
+        'phases': {
+            'config': 0.5,
+            'routes': 1.5
+        }
+    })
@@ -0,0 +1,164 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from flask import Flask
+
+from server.lib import sv_hierarchy
+from server.services import datacommons as dc
+
+_NODES = [
+    {
+        'dcid': 'dc/g/Demographics',
+        'name': 'Demographics',
+        'parents': ['dc/g/Root']
+    },
+    {
+        'dcid': 'dc/g/Health',
+        'name': 'Health',
+        'parents': ['dc/g/Root']
+    },
+    {
+        'dcid': 'dc/g/Person_Age',
+        'name': 'Person By Age',
+        'parents': ['dc/g/Demographics']
+    },
+    {
+        'dcid': 'dc/g/Custom_Age',
+        'parents': ['dc/g/Health']
+    },
+    {
+        'dcid': 'Count_Person',
+        'parents': ['dc/g/Demographics']
+    },
+    {
+        'dcid': 'Count_Person_Upto5Years',
+        'parents': ['dc/g/Person_Age', 'dc/g/Custom_Age']
+    },
+    {
+        'dcid': 'Orphan_SV',
+        'parents': []
+    },
+]
+
+
+class TestSvHierarchy(unittest.TestCase):
+
+  def setUp(self):
+    self.hierarchy = sv_hierarchy.SvHierarchy(_NODES, 'v1')
+
+  def test_contains(self):
+    self.assertIn('Count_Person', self.hierarchy)
+    self.assertIn('Orphan_SV', self.hierarchy)
+    # Only referenced as a parent, so not fully known.
+    self.assertNotIn('dc/g/Root', self.hierarchy)
+    self.assertNotIn('Unknown_SV', self.hierarchy)
+
+  def test_ancestors(self):
+    self.assertEqual(self.hierarchy.get_ancestors('Count_Person'),
+                     ['dc/g/Demographics'])
+    # Custom groups are preferred over the first parent alphabetically.
+    self.assertEqual(self.hierarchy.get_ancestors('Count_Person_Upto5Years'),
+                     ['dc/g/Custom_Age', 'dc/g/Health'])
+    self.assertEqual(self.hierarchy.get_ancestors('dc/g/Person_Age'),
+                     ['dc/g/Demographics'])
+    self.assertEqual(self.hierarchy.get_ancestors('dc/g/Demographics'), [])
+    self.assertEqual(self.hierarchy.get_ancestors('Orphan_SV'), [])
+
+  def test_top_categories(self):
+    self.assertEqual(
+        self.hierarchy.get_top_categories('Count_Person_Upto5Years'),
+        ['dc/g/Demographics', 'dc/g/Health'])
+    self.assertEqual(self.hierarchy.get_top_categories('Count_Person'),
+                     ['dc/g/Demographics'])
+    self.assertEqual(self.hierarchy.get_top_categories('Orphan_SV'), [])
+
+  def test_adjacency(self):
+    self.assertEqual(self.hierarchy.get_children('dc/g/Demographics'),
+                     ['dc/g/Person_Age', 'Count_Person'])
+    self.assertEqual(self.hierarchy.get_parents('Count_Person_Upto5Years'),
+                     ['dc/g/Custom_Age', 'dc/g/Person_Age'])
+    self.assertEqual(self.hierarchy.get_name('dc/g/Health'), 'Health')
+    self.assertEqual(self.hierarchy.get_name('Count_Person'), '')
+
+  def test_cycle(self):
+    hierarchy = sv_hierarchy.SvHierarchy([
+        {
+            'dcid': 'dc/g/A',
+            'parents': ['dc/g/B']
+        },
+        {
+            'dcid': 'dc/g/B',
+            'parents': ['dc/g/A']
+        },
+        {
+            'dcid': 'SV',
+            'parents': ['dc/g/A']
+        },
+    ])
+    self.assertEqual(hierarchy.get_ancestors('SV'), ['dc/g/A', 'dc/g/B'])
+    self.assertEqual(hierarchy.get_top_categories('SV'), [])
+
+  def test_get_hierarchy_from_snapshot(self):
+    with tempfile.TemporaryDirectory() as temp_dir:
+      path = os.path.join(temp_dir, 'sv_hierarchy.json')
+      with open(path, 'w') as f:
+        json.dump({'version': 'v1', 'nodes': _NODES}, f)
+      app = Flask(__name__)
+      app.config['SV_HIERARCHY_SNAPSHOT_PATH'] = path
+      with app.app_context():
+        hierarchy = sv_hierarchy.get_hierarchy()
+        self.assertEqual(hierarchy.version, 'v1')
+        self.assertIs(sv_hierarchy.get_hierarchy(), hierarchy)
+
+      app.config['SV_HIERARCHY_SNAPSHOT_PATH'] = ''
+      with app.app_context():
+        self.assertIsNone(sv_hierarchy.get_hierarchy())
+
+
+class TestVariableAncestors(unittest.TestCase):
+
+  @mock.patch('server.services.datacommons.v2node')
+  @mock.patch('server.services.datacommons.sv_hierarchy.get_hierarchy')
+  def test_uses_snapshot(self, mock_get_hierarchy, mock_v2node):
+    mock_get_hierarchy.return_value = sv_hierarchy.SvHierarchy(_NODES)
+    self.assertEqual(
+        dc.get_variable_ancestors.uncached('Count_Person_Upto5Years'),
+        ['dc/g/Custom_Age', 'dc/g/Health'])
+    mock_v2node.assert_not_called()
+
+  @mock.patch('server.services.datacommons.v2node')
+  @mock.patch('server.services.datacommons.sv_hierarchy.get_hierarchy')
+  def test_falls_back_for_unknown(self, mock_get_hierarchy, mock_v2node):
+    mock_get_hierarchy.return_value = sv_hierarchy.SvHierarchy(_NODES)
+    mock_v2node.side_effect = lambda nodes, _: {
+        'data': {
+            'New_SV': {
+                'arcs': {
+                    'memberOf': {
+                        'nodes': [{
+                            'dcid': 'dc/g/Root'
+                        }]
+                    }
+                }
+            }
+        }
+    } if nodes == ['New_SV'] else {}
+    self.assertEqual(dc.get_variable_ancestors.uncached('New_SV'), [])
+    mock_v2node.assert_called_once()
@@ -0,0 +1,128 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from flask import Flask
+
+from server.lib import cache as lib_cache
+from server.lib import sv_metadata
+from server.lib.nl.common import variable
+from server.tests.utils import DictCache
+
+_METADATA = {
+    'Count_Farm_Widget': {
+        'name': ['Total Population'],
+        'description': ['Number of people'],
+        'footnote': []
+    },
+    'Median_Age_Widget': {
+        'name': ['Median Age'],
+        'description': [],
+        'footnote': ['Census ACS']
+    },
+}
+
+_METADATA_EMPTY = {prop: [] for prop in sv_metadata.PROPS}
+
+
+class TestSvMetadataStore(unittest.TestCase):
+
+  def setUp(self):
+    self.cache = DictCache()
+    patcher = mock.patch.object(lib_cache, 'cache', self.cache)
+    patcher.start()
+    self.addCleanup(patcher.stop)
+    patcher = mock.patch.object(
+        sv_metadata.fetch,
+        'multiple_property_values',
+        side_effect=lambda nodes, props, max_pages:
+        {n: _METADATA.get(n, {p: [] for p in props}) for n in nodes})
+    self.mock_fetch = patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def test_all_properties_fetched_once(self):
+    store = sv_metadata.SvMetadataStore()
+    svs = ['Count_Farm_Widget', 'Median_Age_Widget', 'Bogus']
+    self.assertEqual(
+        store.get_values(svs, 'name'), {
+            'Count_Farm_Widget': ['Total Population'],
+            'Median_Age_Widget': ['Median Age'],
+            'Bogus': []
+        })
+    self.assertEqual(
+        store.get_values(svs, 'footnote')['Median_Age_Widget'], ['Census ACS'])
+    self.mock_fetch.assert_called_once_with(svs, sv_metadata.PROPS, max_pages=1)
+    self.assertEqual(store.num_calls, 1)
+
+    # Other requests read the shared cache, including stat vars without data.
+    store = sv_metadata.SvMetadataStore()
+    self.assertEqual(store.get(['Bogus']), {'Bogus': _METADATA_EMPTY})
+    self.assertEqual(store.num_calls, 0)
+
+  def test_keyed_by_max_pages(self):
+    store = sv_metadata.SvMetadataStore()
+    store.get(['Count_Farm_Widget'])
+    store.get(['Count_Farm_Widget'], max_pages=None)
+    self.assertEqual(self.mock_fetch.call_args_list, [
+        mock.call(['Count_Farm_Widget'], sv_metadata.PROPS, max_pages=1),
+        mock.call(['Count_Farm_Widget'], sv_metadata.PROPS, max_pages=None)
+    ])
+
+    # Both are cached, each under its own page limit.
+    store = sv_metadata.SvMetadataStore()
+    store.get(['Count_Farm_Widget'])
+    store.get(['Count_Farm_Widget'], max_pages=None)
+    self.assertEqual(store.num_calls, 0)
+
+  def test_seed(self):
+    store = sv_metadata.SvMetadataStore(
+        {'Count_Farm_Widget': _METADATA['Count_Farm_Widget']})
+    store.get(['Count_Farm_Widget', 'Median_Age_Widget'])
+    self.mock_fetch.assert_called_once_with(['Median_Age_Widget'],
+                                            sv_metadata.PROPS,
+                                            max_pages=1)
+
+  def test_load_seed(self):
+    self.assertEqual(sv_metadata.load_seed(''), {})
+    with tempfile.TemporaryDirectory() as tmp_dir:
+      path = os.path.join(tmp_dir, 'sv_metadata.json')
+      with open(path, 'w') as f:
+        json.dump({'version': '1', 'svs': _METADATA}, f)
+      self.assertEqual(sv_metadata.load_seed(path), _METADATA)
+      self.assertEqual(sv_metadata.load_seed(path + '.missing'), {})
+
+  def test_sv_details_single_call(self):
+    app = Flask(__name__)
+    app.config[sv_metadata.SEED_KEY] = {}
+    with app.app_context():
+      svs = ['Count_Farm_Widget', 'Median_Age_Widget']
+      self.assertEqual(
+          variable.get_sv_name(svs, {}), {
+              'Count_Farm_Widget': 'Total Population',
+              'Median_Age_Widget': 'Median Age'
+          })
+      self.assertEqual(variable.get_sv_description(svs), {
+          'Count_Farm_Widget': 'Number of people',
+          'Median_Age_Widget': ''
+      })
+      self.assertEqual(variable.get_sv_footnote(svs), {
+          'Count_Farm_Widget': '',
+          'Median_Age_Widget': 'Census ACS'
+      })
+    self.mock_fetch.assert_called_once()
@@ -0,0 +1,95 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from flask import Flask
+from flask import render_template
+import jinja2
+
+from server.lib import template_context
+
+
+class TestMenuContext(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp_dir = tempfile.TemporaryDirectory()
+    self.header_path = os.path.join(self.tmp_dir.name, 'header.json')
+    self.footer_path = os.path.join(self.tmp_dir.name, 'footer.json')
+    self._write(self.header_path, [{'label': 'Explore'}])
+    self._write(self.footer_path, {'links': []})
+
+  def tearDown(self):
+    self.tmp_dir.cleanup()
+
+  def _write(self, path, content, mtime=None):
+    with open(path, 'w') as f:
+      json.dump(content, f)
+    if mtime:
+      os.utime(path, (mtime, mtime))
+
+  def test_serialized_once(self):
+    menus = template_context.MenuContext(self.header_path, self.footer_path)
+    self.assertEqual(menus.get(), {
+        'HEADER_MENU': '[{"label": "Explore"}]',
+        'FOOTER_MENU': '{"links": []}'
+    })
+    self._write(self.header_path, [], mtime=1)
+    with mock.patch.object(template_context.libutil, 'get_json') as get_json:
+      self.assertEqual(menus.get()['HEADER_MENU'], '[{"label": "Explore"}]')
+      get_json.assert_not_called()
+
+  @mock.patch.object(template_context, '_RELOAD_CHECK_SEC', 0)
+  def test_reload(self):
+    menus = template_context.MenuContext(self.header_path,
+                                         self.footer_path,
+                                         reload=True)
+    first = menus.get()
+    self.assertIs(menus.get(), first)
+    self._write(self.header_path, [], mtime=1)
+    self.assertEqual(menus.get()['HEADER_MENU'], '[]')
+    self.assertEqual(menus.get()['FOOTER_MENU'], '{"links": []}')
+
+
+class TestRenderTiming(unittest.TestCase):
+
+  def test_server_timing_header(self):
+    app = Flask(__name__)
+    app.jinja_loader = jinja2.DictLoader({
+        'page.html': 'page {{ x }}',
+        'part.html': 'part'
+    })
+    template_context.init_render_timing(app)
+
+    @app.route('/page')
+    def page():
+      return render_template('page.html', x=render_template('part.html'))
+
+    @app.route('/json')
+    def json_route():
+      return {}
+
+    response = app.test_client().get('/page')
+    self.assertEqual(response.data, b'page part')
+    metrics = response.headers['Server-Timing'].split(', ')
+    self.assertEqual(len(metrics), 2)
+    self.assertTrue(metrics[0].startswith('render;desc="part.html";dur='))
+    self.assertTrue(metrics[1].startswith('render;desc="page.html";dur='))
+
+    response = app.test_client().get('/json')
+    self.assertNotIn('Server-Timing', response.headers)
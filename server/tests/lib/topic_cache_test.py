@@ -150,3 +150,71 @@ class TestTopicCacheLoader(unittest.TestCase):
     self.assertIn('var4', result.in_map)
     self.assertEqual(result.in_map['var1']['relevantVariable'], {'topic1'})
     self.assertEqual(result.in_map['var3']['member'], {'topic2'})
+
+
+def _node(dcid, members):
+  return {
+      'dcid': [dcid],
+      'typeOf': ['Topic'],
+      'name': [dcid],
+      'relevantVariableList': members
+  }
+
+
+class TestTopicGraph(unittest.TestCase):
+
+  def _cache(self, nodes):
+    return topic_cache._load_nodes(DCNames.MAIN_DC.value, nodes, {})
+
+  def test_members(self):
+    cache = self._cache([
+        _node('dc/topic/Health', ['Count_Person', 'dc/topic/Diseases']),
+        _node('dc/topic/Diseases', ['dc/svpg/Diseases', 'Count_Person'])
+    ])
+    graph = cache.graph
+    self.assertEqual(graph.get_members('dc/topic/Health'),
+                     ['Count_Person', 'dc/topic/Diseases'])
+    self.assertEqual(graph.get_members('Count_Person'), [])
+    self.assertEqual(graph.get_members('dc/topic/Missing'), [])
+    self.assertEqual(len(graph), 4)
+
+  def test_closure(self):
+    cache = self._cache([
+        _node('dc/topic/Health', [
+            'Count_Person', 'dc/topic/Diseases', 'dc/topic/Insurance',
+            'dc/topic/Diseases'
+        ]),
+        _node('dc/topic/Diseases', ['dc/svpg/Diseases', 'Count_Death']),
+        _node('dc/topic/Insurance', ['Count_Person_Insured']),
+    ])
+    closure = cache.graph.closure('dc/topic/Health')
+    self.assertEqual(
+        closure.vars,
+        ('Count_Person', 'dc/svpg/Diseases', 'Count_Death',
+         'Count_Person_Insured', 'dc/svpg/Diseases', 'Count_Death'))
+    self.assertEqual(
+        closure.topics,
+        {'dc/topic/Health', 'dc/topic/Diseases', 'dc/topic/Insurance'})
+    self.assertEqual(
+        cache.graph.closure('dc/topic/Diseases').vars,
+        ('dc/svpg/Diseases', 'Count_Death'))
+    self.assertIsNone(cache.graph.closure('Count_Person'))
+
+  def test_no_closure(self):
+    cache = self._cache([
+        # A sub-topic that is not in the cache.
+        _node('dc/topic/Economy', ['Count_Business', 'dc/topic/Uncached']),
+        # A cycle.
+        _node('dc/topic/A', ['dc/topic/B']),
+        _node('dc/topic/B', ['Count_Person', 'dc/topic/A']),
+    ])
+    self.assertIsNone(cache.graph.closure('dc/topic/Economy'))
+    self.assertIsNone(cache.graph.closure('dc/topic/A'))
+    self.assertIsNone(cache.graph.closure('dc/topic/B'))
+
+  def test_merge(self):
+    cache = self._cache([_node('dc/topic/Economy', ['dc/topic/Custom'])])
+    self.assertIsNone(cache.graph.closure('dc/topic/Economy'))
+    cache.merge(self._cache([_node('dc/topic/Custom', ['custom/sv1'])]))
+    self.assertEqual(
+        cache.graph.closure('dc/topic/Economy').vars, ('custom/sv1',))
@@ -0,0 +1,114 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import re
+import tempfile
+import unittest
+
+from flask import Flask
+
+from server.lib import cache as lib_cache
+from server.lib import executors
+from server.lib import tracing
+
+
+def _create_app(**config) -> Flask:
+  app = Flask(__name__)
+  app.config.update({
+      'TRACE_SAMPLE_RATE': 1,
+      'TRACE_EXPORT_ENDPOINT': '',
+      'TRACE_EXPORT_PATH': '',
+      **config
+  })
+  tracing.init(app)
+  cache = lib_cache.CohortAwareSimpleCache()
+  cache.set('cached', 'value')
+
+  @app.route('/api/<path:dcid>')
+  async def api(dcid):
+    with tracing.span('mixer', url='/v2/observation') as span:
+      span.set(response_bytes=2048)
+
+    def fetch():
+      with tracing.span('mixer', url='/v2/node') as span:
+        span.set(response_bytes=1024)
+
+    await executors.run('place', fetch)
+    cache.get('cached')
+    cache.get('missing')
+    cache.get_many('cached', 'missing', 'other')
+    return {}
+
+  return app
+
+
+def _metrics(response) -> dict:
+  """Returns the desc of each Server-Timing metric, by name."""
+  return {
+      name: desc
+      for name, desc in re.findall(r'(\w+);dur=[\d.]+(?:;desc="([^"]*)")?',
+                                   response.headers['Server-Timing'])
+  }
+
+
+class TestTracing(unittest.TestCase):
+
+  def test_server_timing(self):
+    response = _create_app().test_client().get('/api/geoId/06')
+    metrics = _metrics(response)
+    self.assertEqual(list(metrics), ['total', 'cache', 'mixer'])
+    self.assertEqual(metrics['mixer'], '2 calls, 3.0 KB')
+    self.assertEqual(metrics['cache'], '3 calls, 2/5 hits')
+
+  def test_not_sampled(self):
+    response = _create_app(TRACE_SAMPLE_RATE=0).test_client().get('/api/x')
+    self.assertNotIn('Server-Timing', response.headers)
+    self.assertIsNone(tracing.current())
+
+  def test_no_request(self):
+    with tracing.span('mixer') as span:
+      span.set(response_bytes=1)
+    self.assertIsNone(tracing.current())
+
+  def test_export_to_file(self):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+      path = os.path.join(tmp_dir, 'traces.jsonl')
+      app = _create_app(TRACE_EXPORT_PATH=path)
+      app.test_client().get(
+          '/api/geoId/06',
+          headers={
+              'traceparent':
+                  '00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01'
+          })
+      tracing.flush()
+      with open(path) as f:
+        spans = [
+            span for line in f
+            for resource_spans in json.loads(line)['resourceSpans']
+            for scope_spans in resource_spans['scopeSpans']
+            for span in scope_spans['spans']
+        ]
+
+    root = next(s for s in spans if s['name'] == 'GET /api/<path:dcid>')
+    self.assertEqual(root['traceId'], '0af7651916cd43dd8448eb211c80319c')
+    self.assertEqual(root['parentSpanId'], 'b7ad6b7169203331')
+    children = [s for s in spans if s is not root]
+    self.assertEqual(
+        sorted(s['name'] for s in children),
+        ['cache.get', 'cache.get', 'cache.get_many', 'mixer', 'mixer'])
+    for span in children:
+      self.assertEqual(span['traceId'], root['traceId'])
+      self.assertEqual(span['parentSpanId'], root['spanId'])
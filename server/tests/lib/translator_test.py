@@ -12,14 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
 from dataclasses import dataclass
 import unittest
 from unittest.mock import Mock
 from unittest.mock import patch
 
 from server.lib.nl.common.counters import Counters
+from server.lib.translator import detect_lang_and_translate
 from server.lib.translator import translate_page_config
 from server.lib.translator import TranslationStringTokenizer
+from server.tests.utils import DictCache
 
 
 def get_config(strings: list[str]) -> dict:
@@ -82,10 +85,81 @@ class TestTranslatePageConfig(unittest.TestCase):
   def test_translate_page_config(self, mock_translate_func: Mock):
     self.maxDiff = None
     mock_translate_func.return_value = TRANSLATE_API_RETURN_VALUE
-    result = translate_page_config(INPUT_PAGE_CONFIG, "hi", Counters())
+    result = translate_page_config(copy.deepcopy(INPUT_PAGE_CONFIG), "hi",
+                                   Counters())
     self.assertEqual(result, TRANSLATED_PAGE_CONFIG)
 
 
+class TestTranslationCache(unittest.TestCase):
+
+  def setUp(self):
+    self.cache = DictCache()
+    patcher = patch("server.lib.cache.cache", self.cache)
+    patcher.start()
+    self.addCleanup(patcher.stop)
+
+  @patch("server.lib.translator._translate")
+  def test_only_missing_strings_are_sent(self, mock_translate_func: Mock):
+    self.maxDiff = None
+    mock_translate_func.return_value = TRANSLATE_API_RETURN_VALUE
+    result = translate_page_config(copy.deepcopy(INPUT_PAGE_CONFIG), "hi",
+                                   Counters())
+    self.assertEqual(result, TRANSLATED_PAGE_CONFIG)
+    self.assertEqual(len(self.cache.data), len(TRANSLATIONS))
+
+    # Same strings, so nothing is sent.
+    mock_translate_func.reset_mock()
+    result = translate_page_config(copy.deepcopy(INPUT_PAGE_CONFIG), "hi",
+                                   Counters())
+    self.assertEqual(result, TRANSLATED_PAGE_CONFIG)
+    mock_translate_func.assert_not_called()
+
+    # Only the new string is sent, and tokens are reinserted in both cached
+    # and new translations.
+    mock_translate_func.return_value = ["Translated new ___ token"]
+    result = translate_page_config(
+        get_config([
+            TRANSLATIONS[0].original, TRANSLATIONS[1].original,
+            "New ${year} token", TRANSLATIONS[3].original
+        ]), "hi", Counters())
+    mock_translate_func.assert_called_once_with(["New ___ token"], "en", "hi")
+    self.assertEqual(
+        result,
+        get_config([
+            TRANSLATIONS[0].translated_with_reinserted_tokens,
+            TRANSLATIONS[1].translated_with_reinserted_tokens,
+            "Translated new ${year} token",
+            TRANSLATIONS[3].translated_with_reinserted_tokens
+        ]))
+
+    # Other target languages are not shared.
+    mock_translate_func.reset_mock()
+    mock_translate_func.return_value = TRANSLATE_API_RETURN_VALUE
+    translate_page_config(copy.deepcopy(INPUT_PAGE_CONFIG), "fr", Counters())
+    self.assertEqual(len(mock_translate_func.call_args.args[0]),
+                     len(TRANSLATIONS))
+
+  @patch("server.lib.translator.lang_detect", return_value="hi")
+  @patch("server.lib.translator._translate")
+  def test_query_translation(self, mock_translate_func: Mock, _):
+    mock_translate_func.return_value = ["population of india"]
+    self.assertEqual(detect_lang_and_translate("query", Counters()),
+                     ("hi", "population of india"))
+    self.assertEqual(detect_lang_and_translate("query", Counters()),
+                     ("hi", "population of india"))
+    mock_translate_func.assert_called_once()
+
+  @patch("server.lib.translator._translate")
+  def test_missing_translations_are_not_cached(self, mock_translate_func: Mock):
+    mock_translate_func.return_value = TRANSLATE_API_RETURN_VALUE[:2]
+    counters = Counters()
+    result = translate_page_config(copy.deepcopy(INPUT_PAGE_CONFIG), "hi",
+                                   counters)
+    self.assertEqual(result, INPUT_PAGE_CONFIG)
+    self.assertEqual(self.cache.data, {})
+    self.assertIn("translation_count_mismatch", counters.get()["ERROR"])
+
+
 class TestTranslationStringTokenizer(unittest.TestCase):
 
   @dataclass
@@ -727,6 +727,160 @@ class TestGetSeriesDatesFromEntities(unittest.TestCase):
     self.assertEqual(result, expected_output)
 
 
+class TestObsDateColumns(unittest.TestCase):
+
+  obs_series_response = {
+      "byVariable": {
+          "Count_Person": {
+              "byEntity": {
+                  "geoId/01": {
+                      "orderedFacets": [{
+                          "facetId": "2",
+                          "observations": [{
+                              "date": "2019"
+                          }, {
+                              "date": "2020"
+                          }]
+                      }, {
+                          "facetId": "1",
+                          "observations": [{
+                              "date": "2020"
+                          }]
+                      }]
+                  },
+                  "geoId/02": {
+                      "orderedFacets": [{
+                          "facetId": "1",
+                          "observations": [{
+                              "date": "2019"
+                          }, {
+                              "date": "2020"
+                          }]
+                      }]
+                  },
+                  "geoId/03": {}
+              }
+          },
+          "Count_Household": {
+              "byEntity": {
+                  "geoId/01": {
+                      "orderedFacets": [{
+                          "facetId": "2",
+                          "observations": [{
+                              "date": "2019"
+                          }]
+                      }]
+                  }
+              }
+          }
+      }
+  }
+
+  def test_matches_flattened_observations(self):
+    flattened_observations = lib_util.flatten_obs_series_response(
+        self.obs_series_response)
+    columns = lib_util.ObsDateColumns.from_obs_series_response(
+        self.obs_series_response)
+    self.assertEqual(
+        columns.dates_by_variable(),
+        lib_util.flattened_observations_to_dates_by_variable(
+            flattened_observations))
+    self.assertEqual(columns.dates_by_variable(), [{
+        'variable':
+            'Count_Household',
+        'observationDates': [{
+            'date': '2019',
+            'entityCount': [{
+                'count': 1,
+                'facet': '2'
+            }]
+        }]
+    }, {
+        'variable':
+            'Count_Person',
+        'observationDates': [{
+            'date':
+                '2019',
+            'entityCount': [{
+                'count': 1,
+                'facet': '1'
+            }, {
+                'count': 1,
+                'facet': '2'
+            }]
+        }, {
+            'date':
+                '2020',
+            'entityCount': [{
+                'count': 2,
+                'facet': '1'
+            }, {
+                'count': 1,
+                'facet': '2'
+            }]
+        }]
+    }])
+
+  def test_empty(self):
+    columns = lib_util.ObsDateColumns.from_obs_series_response(
+        {"byVariable": {}})
+    self.assertEqual(columns.dates_by_variable(), [])
+    self.assertIsNone(columns.get_highest_coverage_date(5, 5))
+    self.assertEqual(lib_util.flattened_observations_to_dates_by_variable([]),
+                     [])
+
+  @patch('server.lib.util.datetime')
+  def test_highest_coverage_date(self, mock_datetime):
+    mock_datetime.date.today.return_value = datetime.date(2024, 1, 1)
+    columns = lib_util.ObsDateColumns.from_obs_series_response(
+        self.obs_series_response)
+    dates_by_variable = columns.dates_by_variable()
+    # 2019 and 2020 both cover 2 entities, and 2019 is seen first because
+    # Count_Household comes first.
+    self.assertEqual(columns.get_highest_coverage_date(5, 5), '2019')
+    self.assertEqual(
+        lib_util._get_highest_coverage_date(dates_by_variable, 5, 5), '2019')
+    self.assertEqual(
+        columns.filter_facets(['1']).get_highest_coverage_date(5, 5), '2020')
+    self.assertIsNone(
+        columns.filter_facets(['3']).get_highest_coverage_date(5, 5))
+
+  @patch('server.lib.util.datetime')
+  def test_highest_coverage_date_unsorted_dates(self, mock_datetime):
+    mock_datetime.date.today.return_value = datetime.date(2024, 1, 1)
+    # Dates are read in reverse order of the response, whatever their order.
+    dates_by_variable = [{
+        'variable':
+            'Var1',
+        'observationDates': [{
+            'date': '2021',
+            'entityCount': [{
+                'count': 3,
+                'facet': '1'
+            }]
+        }, {
+            'date':
+                '2020',
+            'entityCount': [{
+                'count': 3,
+                'facet': '1'
+            }, {
+                'count': 1,
+                'facet': '2'
+            }]
+        }, {
+            'date': '2019',
+            'entityCount': []
+        }]
+    }, {
+        'variable': 'Var2'
+    }]
+    self.assertIsNone(
+        lib_util._get_highest_coverage_date(dates_by_variable, 1, 0))
+    self.assertEqual(
+        lib_util._get_highest_coverage_date(dates_by_variable, 2, 0), '2020')
+
+
 class TestFetchHighestCoverage(unittest.TestCase):
 
   mock_obs_series_labor_force_response = {
@@ -195,6 +195,20 @@ def mock_dc_api_data(stat_var: str,
     mock_obs_point_within.side_effect = mock_obs_point_within_side_effect
 
 
+def create_existence_data(stat_var: str, places: List[str]) -> Dict[str, any]:
+  """Creates a DC API obs existence response, where the places have data for
+  the stat var."""
+  return {
+      "byVariable": {
+          stat_var: {
+              "byEntity": {
+                  place: {} for place in places
+              }
+          }
+      }
+  }
+
+
 def _create_ordered_facets(data, facets, single_facet):
   ordered_facets = []
   if single_facet:
@@ -27,9 +27,9 @@ class TestPlaceAPI(unittest.TestCase):
   @patch('server.routes.shared_api.place.parent_places')
   @patch('server.lib.fetch.raw_property_values')
   @patch('server.lib.fetch.multiple_property_values')
-  @patch('server.services.datacommons.obs_point')
-  @patch('server.services.datacommons.obs_point_within')
-  def test_place_charts(self, mock_obs_point_within, mock_obs_point,
+  @patch('server.services.datacommons.obs_existence_async')
+  @patch('server.services.datacommons.obs_existence_within_async')
+  def test_place_charts(self, mock_obs_existence_within, mock_obs_existence,
                         mock_multiple_property_values, mock_raw_property_values,
                         mock_parent_places):
     """Test the place_charts endpoint."""
@@ -41,11 +41,11 @@ class TestPlaceAPI(unittest.TestCase):
       # Override the CHART_CONFIG with sample values
       app.config['CHART_CONFIG'] = mock_data.SAMPLE_PLACE_PAGE_CHART_CONFIG
 
-      # Mock obs_point call with a properly structured response
-      mock_obs_point.return_value = mock_data.OSERVATION_POINT_RESPONSE
+      # Mock obs_existence_async call with a properly structured response
+      mock_obs_existence.return_value = mock_data.OSERVATION_POINT_RESPONSE
 
-      # Mock obs_point_within for finding child places existence check for map-based stat vars
-      mock_obs_point_within.return_value = mock_data.OSERVATION_WITHIN_POINT_RESPONSE
+      # Mock obs_existence_within_async for finding child places existence check for map-based stat vars
+      mock_obs_existence_within.return_value = mock_data.OSERVATION_WITHIN_POINT_RESPONSE
 
       mock_multiple_property_values.return_value = mock_data.MULTIPLE_PROPERTY_VALUES_RESPONSE
 
@@ -90,7 +90,7 @@ class TestPlaceSummary(unittest.IsolatedAsyncioTestCase):
 
   def setUp(self):
     super().setUp()
-    self.mock_obs_point = self.patch(dc, "obs_point")
+    self.mock_obs_point = self.patch(dc, "obs_point_async")
     self.mock_fetch_place = self.patch(place_utils, "fetch_place")
     self.mock_get_parent_places = self.patch(place_utils, "get_parent_places")
 
@@ -15,7 +15,9 @@
 
 import copy
 from functools import wraps
+import os
 import random
+import tempfile
 from typing import Dict, List
 import unittest
 from unittest import mock
@@ -25,6 +27,8 @@ from flask_babel import Babel
 from flask_caching import Cache
 import pytest
 
+from server.lib import fetch
+from server.lib import place_availability
 from server.lib.cache import cache
 from server.routes.place import utils
 from server.routes.place.types import BlockConfig
@@ -314,13 +318,12 @@ class TestUtils(unittest.IsolatedAsyncioTestCase):
             None, [ServerBlockMetadata('PLACE', [ServerChartMetadata('BAR')])])
     ]
 
-    mock_data.mock_dc_api_data(stat_var='Count_Person',
-                               places=[mock_data.CALIFORNIA.dcid],
-                               dc_obs_point=True,
-                               dc_obs_points_within=True,
-                               mock_obs_point=self.mock_obs_point,
-                               mock_obs_point_within=self.mock_obs_point_within,
-                               data=[])
+    mock_existence = self.patch(dc, "safe_obs_existence_async")
+    mock_existence_within = self.patch(dc, "safe_obs_existence_within_async")
+    mock_existence.return_value = mock_data.create_existence_data(
+        'Count_Person', [])
+    mock_existence_within.return_value = mock_data.create_existence_data(
+        'Count_Person', [])
 
     # Assert the chart is there.
     filtered_configs = utils.filter_chart_config_for_data_existence(
@@ -344,22 +347,12 @@ class TestUtils(unittest.IsolatedAsyncioTestCase):
             None, [ServerBlockMetadata('PLACE', [ServerChartMetadata('BAR')])])
     ]
 
-    mock_data.mock_dc_api_data(stat_var='Count_Person',
-                               places=[mock_data.CALIFORNIA.dcid],
-                               dc_obs_point=True,
-                               mock_obs_point=self.mock_obs_point,
-                               mock_obs_point_within=self.mock_obs_point_within,
-                               data=list([1234, 321]))
-    mock_data.mock_dc_api_data(stat_var='Count_Person',
-                               places=[
-                                   mock_data.CALIFORNIA.dcid,
-                                   mock_data.ARIZONA.dcid,
-                                   mock_data.NEW_YORK.dcid
-                               ],
-                               dc_obs_points_within=True,
-                               mock_obs_point=self.mock_obs_point,
-                               mock_obs_point_within=self.mock_obs_point_within,
-                               data=[])
+    mock_existence = self.patch(dc, "safe_obs_existence_async")
+    mock_existence_within = self.patch(dc, "safe_obs_existence_within_async")
+    mock_existence.return_value = mock_data.create_existence_data(
+        'Count_Person', [mock_data.CALIFORNIA.dcid])
+    mock_existence_within.return_value = mock_data.create_existence_data(
+        'Count_Person', [])
 
     # Assert the chart is there.
     filtered_configs = utils.filter_chart_config_for_data_existence(
@@ -384,18 +377,12 @@ class TestUtils(unittest.IsolatedAsyncioTestCase):
             [ServerBlockMetadata('CHILD_PLACES', [ServerChartMetadata('BAR')])])
     ]
 
-    mock_data.mock_dc_api_data(stat_var='Count_Person',
-                               places=[mock_data.CALIFORNIA.dcid],
-                               dc_obs_point=True,
-                               mock_obs_point=self.mock_obs_point,
-                               mock_obs_point_within=self.mock_obs_point_within,
-                               data=[])
-    mock_data.mock_dc_api_data(stat_var='Count_Person',
-                               places=[mock_data.SANTA_CLARA_COUNTY.dcid],
-                               dc_obs_points_within=True,
-                               mock_obs_point=self.mock_obs_point,
-                               mock_obs_point_within=self.mock_obs_point_within,
-                               data=[])
+    mock_existence = self.patch(dc, "safe_obs_existence_async")
+    mock_existence_within = self.patch(dc, "safe_obs_existence_within_async")
+    mock_existence.return_value = mock_data.create_existence_data(
+        'Count_Person', [])
+    mock_existence_within.return_value = mock_data.create_existence_data(
+        'Count_Person', [])
 
     # Assert the chart is there.
     filtered_configs = utils.filter_chart_config_for_data_existence(
@@ -424,30 +411,19 @@ class TestUtils(unittest.IsolatedAsyncioTestCase):
             ])
     ]
 
-    mock_safe_obs_point = self.patch(dc, "safe_obs_point")
-    mock_safe_obs_point_within = self.patch(dc, "safe_obs_point_within")
-    mock_data.mock_dc_api_data(stat_var='Count_Person',
-                               places=[
-                                   mock_data.CALIFORNIA.dcid,
-                                   mock_data.NEW_YORK.dcid,
-                                   mock_data.ARIZONA.dcid
-                               ],
-                               dc_obs_point=True,
-                               mock_obs_point=mock_safe_obs_point,
-                               mock_obs_point_within=mock_safe_obs_point_within,
-                               data=list([1234, 321]))
-    mock_data.mock_dc_api_data(stat_var='Count_Person',
-                               places=[
-                                   mock_data.SANTA_CLARA_COUNTY.dcid,
-                                   mock_data.SAN_MATEO_COUNTY.dcid,
-                                   mock_data.CALIFORNIA.dcid,
-                                   mock_data.NEW_YORK.dcid,
-                                   mock_data.ARIZONA.dcid
-                               ],
-                               dc_obs_points_within=True,
-                               mock_obs_point=mock_safe_obs_point,
-                               mock_obs_point_within=mock_safe_obs_point_within,
-                               data=list([1234, 321]))
+    mock_existence = self.patch(dc, "safe_obs_existence_async")
+    mock_existence_within = self.patch(dc, "safe_obs_existence_within_async")
+    mock_existence.return_value = mock_data.create_existence_data(
+        'Count_Person', [
+            mock_data.CALIFORNIA.dcid, mock_data.NEW_YORK.dcid,
+            mock_data.ARIZONA.dcid
+        ])
+    mock_existence_within.return_value = mock_data.create_existence_data(
+        'Count_Person', [
+            mock_data.SANTA_CLARA_COUNTY.dcid, mock_data.SAN_MATEO_COUNTY.dcid,
+            mock_data.CALIFORNIA.dcid, mock_data.NEW_YORK.dcid,
+            mock_data.ARIZONA.dcid
+        ])
 
     # Assert the chart is there.
     filtered_configs = utils.filter_chart_config_for_data_existence(
@@ -474,6 +450,91 @@ class TestUtils(unittest.IsolatedAsyncioTestCase):
 
     self.assertEqual(filtered_configs, expected_configs)
 
+  def test_filter_chart_config_for_data_existence_from_index(self):
+    """Tests that the availability index answers the existence checks."""
+    configs = [
+        ServerChartConfiguration(
+            'Economics', 'CHART', 'CHART', 'description', ['Count_Person'],
+            None, [
+                ServerBlockMetadata(
+                    'CHILD_PLACES',
+                    [ServerChartMetadata('BAR'),
+                     ServerChartMetadata('MAP')])
+            ]),
+        ServerChartConfiguration(
+            'Economics', 'CHART', 'CHART', 'description', ['Median_Age_Person'],
+            None, [
+                ServerBlockMetadata('PLACE', [ServerChartMetadata('BAR')]),
+                ServerBlockMetadata('PEER_PLACES_WITHIN_PARENT',
+                                    [ServerChartMetadata('BAR')])
+            ]),
+        ServerChartConfiguration(
+            'Economics', 'CHART', 'CHART', 'description', ['Count_Person'],
+            None, [
+                ServerBlockMetadata('PLACE', [ServerChartMetadata('BAR')]),
+                ServerBlockMetadata(
+                    'PEER_PLACES_WITHIN_PARENT',
+                    [ServerChartMetadata('BAR'),
+                     ServerChartMetadata('MAP')])
+            ])
+    ]
+    svs = ['Count_Person', 'Median_Age_Person']
+    mock_existence = self.patch(dc, "safe_obs_existence_async")
+    mock_existence_within = self.patch(dc, "safe_obs_existence_within_async")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+      path = os.path.join(tmp_dir, 'place_availability.idx')
+      place_availability.write_index(
+          path,
+          svs,
+          {
+              place_availability.place_key(mock_data.CALIFORNIA.dcid):
+                  ([svs], 0),
+              place_availability.child_key(mock_data.CALIFORNIA.dcid, 'County'):
+                  ([['Count_Person'], ['Count_Person']
+                   ], place_availability.FLAG_GEO),
+              # California is one of the two states with Median_Age_Person.
+              place_availability.child_key(mock_data.USA.dcid, 'State'):
+                  ([svs, svs, ['Count_Person']], 0),
+          })
+      with self.app.app_context():
+        self.app.config['PLACE_AVAILABILITY_INDEX_PATH'] = path
+        try:
+          filtered_configs = utils.filter_chart_config_for_data_existence(
+              configs, mock_data.CALIFORNIA.dcid, mock_data.CALIFORNIA.types[0],
+              mock_data.SANTA_CLARA_COUNTY.types[0], mock_data.USA.dcid)
+        finally:
+          del self.app.config['PLACE_AVAILABILITY_INDEX_PATH']
+
+    mock_existence.assert_not_called()
+    mock_existence_within.assert_not_called()
+    self.mock_v2node.assert_not_called()
+    self.assertEqual(
+        filtered_configs,
+        [
+            ServerChartConfiguration(
+                'Economics', 'CHART', 'CHART', 'description', ['Count_Person'],
+                ['Count_Person'], [
+                    ServerBlockMetadata('CHILD_PLACES', [
+                        ServerChartMetadata('BAR'),
+                        ServerChartMetadata('MAP')
+                    ])
+                ]),
+            # The peer chart needs two other states with data.
+            ServerChartConfiguration(
+                'Economics', 'CHART', 'CHART', 'description',
+                ['Median_Age_Person'], ['Count_Person'],
+                [ServerBlockMetadata('PLACE', [ServerChartMetadata('BAR')])]),
+            # There is no geometry for the maps of states.
+            ServerChartConfiguration(
+                'Economics', 'CHART', 'CHART', 'description', ['Count_Person'],
+                ['Count_Person'], [
+                    ServerBlockMetadata('PLACE', [ServerChartMetadata('BAR')]),
+                    ServerBlockMetadata('PEER_PLACES_WITHIN_PARENT',
+                                        [ServerChartMetadata('BAR')])
+                ])
+        ])
+
   def test_filter_chart_config_for_data_existence_has_no_denominator_data(self):
     """Tests the filter_chart_config_for_data_existence function, which checks chart existence."""
     # Initialize the ServerChartConfig
@@ -494,30 +555,19 @@ class TestUtils(unittest.IsolatedAsyncioTestCase):
             ])
     ]
 
-    mock_safe_obs_point = self.patch(dc, "safe_obs_point")
-    mock_safe_obs_point_within = self.patch(dc, "safe_obs_point_within")
-    mock_data.mock_dc_api_data(stat_var='LifeExpectancy',
-                               places=[
-                                   mock_data.CALIFORNIA.dcid,
-                                   mock_data.NEW_YORK.dcid,
-                                   mock_data.ARIZONA.dcid
-                               ],
-                               dc_obs_point=True,
-                               mock_obs_point=mock_safe_obs_point,
-                               mock_obs_point_within=mock_safe_obs_point_within,
-                               data=list([1234, 321]))
-    mock_data.mock_dc_api_data(stat_var='LifeExpectancy',
-                               places=[
-                                   mock_data.CALIFORNIA.dcid,
-                                   mock_data.NEW_YORK.dcid,
-                                   mock_data.ARIZONA.dcid,
-                                   mock_data.SANTA_CLARA_COUNTY.dcid,
-                                   mock_data.SAN_MATEO_COUNTY.dcid
-                               ],
-                               dc_obs_points_within=True,
-                               mock_obs_point=mock_safe_obs_point,
-                               mock_obs_point_within=mock_safe_obs_point_within,
-                               data=list([1234, 321]))
+    mock_existence = self.patch(dc, "safe_obs_existence_async")
+    mock_existence_within = self.patch(dc, "safe_obs_existence_within_async")
+    mock_existence.return_value = mock_data.create_existence_data(
+        'LifeExpectancy', [
+            mock_data.CALIFORNIA.dcid, mock_data.NEW_YORK.dcid,
+            mock_data.ARIZONA.dcid
+        ])
+    mock_existence_within.return_value = mock_data.create_existence_data(
+        'LifeExpectancy', [
+            mock_data.CALIFORNIA.dcid, mock_data.NEW_YORK.dcid,
+            mock_data.ARIZONA.dcid, mock_data.SANTA_CLARA_COUNTY.dcid,
+            mock_data.SAN_MATEO_COUNTY.dcid
+        ])
 
     # Assert the chart is there.
     filtered_configs = utils.filter_chart_config_for_data_existence(
@@ -782,44 +832,45 @@ class TestUtils(unittest.IsolatedAsyncioTestCase):
     ])
 
   def test_multiple_places_for_stat_var(self):
-    obs_point_response = {
-        "byVariable": {
-            "stat_var_1": {
-                "byEntity": {
-                    "place_1": list([1234]),
-                    "place_2": list([1234]),
-                    "place_3": list([1234])
-                }
-            },
-            "stat_var_2": {
-                "byEntity": {
-                    "place_4": list([1234, 321])
-                }
-            }
-        }
+    places_with_data = {
+        "stat_var_1": ["place_1", "place_2", "place_3"],
+        "stat_var_2": ["place_4"]
     }
     stat_var_dcids = ["stat_var_1", "stat_var_2"]
     expected = {"stat_var_1": 2, "stat_var_2": 1}  # capped at 2
-    result = utils.count_places_per_stat_var(obs_point_response, stat_var_dcids,
+    result = utils.count_places_per_stat_var(places_with_data, stat_var_dcids,
                                              2)
     self.assertEqual(result, expected)
 
+  def test_places_to_consider(self):
+    places_with_data = {"stat_var_1": ["place_1", "place_2", "place_3"]}
+    result = utils.count_places_per_stat_var(places_with_data, ["stat_var_1"],
+                                             2, ["place_3", "place_4"])
+    self.assertEqual(result, {"stat_var_1": 1})
+
   def test_empty_response(self):
-    obs_point_response = {
-        "byVariable": {
-            "stat_var_1": {
-                "byEntity": {}
-            },
-            "stat_var_2": {
-                "byEntity": {}
-            }
-        }
-    }
     stat_var_dcids = ["stat_var_1", "stat_var_2"]
     expected = {}
-    result = utils.count_places_per_stat_var(obs_point_response, stat_var_dcids)
+    result = utils.count_places_per_stat_var({}, stat_var_dcids)
     self.assertEqual(result, expected)
 
+  def test_entities_with_data(self):
+    self.assertEqual(
+        fetch.entities_with_data({
+            "byVariable": {
+                "stat_var_1": {
+                    "byEntity": {
+                        "place_1": {},
+                        "place_2": {}
+                    }
+                },
+                "stat_var_2": {
+                    "byEntity": {}
+                },
+                "stat_var_3": {}
+            }
+        }), {"stat_var_1": ["place_1", "place_2"]})
+
   def test_filter_by_category(self):
     config = copy.deepcopy(SAMPLE_CHART_CONFIG)
     config2 = copy.deepcopy(SAMPLE_CHART_CONFIG)
@@ -1020,18 +1071,15 @@ class TestUtils(unittest.IsolatedAsyncioTestCase):
     self.assertEqual(resp[0].value, 150)  # The latest value
     self.assertEqual(resp[0].variableDcid, 'Count_Person')
 
-  def test_safe_api_error_handling(self):
-    """Tests that safe API calls handle errors gracefully."""
-    # Test safe_obs_point error handling
-    self.mock_obs_point.side_effect = Exception("API Error")
-    result = dc.safe_obs_point(["test_place"], ["test_var"])
-    self.assertEqual(result, {"byVariable": {}})
-
-    # Test safe_obs_point_within error handling
-    self.mock_obs_point_within.side_effect = Exception("API Error")
-    result = dc.safe_obs_point_within("test_place", "test_type", ["test_var"])
-    self.assertEqual(result, {"byVariable": {}})
-
-    # Verify both calls logged errors
-    self.mock_obs_point.assert_called_once()
-    self.mock_obs_point_within.assert_called_once()
+  async def test_safe_async_api_error_handling(self):
+    """Tests that safe async API calls handle errors gracefully."""
+    mock_post = self.patch(dc, "post_async")
+    mock_post.side_effect = Exception("API Error")
+    self.assertEqual(
+        await dc.safe_obs_existence_async(["test_place"], ["test_var"]),
+        {"byVariable": {}})
+    self.assertEqual(
+        await dc.safe_obs_existence_within_async("test_place", "test_type",
+                                                 ["test_var"]),
+        {"byVariable": {}})
+    self.assertEqual(mock_post.call_count, 2)
@@ -0,0 +1,137 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import threading
+import time
+import unittest
+from unittest import mock
+
+from flask import Flask
+
+import server.services.bigtable as bt
+
+
+class _Status:
+
+  def __init__(self, code):
+    self.code = code
+
+
+class _FakeRow:
+
+  def __init__(self, key):
+    self.key = key
+    self.cells = {}
+
+  def set_cell(self, family, col, value):
+    self.cells[col.decode()] = value
+
+
+class _FakeTable:
+
+  def __init__(self, fail_keys=()):
+    self.batches = []
+    self.fail_keys = set(fail_keys)
+    # Blocks writes until set.
+    self.unblocked = threading.Event()
+    self.unblocked.set()
+
+  def direct_row(self, key):
+    return _FakeRow(key)
+
+  def mutate_rows(self, rows):
+    self.unblocked.wait()
+    self.batches.append(rows)
+    return [_Status(1 if row.key in self.fail_keys else 0) for row in rows]
+
+
+@mock.patch.object(bt, 'get_project_id', return_value='proj')
+@mock.patch.object(bt.dc, 'nl_server_config', return_value={'idx': 'v1'})
+@mock.patch.object(bt.dc, 'version', return_value={'gitHash': 'abc'})
+class TestQueryLogWriter(unittest.TestCase):
+
+  def setUp(self):
+    self.app = Flask(__name__)
+
+  def test_batches_rows(self, mock_version, mock_nl_config, _):
+    table = _FakeTable()
+    table.unblocked.clear()
+    writer = bt.QueryLogWriter(self.app, table, batch_size=3, flush_sec=0.1)
+    for i in range(5):
+      self.assertTrue(writer.submit({'id': f's{i}'}, {'q': i}))
+    table.unblocked.set()
+    writer.flush()
+
+    self.assertEqual(sum(len(b) for b in table.batches), 5)
+    self.assertTrue(all(len(b) <= 3 for b in table.batches))
+    self.assertLess(len(table.batches), 5)
+    row = table.batches[0][0]
+    self.assertEqual(row.key, b's0#proj')
+    self.assertEqual(json.loads(row.cells['data']), {'q': 0})
+    self.assertEqual(json.loads(row.cells['version'])['mixer_hash'], 'abc')
+    # Versions are fetched once and reused for later batches.
+    mock_version.assert_called_once()
+    mock_nl_config.assert_called_once()
+    stats = writer.stats()
+    self.assertEqual(stats['queued'], 5)
+    self.assertEqual(stats['written'], 5)
+    self.assertEqual(stats['queue_size'], 0)
+
+  def test_drops_on_overflow(self, *_):
+    table = _FakeTable()
+    table.unblocked.clear()
+    writer = bt.QueryLogWriter(self.app,
+                               table,
+                               queue_size=2,
+                               batch_size=1,
+                               flush_sec=0)
+    self.assertTrue(writer.submit({'id': 's0'}, {}))
+    # Wait for the worker to take the first row and block on the write.
+    while writer.stats()['queue_size']:
+      time.sleep(0.01)
+    self.assertTrue(writer.submit({'id': 's1'}, {}))
+    self.assertTrue(writer.submit({'id': 's2'}, {}))
+    self.assertFalse(writer.submit({'id': 's3'}, {}))
+    # Rows without a session are not logged.
+    self.assertFalse(writer.submit({}, {}))
+    table.unblocked.set()
+    writer.flush()
+
+    stats = writer.stats()
+    self.assertEqual(stats['dropped'], 1)
+    self.assertEqual(stats['written'], 3)
+
+  def test_counts_failures(self, *_):
+    table = _FakeTable(fail_keys=[b's1#proj'])
+    writer = bt.QueryLogWriter(self.app, table)
+    writer.submit({'id': 's0'}, {'bad': {1, 2}})
+    writer.submit({'id': 's1'}, {})
+    writer.flush()
+
+    stats = writer.stats()
+    self.assertEqual(stats['unserializable'], 1)
+    self.assertEqual(stats['failed'], 1)
+    self.assertEqual(stats['written'], 1)
+    self.assertIn('FATAL', json.loads(table.batches[0][0].cells['data']))
+
+  def test_write_row(self, *_):
+    table = _FakeTable()
+    with self.app.app_context():
+      self.assertFalse(bt.write_row({'id': 's0'}, {}))
+      writer = bt.QueryLogWriter(self.app, table)
+      self.app.config[bt.QUERY_LOG_WRITER_KEY] = writer
+      self.assertTrue(bt.write_row({'id': 's0'}, {}))
+    writer.flush()
+    self.assertEqual(len(table.batches), 1)
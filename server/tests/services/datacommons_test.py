@@ -18,10 +18,12 @@ import unittest
 from unittest import mock
 
 from flask import Flask
-from requests import Response
+import httpx
 
 from server.lib.cache import cache
 from server.lib.cache import should_skip_cache
+from server.services import datacommons as dc
+from server.services.async_http import AsyncHttpClient
 from server.services.datacommons import _get_best_type
 from server.services.datacommons import get_basic_request_headers
 from server.services.datacommons import nl_search_vars
@@ -432,7 +434,7 @@ class TestServiceDataCommonsNLSearchVarsInParallel(
 
   def setUp(self):
     self.app = Flask(__name__)
-    self.app.config["NL_ROOT"] = "fake_root"
+    self.app.config["NL_ROOT"] = "http://fake_root"
     self.app.config["DC_API_KEY"] = "fake_key"
     self.app_context = self.app.app_context()
     self.app_context.push()
@@ -473,29 +475,87 @@ class TestServiceDataCommonsNLSearchVarsInParallel(
         "scoreThreshold": 0.7,
     }
 
-    def side_effect(url, *args, **kwargs):
-      resp = Response()
-      resp.status_code = 200
-
-      if "idx1" in url:
-        # Setting the ._content attribute automatically makes both resp.json() and resp.text available.
-        resp._content = json.dumps(idx1_result).encode('utf-8')
+    requests_sent = []
 
-      else:
-        resp._content = json.dumps(idx2_result).encode('utf-8')
+    def handler(request: httpx.Request) -> httpx.Response:
+      requests_sent.append(request)
+      if request.url.params["idx"] == "idx1":
+        return httpx.Response(200, json=idx1_result)
+      return httpx.Response(200, json=idx2_result)
 
-      return resp
-
-    with mock.patch('requests.post') as mock_post:
+    client = AsyncHttpClient(transport=httpx.MockTransport(handler))
+    self.addCleanup(client.close)
+    with mock.patch.object(dc, "_async_client", client):
       with self.app.test_request_context():
-        mock_post.side_effect = side_effect
-
         result = await nl_search_vars_in_parallel(queries=["foo"],
                                                   index_types=["idx1", "idx2"],
                                                   skip_topics=True)
 
         self.assertEqual(result, {"idx1": idx1_result, "idx2": idx2_result})
-        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(len(requests_sent), 2)
+        self.assertEqual(json.loads(requests_sent[0].content),
+                         {"queries": ["foo"]})
+
+
+class TestServiceDataCommonsAsync(unittest.IsolatedAsyncioTestCase):
+
+  def setUp(self):
+    self.app = Flask(__name__)
+    self.app.config["DC_API_KEY"] = "fake_key"
+    cache.init_app(self.app, config={"CACHE_TYPE": "SimpleCache"})
+    self.app_context = self.app.test_request_context()
+    self.app_context.push()
+    self.requests_sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+      self.requests_sent.append(request)
+      return httpx.Response(200,
+                            json={"data": {
+                                "dc/1": {}
+                            }},
+                            headers={"X-Response-Id": "id1"})
+
+    client = AsyncHttpClient(transport=httpx.MockTransport(handler))
+    self.addCleanup(client.close)
+    patcher = mock.patch.object(dc, "_async_client", client)
+    patcher.start()
+    self.addCleanup(patcher.stop)
+
+  def tearDown(self):
+    cache.clear()
+    self.app_context.pop()
+
+  async def test_post_async_shares_cache(self):
+    url = "http://mixer/v2/node"
+    req = {"nodes": ["dc/1"], "property": "->name"}
+    result = await dc.post_async(url, req)
+    self.assertEqual(result["data"], {"dc/1": {}})
+    self.assertEqual(json.loads(self.requests_sent[0].content), req)
+    self.assertEqual(self.requests_sent[0].headers["X-API-Key"], "fake_key")
+
+    # Both the async and the sync calls are served from the same entry.
+    self.assertEqual(await dc.post_async(url, req), result)
+    with mock.patch("requests.post") as mock_post:
+      self.assertEqual(dc.post(url, req), result)
+      mock_post.assert_not_called()
+    self.assertEqual(len(self.requests_sent), 1)
+
+  async def test_get_async_error(self):
+    requests_sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+      requests_sent.append(request)
+      return httpx.Response(500, json={"message": "boom"})
+
+    client = AsyncHttpClient(transport=httpx.MockTransport(handler))
+    self.addCleanup(client.close)
+    with mock.patch.object(dc, "_async_client", client):
+      with self.assertRaisesRegex(ValueError, "boom"):
+        await dc.get_async("http://mixer/version")
+      # Errors are not cached.
+      with self.assertRaisesRegex(ValueError, "boom"):
+        await dc.get_async("http://mixer/version")
+    self.assertEqual(len(requests_sent), 2)
 
 
 class TestGetBestType(unittest.TestCase):
@@ -15,13 +15,30 @@
 
 from typing import List
 
+from server.lib.feature_flags import set_feature_flags
+
 
 def mock_feature_flags(app,
                        flags: List[str],
                        enabled: bool,
                        rolloutPercent: int = None):
   """Mocks the feature flags"""
+  feature_flags = dict(app.config["FEATURE_FLAGS"])
   for flag in flags:
-    app.config["FEATURE_FLAGS"][flag] = {"enabled": enabled}
+    feature_flags[flag] = {"enabled": enabled}
     if rolloutPercent is not None:
-      app.config["FEATURE_FLAGS"][flag]["rollout_percentage"] = rolloutPercent
+      feature_flags[flag]["rollout_percentage"] = rolloutPercent
+  set_feature_flags(app, feature_flags)
+
+
+class DictCache:
+  """An in-memory stand-in for the shared cache, for server.lib.cache.cache."""
+
+  def __init__(self):
+    self.data = {}
+
+  def get_many(self, *keys):
+    return [self.data.get(k) for k in keys]
+
+  def set_many(self, mapping, timeout=None):
+    self.data.update(mapping)
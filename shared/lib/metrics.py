@@ -0,0 +1,466 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Prometheus metrics of the website and NL server workers, served at /metrics.
+
+Metrics are served when the ENABLE_METRICS environment variable is 'true' and
+METRICS_TOKEN is set; requests to /metrics must then send the token as in
+'Authorization: Bearer <token>', as set in the Prometheus scrape config.
+Each gunicorn worker records its metrics in memory and writes them to a file
+of its own in METRICS_DIR every few seconds and when it exits. /metrics, served
+by any worker, merges the files of all the workers into the Prometheus text
+format:
+- counters and histograms are summed over all the workers, including the ones
+  that have exited, so they only go down when the server restarts;
+- gauges are only read from live workers, and are summed, maxed or reported
+  per worker with a pid label, as set by their mode.
+
+Usage:
+
+  _CALLS = metrics.counter('mixer_calls_total', 'Calls to the mixer.',
+                           ['endpoint'])
+  _CALLS.inc(endpoint='/v2/node')
+
+Values recorded before gunicorn forks the workers (with --preload) are written
+by the master process; the counters and histograms of the workers start from
+zero, and their gauges keep the values set before the fork.
+"""
+
+import atexit
+import bisect
+import contextlib
+import glob
+import hmac
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+from flask import Flask
+from flask import g
+from flask import request
+from flask import Response
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30,
+                   60)
+# How a gauge is merged over the live workers.
+GAUGE_MODES = ('all', 'sum', 'max')
+
+_WRITE_INTERVAL_SEC = 5
+
+_lock = threading.Lock()
+_registry: Dict[str, '_Metric'] = {}
+
+# The directory of the metrics files, set by init.
+_dir: str = ''
+# The token /metrics requests must send, set by init.
+_token: bytes = b''
+# Called before the metrics of this process are written, eg. to set gauges.
+_collect: Callable[[], None] | None = None
+_writer_lock = threading.Lock()
+_writer_pid: int | None = None
+_exit_registered = False
+
+
+class _Metric:
+  type = ''
+
+  def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+    self.name = name
+    self.documentation = documentation
+    self.labelnames = tuple(labelnames)
+    self._values: Dict[Tuple[str, ...], object] = {}
+
+  def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+    if set(labels) != set(self.labelnames):
+      raise ValueError(
+          f'{self.name} has labels {list(self.labelnames)}, got {list(labels)}')
+    return tuple(str(labels[name]) for name in self.labelnames)
+
+  def value(self, **labels):
+    """Returns the value recorded by this process for the labels, or None."""
+    key = self._key(labels)
+    with _lock:
+      value = self._values.get(key)
+    return list(value) if isinstance(value, list) else value
+
+  def _reset(self):
+    self._values = {}
+
+  def _to_dict(self) -> Dict:
+    """Returns the values to write, called with the lock held."""
+    return {
+        'type': self.type,
+        'help': self.documentation,
+        'labelnames': list(self.labelnames),
+        'samples': [[list(k), v] for k, v in self._values.items()],
+    }
+
+
+class Counter(_Metric):
+  type = 'counter'
+
+  def inc(self, amount: float = 1, **labels):
+    key = self._key(labels)
+    with _lock:
+      self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+  type = 'gauge'
+
+  def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+               mode: str):
+    super().__init__(name, documentation, labelnames)
+    if mode not in GAUGE_MODES:
+      raise ValueError(f'Unknown gauge mode {mode}, expected one of '
+                       f'{GAUGE_MODES}')
+    self.mode = mode
+
+  def set(self, value: float, **labels):
+    key = self._key(labels)
+    with _lock:
+      self._values[key] = value
+
+  def _reset(self):
+    # Gauges hold state, which the workers share with the master process.
+    pass
+
+  def _to_dict(self) -> Dict:
+    return {**super()._to_dict(), 'mode': self.mode}
+
+
+class Histogram(_Metric):
+  type = 'histogram'
+
+  def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+               buckets: Sequence[float]):
+    super().__init__(name, documentation, labelnames)
+    self.buckets = sorted(buckets)
+
+  def observe(self, value: float, **labels):
+    key = self._key(labels)
+    # The count of each bucket (value <= bound) and then of +Inf, followed by
+    # the sum of the values.
+    i = bisect.bisect_left(self.buckets, value)
+    with _lock:
+      counts = self._values.get(key)
+      if counts is None:
+        counts = [0] * (len(self.buckets) + 1) + [0.0]
+        self._values[key] = counts
+      counts[i] += 1
+      counts[-1] += value
+
+  @contextlib.contextmanager
+  def time(self, **labels) -> Iterator[None]:
+    """Observes the seconds taken by the block."""
+    start = time.perf_counter()
+    try:
+      yield
+    finally:
+      self.observe(time.perf_counter() - start, **labels)
+
+  def _to_dict(self) -> Dict:
+    return {
+        **super()._to_dict(), 'buckets': self.buckets,
+        'samples': [[list(k), list(v)] for k, v in self._values.items()]
+    }
+
+
+def _register(metric: _Metric) -> _Metric:
+  with _lock:
+    existing = _registry.get(metric.name)
+    if existing is None:
+      _registry[metric.name] = metric
+      return metric
+  if (type(existing) is not type(metric) or
+      existing.labelnames != metric.labelnames):
+    raise ValueError(f'Metric {metric.name} is already registered differently')
+  return existing
+
+
+def counter(name: str, documentation: str,
+            labelnames: Sequence[str] = ()) -> Counter:
+  """Returns the counter of this name, registering it on first use."""
+  return _register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str,
+          documentation: str,
+          labelnames: Sequence[str] = (),
+          mode: str = 'all') -> Gauge:
+  """
+  Returns the gauge of this name, registering it on first use. Its values
+  from the live workers are reported with a pid label (mode 'all'), summed
+  (mode 'sum') or maxed (mode 'max').
+  """
+  return _register(Gauge(name, documentation, labelnames, mode))
+
+
+def histogram(name: str,
+              documentation: str,
+              labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+  """Returns the histogram of this name, registering it on first use."""
+  return _register(Histogram(name, documentation, labelnames, buckets))
+
+
+REQUEST_SECONDS = histogram('http_request_duration_seconds',
+                            'Time to serve requests, by blueprint.',
+                            ['blueprint', 'method', 'status'])
+
+
+def _snapshot() -> Dict:
+  if _collect:
+    try:
+      _collect()
+    except Exception:
+      logging.exception('Failed to collect metrics')
+  with _lock:
+    return {
+        'pid': os.getpid(),
+        'metrics': {
+            name: metric._to_dict() for name, metric in _registry.items()
+        }
+    }
+
+
+def _path(pid: int) -> str:
+  return os.path.join(_dir, f'{pid}.json')
+
+
+def write():
+  """Writes the metrics of this process to its file."""
+  if not _dir:
+    return
+  path = _path(os.getpid())
+  tmp_path = f'{path}.tmp'
+  try:
+    with open(tmp_path, 'w') as f:
+      json.dump(_snapshot(), f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+  except OSError:
+    logging.exception('Failed to write metrics to %s', path)
+
+
+def _write_periodically():
+  while True:
+    time.sleep(_WRITE_INTERVAL_SEC)
+    write()
+
+
+def _ensure_writer():
+  """Starts the writer thread of this process, on first use after a fork."""
+  global _writer_pid
+  if _writer_pid == os.getpid():
+    return
+  with _writer_lock:
+    if _writer_pid != os.getpid():
+      _writer_pid = os.getpid()
+      threading.Thread(target=_write_periodically,
+                       name='metrics-writer',
+                       daemon=True).start()
+
+
+def _after_fork_in_child():
+  global _lock, _writer_lock
+  # The lock may have been held by another thread of the parent.
+  _lock = threading.Lock()
+  _writer_lock = threading.Lock()
+  # What the parent counted is in the file of the parent.
+  for metric in _registry.values():
+    metric._reset()
+
+
+os.register_at_fork(before=write, after_in_child=_after_fork_in_child)
+
+
+def _is_alive(pid: int) -> bool:
+  if pid == os.getpid():
+    return True
+  try:
+    os.kill(pid, 0)
+  except ProcessLookupError:
+    return False
+  except OSError:
+    # Eg. the process of another user.
+    pass
+  return True
+
+
+def _read_snapshots() -> Iterator[Tuple[Dict, bool]]:
+  """Yields the snapshot of each process and whether it is alive."""
+  for path in glob.glob(os.path.join(_dir, '*.json')):
+    try:
+      with open(path) as f:
+        snapshot = json.load(f)
+    except (OSError, ValueError):
+      # Eg. deleted by _prune in another worker.
+      continue
+    yield snapshot, _is_alive(snapshot['pid'])
+
+
+def _prune():
+  """Deletes the files of the processes that have exited."""
+  for path in glob.glob(os.path.join(_dir, '*.json')):
+    pid = os.path.basename(path).split('.', 1)[0]
+    if pid.isdigit() and not _is_alive(int(pid)):
+      with contextlib.suppress(OSError):
+        os.remove(path)
+
+
+def _merge(snapshots: Iterator[Tuple[Dict, bool]]) -> Dict[str, Dict]:
+  merged: Dict[str, Dict] = {}
+  for snapshot, alive in snapshots:
+    pid = str(snapshot['pid'])
+    for name, metric in snapshot['metrics'].items():
+      kind = metric['type']
+      if kind == 'gauge' and not alive:
+        continue
+      out = merged.setdefault(name, {**metric, 'values': {}})
+      values = out['values']
+      for labels, value in metric['samples']:
+        key = tuple(labels)
+        if kind == 'histogram':
+          if key in values and len(values[key]) == len(value):
+            value = [a + b for a, b in zip(values[key], value)]
+        elif kind == 'counter':
+          value += values.get(key, 0)
+        elif out['mode'] == 'all':
+          key += (pid,)
+        elif key in values:
+          if out['mode'] == 'sum':
+            value += values[key]
+          else:
+            value = max(value, values[key])
+        values[key] = value
+  return merged
+
+
+def _format_value(value: float) -> str:
+  if value == math.inf:
+    return '+Inf'
+  if isinstance(value, int):
+    return str(value)
+  return repr(float(value))
+
+
+def _format_labels(labels: List[Tuple[str, str]]) -> str:
+  if not labels:
+    return ''
+  escaped = []
+  for name, value in labels:
+    value = value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+    escaped.append(f'{name}="{value}"')
+  return '{' + ','.join(escaped) + '}'
+
+
+def exposition(merged: Dict[str, Dict]) -> str:
+  """Returns merged metrics in the Prometheus text format."""
+  lines = []
+  for name in sorted(merged):
+    metric = merged[name]
+    kind = metric['type']
+    labelnames = list(metric['labelnames'])
+    if kind == 'gauge' and metric['mode'] == 'all':
+      labelnames.append('pid')
+    help_text = metric['help'].replace('\\', '\\\\').replace('\n', '\\n')
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} {kind}')
+    for key, value in sorted(metric['values'].items()):
+      labels = list(zip(labelnames, key))
+      if kind != 'histogram':
+        lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        continue
+      count = 0
+      for bound, bucket_count in zip(metric['buckets'] + [math.inf],
+                                     value[:-1]):
+        count += bucket_count
+        le = [('le', _format_value(float(bound)))]
+        lines.append(f'{name}_bucket{_format_labels(labels + le)} {count}')
+      lines.append(
+          f'{name}_sum{_format_labels(labels)} {_format_value(value[-1])}')
+      lines.append(f'{name}_count{_format_labels(labels)} {count}')
+  return '\n'.join(lines) + '\n'
+
+
+def _authorized() -> bool:
+  scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+  return scheme == 'Bearer' and bool(token) and hmac.compare_digest(
+      token.encode(), _token)
+
+
+def _serve_metrics():
+  if not _authorized():
+    return 'Forbidden', 403
+  write()
+  return Response(exposition(_merge(_read_snapshots())),
+                  content_type=CONTENT_TYPE)
+
+
+def _start_request():
+  _ensure_writer()
+  g.metrics_start = time.perf_counter()
+
+
+def _end_request(response: Response) -> Response:
+  start = g.pop('metrics_start', None)
+  if start is not None:
+    REQUEST_SECONDS.observe(time.perf_counter() - start,
+                            blueprint=request.blueprint or '',
+                            method=request.method,
+                            status=response.status_code)
+  return response
+
+
+def init(app: Flask,
+         service_name: str,
+         collect: Callable[[], None] | None = None):
+  """
+  Serves /metrics and records the latency of requests if ENABLE_METRICS is
+  'true' and METRICS_TOKEN is set. collect is called before the metrics of a worker are written, to
+  set gauges read from elsewhere.
+
+  The files of the processes that have exited, eg. in an earlier run of the
+  server, are deleted. Without --preload, this also drops the counts of the
+  workers that gunicorn replaced, which Prometheus sees as a counter reset.
+  """
+  global _dir, _token, _collect, _exit_registered
+  if os.environ.get('ENABLE_METRICS', '').lower() != 'true':
+    return
+  token = os.environ.get('METRICS_TOKEN', '')
+  if not token:
+    logging.warning('Metrics disabled, ENABLE_METRICS is set without '
+                    'METRICS_TOKEN')
+    return
+  _token = token.encode()
+  _dir = os.environ.get(
+      'METRICS_DIR',
+      os.path.join(tempfile.gettempdir(), 'dc-metrics', service_name))
+  os.makedirs(_dir, exist_ok=True)
+  _prune()
+  _collect = collect
+  app.add_url_rule('/metrics', 'metrics', _serve_metrics)
+  app.before_request(_start_request)
+  app.after_request(_end_request)
+  if not _exit_registered:
+    atexit.register(write)
+    _exit_registered = True
+  logging.info('Metrics enabled, writing them to %s', _dir)
@@ -0,0 +1,386 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Admin-only profiling of live website and NL server workers.
+
+Profiling is enabled by setting the PROFILING_TOKEN environment variable;
+requests must then send it in the X-Profiling-Token header. Without it, no
+route or hook is registered, so nothing runs while idle.
+
+- POST /debug/profile/cpu?seconds=N samples the Python stacks of all the
+  threads of the worker that receives it for N seconds, in the background.
+- A request with 'X-Profile: cpu,alloc' is profiled while it is served: its
+  stacks are sampled (cpu) and/or tracemalloc snapshots are taken before and
+  after it (alloc). The response lists the profiles in X-Profile-Files.
+
+Profiles are written to PROFILING_DIR, shared by the workers of a container,
+and served by any worker:
+- GET /debug/profile/ lists them;
+- GET /debug/profile/<file> returns one, and ?format=svg renders sampled
+  stacks as a flamegraph.
+
+Sampled stacks are in the collapsed format of flamegraph.pl and speedscope:
+one 'thread;outer;...;inner count' line per stack.
+"""
+
+import collections
+import hmac
+import html
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Tuple
+import zlib
+
+from flask import Blueprint
+from flask import current_app
+from flask import Flask
+from flask import g
+from flask import jsonify
+from flask import request
+from flask import Response
+
+TOKEN_HEADER = 'X-Profiling-Token'
+PROFILE_HEADER = 'X-Profile'
+PROFILE_FILES_HEADER = 'X-Profile-Files'
+
+_CONFIG_KEY = 'PROFILING'
+_MAX_SECONDS = 120
+_DEFAULT_INTERVAL_MS = 10
+# Older profiles are deleted beyond this number.
+_MAX_FILES = 100
+# Frames of the tracebacks kept by tracemalloc.
+_ALLOC_FRAMES = 25
+_ALLOC_TOP = 30
+_FILE_NAME = re.compile(r'^(cpu|request-cpu|request-alloc)-\d+-\d+\.txt$')
+
+
+def _frame_name(frame) -> str:
+  code = frame.f_code
+  path = code.co_filename.rsplit(os.sep, 2)
+  return f'{code.co_name} ({"/".join(path[-2:])}:{code.co_firstlineno})'
+
+
+class StackSampler:
+  """Samples the Python stacks of the threads of the process."""
+
+  def __init__(self, interval_sec: float):
+    self._interval_sec = interval_sec
+    self._stop = threading.Event()
+    self._thread = threading.Thread(target=self._run,
+                                    name='profiling-sampler',
+                                    daemon=True)
+    self.counts: Dict[str, int] = collections.Counter()
+    self.samples = 0
+
+  def start(self):
+    self._thread.start()
+
+  def stop(self) -> Dict[str, int]:
+    self._stop.set()
+    self._thread.join()
+    return self.counts
+
+  def _run(self):
+    while not self._stop.wait(self._interval_sec):
+      self.sample()
+
+  def sample(self):
+    names = {t.ident: t.name for t in threading.enumerate()}
+    own = threading.get_ident()
+    for ident, frame in sys._current_frames().items():
+      if ident == own:
+        continue
+      stack = []
+      while frame is not None:
+        stack.append(_frame_name(frame))
+        frame = frame.f_back
+      stack.append(names.get(ident, str(ident)))
+      self.counts[';'.join(reversed(stack))] += 1
+    self.samples += 1
+
+
+def collapsed(counts: Dict[str, int]) -> str:
+  """Returns stack counts in the collapsed format."""
+  return ''.join(
+      f'{stack} {count}\n' for stack, count in sorted(counts.items()))
+
+
+def parse_collapsed(text: str) -> Dict[str, int]:
+  counts = collections.Counter()
+  for line in text.splitlines():
+    stack, _, count = line.rpartition(' ')
+    if stack and count.isdigit():
+      counts[stack] += int(count)
+  return counts
+
+
+_FRAME_HEIGHT = 16
+_SVG_WIDTH = 1200
+
+
+def flamegraph_svg(counts: Dict[str, int], title: str = '') -> str:
+  """Renders stack counts as a flamegraph, with the roots at the bottom."""
+  # Tree of frame -> [count, children].
+  root = [0, {}]
+  depth = 0
+  for stack, count in counts.items():
+    node = root
+    node[0] += count
+    frames = stack.split(';')
+    depth = max(depth, len(frames))
+    for frame in frames:
+      node = node[1].setdefault(frame, [0, {}])
+      node[0] += count
+  total = root[0] or 1
+  height = (depth + 2) * _FRAME_HEIGHT
+  rects = []
+
+  def add(children, x: float, level: int):
+    for name, (count, grandchildren) in sorted(children.items()):
+      width = count / total * _SVG_WIDTH
+      if width >= 0.5:
+        y = height - (level + 1) * _FRAME_HEIGHT
+        # Warm colors, stable per frame.
+        hue = zlib.crc32(name.encode())
+        color = f'rgb({205 + hue % 50},{(hue >> 8) % 180},{(hue >> 16) % 55})'
+        label = html.escape(name)
+        text = label if width > 60 else ''
+        rects.append(
+            f'<g><title>{label} ({count} samples, {count / total:.1%})</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{width:.1f}" '
+            f'height="{_FRAME_HEIGHT - 1}" fill="{color}"/>'
+            f'<text x="{x + 3:.1f}" y="{y + 11}" textLength="{width - 6:.1f}" '
+            f'lengthAdjust="spacingAndGlyphs">{text}</text></g>')
+        add(grandchildren, x, level + 1)
+      x += width
+
+  add(root[1], 0, 0)
+  return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{_SVG_WIDTH}" '
+          f'height="{height}" font-family="monospace" font-size="11">'
+          f'<text x="3" y="12">{html.escape(title)} ({root[0]} samples)'
+          f'</text>{"".join(rects)}</svg>')
+
+
+class AllocationProfile:
+  """Allocations between two tracemalloc snapshots."""
+
+  def __init__(self):
+    self._before = None
+
+  def start(self):
+    tracemalloc.start(_ALLOC_FRAMES)
+    tracemalloc.reset_peak()
+    self._before = tracemalloc.take_snapshot()
+
+  def stop(self) -> str:
+    """Stops tracing and returns a report of the largest allocations."""
+    after = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    lines = [
+        f'Peak traced memory: {peak / 1024:.1f} KiB',
+        f'Traced memory at the end: {current / 1024:.1f} KiB', ''
+    ]
+    stats = after.compare_to(self._before, 'traceback')
+    for stat in stats[:_ALLOC_TOP]:
+      lines.append(f'{stat.size_diff / 1024:+.1f} KiB '
+                   f'({stat.count_diff:+d} blocks), '
+                   f'{stat.size / 1024:.1f} KiB in {stat.count} blocks:')
+      lines.extend(stat.traceback.format(most_recent_first=True))
+      lines.append('')
+    return '\n'.join(lines)
+
+
+class Profiler:
+  """The profiling state of a worker."""
+
+  def __init__(self, token: str, profile_dir: str):
+    self._token = token.encode()
+    self.profile_dir = profile_dir
+    os.makedirs(profile_dir, exist_ok=True)
+    # Only one CPU sampling and one allocation profile at a time, as the
+    # samplers would see each other and tracemalloc is process wide.
+    self.cpu_lock = threading.Lock()
+    self.alloc_lock = threading.Lock()
+
+  def authorized(self) -> bool:
+    token = request.headers.get(TOKEN_HEADER, '').encode()
+    return bool(token) and hmac.compare_digest(token, self._token)
+
+  def write(self, kind: str, content: str) -> str:
+    """Writes a profile and returns its file name."""
+    name = f'{kind}-{os.getpid()}-{time.time_ns() // 1000000}.txt'
+    with open(os.path.join(self.profile_dir, name), 'w') as f:
+      f.write(content)
+    for old in self.files()[_MAX_FILES:]:
+      try:
+        os.remove(os.path.join(self.profile_dir, old[0]))
+      except OSError:
+        pass
+    return name
+
+  def files(self) -> List[Tuple[str, int, float]]:
+    """Returns (name, size, mtime) of the profiles, the latest first."""
+    result = []
+    for name in os.listdir(self.profile_dir):
+      if _FILE_NAME.match(name):
+        stat = os.stat(os.path.join(self.profile_dir, name))
+        result.append((name, stat.st_size, stat.st_mtime))
+    return sorted(result, key=lambda f: f[2], reverse=True)
+
+
+def _profiler() -> Profiler:
+  return current_app.config[_CONFIG_KEY]
+
+
+bp = Blueprint('profiling', __name__, url_prefix='/debug/profile')
+
+
+@bp.before_request
+def _check_token():
+  if not _profiler().authorized():
+    return 'Forbidden', 403
+
+
+def _sample_cpu(profiler: Profiler, seconds: float, interval_sec: float):
+  try:
+    sampler = StackSampler(interval_sec)
+    sampler.start()
+    time.sleep(seconds)
+    counts = sampler.stop()
+    name = profiler.write('cpu', collapsed(counts))
+    logging.info('Wrote CPU profile %s of %d samples', name, sampler.samples)
+  finally:
+    profiler.cpu_lock.release()
+
+
+@bp.route('/cpu', methods=['POST'])
+def cpu():
+  """Samples the stacks of this worker for ?seconds in the background."""
+  try:
+    seconds = float(request.args.get('seconds', 10))
+    interval_ms = float(request.args.get('interval_ms', _DEFAULT_INTERVAL_MS))
+  except ValueError:
+    return 'seconds and interval_ms must be numbers', 400
+  if not 0 < seconds <= _MAX_SECONDS or interval_ms < 1:
+    return f'seconds must be in (0, {_MAX_SECONDS}], interval_ms >= 1', 400
+  profiler = _profiler()
+  if not profiler.cpu_lock.acquire(blocking=False):
+    return 'A CPU profile of this worker is already running', 409
+  threading.Thread(target=_sample_cpu,
+                   args=(profiler, seconds, interval_ms / 1000),
+                   name='profiling-cpu',
+                   daemon=True).start()
+  return jsonify({
+      'pid': os.getpid(),
+      'seconds': seconds,
+      'message': f'Profiling worker {os.getpid()}, see /debug/profile/'
+  }), 202
+
+
+@bp.route('/')
+def index():
+  return jsonify([{
+      'name': name,
+      'bytes': size,
+      'time': mtime
+  } for name, size, mtime in _profiler().files()])
+
+
+@bp.route('/<name>')
+def profile_file(name):
+  if not _FILE_NAME.match(name):
+    return 'Not found', 404
+  profiler = _profiler()
+  try:
+    with open(os.path.join(profiler.profile_dir, name)) as f:
+      content = f.read()
+  except FileNotFoundError:
+    return 'Not found', 404
+  if request.args.get('format') == 'svg' and 'cpu' in name:
+    return Response(flamegraph_svg(parse_collapsed(content), title=name),
+                    mimetype='image/svg+xml')
+  return Response(content, mimetype='text/plain')
+
+
+def _start_request_profile():
+  kinds = request.headers.get(PROFILE_HEADER)
+  if not kinds:
+    return
+  profiler = _profiler()
+  if not profiler.authorized():
+    logging.warning('Ignoring %s header without a valid token', PROFILE_HEADER)
+    return
+  kinds = {k.strip() for k in kinds.split(',')}
+  if 'cpu' in kinds and profiler.cpu_lock.acquire(blocking=False):
+    g.profiling_sampler = StackSampler(_DEFAULT_INTERVAL_MS / 1000)
+    g.profiling_sampler.start()
+  if 'alloc' in kinds and profiler.alloc_lock.acquire(blocking=False):
+    g.profiling_alloc = AllocationProfile()
+    g.profiling_alloc.start()
+
+
+def _end_request_profile(response: Response) -> Response:
+  sampler = g.pop('profiling_sampler', None)
+  alloc = g.pop('profiling_alloc', None)
+  if not sampler and not alloc:
+    return response
+  profiler = _profiler()
+  names = []
+  if alloc:
+    try:
+      names.append(profiler.write('request-alloc', alloc.stop()))
+    finally:
+      profiler.alloc_lock.release()
+  if sampler:
+    try:
+      names.append(profiler.write('request-cpu', collapsed(sampler.stop())))
+    finally:
+      profiler.cpu_lock.release()
+  logging.info('Profiled %s: %s', request.path, ', '.join(names))
+  response.headers[PROFILE_FILES_HEADER] = ', '.join(names)
+  return response
+
+
+def _teardown_request_profile(e):
+  # Stops the profilers of a request that failed before its response.
+  sampler = g.pop('profiling_sampler', None)
+  alloc = g.pop('profiling_alloc', None)
+  if sampler:
+    sampler.stop()
+    _profiler().cpu_lock.release()
+  if alloc:
+    alloc.stop()
+    _profiler().alloc_lock.release()
+
+
+def init(app: Flask):
+  """Registers the profiling routes and hooks if PROFILING_TOKEN is set."""
+  token = os.environ.get('PROFILING_TOKEN', '')
+  if not token:
+    return
+  profile_dir = os.environ.get(
+      'PROFILING_DIR', os.path.join(tempfile.gettempdir(), 'dc-profiles'))
+  app.config[_CONFIG_KEY] = Profiler(token, profile_dir)
+  app.register_blueprint(bp)
+  app.before_request(_start_request_profile)
+  app.after_request(_end_request_profile)
+  app.teardown_request(_teardown_request_profile)
+  logging.info('Profiling enabled, writing profiles to %s', profile_dir)
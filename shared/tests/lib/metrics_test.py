@@ -0,0 +1,203 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for metrics"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from flask import Blueprint
+from flask import Flask
+
+from shared.lib import metrics
+
+# A pid that is not running.
+_DEAD_PID = 2**22 + 1
+
+_CALLS = metrics.counter('test_calls_total', 'Test calls.', ['endpoint'])
+_LATENCY = metrics.histogram('test_latency_seconds',
+                             'Test latency.',
+                             buckets=[0.1, 1])
+_QUEUE_SIZE = metrics.gauge('test_queue_size', 'Test queue size.', mode='sum')
+_LOAD_SECONDS = metrics.gauge('test_load_seconds',
+                              'Test load time.', ['model'],
+                              mode='max')
+_THREADS = metrics.gauge('test_threads', 'Test threads.')
+
+_TOKEN = 'secret'
+_HEADERS = {'Authorization': f'Bearer {_TOKEN}'}
+
+
+def _create_app(metrics_dir: str,
+                enabled: str = 'true',
+                token: str = _TOKEN) -> Flask:
+  app = Flask(__name__)
+  bp = Blueprint('things', __name__)
+
+  @bp.route('/things')
+  def things():
+    return 'things'
+
+  app.register_blueprint(bp)
+  with mock.patch.dict(os.environ, {
+      'ENABLE_METRICS': enabled,
+      'METRICS_TOKEN': token,
+      'METRICS_DIR': metrics_dir
+  }):
+    metrics.init(app, 'test')
+  return app
+
+
+def _samples(text: str) -> dict:
+  """Returns the value of each sample line, by name and labels."""
+  return {
+      line.rsplit(' ', 1)[0]: line.rsplit(' ', 1)[1]
+      for line in text.splitlines()
+      if not line.startswith('#')
+  }
+
+
+class TestMetrics(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp_dir = tempfile.TemporaryDirectory()
+    self.client = _create_app(self.tmp_dir.name).test_client()
+    self.addCleanup(setattr, metrics, '_dir', '')
+
+  def tearDown(self):
+    self.tmp_dir.cleanup()
+
+  def _write_snapshot(self, pid: int, metrics_dict: dict):
+    with open(os.path.join(self.tmp_dir.name, f'{pid}.json'), 'w') as f:
+      json.dump({'pid': pid, 'metrics': metrics_dict}, f)
+
+  def test_disabled(self):
+    client = _create_app(self.tmp_dir.name, enabled='').test_client()
+    self.assertEqual(client.get('/metrics', headers=_HEADERS).status_code, 404)
+    client = _create_app(self.tmp_dir.name, token='').test_client()
+    self.assertEqual(client.get('/metrics', headers=_HEADERS).status_code, 404)
+
+  def test_requires_token(self):
+    self.assertEqual(self.client.get('/metrics').status_code, 403)
+    response = self.client.get('/metrics',
+                               headers={'Authorization': 'Bearer wrong'})
+    self.assertEqual(response.status_code, 403)
+    self.assertEqual(
+        self.client.get('/metrics', headers=_HEADERS).status_code, 200)
+
+  def test_request_latency(self):
+    self.client.get('/things')
+    self.client.get('/things')
+    self.client.get('/missing')
+    response = self.client.get('/metrics', headers=_HEADERS)
+    self.assertEqual(response.content_type, metrics.CONTENT_TYPE)
+    samples = _samples(response.get_data(as_text=True))
+    self.assertEqual(
+        samples['http_request_duration_seconds_count'
+                '{blueprint="things",method="GET",status="200"}'], '2')
+    self.assertEqual(
+        samples['http_request_duration_seconds_bucket'
+                '{blueprint="",method="GET",status="404",le="+Inf"}'], '1')
+
+  def test_merge_workers(self):
+    _CALLS.inc(endpoint='/v2/node')
+    _CALLS.inc(2, endpoint='/v2/node')
+    _LATENCY.observe(0.5)
+    _QUEUE_SIZE.set(3)
+    _LOAD_SECONDS.set(1.5, model='a')
+    _THREADS.set(4)
+    counts = _LATENCY.value()
+    # An exited worker, and a live one (the test runner).
+    for pid in [_DEAD_PID, os.getppid()]:
+      self._write_snapshot(
+          pid, {
+              'test_calls_total': {
+                  'type': 'counter',
+                  'help': 'Test calls.',
+                  'labelnames': ['endpoint'],
+                  'samples': [[['/v2/node'], 10]]
+              },
+              'test_latency_seconds': {
+                  'type': 'histogram',
+                  'help': 'Test latency.',
+                  'labelnames': [],
+                  'buckets': [0.1, 1],
+                  'samples': [[[], [1, 0, 1, 2.05]]]
+              },
+              'test_queue_size': {
+                  'type': 'gauge',
+                  'help': 'Test queue size.',
+                  'labelnames': [],
+                  'mode': 'sum',
+                  'samples': [[[], 5]]
+              },
+              'test_load_seconds': {
+                  'type': 'gauge',
+                  'help': 'Test load time.',
+                  'labelnames': ['model'],
+                  'mode': 'max',
+                  'samples': [[['a'], 2.5]]
+              },
+          })
+
+    text = self.client.get('/metrics', headers=_HEADERS).get_data(as_text=True)
+    self.assertIn('# TYPE test_calls_total counter\n', text)
+    samples = _samples(text)
+    self.assertEqual(samples['test_calls_total{endpoint="/v2/node"}'], '23')
+    self.assertEqual(samples['test_latency_seconds_bucket{le="0.1"}'],
+                     str(2 + counts[0]))
+    self.assertEqual(samples['test_latency_seconds_bucket{le="1.0"}'],
+                     str(2 + counts[0] + counts[1]))
+    self.assertEqual(samples['test_latency_seconds_count'],
+                     str(4 + counts[0] + counts[1] + counts[2]))
+    # Only the gauges of the live workers.
+    self.assertEqual(samples['test_queue_size'], '8')
+    self.assertEqual(samples['test_load_seconds{model="a"}'], '2.5')
+    self.assertEqual(samples[f'test_threads{{pid="{os.getpid()}"}}'], '4')
+
+  def test_fork(self):
+    _CALLS.inc(endpoint='/v2/fork')
+    pid = os.fork()
+    if pid == 0:
+      # The child counts from zero.
+      code = 0 if _CALLS.value(endpoint='/v2/fork') is None else 1
+      _CALLS.inc(5, endpoint='/v2/fork')
+      metrics.write()
+      os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+    samples = _samples(
+        self.client.get('/metrics', headers=_HEADERS).get_data(as_text=True))
+    self.assertEqual(samples['test_calls_total{endpoint="/v2/fork"}'], '6')
+
+  def test_prune_exited_workers(self):
+    self._write_snapshot(_DEAD_PID, {})
+    self._write_snapshot(os.getppid(), {})
+    _create_app(self.tmp_dir.name)
+    self.assertEqual(sorted(os.listdir(self.tmp_dir.name)),
+                     [f'{os.getppid()}.json'])
+
+  def test_labels(self):
+    with self.assertRaises(ValueError):
+      _CALLS.inc(url='/v2/node')
+    with self.assertRaises(ValueError):
+      metrics.counter('test_calls_total', 'Test calls.', ['url'])
+    self.assertIs(
+        metrics.counter('test_calls_total', 'Test calls.', ['endpoint']),
+        _CALLS)
+    _CALLS.inc(endpoint='a"b\\c\nd')
+    text = self.client.get('/metrics', headers=_HEADERS).get_data(as_text=True)
+    self.assertIn('test_calls_total{endpoint="a\\"b\\\\c\\nd"} 1\n', text)
@@ -0,0 +1,133 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for profiling"""
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from flask import Flask
+
+from shared.lib import profiling
+
+_TOKEN = 'secret'
+_HEADERS = {profiling.TOKEN_HEADER: _TOKEN}
+
+
+def _busy_wait(seconds):
+  end = time.time() + seconds
+  while time.time() < end:
+    pass
+
+
+def _create_app(profile_dir: str, token: str = _TOKEN) -> Flask:
+  app = Flask(__name__)
+  with mock.patch.dict(os.environ, {
+      'PROFILING_TOKEN': token,
+      'PROFILING_DIR': profile_dir
+  }):
+    profiling.init(app)
+
+  @app.route('/slow')
+  def slow():
+    _busy_wait(0.2)
+    return {'values': [list(range(100)) for _ in range(100)]}
+
+  return app
+
+
+class TestProfiling(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp_dir = tempfile.TemporaryDirectory()
+    self.client = _create_app(self.tmp_dir.name).test_client()
+
+  def tearDown(self):
+    self.tmp_dir.cleanup()
+
+  def test_disabled_without_token(self):
+    client = _create_app(self.tmp_dir.name, token='').test_client()
+    self.assertEqual(client.post('/debug/profile/cpu').status_code, 404)
+    response = client.get('/slow', headers={profiling.PROFILE_HEADER: 'cpu'})
+    self.assertNotIn(profiling.PROFILE_FILES_HEADER, response.headers)
+
+  def test_requires_token(self):
+    self.assertEqual(self.client.get('/debug/profile/').status_code, 403)
+    response = self.client.get('/debug/profile/',
+                               headers={profiling.TOKEN_HEADER: 'wrong'})
+    self.assertEqual(response.status_code, 403)
+    response = self.client.get('/slow',
+                               headers={profiling.PROFILE_HEADER: 'cpu'})
+    self.assertNotIn(profiling.PROFILE_FILES_HEADER, response.headers)
+
+  def test_cpu(self):
+    busy = threading.Thread(target=_busy_wait, args=(0.5,))
+    busy.start()
+    response = self.client.post('/debug/profile/cpu?seconds=0.2&interval_ms=5',
+                                headers=_HEADERS)
+    self.assertEqual(response.status_code, 202)
+    response = self.client.post('/debug/profile/cpu?seconds=0.2',
+                                headers=_HEADERS)
+    self.assertEqual(response.status_code, 409)
+    busy.join()
+
+    for _ in range(50):
+      files = self.client.get('/debug/profile/', headers=_HEADERS).get_json()
+      if files:
+        break
+      time.sleep(0.1)
+    self.assertEqual(len(files), 1)
+    name = files[0]['name']
+    self.assertTrue(name.startswith('cpu-'))
+    profile = self.client.get(f'/debug/profile/{name}',
+                              headers=_HEADERS).get_data(as_text=True)
+    self.assertIn('_busy_wait (lib/profiling_test.py:', profile)
+    svg = self.client.get(f'/debug/profile/{name}?format=svg', headers=_HEADERS)
+    self.assertEqual(svg.mimetype, 'image/svg+xml')
+    self.assertIn('_busy_wait', svg.get_data(as_text=True))
+
+  def test_bad_requests(self):
+    for args in ['seconds=0', 'seconds=1000', 'seconds=x', 'interval_ms=0']:
+      response = self.client.post(f'/debug/profile/cpu?{args}',
+                                  headers=_HEADERS)
+      self.assertEqual(response.status_code, 400, args)
+    response = self.client.get('/debug/profile/..%2Fpasswd', headers=_HEADERS)
+    self.assertEqual(response.status_code, 404)
+
+  def test_request_profile(self):
+    response = self.client.get('/slow',
+                               headers={
+                                   **_HEADERS, profiling.PROFILE_HEADER:
+                                       'cpu, alloc'
+                               })
+    self.assertEqual(response.status_code, 200)
+    names = response.headers[profiling.PROFILE_FILES_HEADER].split(', ')
+    self.assertEqual([n.split('-')[1] for n in names], ['alloc', 'cpu'])
+    alloc = self.client.get(f'/debug/profile/{names[0]}',
+                            headers=_HEADERS).get_data(as_text=True)
+    self.assertTrue(alloc.startswith('Peak traced memory: '))
+    self.assertIn('profiling_test.py', alloc)
+    cpu = self.client.get(f'/debug/profile/{names[1]}',
+                          headers=_HEADERS).get_data(as_text=True)
+    self.assertIn('_busy_wait', cpu)
+
+  def test_flamegraph(self):
+    svg = profiling.flamegraph_svg(
+        profiling.parse_collapsed('main;a;b 3\nmain;a;c 1\nmain;<d> 4\n'))
+    self.assertIn('<title>main (8 samples, 100.0%)</title>', svg)
+    self.assertIn('<title>a (4 samples, 50.0%)</title>', svg)
+    self.assertIn('<title>&lt;d&gt; (4 samples, 50.0%)</title>', svg)
@@ -0,0 +1,254 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Synthetic inputs of realistic sizes for the benchmark suite. They are
+# generated from a fixed seed, so every run times the same data.
+
+import json
+import random
+from typing import Dict, List
+
+from server.lib.nl.common.utterance import ChartType
+from server.lib.nl.common.utterance import QueryType
+from server.lib.nl.detection.types import ClassificationType
+
+_LAST_YEAR = 2024
+
+
+def places(num_places: int) -> List[str]:
+  """Returns county-like place DCIDs."""
+  return [f'geoId/{i:05d}' for i in range(num_places)]
+
+
+def variables(num_svs: int) -> List[str]:
+  return [f'Count_Person_Var{i}' for i in range(num_svs)]
+
+
+def _facets(num_facets: int) -> Dict[str, Dict]:
+  return {
+      str(1000 + f): {
+          'importName': f'Import{f}',
+          'measurementMethod': 'CensusACS5yrSurvey',
+          'provenanceUrl': f'https://source{f}.example.com',
+          'unit': 'USDollar' if f % 2 else ''
+      } for f in range(num_facets)
+  }
+
+
+def point_response(entities: List[str], svs: List[str],
+                   num_facets: int) -> Dict:
+  """Returns a v2 observation response with the latest point of each
+  facet."""
+  rand = random.Random(0)
+  by_variable = {}
+  for sv in svs:
+    by_entity = {}
+    for entity in entities:
+      ordered_facets = []
+      for f in range(num_facets):
+        date = str(_LAST_YEAR - rand.randint(0, 3))
+        ordered_facets.append({
+            'facetId': str(1000 + f),
+            'earliestDate': date,
+            'latestDate': date,
+            'obsCount': 1,
+            'observations': [{
+                'date': date,
+                'value': rand.random() * 1e5
+            }]
+        })
+      by_entity[entity] = {'orderedFacets': ordered_facets}
+    by_variable[sv] = {'byEntity': by_entity}
+  return {'byVariable': by_variable, 'facets': _facets(num_facets)}
+
+
+def series_response(entities: List[str], svs: List[str], num_facets: int,
+                    num_years: int) -> Dict:
+  """Returns a v2 observation response with yearly series."""
+  rand = random.Random(0)
+  by_variable = {}
+  for sv in svs:
+    by_entity = {}
+    for entity in entities:
+      ordered_facets = []
+      for f in range(num_facets):
+        # Series end at different years, as with real data.
+        end = _LAST_YEAR - rand.randint(0, 3)
+        start = end - num_years + 1
+        ordered_facets.append({
+            'facetId':
+                str(1000 + f),
+            'earliestDate':
+                str(start),
+            'latestDate':
+                str(end),
+            'obsCount':
+                num_years,
+            'observations': [{
+                'date': str(year),
+                'value': rand.random() * 1e5
+            } for year in range(start, end + 1)]
+        })
+      by_entity[entity] = {'orderedFacets': ordered_facets}
+    by_variable[sv] = {'byEntity': by_entity}
+  return {'byVariable': by_variable, 'facets': _facets(num_facets)}
+
+
+def geojson_strings(entities: List[str], num_points: int) -> Dict[str, str]:
+  """Returns a geoJsonCoordinates string per place: a polygon, or a
+  multipolygon for 1 in 10 places."""
+  rand = random.Random(0)
+  result = {}
+  for i, entity in enumerate(entities):
+    lng, lat = rand.uniform(-120, -70), rand.uniform(25, 48)
+    num_polygons = 3 if i % 10 == 0 else 1
+    polygons = []
+    for _ in range(num_polygons):
+      ring = [[
+          round(lng + rand.uniform(-0.5, 0.5), 6),
+          round(lat + rand.uniform(-0.5, 0.5), 6)
+      ] for _ in range(num_points // num_polygons)]
+      ring.append(ring[0])
+      polygons.append([ring])
+    if num_polygons == 1:
+      geojson = {'type': 'Polygon', 'coordinates': polygons[0]}
+    else:
+      geojson = {'type': 'MultiPolygon', 'coordinates': polygons}
+    result[entity] = json.dumps(geojson)
+  return result
+
+
+_QUERY_TEMPLATES = [
+    '{sv} in {place}',
+    'what is the {sv} of {place}',
+    'how has {sv} changed over time in {place}',
+    'which counties in {place} have the highest {sv}',
+    'top 10 cities in {place} by {sv} per capita',
+    'compare {sv} in {place} and {place2}',
+    '{sv} vs {sv2} in counties of {place}',
+    'correlation between {sv} and {sv2} across states',
+    'counties with {sv} over 50000 in {place}',
+    'fastest growing {sv} in {place} since 2010',
+    'show me the {sv} in {place} in 2020',
+    'earthquakes and fires in {place}',
+    'lowest {sv} among countries in africa',
+    'tell me about {place}',
+]
+
+_SV_PHRASES = [
+    'population', 'median household income', 'unemployment rate',
+    'obesity rate', 'poverty', 'life expectancy', 'gdp', 'co2 emissions',
+    'median age', 'number of farms', 'high school graduation rate',
+    'housing prices', 'crime rate', 'asthma prevalence'
+]
+
+_PLACE_PHRASES = [
+    'california', 'new york city', 'texas', 'santa clara county', 'india',
+    'the united states', 'kenya', 'mountain view', 'ohio', 'europe'
+]
+
+
+def queries(num_queries: int) -> List[str]:
+  """Returns NL queries in the styles of the explore page."""
+  rand = random.Random(0)
+  result = []
+  for i in range(num_queries):
+    template = _QUERY_TEMPLATES[i % len(_QUERY_TEMPLATES)]
+    result.append(
+        template.format(sv=rand.choice(_SV_PHRASES),
+                        sv2=rand.choice(_SV_PHRASES),
+                        place=rand.choice(_PLACE_PHRASES),
+                        place2=rand.choice(_PLACE_PHRASES)))
+  return result
+
+
+def _place_dict(dcid: str, place_type: str) -> Dict:
+  return {
+      'dcid': dcid,
+      'name': f'{dcid} name',
+      'place_type': place_type,
+      'country': 'country/USA'
+  }
+
+
+def _chart_dict(sv: str, chart_type: ChartType, place: Dict) -> Dict:
+  return {
+      'chart_type': chart_type,
+      'places': [place],
+      'svs': [sv],
+      'entities': [],
+      'props': [],
+      'event': None,
+      'place_type': 'County',
+      'chart_vars': {
+          'svs': [sv],
+          'props': [],
+          'title': '',
+          'description': '',
+          'title_suffix': '',
+          'is_topic_peer_group': False,
+          'source_topic': 'dc/topic/Benchmark',
+          'event': None,
+          'skip_map_for_ranking': False,
+          'orig_sv_map': {},
+          'growth_direction': None,
+          'growth_ranking_type': None,
+          'svpg_id': '',
+          'skip_overview_for_entity_answer': False
+      },
+      'ranking_types': [],
+      'info_message': ''
+  }
+
+
+def utterance_dicts(svs: List[str], num_utterances: int) -> List[Dict]:
+  """
+  Returns saved utterances (see serialize.save_utterance) of a session of
+  contained-in queries, each with a chart per stat var.
+  """
+  place = _place_dict('geoId/06', 'State')
+  chart_types = [
+      ChartType.TIMELINE_WITH_HIGHLIGHT, ChartType.MAP_CHART,
+      ChartType.RANKING_WITH_MAP, ChartType.BAR_CHART
+  ]
+  result = []
+  for i in range(num_utterances):
+    result.append({
+        'query': f'query {i}',
+        'query_type': QueryType.BASIC,
+        'svs': svs,
+        'properties': [],
+        'places': [place],
+        'entities': [],
+        'classifications': [{
+            'type': ClassificationType.CONTAINED_IN,
+            'contained_in_place_type': 'County',
+            'had_default_type': False
+        }],
+        'ranked_charts': [
+            _chart_dict(sv, chart_types[j % len(chart_types)], place)
+            for j, sv in enumerate(svs)
+        ],
+        'session_id': 'benchmark',
+        'llm_resp': {},
+        'placeFallback': {},
+        'insightCtx': {
+            'childEntityType': 'County',
+            'entities': ['geoId/06'],
+            'variables': svs,
+            'sessionId': 'benchmark'
+        },
+        'answerPlaces': []
+    })
+  return result
@@ -0,0 +1,400 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Regression benchmarks of the website hot paths, on synthetic inputs of
+# realistic sizes (tools/benchmarks/fixtures.py).
+#
+# Each case is timed as the best of --repeat runs, and divided by the time of
+# a fixed calibration workload timed alongside it, so that results from
+# different machines can be compared. --mode=update stores the results as the
+# baselines, and --mode=compare fails when a case is slower than its baseline
+# by more than --threshold.
+#
+# Mixer calls made by the benchmarked functions are patched to return the
+# fixtures.
+
+import contextlib
+import functools
+import json
+import platform
+import re
+import sys
+import timeit
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+from unittest import mock
+
+from absl import app
+from absl import flags
+
+from server.lib import fetch
+from server.lib.nl.common import rank_utils
+from server.lib.nl.common import serialize
+from server.lib.nl.common import utils as nl_utils
+from server.lib.nl.common import variable
+import server.lib.nl.common.counters as ctr
+from server.lib.nl.config_builder import builder
+import server.lib.nl.config_builder.base as builder_base
+from server.lib.nl.detection import heuristic_classifiers
+from server.lib.nl.detection import variable as detection_variable
+from server.lib.nl.detection.types import ClassificationType
+from server.lib.nl.detection.types import RankingType
+from server.lib.nl.detection.types import TimeDeltaType
+from server.lib.nl.fulfillment.types import PopulateState
+import server.lib.util as lib_util
+from server.routes.shared_api import choropleth
+from server.routes.shared_api import csv
+from shared.lib import utils as shared_utils
+from tools.benchmarks import fixtures
+
+FLAGS = flags.FLAGS
+
+flags.DEFINE_enum(
+    'mode', 'run', ['run', 'compare', 'update'],
+    'run: print the results, compare: also compare them with '
+    'the baselines, update: store them as the baselines')
+flags.DEFINE_string('baselines', 'tools/benchmarks/baselines.json',
+                    'JSON file of the baseline results')
+flags.DEFINE_float('threshold', 0.5,
+                   'Slowdown relative to the baseline that fails a case')
+flags.DEFINE_string('cases', '', 'Regex of the names of the cases to run')
+flags.DEFINE_integer('repeat', 7, 'Number of timed runs, the best is kept')
+flags.DEFINE_integer('num_places', 3200, 'Number of places, eg. US counties')
+flags.DEFINE_integer('num_svs', 200, 'Number of stat vars')
+
+
+class Case(NamedTuple):
+  name: str
+  # Builds the inputs, enters any patches in the stack, and returns the
+  # function to time.
+  setup: Callable[[contextlib.ExitStack], Callable[[], Any]]
+
+
+CASES: List[Case] = []
+
+
+def _case(name: str):
+
+  def register(setup):
+    CASES.append(Case(name, setup))
+    return setup
+
+  return register
+
+
+# Fixtures shared by several cases are built once.
+@functools.lru_cache(maxsize=None)
+def _places() -> List[str]:
+  return fixtures.places(FLAGS.num_places)
+
+
+@functools.lru_cache(maxsize=None)
+def _svs() -> List[str]:
+  return fixtures.variables(FLAGS.num_svs)
+
+
+@functools.lru_cache(maxsize=None)
+def _point_response() -> Dict:
+  # Place page and explore charts fetch tens of stat vars at a time.
+  return fixtures.point_response(_places(), _svs()[:20], num_facets=3)
+
+
+@functools.lru_cache(maxsize=None)
+def _series_response() -> Dict:
+  return fixtures.series_response(_places(),
+                                  _svs()[:3],
+                                  num_facets=2,
+                                  num_years=20)
+
+
+@functools.lru_cache(maxsize=None)
+def _queries() -> List[str]:
+  return fixtures.queries(500)
+
+
+def _patch(stack: contextlib.ExitStack, target, name: str, **kwargs):
+  stack.enter_context(mock.patch.object(target, name, **kwargs))
+
+
+@_case('shared.remove_stop_words')
+def _remove_stop_words(_):
+  queries = _queries()
+  stop_words = shared_utils.combine_stop_words()
+  return lambda: [
+      shared_utils.remove_stop_words(q, stop_words) for q in queries
+  ]
+
+
+@_case('nl.heuristic_classifiers')
+def _heuristic_classifiers(_):
+  queries = _queries()
+  counters = ctr.Counters()
+  hc = heuristic_classifiers
+
+  def classify():
+    # The classifiers of heuristic_detector.detect.
+    for q in queries:
+      hc.ranking(q)
+      hc.comparison(q)
+      hc.containedin(q)
+      hc.superlative_type(q)
+      hc.time_delta(q)
+      hc.event(q)
+      hc.general(q, ClassificationType.OVERVIEW, 'Overview')
+      hc.quantity(q, counters)
+      hc.correlation(q)
+      hc.general(q, ClassificationType.ANSWER_PLACES_REFERENCE,
+                 'AnswerPlacesReference')
+      hc.general(q, ClassificationType.PER_CAPITA, 'PerCapita')
+      hc.date(q, counters)
+      hc.general(q, ClassificationType.TEMPORAL, 'Temporal')
+
+  return classify
+
+
+@_case('nl.detect_vars_preprocessing')
+def _detect_vars_preprocessing(_):
+  queries = _queries()
+  stop_words = shared_utils.combine_stop_words()
+
+  def preprocess():
+    # The query preparation of detect_vars, before the embeddings lookup.
+    for q in queries:
+      shared_utils.remove_stop_words(q, stop_words)
+      detection_variable._prepare_multivar_queries(q, stop_words)
+
+  return preprocess
+
+
+@_case('fetch._compact_point')
+def _compact_point(_):
+  resp = _point_response()
+  return lambda: fetch._compact_point(resp, False)
+
+
+@_case('fetch._compact_point.all_facets')
+def _compact_point_all_facets(_):
+  resp = _point_response()
+  return lambda: fetch._compact_point(resp, True)
+
+
+@_case('fetch._compact_series')
+def _compact_series(_):
+  resp = _series_response()
+  return lambda: fetch._compact_series(resp, False)
+
+
+@_case('fetch._compact_series.all_facets')
+def _compact_series_all_facets(_):
+  resp = _series_response()
+  return lambda: fetch._compact_series(resp, True)
+
+
+@_case('choropleth.get_geojson_feature')
+def _get_geojson_feature(_):
+  geojsons = fixtures.geojson_strings(_places(), num_points=200)
+  return lambda: [
+      choropleth.get_geojson_feature(place, place, [geojson])
+      for place, geojson in geojsons.items()
+  ]
+
+
+@_case('csv.get_point_within_csv_rows')
+def _get_point_within_csv_rows(stack):
+  resp = _point_response()
+  svs = list(resp['byVariable'])
+  _patch(stack, csv.dc, 'obs_point_within', return_value=resp)
+  _patch(stack,
+         csv,
+         'names',
+         side_effect=lambda dcids: {dcid: dcid for dcid in dcids})
+  return lambda: csv.get_point_within_csv_rows('country/USA', 'County', svs, {},
+                                               'LATEST')
+
+
+@_case('csv.get_series_csv_rows')
+def _get_series_csv_rows(stack):
+  resp = _series_response()
+  svs = list(resp['byVariable'])
+  _patch(stack,
+         csv,
+         'names',
+         side_effect=lambda dcids: {dcid: dcid for dcid in dcids})
+  return lambda: csv.get_series_csv_rows(resp, svs, {}, '2010', '')
+
+
+@_case('csv.get_series_tidy_csv_rows')
+def _get_series_tidy_csv_rows(stack):
+  resp = _series_response()
+  svs = list(resp['byVariable'])
+  _patch(stack,
+         csv,
+         '_get_entity_and_variable_props',
+         side_effect=lambda places, svs: ({
+             p: {
+                 'name': p,
+                 'isoCode': ''
+             } for p in places
+         }, {
+             sv: {
+                 'name': sv
+             } for sv in svs
+         }))
+  _patch(stack, csv.fetch, 'get_processed_facets', side_effect=lambda f: f)
+  return lambda: csv.get_series_tidy_csv_rows(resp, svs, {}, '2010', '')
+
+
+@_case('util.flattened_observations_to_dates_by_variable')
+def _flattened_observations_to_dates_by_variable(_):
+  flattened = lib_util.flatten_obs_series_response(_series_response())
+  return lambda: lib_util.flattened_observations_to_dates_by_variable(flattened)
+
+
+@_case('nl.rank_places_by_series_growth')
+def _rank_places_by_series_growth(stack):
+  places = _places()
+  sv = _svs()[0]
+  series = fetch._compact_series(
+      fixtures.series_response(places, [sv], num_facets=1, num_years=10), False)
+  denoms = fetch._compact_point(
+      fixtures.point_response(places, ['Count_Person'], num_facets=1), False)
+  _patch(stack, rank_utils.fetch, 'series_core', return_value=series)
+  _patch(stack, rank_utils.fetch, 'point_core', return_value=denoms)
+  counters = ctr.Counters()
+  return lambda: rank_utils.rank_places_by_series_growth(
+      places, sv, TimeDeltaType.INCREASE, RankingType.HIGH, set(), counters,
+      'County')
+
+
+@_case('nl.serialize.save_utterance')
+def _save_utterance(_):
+  uttr = serialize.load_utterance(
+      fixtures.utterance_dicts(_svs(), num_utterances=5))
+  return lambda: serialize.save_utterance(uttr)
+
+
+@_case('nl.serialize.load_utterance')
+def _load_utterance(_):
+  uttr_dicts = fixtures.utterance_dicts(_svs(), num_utterances=5)
+  return lambda: serialize.load_utterance(uttr_dicts)
+
+
+@_case('nl.config_builder.build')
+def _config_builder_build(stack):
+  uttr = serialize.load_utterance(
+      fixtures.utterance_dicts(_svs(), num_utterances=1))
+  uttr.counters = ctr.Counters()
+  sv_names = lambda svs, *args: {sv: f'{sv} name' for sv in svs}
+  empty = lambda svs: {sv: '' for sv in svs}
+  _patch(stack, variable, 'get_sv_name', side_effect=sv_names)
+  _patch(stack, variable, 'get_sv_unit', side_effect=empty)
+  _patch(stack, variable, 'get_sv_description', side_effect=empty)
+  _patch(stack, variable, 'get_sv_footnote', side_effect=empty)
+  _patch(stack, nl_utils, 'parent_place_names', return_value=['USA'])
+  config = builder_base.Config(event_config=None,
+                               sv_chart_titles={},
+                               nopc_vars=set(),
+                               sdg_percent_vars=set())
+  return lambda: builder.build(PopulateState(uttr=uttr), config)
+
+
+def _calibration():
+  # A fixed pure Python workload, of the dict, string and sorting operations
+  # that dominate the cases.
+  values = {f'geoId/{i:05d}': (i * 7919) % 10007 for i in range(100000)}
+  return sorted(values.items(), key=lambda kv: kv[1])
+
+
+def _best_secs(fn: Callable[[], Any], repeat: int) -> Tuple[float, float]:
+  """Returns the best times of fn and of the calibration workload."""
+  # Warm up, eg. compiled regexes.
+  fn()
+  _calibration()
+  # The runs are interleaved, so that both see the same changes in the speed
+  # of the machine, eg. on shared CPUs.
+  secs, calibration_secs = [], []
+  for _ in range(repeat):
+    secs.append(timeit.timeit(fn, number=1))
+    calibration_secs.append(timeit.timeit(_calibration, number=1))
+  return min(secs), min(calibration_secs)
+
+
+def run_cases(cases: List[Case], repeat: int) -> Dict:
+  """Returns the best time of each case, and relative to the calibration."""
+  results = {}
+  calibration_secs = []
+  for case in cases:
+    with contextlib.ExitStack() as stack:
+      sec, calibration_sec = _best_secs(case.setup(stack), repeat)
+    calibration_secs.append(calibration_sec)
+    results[case.name] = {
+        'ms': round(sec * 1000, 3),
+        'relative': round(sec / calibration_sec, 4)
+    }
+  return {
+      'calibration_ms': round(min(calibration_secs, default=0) * 1000, 3),
+      'python': platform.python_version(),
+      'cases': results
+  }
+
+
+def compare(results: Dict, baselines: Dict,
+            threshold: float) -> Dict[str, float]:
+  """Returns the slowdown of each case compared with its baseline, as the
+  ratio of their relative times, for the cases that are slower than the
+  threshold allows."""
+  regressions = {}
+  for name, result in results['cases'].items():
+    baseline = baselines.get('cases', {}).get(name)
+    if not baseline:
+      continue
+    ratio = result['relative'] / baseline['relative']
+    if ratio > 1 + threshold:
+      regressions[name] = ratio
+  return regressions
+
+
+def main(_):
+  cases = [c for c in CASES if re.search(FLAGS.cases, c.name)]
+  results = run_cases(cases, FLAGS.repeat)
+  baselines = {}
+  if FLAGS.mode == 'compare':
+    with open(FLAGS.baselines) as f:
+      baselines = json.load(f)
+
+  print(f'calibration: {results["calibration_ms"]:.1f} ms')
+  for name, result in results['cases'].items():
+    line = f'{name:<52}{result["ms"]:>10.1f} ms'
+    baseline = baselines.get('cases', {}).get(name)
+    if baseline:
+      line += f'{result["relative"] / baseline["relative"]:>8.2f}x baseline'
+    elif FLAGS.mode == 'compare':
+      line += '     no baseline'
+    print(line)
+
+  if FLAGS.mode == 'update':
+    with open(FLAGS.baselines, 'w') as f:
+      json.dump(results, f, indent=2, sort_keys=True)
+      f.write('\n')
+    print(f'Wrote {FLAGS.baselines}')
+  elif FLAGS.mode == 'compare':
+    regressions = compare(results, baselines, FLAGS.threshold)
+    for name, ratio in regressions.items():
+      print(f'REGRESSION {name}: {ratio:.2f}x the baseline', file=sys.stderr)
+    if regressions:
+      return 1
+  return 0
+
+
+if __name__ == '__main__':
+  app.run(main)
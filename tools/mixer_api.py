@@ -0,0 +1,61 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Client of the Data Commons REST API for the tools that build the website's
+# local snapshots. Requests use the key in the DC_API_KEY environment variable.
+
+import os
+
+from absl import flags
+import requests
+
+FLAGS = flags.FLAGS
+
+flags.DEFINE_string('api_root', 'https://api.datacommons.org',
+                    'Root of the Data Commons REST API')
+
+
+def post(path, req):
+  resp = requests.post(f'{FLAGS.api_root}{path}',
+                       json=req,
+                       headers={'x-api-key': os.environ['DC_API_KEY']})
+  resp.raise_for_status()
+  return resp.json()
+
+
+def v2node(nodes, prop, batch_size):
+  """
+  Returns the v2/node data of the nodes, fetched batch_size nodes at a time.
+  The nodes of an arc are merged over all the pages of a response.
+  """
+  result = {}
+  for i in range(0, len(nodes), batch_size):
+    next_token = ''
+    while True:
+      req = {'nodes': nodes[i:i + batch_size], 'property': prop}
+      if next_token:
+        req['nextToken'] = next_token
+      resp = post('/v2/node', req)
+      for dcid, node_data in resp.get('data', {}).items():
+        node = result.setdefault(dcid, {})
+        if 'properties' in node_data:
+          node.setdefault('properties', []).extend(node_data['properties'])
+        for arc, arc_data in node_data.get('arcs', {}).items():
+          node.setdefault('arcs', {}).setdefault(arc,
+                                                 {'nodes': []})['nodes'].extend(
+                                                     arc_data.get('nodes', []))
+      next_token = resp.get('nextToken', '')
+      if not next_token:
+        break
+  return result
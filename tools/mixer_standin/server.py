@@ -0,0 +1,200 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Local stand-in for the mixer, serving recorded v2 observation, node,
+# resolve and event responses, with a configurable latency per endpoint.
+#
+# Recordings are keyed and stored like the website recorder ones
+# (server/lib/recorder): by the RequestHasher hash of the request, in a
+# directory per endpoint. In record mode, requests without a recording are
+# sent to the upstream mixer and the responses are recorded.
+#
+# Point the website at it with WEBSITE_MIXER_API_ROOT=http://localhost:<port>.
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Dict, Tuple
+
+from absl import app
+from absl import flags
+from flask import Flask
+from flask import request
+from flask import Response
+import requests
+
+from server.lib.recorder.hashing import RequestHasher
+from server.lib.recorder.stats import RecorderStats
+from server.lib.recorder.storage import Recording
+from server.lib.recorder.storage import RecordingStorage
+
+FLAGS = flags.FLAGS
+
+flags.DEFINE_integer('port', 8081, 'Port to serve on')
+flags.DEFINE_string('recordings', 'tools/mixer_standin/recordings',
+                    'Directory of the recorded mixer responses')
+flags.DEFINE_enum(
+    'mode', 'replay', ['replay', 'record'],
+    'replay: only serve recordings, record: also record the '
+    'responses of the upstream mixer to requests without one')
+flags.DEFINE_string('upstream', 'https://api.datacommons.org',
+                    'Mixer to record from')
+flags.DEFINE_string('api_key', os.environ.get('DC_API_KEY', ''),
+                    'API key of the upstream mixer')
+flags.DEFINE_string(
+    'latency', '', 'Latency to add per endpoint, as comma separated '
+    'ENDPOINT=BASE_MS[:TAIL_MS], eg. "observation=40:20,node=10". * sets the '
+    'latency of the other endpoints')
+flags.DEFINE_integer('latency_seed', 0, 'Seed of the latency jitter')
+
+# Mixer endpoints served, under /v2/.
+ENDPOINTS = ['observation', 'node', 'resolve', 'event']
+
+# Endpoint -> (base ms, mean tail ms).
+Latency = Dict[str, Tuple[float, float]]
+
+
+def parse_latency(spec: str) -> Latency:
+  """Parses a --latency flag value."""
+  latency = {}
+  for item in filter(None, (s.strip() for s in spec.split(','))):
+    endpoint, _, value = item.partition('=')
+    if endpoint != '*' and endpoint not in ENDPOINTS:
+      raise ValueError(f'Unknown endpoint in latency: {endpoint}')
+    base, _, tail = value.partition(':')
+    latency[endpoint] = (float(base), float(tail or 0))
+  return latency
+
+
+class MixerStandin:
+  """Serves the recorded mixer responses of a directory."""
+
+  def __init__(self,
+               recordings_dir: str,
+               record: bool = False,
+               upstream: str = '',
+               api_key: str = '',
+               latency: Latency | None = None,
+               seed: int = 0):
+    self.storage = RecordingStorage(recordings_dir)
+    self.hasher = RequestHasher()
+    self.stats = RecorderStats()
+    self.record = record
+    self.upstream = upstream.rstrip('/')
+    self.api_key = api_key
+    self.latency = latency or {}
+    self._rand = random.Random(seed)
+    self._rand_lock = threading.Lock()
+    self._session = requests.Session()
+
+  def delay_sec(self, endpoint: str) -> float:
+    """
+    Returns the latency to add to a response: the base latency of the
+    endpoint plus an exponentially distributed tail, which gives the long
+    p99 of real mixer calls.
+    """
+    base_ms, tail_ms = self.latency.get(endpoint, self.latency.get('*', (0, 0)))
+    if tail_ms:
+      with self._rand_lock:
+        base_ms += self._rand.expovariate(1 / tail_ms)
+    return base_ms / 1000
+
+  def _fetch_upstream(self) -> Recording | None:
+    resp = self._session.request(request.method,
+                                 f'{self.upstream}{request.path}',
+                                 params=request.args,
+                                 json=request.get_json(silent=True),
+                                 headers={'x-api-key': self.api_key})
+    if resp.status_code != 200:
+      logging.warning('Upstream mixer returned %s for %s', resp.status_code,
+                      request.path)
+      return None
+    return Recording(request_path=request.path,
+                     request_args=request.args.to_dict(flat=False),
+                     request_json=request.get_json(silent=True),
+                     response_mimetype='application/json',
+                     response_encoding=None,
+                     response_body=resp.text)
+
+  def handle(self, endpoint: str) -> Response:
+    start = time.time()
+    hash_key = self.hasher.get_hash(request)
+    path = self.storage.get_recording_path(request.path, hash_key)
+    record = self.storage.load_record(path)
+    if record:
+      self.stats.increment_found()
+    elif self.record:
+      self.stats.increment_fallback_live(request.path)
+      record = self._fetch_upstream()
+      if record:
+        self.storage.save_record(path, record)
+        self.stats.add_recorded_hash(hash_key)
+    else:
+      # Counted as a fake response: the stand-in answers with an error, as
+      # the mixer does for bad requests.
+      self.stats.increment_fallback_fake()
+    delay = self.delay_sec(endpoint) - (time.time() - start)
+    if delay > 0:
+      time.sleep(delay)
+    if not record:
+      return Response(json.dumps({
+          'code': 5,
+          'message': f'No recording for {request.path} ({hash_key})'
+      }),
+                      status=404,
+                      mimetype='application/json')
+    return Response(record.response_body,
+                    status=200,
+                    mimetype=record.response_mimetype)
+
+
+def create_app(standin: MixerStandin) -> Flask:
+  mixer = Flask(__name__)
+
+  @mixer.route('/v2/<endpoint>', methods=['GET', 'POST'])
+  def v2(endpoint):
+    if endpoint not in ENDPOINTS:
+      return Response(json.dumps({
+          'code': 12,
+          'message': f'Endpoint not served: {request.path}'
+      }),
+                      status=404,
+                      mimetype='application/json')
+    return standin.handle(endpoint)
+
+  @mixer.route('/healthz')
+  def healthz():
+    return 'OK'
+
+  return mixer
+
+
+def main(_):
+  standin = MixerStandin(FLAGS.recordings,
+                         record=FLAGS.mode == 'record',
+                         upstream=FLAGS.upstream,
+                         api_key=FLAGS.api_key,
+                         latency=parse_latency(FLAGS.latency),
+                         seed=FLAGS.latency_seed)
+  try:
+    create_app(standin).run(port=FLAGS.port, threaded=True)
+  finally:
+    standin.stats.log_stats()
+
+
+if __name__ == '__main__':
+  app.run(main)
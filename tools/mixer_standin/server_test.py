@@ -0,0 +1,101 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import tempfile
+import unittest
+from unittest import mock
+
+from tools.mixer_standin import server
+from tools.mixer_standin import traffic
+
+_REQ = {
+    'select': ['date', 'value', 'variable', 'entity'],
+    'entity': {
+        'dcids': ['geoId/06', 'geoId/36']
+    },
+    'variable': {
+        'dcids': ['Count_Person']
+    }
+}
+
+
+class TestMixerStandin(unittest.TestCase):
+
+  def setUp(self):
+    tmp_dir = tempfile.TemporaryDirectory()
+    self.addCleanup(tmp_dir.cleanup)
+    self.recordings = tmp_dir.name
+
+  def test_record_and_replay(self):
+    recorder = server.MixerStandin(self.recordings,
+                                   record=True,
+                                   upstream='https://mixer')
+    upstream_resp = mock.Mock(status_code=200, text='{"byVariable": {}}')
+    with mock.patch.object(recorder._session,
+                           'request',
+                           return_value=upstream_resp) as mock_request:
+      client = server.create_app(recorder).test_client()
+      resp = client.post('/v2/observation', json=_REQ)
+      self.assertEqual(resp.status_code, 200)
+      self.assertEqual(resp.get_json(), {'byVariable': {}})
+      # Recorded responses are not fetched again.
+      client.post('/v2/observation', json=_REQ)
+      mock_request.assert_called_once()
+
+    client = server.create_app(server.MixerStandin(
+        self.recordings)).test_client()
+    # The same request, with lists in another order.
+    req = dict(_REQ, entity={'dcids': ['geoId/36', 'geoId/06']})
+    resp = client.post('/v2/observation', json=req)
+    self.assertEqual(resp.get_json(), {'byVariable': {}})
+    resp = client.post('/v2/observation', json=dict(_REQ, date='2020'))
+    self.assertEqual(resp.status_code, 404)
+    self.assertEqual(client.post('/v2/bulk', json=_REQ).status_code, 404)
+
+  def test_latency(self):
+    self.assertEqual(server.parse_latency('observation=40:20, *=5'), {
+        'observation': (40, 20),
+        '*': (5, 0)
+    })
+    with self.assertRaises(ValueError):
+      server.parse_latency('bulk=10')
+    standin = server.MixerStandin(
+        self.recordings, latency=server.parse_latency('observation=40:20,*=5'))
+    self.assertEqual(standin.delay_sec('node'), 0.005)
+    delays = [standin.delay_sec('observation') for _ in range(1000)]
+    self.assertGreaterEqual(min(delays), 0.04)
+    self.assertAlmostEqual(sum(delays) / len(delays), 0.06, delta=0.005)
+
+
+class TestTraffic(unittest.TestCase):
+
+  def test_percentile(self):
+    values = list(range(1, 101))
+    self.assertEqual(traffic.percentile(values, 50), 50)
+    self.assertEqual(traffic.percentile(values, 99), 99)
+    self.assertEqual(traffic.percentile([], 99), 0)
+
+  def test_mix_weights(self):
+    mix = traffic.TrafficMix({
+        'requests': [{
+            'name': 'a',
+            'weight': 3,
+            'paths': ['/a']
+        }, {
+            'name': 'b',
+            'paths': ['/b1', '/b2']
+        }]
+    })
+    names = [mix.next()['name'] for _ in range(4000)]
+    self.assertAlmostEqual(names.count('a') / len(names), 0.75, delta=0.03)
@@ -0,0 +1,152 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Sends a weighted mix of website API requests (place pages, explore queries,
+# CSV downloads, choropleths) from concurrent clients, and reports the
+# throughput and the latency percentiles of each kind of request.
+
+import concurrent.futures
+import json
+import math
+import random
+import threading
+import time
+from typing import Dict, List
+
+from absl import app
+from absl import flags
+import requests
+
+FLAGS = flags.FLAGS
+
+flags.DEFINE_string('website', 'http://localhost:8080', 'Website to load')
+flags.DEFINE_string('mix', 'tools/mixer_standin/traffic_mix.json',
+                    'JSON file of the requests to send and their weights')
+flags.DEFINE_integer('concurrency', 8, 'Number of concurrent clients')
+flags.DEFINE_integer('duration_sec', 60, 'How long to send requests for')
+flags.DEFINE_integer('warmup_requests', 0,
+                     'Requests to send before measuring, eg. to fill caches')
+flags.DEFINE_integer('seed', 0, 'Seed of the request order')
+flags.DEFINE_bool('skip_cache', False,
+                  'Send X-Skip-Cache so the website skips its cache')
+flags.DEFINE_string('output', '', 'Optional JSON file to write the report to')
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+  """Returns the nearest-rank percentile of sorted values."""
+  if not sorted_values:
+    return 0
+  rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+  return sorted_values[rank - 1]
+
+
+class TrafficMix:
+  """Picks requests of a mix file at random by weight."""
+
+  def __init__(self, mix: Dict, seed: int = 0):
+    self.requests = mix['requests']
+    self._weights = [r.get('weight', 1) for r in self.requests]
+    self._rand = random.Random(seed)
+    self._lock = threading.Lock()
+
+  def next(self) -> Dict:
+    with self._lock:
+      req = self._rand.choices(self.requests, weights=self._weights)[0]
+      path = self._rand.choice(req['paths'])
+    return {
+        'name': req['name'],
+        'method': req.get('method', 'GET'),
+        'path': path,
+        'json': req.get('json')
+    }
+
+
+def _send(session: requests.Session, website: str, req: Dict) -> Dict:
+  start = time.time()
+  try:
+    resp = session.request(req['method'],
+                           f'{website}{req["path"]}',
+                           json=req['json'])
+    ok = resp.status_code == 200
+  except Exception:
+    ok = False
+  return {'name': req['name'], 'ok': ok, 'sec': time.time() - start}
+
+
+def run(website: str,
+        mix: TrafficMix,
+        concurrency: int,
+        duration_sec: float,
+        warmup_requests: int = 0,
+        skip_cache: bool = False) -> Dict:
+  """Sends the mix until duration_sec is over, and returns the report."""
+  session = requests.Session()
+  if skip_cache:
+    session.headers['X-Skip-Cache'] = 'true'
+  adapter = requests.adapters.HTTPAdapter(pool_maxsize=concurrency)
+  session.mount('http://', adapter)
+  session.mount('https://', adapter)
+  for _ in range(warmup_requests):
+    _send(session, website, mix.next())
+
+  results = []
+  results_lock = threading.Lock()
+  start = time.time()
+  end = start + duration_sec
+
+  def client():
+    while time.time() < end:
+      result = _send(session, website, mix.next())
+      with results_lock:
+        results.append(result)
+
+  with concurrent.futures.ThreadPoolExecutor(concurrency) as executor:
+    for future in [executor.submit(client) for _ in range(concurrency)]:
+      future.result()
+  elapsed = time.time() - start
+
+  report = {'concurrency': concurrency, 'elapsed_sec': elapsed, 'by_name': {}}
+  names = sorted(set(r['name'] for r in results))
+  for name in names + ['all']:
+    name_results = [r for r in results if name in ('all', r['name'])]
+    latencies = sorted(r['sec'] * 1000 for r in name_results if r['ok'])
+    report['by_name'][name] = {
+        'requests': len(name_results),
+        'errors': sum(1 for r in name_results if not r['ok']),
+        'qps': len(name_results) / elapsed,
+        'p50_ms': percentile(latencies, 50),
+        'p90_ms': percentile(latencies, 90),
+        'p99_ms': percentile(latencies, 99),
+    }
+  return report
+
+
+def main(_):
+  with open(FLAGS.mix) as f:
+    mix = TrafficMix(json.load(f), FLAGS.seed)
+  report = run(FLAGS.website, mix, FLAGS.concurrency, FLAGS.duration_sec,
+               FLAGS.warmup_requests, FLAGS.skip_cache)
+  print(f'{"request":<20}{"count":>8}{"errors":>8}{"qps":>8}'
+        f'{"p50 ms":>10}{"p90 ms":>10}{"p99 ms":>10}')
+  for name, stats in report['by_name'].items():
+    print(f'{name:<20}{stats["requests"]:>8}{stats["errors"]:>8}'
+          f'{stats["qps"]:>8.1f}{stats["p50_ms"]:>10.1f}'
+          f'{stats["p90_ms"]:>10.1f}{stats["p99_ms"]:>10.1f}')
+  if FLAGS.output:
+    with open(FLAGS.output, 'w') as f:
+      json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+  app.run(main)
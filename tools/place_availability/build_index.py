@@ -0,0 +1,159 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Builds the place availability index loaded by
+# server/lib/place_availability.py.
+#
+# Starting from the root places, indexes the children of each place for every
+# (parent type, child type) level, then does the same for the children.
+
+import collections
+import datetime
+import os
+
+from absl import app
+from absl import flags
+
+from server.lib import place_availability
+import server.lib.util as libutil
+from tools import mixer_api
+
+FLAGS = flags.FLAGS
+
+flags.DEFINE_string('output', 'place_availability.idx', 'Path of the index')
+flags.DEFINE_list('roots', ['Earth:Place'],
+                  'Root places to start from, as dcid:type')
+flags.DEFINE_list(
+    'levels', [
+        'Place:Continent', 'Place:Country', 'Continent:Country',
+        'Country:State', 'Country:AdministrativeArea1', 'State:County',
+        'AdministrativeArea1:AdministrativeArea2', 'County:City'
+    ], 'Place types to index under each parent type, as parent_type:child_type')
+flags.DEFINE_integer('batch_size', 100, 'Number of variables per call')
+
+_GEO_PROPERTIES = {
+    'geoJsonCoordinatesDP3', 'geoJsonCoordinatesDP2', 'geoJsonCoordinatesDP1'
+}
+
+
+def chart_svs():
+  """Returns the variables and denominators of the place page charts."""
+  svs = set()
+  for config in libutil.get_chart_config():
+    if 'variables' not in config:
+      continue
+    svs.update(config['variables'])
+    if not config.get('non_dividable'):
+      svs.update(config.get('denominator') or ['Count_Person'])
+  return sorted(svs)
+
+
+def _existence(svs, entity):
+  """Returns entity -> variables with data, for an entity request."""
+  result = collections.defaultdict(set)
+  for i in range(0, len(svs), FLAGS.batch_size):
+    resp = mixer_api.post(
+        '/v2/observation', {
+            'select': ['variable', 'entity'],
+            'entity': entity,
+            'variable': {
+                'dcids': svs[i:i + FLAGS.batch_size]
+            }
+        })
+    for sv, sv_data in resp.get('byVariable', {}).items():
+      for e in sv_data.get('byEntity', {}):
+        result[e].add(sv)
+  return result
+
+
+def _children(parent, child_type):
+  data = mixer_api.v2node([parent],
+                          f'<-containedInPlace+{{typeOf:{child_type}}}', 1)
+  nodes = data.get(parent, {}).get('arcs', {}).get('containedInPlace+',
+                                                   {}).get('nodes', [])
+  return sorted(n['dcid'] for n in nodes if n.get('dcid'))
+
+
+def _has_geo(places):
+  if not places:
+    return False
+  data = mixer_api.v2node(places, '->', len(places))
+  for node in data.values():
+    if _GEO_PROPERTIES & set(node.get('properties', [])):
+      return True
+  return False
+
+
+def build():
+  svs = chart_svs()
+  levels = collections.defaultdict(list)
+  for level in FLAGS.levels:
+    parent_type, child_type = level.split(':')
+    levels[parent_type].append(child_type)
+
+  entries = {}
+  current = [tuple(root.split(':')) for root in FLAGS.roots]
+  for dcid, sv_set in _existence(svs, {
+      'dcids': [dcid for dcid, _ in current]
+  }).items():
+    entries[place_availability.place_key(dcid)] = ([sorted(sv_set)], 0)
+  visited = {dcid for dcid, _ in current}
+  while current:
+    next_places = []
+    for parent, parent_type in current:
+      for child_type in levels.get(parent_type, []):
+        children = _children(parent, child_type)
+        if not children:
+          continue
+        child_svs = _existence(svs, {
+            'expression': f'{parent}<-containedInPlace+{{typeOf:{child_type}}}'
+        })
+        counts = collections.Counter()
+        for child in children:
+          child_sv_set = child_svs.get(child, set())
+          counts.update(child_sv_set)
+          entries[place_availability.place_key(child)] = ([
+              sorted(child_sv_set)
+          ], 0)
+          if child not in visited:
+            visited.add(child)
+            next_places.append((child, child_type))
+        sv_lists = [
+            sorted(sv
+                   for sv, count in counts.items()
+                   if count >= n)
+            for n in range(1, place_availability.MAX_COUNT + 1)
+        ]
+        flags_value = place_availability.FLAG_GEO if _has_geo(children) else 0
+        entries[place_availability.child_key(parent,
+                                             child_type)] = (sv_lists,
+                                                             flags_value)
+    print(f'Indexed {len(entries)} keys, {len(next_places)} places to expand')
+    current = next_places
+  return svs, entries
+
+
+def main(_):
+  svs, entries = build()
+  version = datetime.datetime.now(datetime.timezone.utc).isoformat()
+  # Write next to the output and rename, so that servers mapping the current
+  # index never see a partial file.
+  tmp_path = f'{FLAGS.output}.tmp'
+  place_availability.write_index(tmp_path, svs, entries, version)
+  os.replace(tmp_path, FLAGS.output)
+  print(f'Wrote {len(entries)} keys and {len(svs)} variables to {FLAGS.output}')
+
+
+if __name__ == '__main__':
+  app.run(main)
@@ -0,0 +1,38 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Builds the startup snapshot loaded by server/lib/startup.py.
+
+import os
+import time
+
+from absl import app
+from absl import flags
+
+from server.lib import startup
+
+FLAGS = flags.FLAGS
+
+flags.DEFINE_string('output', 'startup_snapshot.pkl', 'Path of the snapshot')
+
+
+def main(_):
+  start = time.time()
+  keys = startup.build_snapshot(FLAGS.output)
+  print(f'Wrote {len(keys)} values ({os.path.getsize(FLAGS.output)} bytes) '
+        f'to {FLAGS.output} in {time.time() - start:.2f}s')
+
+
+if __name__ == '__main__':
+  app.run(main)
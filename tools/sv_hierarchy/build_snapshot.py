@@ -0,0 +1,87 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Builds the stat var hierarchy snapshot loaded by server/lib/sv_hierarchy.py.
+#
+# Walks down from dc/g/Root through the specializationOf (groups) and memberOf
+# (stat vars) arcs and writes the parents and names of every node reached.
+
+import datetime
+import json
+
+from absl import app
+from absl import flags
+
+from tools import mixer_api
+
+FLAGS = flags.FLAGS
+
+flags.DEFINE_string('output', 'sv_hierarchy.json', 'Path of the snapshot')
+flags.DEFINE_integer('batch_size', 500, 'Number of nodes per v2/node call')
+
+_ROOT = 'dc/g/Root'
+# Stat var hierarchy depth is far below this; it only guards against cycles.
+_MAX_DEPTH = 50
+
+
+def build():
+  parents = {}
+  names = {}
+  current = [_ROOT]
+  visited = {_ROOT}
+  depth = 0
+  while current and depth < _MAX_DEPTH:
+    print(f'Depth {depth}: {len(current)} groups')
+    children = mixer_api.v2node(current, '<-[memberOf,specializationOf]',
+                                FLAGS.batch_size)
+    next_groups = []
+    for group, node_data in children.items():
+      for arc, arc_data in node_data.get('arcs', {}).items():
+        for n in arc_data['nodes']:
+          dcid = n.get('dcid')
+          if not dcid:
+            continue
+          parents.setdefault(dcid, set()).add(group)
+          if dcid in visited:
+            continue
+          visited.add(dcid)
+          # Only groups have members of their own.
+          if arc == 'specializationOf' or 'StatVarGroup' in n.get('types', []):
+            next_groups.append(dcid)
+          if n.get('name'):
+            names[dcid] = n['name']
+    current = sorted(set(next_groups))
+    depth += 1
+
+  nodes = []
+  for dcid in sorted(parents):
+    node = {'dcid': dcid, 'parents': sorted(parents[dcid])}
+    if dcid.startswith('dc/g/') and dcid in names:
+      node['name'] = names[dcid]
+    nodes.append(node)
+  return {
+      'version': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+      'nodes': nodes
+  }
+
+
+def main(_):
+  snapshot = build()
+  with open(FLAGS.output, 'w') as f:
+    json.dump(snapshot, f)
+  print(f'Wrote {len(snapshot["nodes"])} nodes to {FLAGS.output}')
+
+
+if __name__ == '__main__':
+  app.run(main)
@@ -0,0 +1,78 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Builds the stat var metadata snapshot loaded by server/lib/sv_metadata.py.
+#
+# The snapshot holds the popular stat vars: those in the chart configs, the NL
+# chart titles and the main topic cache (topics, SVPGs and their members).
+
+import datetime
+import json
+
+from absl import app
+from absl import flags
+
+from server.lib import startup
+from server.lib import sv_metadata
+from server.lib.nl.explore.params import DCNames
+from tools import mixer_api
+
+FLAGS = flags.FLAGS
+
+flags.DEFINE_string('output', 'sv_metadata.json', 'Path of the snapshot')
+flags.DEFINE_integer('batch_size', 500, 'Number of nodes per v2/node call')
+
+
+def popular_svs():
+  config = startup.StaticConfig()
+  svs = set(config.get('RANKED_STAT_VARS'))
+  svs.update(config.get('NL_CHART_TITLES').keys())
+  main_cache = config.get('TOPIC_CACHE').get(DCNames.MAIN_DC.value)
+  if main_cache:
+    for dcid, node in main_cache.out_map.items():
+      svs.add(dcid)
+      svs.update(node.vars)
+      svs.update(node.extended_vars)
+  return sorted(svs)
+
+
+def build():
+  svs = popular_svs()
+  print(f'Fetching {len(svs)} stat vars')
+  data = mixer_api.v2node(svs, f'->[{", ".join(sv_metadata.PROPS)}]',
+                          FLAGS.batch_size)
+  entries = {}
+  for sv in svs:
+    arcs = data.get(sv, {}).get('arcs', {})
+    entries[sv] = {
+        prop: [
+            n.get('dcid') or n.get('value')
+            for n in arcs.get(prop, {}).get('nodes', [])
+        ] for prop in sv_metadata.PROPS
+    }
+  return {
+      'version': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+      'svs': entries
+  }
+
+
+def main(_):
+  snapshot = build()
+  with open(FLAGS.output, 'w') as f:
+    json.dump(snapshot, f)
+  print(f'Wrote {len(snapshot["svs"])} stat vars to {FLAGS.output}')
+
+
+if __name__ == '__main__':
+  app.run(main)